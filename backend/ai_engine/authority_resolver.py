@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import uuid
 
 from sqlalchemy import select
@@ -25,6 +26,12 @@ DOC_TYPE_AUTHORITY_OVERRIDE = {
 }
 
 
+RESOLVER_VERSION = "wave-ai2-authority-v1"
+RESOLVER_TABLE_HASH = hashlib.sha256(
+    repr((sorted(AUTHORITY_RANK.items()), sorted(DOC_TYPE_AUTHORITY_OVERRIDE.items()))).encode("utf-8")
+).hexdigest()
+
+
 def _resolve_authority(container_authority: str, doc_type: str) -> str:
     container_level = container_authority if container_authority in AUTHORITY_RANK else "EVIDENCE"
     override = DOC_TYPE_AUTHORITY_OVERRIDE.get(doc_type)
@@ -59,11 +66,26 @@ def _jurisdiction(doc: DocumentRegistry, classification: DocumentClassification)
     return None
 
 
+def _input_fingerprint(doc: DocumentRegistry, classification: DocumentClassification) -> str:
+    parts = (
+        RESOLVER_VERSION,
+        RESOLVER_TABLE_HASH,
+        classification.input_fingerprint or "",
+        classification.doc_type,
+        doc.authority,
+        doc.shareability,
+        doc.container_name,
+        doc.blob_path,
+    )
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
 def resolve_authority_profiles(
     db: Session,
     *,
     fund_id: uuid.UUID,
     actor_id: str = "ai-engine",
+    force: bool = False,
 ) -> list[DocumentGovernanceProfile]:
     rows = list(
         db.execute(
@@ -75,9 +97,19 @@ def resolve_authority_profiles(
             )
         ).all()
     )
+    existing_by_doc = {
+        row.doc_id: row
+        for row in db.execute(select(DocumentGovernanceProfile).where(DocumentGovernanceProfile.fund_id == fund_id)).scalars().all()
+    }
 
     saved: list[DocumentGovernanceProfile] = []
     for document, classification in rows:
+        fingerprint = _input_fingerprint(document, classification)
+        existing = existing_by_doc.get(document.id)
+        if existing is not None and existing.input_fingerprint == fingerprint and not force:
+            saved.append(existing)
+            continue
+
         resolved = _resolve_authority(document.authority, classification.doc_type)
         profile_payload = {
             "fund_id": fund_id,
@@ -87,28 +119,20 @@ def resolve_authority_profiles(
             "binding_scope": _binding_scope(classification.doc_type),
             "shareability_final": document.shareability,
             "jurisdiction": _jurisdiction(document, classification),
+            "input_fingerprint": fingerprint,
             "created_by": actor_id,
             "updated_by": actor_id,
         }
 
-        existing = db.execute(
-            select(DocumentGovernanceProfile).where(
-                DocumentGovernanceProfile.fund_id == fund_id,
-                DocumentGovernanceProfile.doc_id == document.id,
-            )
-        ).scalar_one_or_none()
-
         if existing is None:
             row = DocumentGovernanceProfile(**profile_payload)
             db.add(row)
-            db.flush()
         else:
             for key, value in profile_payload.items():
                 if key == "created_by":
                     continue
                 setattr(existing, key, value)
             row = existing
-            db.flush()
 
         saved.append(row)
 
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 import datetime as dt
 import uuid
-from hashlib import sha1
+from hashlib import sha1, sha256
 
 from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
+from ai_engine.keyword_rules import KeywordRule, KeywordRuleTable, RuleDecision
 from app.modules.ai.models import DocumentRegistry
 from app.modules.documents.models import Document, DocumentVersion
 from app.services.search_index import AzureSearchMetadataClient
@@ -40,24 +41,51 @@ def _normalize(value: str | None) -> str:
     return (value or "").strip().lower()
 
 
+INSTITUTIONAL_TYPE_RULES = KeywordRuleTable(
+    rules=(
+        KeywordRule("regulatory", "text", ("cima", "regulatory", "regulation", "compliance manual")),
+        KeywordRule("legal", "text", ("lpa", "offering", "subscription", "admin agreement", "engagement", "custodian", "legal")),
+        KeywordRule("marketing", "text", ("marketing", "deck", "brochure", "teaser", "factsheet", "pitch")),
+        KeywordRule("financial", "text", ("audit", "financial", "statement", "nav", "valuation", "report")),
+        KeywordRule("investment-committee", "text", ("investment committee", "ic memo", "approval memo")),
+        KeywordRule("kyc-aml", "text", ("kyc", "aml", "know your customer", "anti-money laundering")),
+        KeywordRule("governance", "text", ("board", "minutes", "governance")),
+    ),
+    decisions=(
+        RuleDecision("REGULATORY_CIMA", all_of=(("regulatory",),)),
+        RuleDecision("LEGAL_BINDING", all_of=(("legal",),)),
+        RuleDecision("MARKETING_PROMOTIONAL", all_of=(("marketing",),)),
+        RuleDecision("FINANCIAL_REPORTING", all_of=(("financial",),)),
+        RuleDecision("INVESTMENT_COMMITTEE", all_of=(("investment-committee",),)),
+        RuleDecision("KYC_AML", all_of=(("kyc-aml",),)),
+        RuleDecision("GOVERNANCE_BOARD", all_of=(("governance",),)),
+    ),
+    default=RuleDecision("OPERATIONAL_EVIDENCE"),
+)
+CLASSIFY_BATCH_SIZE = 500
+CLASSIFIER_VERSION = "wave-ai1-v1"
+
+
+def _input_fingerprint(document: Document, version: DocumentVersion) -> str:
+    parts = (
+        CLASSIFIER_VERSION,
+        INSTITUTIONAL_TYPE_RULES.fingerprint,
+        str(document.id),
+        document.title or "",
+        document.root_folder or "",
+        document.folder_path or "",
+        version.blob_path or "",
+        version.checksum or "",
+    )
+    return sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _rule_fields(*, title: str | None, root_folder: str | None, folder_path: str | None) -> dict[str, str]:
+    return {"text": " ".join([_normalize(title), _normalize(root_folder), _normalize(folder_path)])}
+
+
 def _classify_document(*, title: str | None, root_folder: str | None, folder_path: str | None) -> str:
-    text = " ".join([_normalize(title), _normalize(root_folder), _normalize(folder_path)])
-
-    if any(token in text for token in ["cima", "regulatory", "regulation", "compliance manual"]):
-        return "REGULATORY_CIMA"
-    if any(token in text for token in ["lpa", "offering", "subscription", "admin agreement", "engagement", "custodian", "legal"]):
-        return "LEGAL_BINDING"
-    if any(token in text for token in ["marketing", "deck", "brochure", "teaser", "factsheet", "pitch"]):
-        return "MARKETING_PROMOTIONAL"
-    if any(token in text for token in ["audit", "financial", "statement", "nav", "valuation", "report"]):
-        return "FINANCIAL_REPORTING"
-    if any(token in text for token in ["investment committee", "ic memo", "approval memo"]):
-        return "INVESTMENT_COMMITTEE"
-    if any(token in text for token in ["kyc", "aml", "know your customer", "anti-money laundering"]):
-        return "KYC_AML"
-    if any(token in text for token in ["board", "minutes", "governance"]):
-        return "GOVERNANCE_BOARD"
-    return "OPERATIONAL_EVIDENCE"
+    return INSTITUTIONAL_TYPE_RULES.classify(_rule_fields(title=title, root_folder=root_folder, folder_path=folder_path))[0]
 
 
 def classify_documents(
@@ -66,7 +94,13 @@ def classify_documents(
     fund_id: uuid.UUID,
     path: str | None = None,
     actor_id: str = "ai-engine",
+    force: bool = False,
 ) -> list[DocumentRegistry]:
+    """Register and classify current dataroom versions; unchanged inputs are skipped.
+
+    Returns the registry row of every matching version; only rows written by
+    this call are pushed to the metadata search index.
+    """
     now = _now_utc()
     prefix = (path or "").strip().lower()
 
@@ -88,68 +122,88 @@ def classify_documents(
     )
     rows = list(db.execute(stmt).all())
 
-    saved: list[DocumentRegistry] = []
-    for document, version in rows:
-        if prefix:
-            full_path = f"{(document.root_folder or '').strip()}/{(document.folder_path or '').strip()}".lower()
-            if prefix not in full_path and prefix not in (document.root_folder or "").lower():
-                continue
-
-        institutional_type = _classify_document(
-            title=document.title,
-            root_folder=document.root_folder,
-            folder_path=document.folder_path,
-        )
-        if institutional_type not in INSTITUTIONAL_TYPES:
-            institutional_type = "OPERATIONAL_EVIDENCE"
-
-        data_latency = _to_seconds_delta(version.uploaded_at or version.updated_at, now)
-        source_key = f"{fund_id}:{version.id}:{institutional_type}"
-
-        existing = db.execute(
+    if prefix:
+        rows = [
+            (document, version)
+            for document, version in rows
+            if prefix in f"{(document.root_folder or '').strip()}/{(document.folder_path or '').strip()}".lower()
+            or prefix in (document.root_folder or "").lower()
+        ]
+
+    existing_by_version = {
+        row.version_id: row
+        for row in db.execute(
             select(DocumentRegistry).where(
                 DocumentRegistry.fund_id == fund_id,
-                DocumentRegistry.version_id == version.id,
+                DocumentRegistry.version_id.is_not(None),
             )
-        ).scalar_one_or_none()
-
-        payload = {
-            "fund_id": fund_id,
-            "access_level": "internal",
-            "document_id": document.id,
-            "version_id": version.id,
-            "blob_path": version.blob_path,
-            "root_folder": document.root_folder,
-            "folder_path": document.folder_path,
-            "title": document.title,
-            "institutional_type": institutional_type,
-            "source_signals": {
-                "rule": "keyword+folder",
-                "hash": sha1(source_key.encode("utf-8")).hexdigest(),
-            },
-            "classifier_version": "wave-ai1-v1",
-            "as_of": now,
-            "data_latency": data_latency,
-            "data_quality": "OK",
-            "created_by": actor_id,
-            "updated_by": actor_id,
-        }
-
-        if existing is None:
-            row = DocumentRegistry(**payload)
-            db.add(row)
-            db.flush()
-        else:
-            for key, value in payload.items():
-                if key == "created_by":
-                    continue
-                setattr(existing, key, value)
-            row = existing
-            db.flush()
-
-        saved.append(row)
-
-    if saved:
+        ).scalars().all()
+    }
+
+    fingerprints: dict[uuid.UUID, str] = {}
+    stale: list[tuple[Document, DocumentVersion]] = []
+    for document, version in rows:
+        fingerprint = _input_fingerprint(document, version)
+        fingerprints[version.id] = fingerprint
+        existing = existing_by_version.get(version.id)
+        signals = (existing.source_signals or {}) if existing is not None else {}
+        if force or existing is None or signals.get("inputFingerprint") != fingerprint:
+            stale.append((document, version))
+
+    changed: list[DocumentRegistry] = []
+    for i in range(0, len(stale), CLASSIFY_BATCH_SIZE):
+        chunk = stale[i : i + CLASSIFY_BATCH_SIZE]
+        results = INSTITUTIONAL_TYPE_RULES.classify_many(
+            _rule_fields(title=document.title, root_folder=document.root_folder, folder_path=document.folder_path)
+            for document, _ in chunk
+        )
+
+        for (document, version), (institutional_type, _, _) in zip(chunk, results):
+            if institutional_type not in INSTITUTIONAL_TYPES:
+                institutional_type = "OPERATIONAL_EVIDENCE"
+
+            data_latency = _to_seconds_delta(version.uploaded_at or version.updated_at, now)
+            source_key = f"{fund_id}:{version.id}:{institutional_type}"
+            existing = existing_by_version.get(version.id)
+
+            payload = {
+                "fund_id": fund_id,
+                "access_level": "internal",
+                "document_id": document.id,
+                "version_id": version.id,
+                "blob_path": version.blob_path,
+                "root_folder": document.root_folder,
+                "folder_path": document.folder_path,
+                "title": document.title,
+                "institutional_type": institutional_type,
+                "source_signals": {
+                    "rule": "keyword+folder",
+                    "hash": sha1(source_key.encode("utf-8")).hexdigest(),
+                    "inputFingerprint": fingerprints[version.id],
+                },
+                "classifier_version": CLASSIFIER_VERSION,
+                "as_of": now,
+                "data_latency": data_latency,
+                "data_quality": "OK",
+                "created_by": actor_id,
+                "updated_by": actor_id,
+            }
+
+            if existing is None:
+                row = DocumentRegistry(**payload)
+                db.add(row)
+                existing_by_version[version.id] = row
+            else:
+                for key, value in payload.items():
+                    if key == "created_by":
+                        continue
+                    setattr(existing, key, value)
+                row = existing
+
+            changed.append(row)
+        db.flush()
+
+    if changed:
         try:
             search_docs = [
                 {
@@ -161,13 +215,19 @@ def classify_documents(
                     "version": str(item.version_id),
                     "uploaded_at": item.as_of.isoformat(),
                 }
-                for item in saved
+                for item in changed
             ]
-            AzureSearchMetadataClient().upsert_documents(items=search_docs)
+            failed_keys = AzureSearchMetadataClient().upsert_documents(items=search_docs).failed_keys
+            degraded = [item for item in changed if f"ai-doc-registry-{item.id}" in failed_keys]
         except Exception:
-            for item in saved:
-                item.data_quality = "DEGRADED"
-                item.updated_by = actor_id
-
+            degraded = changed
+        for item in degraded:
+            item.data_quality = "DEGRADED"
+            # Retry the index push on the next run even if nothing changed.
+            item.source_signals = {k: v for k, v in (item.source_signals or {}).items() if k != "inputFingerprint"}
+            item.updated_by = actor_id
+
+    # Resolve before commit: reading ids off expired rows would reload each one.
+    out = [existing_by_version[version.id] for _, version in rows]
     db.commit()
-    return saved
+    return out
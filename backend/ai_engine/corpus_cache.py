@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import datetime as dt
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from ai_engine.knowledge_writer import upsert_rows
+from app.modules.ai.models import DocumentCorpusCache
+from app.modules.documents.models import DocumentChunk, DocumentVersion
+
+# Chunks per version kept in the shared corpus (the stages used to read 50-120).
+MAX_CORPUS_CHUNKS = 120
+LRU_MAX_ENTRIES = 1024
+CACHE_KEY = ("fund_id", "version_id")  # ix_document_corpus_cache_fund_version
+
+# (fund_id, version_id, checksum, indexed_at): a re-index with the same bytes moves
+# indexed_at, so processes that never saw invalidate_corpus stop serving the old corpus.
+_LRUKey = tuple[uuid.UUID, uuid.UUID, str | None, dt.datetime | None]
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _now_utc() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+def normalize_text(value: str | None) -> str:
+    cleaned = _NON_ALNUM_RE.sub(" ", (value or "").lower()).strip()
+    return _WHITESPACE_RE.sub(" ", cleaned)
+
+
+@dataclass(frozen=True)
+class DocumentCorpus:
+    version_id: uuid.UUID
+    version_checksum: str | None
+    chunk_count: int
+    text: str
+    normalized: str
+    tokens: frozenset[str]
+
+
+class _CorpusLRU:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._items: OrderedDict[_LRUKey, DocumentCorpus] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: _LRUKey) -> DocumentCorpus | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: _LRUKey, value: DocumentCorpus) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def discard(self, fund_id: uuid.UUID, version_id: uuid.UUID) -> None:
+        with self._lock:
+            for key in [k for k in self._items if k[0] == fund_id and k[1] == version_id]:
+                del self._items[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_lru = _CorpusLRU(LRU_MAX_ENTRIES)
+
+
+def clear_corpus_lru() -> None:
+    _lru.clear()
+
+
+def _build(version_id: uuid.UUID, version_checksum: str | None, chunks: list[str]) -> DocumentCorpus:
+    text = "\n".join(chunks)
+    normalized = normalize_text(text)
+    return DocumentCorpus(
+        version_id=version_id,
+        version_checksum=version_checksum,
+        chunk_count=len(chunks),
+        text=text,
+        normalized=normalized,
+        tokens=frozenset(normalized.split()),
+    )
+
+
+def _windows(values: list[uuid.UUID], size: int) -> Iterable[list[uuid.UUID]]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def get_corpora(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    version_ids: Iterable[uuid.UUID | None],
+    actor_id: str = "ai-engine",
+    batch_size: int = 500,
+) -> dict[uuid.UUID, DocumentCorpus]:
+    """Return the chunk corpus of each document version, building it at most once per checksum.
+
+    Lookups go LRU -> document_corpus_cache -> document_chunks. Versions
+    without chunks yet get an empty corpus that is not cached, so the next
+    call after indexing picks the chunks up.
+    """
+    wanted = list(dict.fromkeys(v for v in version_ids if v is not None))
+    out: dict[uuid.UUID, DocumentCorpus] = {}
+
+    for window in _windows(wanted, batch_size):
+        checksums: dict[uuid.UUID, str | None] = {}
+        lru_keys: dict[uuid.UUID, _LRUKey] = {v: (fund_id, v, None, None) for v in window}
+        for version_id, checksum, indexed_at in db.execute(
+            select(DocumentVersion.id, DocumentVersion.checksum, DocumentVersion.indexed_at).where(
+                DocumentVersion.fund_id == fund_id,
+                DocumentVersion.id.in_(window),
+            )
+        ).all():
+            checksums[version_id] = checksum
+            lru_keys[version_id] = (fund_id, version_id, checksum, indexed_at)
+
+        misses: list[uuid.UUID] = []
+        for version_id in window:
+            cached = _lru.get(lru_keys[version_id])
+            if cached is None:
+                misses.append(version_id)
+            else:
+                out[version_id] = cached
+        if not misses:
+            continue
+
+        stored = db.execute(
+            select(DocumentCorpusCache).where(
+                DocumentCorpusCache.fund_id == fund_id,
+                DocumentCorpusCache.version_id.in_(misses),
+            )
+        ).scalars().all()
+        for row in stored:
+            if row.version_checksum != checksums.get(row.version_id):
+                continue
+            corpus = DocumentCorpus(
+                version_id=row.version_id,
+                version_checksum=row.version_checksum,
+                chunk_count=row.chunk_count,
+                text=row.text,
+                normalized=row.normalized_text,
+                tokens=frozenset(row.tokens or []),
+            )
+            out[row.version_id] = corpus
+            _lru.put(lru_keys[row.version_id], corpus)
+        stale = [v for v in misses if v not in out]
+        if not stale:
+            continue
+
+        ranked = (
+            select(
+                DocumentChunk.version_id.label("version_id"),
+                DocumentChunk.text.label("text"),
+                func.row_number()
+                .over(partition_by=DocumentChunk.version_id, order_by=DocumentChunk.chunk_index)
+                .label("position"),
+            )
+            .where(DocumentChunk.fund_id == fund_id, DocumentChunk.version_id.in_(stale))
+            .subquery()
+        )
+        chunks_by_version: dict[uuid.UUID, list[str]] = {v: [] for v in stale}
+        for version_id, text in db.execute(
+            select(ranked.c.version_id, ranked.c.text)
+            .where(ranked.c.position <= MAX_CORPUS_CHUNKS)
+            .order_by(ranked.c.version_id, ranked.c.position)
+        ).all():
+            chunks_by_version[version_id].append(text or "")
+
+        now = _now_utc()
+        rows = []
+        for version_id in stale:
+            corpus = _build(version_id, checksums.get(version_id), chunks_by_version[version_id])
+            out[version_id] = corpus
+            if corpus.chunk_count == 0:
+                continue
+            _lru.put(lru_keys[version_id], corpus)
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "fund_id": fund_id,
+                    "access_level": "internal",
+                    "version_id": version_id,
+                    "version_checksum": corpus.version_checksum,
+                    "chunk_count": corpus.chunk_count,
+                    "text": corpus.text,
+                    "normalized_text": corpus.normalized,
+                    "tokens": sorted(corpus.tokens),
+                    "built_at": now,
+                    "created_by": actor_id,
+                    "updated_by": actor_id,
+                }
+            )
+        upsert_rows(
+            db,
+            model=DocumentCorpusCache,
+            rows=rows,
+            key=CACHE_KEY,
+            update_columns=("version_checksum", "chunk_count", "text", "normalized_text", "tokens", "built_at", "updated_by"),
+            chunk_size=200,
+        )
+
+    return out
+
+
+def get_corpus(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    version_id: uuid.UUID | None,
+    actor_id: str = "ai-engine",
+) -> DocumentCorpus | None:
+    if version_id is None:
+        return None
+    return get_corpora(db, fund_id=fund_id, version_ids=[version_id], actor_id=actor_id).get(version_id)
+
+
+def invalidate_corpus(db: Session, *, fund_id: uuid.UUID, version_id: uuid.UUID) -> None:
+    _lru.discard(fund_id, version_id)
+    db.execute(
+        delete(DocumentCorpusCache).where(
+            DocumentCorpusCache.fund_id == fund_id,
+            DocumentCorpusCache.version_id == version_id,
+        )
+    )
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
+import datetime as dt
+import hashlib
 import uuid
-from pathlib import Path
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ai_engine.corpus_cache import DocumentCorpus, get_corpora
+from ai_engine.extracted_text import ExtractedText, load_registry_texts
+from ai_engine.keyword_rules import KeywordRule, KeywordRuleTable, RuleDecision
 from app.modules.ai.models import DocumentClassification, DocumentRegistry
-from app.modules.documents.models import DocumentChunk, DocumentVersion
-from app.services.blob_storage import blob_uri, download_bytes
-from app.services.text_extract import extract_text_from_docx, extract_text_from_pdf
+from app.modules.documents.models import DocumentVersion
 
 
 DOC_TYPES: tuple[str, ...] = (
@@ -25,74 +27,118 @@ DOC_TYPES: tuple[str, ...] = (
 )
 
 
-def _read_text_content(db: Session, doc: DocumentRegistry) -> str:
-    if doc.version_id:
-        chunks = list(
-            db.execute(
-                select(DocumentChunk.text)
-                .join(DocumentVersion, DocumentVersion.id == DocumentChunk.version_id)
-                .where(
-                    DocumentChunk.fund_id == doc.fund_id,
-                    DocumentChunk.version_id == doc.version_id,
-                )
-                .limit(50)
-            ).all()
-        )
-        text = "\n".join((item[0] or "") for item in chunks)
-        if text.strip():
-            return text
-
-    try:
-        uri = blob_uri(doc.container_name, doc.blob_path)
-        data = download_bytes(blob_uri=uri)
-        suffix = Path(doc.blob_path).suffix.lower()
-        if suffix == ".pdf":
-            return extract_text_from_pdf(data).text
-        if suffix == ".docx":
-            return extract_text_from_docx(data).text
-        return data.decode("utf-8", errors="ignore")
-    except Exception:
-        return ""
-
-
-def _classify(doc: DocumentRegistry, content_text: str) -> tuple[str, int, str]:
-    filename = (doc.blob_path or "").lower()
-    domain = (doc.domain_tag or "").lower()
-    container = (doc.container_name or "").lower()
-    content = (content_text or "").lower()
-
-    basis: list[str] = []
-
-    if "regulatory" in container or "cima" in filename or "cima" in content:
-        basis.extend(["container", "content"])
-        return "REGULATORY_CIMA", 95, "|".join(sorted(set(basis)))
-
-    if "constitution" in container or any(token in filename for token in ["lpa", "constitutional", "fund-rules"]):
-        basis.append("filename")
-        return "FUND_CONSTITUTIONAL", 93, "|".join(sorted(set(basis)))
-
-    if "service-providers" in container or any(token in filename for token in ["agreement", "contract", "engagement"]):
-        basis.append("container")
-        if any(token in content for token in ["administrator", "custodian", "counsel", "service provider"]):
-            basis.append("content")
-        return "SERVICE_PROVIDER_CONTRACT", 90, "|".join(sorted(set(basis)))
-
-    if "pipeline" in container and any(token in content for token in ["investment memo", "ic memo", "committee"]):
-        return "INVESTMENT_MEMO", 88, "container|content"
-
-    if "investor-facing" in container and any(token in filename for token in ["deck", "brochure", "factsheet", "teaser"]):
-        return "DEAL_MARKETING", 86, "container|filename"
+def _read_text_content(corpus: DocumentCorpus | None, extracted: ExtractedText | None) -> str:
+    if corpus is not None and corpus.text.strip():
+        return corpus.text
+    return extracted.text if extracted is not None else ""
+
+
+CLASSIFY_BATCH_SIZE = 500
+CLASSIFIER_VERSION = "wave-ai2-doc-type-v2"
+
+DOC_TYPE_RULES = KeywordRuleTable(
+    rules=(
+        KeywordRule("container:regulatory", "container", ("regulatory",)),
+        KeywordRule("filename:cima", "filename", ("cima",)),
+        KeywordRule("content:cima", "content", ("cima",)),
+        KeywordRule("container:constitution", "container", ("constitution",)),
+        KeywordRule("filename:constitutional", "filename", ("lpa", "constitutional", "fund-rules")),
+        KeywordRule("container:service-providers", "container", ("service-providers",)),
+        KeywordRule("filename:contract", "filename", ("agreement", "contract", "engagement")),
+        KeywordRule("content:service-provider", "content", ("administrator", "custodian", "counsel", "service provider")),
+        KeywordRule("container:pipeline", "container", ("pipeline",)),
+        KeywordRule("content:memo", "content", ("investment memo", "ic memo", "committee")),
+        KeywordRule("container:investor-facing", "container", ("investor-facing",)),
+        KeywordRule("filename:marketing", "filename", ("deck", "brochure", "factsheet", "teaser")),
+        KeywordRule("domain:risk-policy", "domain", ("risk_policy",)),
+        KeywordRule("container:risk-policy", "container", ("risk-policy",)),
+        KeywordRule("filename:policy", "filename", ("policy",)),
+        KeywordRule("container:portfolio-monitoring", "container", ("portfolio-monitoring",)),
+        KeywordRule("filename:evidence", "filename", ("audit", "evidence", "statement")),
+    ),
+    decisions=(
+        RuleDecision(
+            "REGULATORY_CIMA",
+            all_of=(("container:regulatory", "filename:cima", "content:cima"),),
+            confidence=95,
+            basis=("container", "content"),
+        ),
+        RuleDecision(
+            "FUND_CONSTITUTIONAL",
+            all_of=(("container:constitution", "filename:constitutional"),),
+            confidence=93,
+            basis=("filename",),
+        ),
+        RuleDecision(
+            "SERVICE_PROVIDER_CONTRACT",
+            all_of=(("container:service-providers", "filename:contract"),),
+            confidence=90,
+            basis=("container",),
+            basis_if=(("content:service-provider", "content"),),
+        ),
+        RuleDecision(
+            "INVESTMENT_MEMO",
+            all_of=(("container:pipeline",), ("content:memo",)),
+            confidence=88,
+            basis=("container", "content"),
+        ),
+        RuleDecision(
+            "DEAL_MARKETING",
+            all_of=(("container:investor-facing",), ("filename:marketing",)),
+            confidence=86,
+            basis=("container", "filename"),
+        ),
+        RuleDecision(
+            "RISK_POLICY_INTERNAL",
+            all_of=(("domain:risk-policy", "container:risk-policy", "filename:policy"),),
+            confidence=90,
+            basis=("container", "filename"),
+        ),
+        RuleDecision(
+            "AUDIT_EVIDENCE",
+            all_of=(("container:portfolio-monitoring", "filename:evidence"),),
+            confidence=84,
+            basis=("container", "filename"),
+        ),
+        RuleDecision(
+            "INVESTOR_NARRATIVE",
+            all_of=(("container:investor-facing",),),
+            confidence=82,
+            basis=("container",),
+        ),
+    ),
+    default=RuleDecision("OTHER", confidence=60, basis=("container",)),
+)
 
-    if "risk_policy" in domain or "risk-policy" in container or "policy" in filename:
-        return "RISK_POLICY_INTERNAL", 90, "container|filename"
 
-    if "portfolio-monitoring" in container or any(token in filename for token in ["audit", "evidence", "statement"]):
-        return "AUDIT_EVIDENCE", 84, "container|filename"
+def _rule_fields(doc: DocumentRegistry, content_text: str) -> dict[str, str | None]:
+    return {
+        "filename": doc.blob_path,
+        "domain": doc.domain_tag,
+        "container": doc.container_name,
+        "content": content_text,
+    }
 
-    if "investor-facing" in container:
-        return "INVESTOR_NARRATIVE", 82, "container"
 
-    return "OTHER", 60, "container"
+def _classify(doc: DocumentRegistry, content_text: str) -> tuple[str, int, str]:
+    doc_type, confidence, basis = DOC_TYPE_RULES.classify(_rule_fields(doc, content_text))
+    return doc_type, int(confidence or 0), basis
+
+
+def _input_fingerprint(doc: DocumentRegistry, version_checksum: str | None, indexed_at: dt.datetime | None) -> str:
+    # indexed_at moves when chunks land, which changes the text the rules see.
+    parts = (
+        CLASSIFIER_VERSION,
+        DOC_TYPE_RULES.fingerprint,
+        doc.container_name,
+        doc.blob_path,
+        doc.domain_tag or "",
+        doc.checksum or "",
+        doc.etag or "",
+        version_checksum or "",
+        indexed_at.isoformat() if indexed_at else "",
+    )
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
 
 
 def classify_registered_documents(
@@ -100,53 +146,70 @@ def classify_registered_documents(
     *,
     fund_id: uuid.UUID,
     actor_id: str = "ai-engine",
+    force: bool = False,
 ) -> list[DocumentClassification]:
-    docs = list(
-        db.execute(
-            select(DocumentRegistry)
-            .where(DocumentRegistry.fund_id == fund_id)
-            .order_by(DocumentRegistry.updated_at.desc())
-        ).scalars().all()
-    )
-
-    saved: list[DocumentClassification] = []
-    for doc in docs:
-        content_text = _read_text_content(db, doc)
-        doc_type, confidence, basis = _classify(doc, content_text)
-
-        existing = db.execute(
-            select(DocumentClassification).where(
-                DocumentClassification.fund_id == fund_id,
-                DocumentClassification.doc_id == doc.id,
-            )
-        ).scalar_one_or_none()
-
-        payload = {
-            "fund_id": fund_id,
-            "access_level": "internal",
-            "doc_id": doc.id,
-            "doc_type": doc_type,
-            "confidence_score": int(confidence),
-            "classification_basis": basis,
-            "created_by": actor_id,
-            "updated_by": actor_id,
-        }
-
-        if existing is None:
-            row = DocumentClassification(**payload)
-            db.add(row)
-            db.flush()
-        else:
-            for key, value in payload.items():
-                if key == "created_by":
-                    continue
-                setattr(existing, key, value)
-            row = existing
-            db.flush()
-
-        doc.detected_doc_type = doc_type
-        doc.updated_by = actor_id
-        saved.append(row)
+    """Classify registry rows whose inputs changed since their last classification.
+
+    Returns the classification of every registry row, recomputed or not.
+    `force` recomputes all of them.
+    """
+    rows = db.execute(
+        select(DocumentRegistry, DocumentVersion.checksum, DocumentVersion.indexed_at)
+        .outerjoin(DocumentVersion, DocumentVersion.id == DocumentRegistry.version_id)
+        .where(DocumentRegistry.fund_id == fund_id)
+        .order_by(DocumentRegistry.updated_at.desc())
+    ).all()
+    existing_by_doc = {
+        row.doc_id: row
+        for row in db.execute(select(DocumentClassification).where(DocumentClassification.fund_id == fund_id)).scalars().all()
+    }
+
+    fingerprints: dict[uuid.UUID, str] = {}
+    stale: list[DocumentRegistry] = []
+    for doc, version_checksum, indexed_at in rows:
+        fingerprint = _input_fingerprint(doc, version_checksum, indexed_at)
+        fingerprints[doc.id] = fingerprint
+        existing = existing_by_doc.get(doc.id)
+        if force or existing is None or existing.input_fingerprint != fingerprint:
+            stale.append(doc)
+
+    for i in range(0, len(stale), CLASSIFY_BATCH_SIZE):
+        chunk = stale[i : i + CLASSIFY_BATCH_SIZE]
+        corpora = get_corpora(db, fund_id=fund_id, version_ids=[doc.version_id for doc in chunk], actor_id=actor_id)
+        unchunked = [doc for doc in chunk if not (doc.version_id in corpora and corpora[doc.version_id].text.strip())]
+        extracted = load_registry_texts(db, fund_id=fund_id, docs=unchunked, actor_id=actor_id)
+        results = DOC_TYPE_RULES.classify_many(
+            _rule_fields(doc, _read_text_content(corpora.get(doc.version_id), extracted.get(doc.id))) for doc in chunk
+        )
 
+        for doc, (doc_type, confidence, basis) in zip(chunk, results):
+            payload = {
+                "fund_id": fund_id,
+                "access_level": "internal",
+                "doc_id": doc.id,
+                "doc_type": doc_type,
+                "confidence_score": int(confidence or 0),
+                "classification_basis": basis,
+                "input_fingerprint": fingerprints[doc.id],
+                "created_by": actor_id,
+                "updated_by": actor_id,
+            }
+
+            existing = existing_by_doc.get(doc.id)
+            if existing is None:
+                existing_by_doc[doc.id] = DocumentClassification(**payload)
+                db.add(existing_by_doc[doc.id])
+            else:
+                for key, value in payload.items():
+                    if key == "created_by":
+                        continue
+                    setattr(existing, key, value)
+
+            doc.detected_doc_type = doc_type
+            doc.updated_by = actor_id
+        db.flush()
+
+    # Resolve before commit: reading ids off expired rows would reload each one.
+    out = [existing_by_doc[doc.id] for doc, _, _ in rows]
     db.commit()
-    return saved
+    return out
@@ -2,16 +2,23 @@ from __future__ import annotations
 
 import datetime as dt
 import hashlib
+import queue
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator
 
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
 from ai_engine.authority_resolver import resolve_authority_profiles
 from ai_engine.doc_classifier import classify_registered_documents
 from ai_engine.knowledge_anchor_extractor import extract_knowledge_anchors
-from app.modules.ai.models import DocumentRegistry
-from app.services.blob_storage import BlobEntry, list_blobs
+from ai_engine.stage_dag import Stage, run_dag
+from ai_engine.knowledge_writer import upsert_rows
+from app.modules.ai.models import DocumentRegistry, DocumentScanWatermark
+from app.services.blob_storage import BlobEntry, iter_blobs
 
 
 CONTAINER_METADATA: dict[str, dict[str, str]] = {
@@ -60,10 +67,23 @@ CONTAINER_METADATA: dict[str, dict[str, str]] = {
 }
 
 
+SCAN_BATCH_SIZE = 500
+LISTING_PAGE_SIZE = 1000
+WATERMARK_KEY = ("fund_id", "container_name")  # ix_document_scan_watermarks_fund_container
+
+
 def _now_utc() -> dt.datetime:
     return dt.datetime.now(dt.timezone.utc)
 
 
+def _ensure_utc(value: dt.datetime | None) -> dt.datetime | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt.timezone.utc)
+    return value.astimezone(dt.timezone.utc)
+
+
 def _parse_iso(value: str | None) -> dt.datetime | None:
     if not value:
         return None
@@ -88,31 +108,155 @@ def _checksum(entry: BlobEntry, container_name: str) -> str:
     return hashlib.sha256(base.encode("utf-8")).hexdigest()
 
 
+@dataclass(frozen=True)
+class RegistryScanResult:
+    scanned: int
+    created: int
+    updated: int
+    unchanged: int = 0
+    changed: tuple[tuple[str, str], ...] = ()  # (container_name, blob_path) created or modified
+    deleted: tuple[tuple[str, str], ...] = ()  # registered blobs missing from a successful listing
+    failed_containers: tuple[str, ...] = ()
+
+
+def _put(out: queue.Queue, item: tuple, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _list_container(container_name: str, out: queue.Queue, stop: threading.Event, *, batch_size: int) -> None:
+    batch: list[BlobEntry] = []
+    try:
+        for entry in iter_blobs(container=container_name, prefix=None, results_per_page=LISTING_PAGE_SIZE):
+            if entry.is_folder:
+                continue
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                if not _put(out, (container_name, batch, None), stop):
+                    return
+                batch = []
+        if batch and not _put(out, (container_name, batch, None), stop):
+            return
+        _put(out, (container_name, None, None), stop)
+    except Exception as exc:
+        _put(out, (container_name, None, exc), stop)
+
+
+def _stream_container_listings(*, batch_size: int) -> Iterator[tuple[str, list[BlobEntry] | None, Exception | None]]:
+    """Yield (container, entries, error) batches while every container is listed on its own thread.
+
+    A container is finished when it yields entries=None; error is set if its listing failed.
+    The queue is bounded so slow database writes throttle the listers.
+    """
+    out: queue.Queue = queue.Queue(maxsize=len(CONTAINER_METADATA) * 4)
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(CONTAINER_METADATA), thread_name_prefix="registry-scan") as pool:
+        for container_name in CONTAINER_METADATA:
+            pool.submit(_list_container, container_name, out, stop, batch_size=batch_size)
+        try:
+            remaining = len(CONTAINER_METADATA)
+            while remaining:
+                item = out.get()
+                if item[1] is None:
+                    remaining -= 1
+                yield item
+        finally:
+            stop.set()
+
+
+def _load_watermarks(db: Session, *, fund_id: uuid.UUID) -> dict[str, dt.datetime | None]:
+    rows = db.execute(
+        select(DocumentScanWatermark.container_name, DocumentScanWatermark.last_modified_utc).where(
+            DocumentScanWatermark.fund_id == fund_id,
+        )
+    ).all()
+    return {row[0]: _ensure_utc(row[1]) for row in rows}
+
+
 def scan_document_registry(
     db: Session,
     *,
     fund_id: uuid.UUID,
     actor_id: str = "ai-engine",
-) -> list[DocumentRegistry]:
+    full_rescan: bool = False,
+    batch_size: int = SCAN_BATCH_SIZE,
+) -> RegistryScanResult:
+    """Delta-scan the governed containers into document_registry.
+
+    A blob already registered with the same etag and last-modified, and not
+    newer than its container watermark, is left untouched. Watermarks only
+    advance for containers whose listing completed; `full_rescan` rewrites
+    every registered blob as before.
+    """
     now = _now_utc()
-    touched: list[DocumentRegistry] = []
+    watermarks = _load_watermarks(db, fund_id=fund_id)
 
-    for container_name, metadata in CONTAINER_METADATA.items():
-        try:
-            entries = [item for item in list_blobs(container=container_name, prefix=None) if not item.is_folder]
-        except Exception:
+    existing_by_key = {
+        (row.container_name, row.blob_path): row
+        for row in db.execute(
+            select(
+                DocumentRegistry.id,
+                DocumentRegistry.container_name,
+                DocumentRegistry.blob_path,
+                DocumentRegistry.etag,
+                DocumentRegistry.last_modified_utc,
+                DocumentRegistry.data_quality,
+            ).where(
+                DocumentRegistry.fund_id == fund_id,
+                DocumentRegistry.container_name.in_(list(CONTAINER_METADATA)),
+            )
+        ).all()
+    }
+
+    inserts: list[dict] = []
+    updates: list[dict] = []
+    created = updated = unchanged = 0
+    changed: list[tuple[str, str]] = []
+    failed: list[str] = []
+    seen: dict[str, set[str]] = {name: set() for name in CONTAINER_METADATA}
+    newest: dict[str, dt.datetime | None] = {name: watermarks.get(name) for name in CONTAINER_METADATA}
+
+    def _flush_writes() -> None:
+        nonlocal inserts, updates
+        if inserts:
+            db.execute(insert(DocumentRegistry), inserts)
+        if updates:
+            db.execute(update(DocumentRegistry), updates)
+        inserts, updates = [], []
+
+    for container_name, entries, error in _stream_container_listings(batch_size=batch_size):
+        if error is not None:
+            failed.append(container_name)
+            continue
+        if entries is None:
             continue
 
+        metadata = CONTAINER_METADATA[container_name]
+        watermark = watermarks.get(container_name)
         for entry in entries:
-            checksum = _checksum(entry, container_name)
             modified = _parse_iso(entry.last_modified)
-            existing = db.execute(
-                select(DocumentRegistry).where(
-                    DocumentRegistry.fund_id == fund_id,
-                    DocumentRegistry.container_name == container_name,
-                    DocumentRegistry.blob_path == entry.name,
-                )
-            ).scalar_one_or_none()
+            existing = existing_by_key.get((container_name, entry.name))
+            seen[container_name].add(entry.name)
+            if modified is not None and (newest[container_name] is None or modified > newest[container_name]):
+                newest[container_name] = modified
+
+            blob_changed = bool(
+                existing is None
+                or existing.data_quality == "MISSING"
+                or existing.etag != entry.etag
+                or _ensure_utc(existing.last_modified_utc) != modified
+                or modified is None
+                or watermark is None
+                or modified > watermark
+            )
+            if not blob_changed and not full_rescan:
+                unchanged += 1
+                continue
 
             payload = {
                 "fund_id": fund_id,
@@ -125,7 +269,7 @@ def scan_document_registry(
                 "shareability": metadata["shareability"],
                 "lifecycle_stage": metadata["lifecycle_stage"],
                 "last_ingested_at": now,
-                "checksum": checksum,
+                "checksum": _checksum(entry, container_name),
                 "etag": entry.etag,
                 "last_modified_utc": modified,
                 "as_of": now,
@@ -144,24 +288,92 @@ def scan_document_registry(
             }
 
             if existing is None:
-                row = DocumentRegistry(**payload)
-                db.add(row)
-                db.flush()
-                touched.append(row)
-                continue
+                inserts.append({"id": uuid.uuid4(), **payload})
+                created += 1
+            else:
+                row = {key: value for key, value in payload.items() if key != "created_by"}
+                if not blob_changed:
+                    row.pop("last_ingested_at")
+                updates.append({"id": existing.id, **row})
+                updated += 1
+            if blob_changed:
+                changed.append((container_name, entry.name))
 
-            changed = bool(existing.etag != payload["etag"] or existing.last_modified_utc != payload["last_modified_utc"])
-            for key, value in payload.items():
-                if key == "created_by":
-                    continue
-                if key == "last_ingested_at" and not changed:
-                    continue
-                setattr(existing, key, value)
-            db.flush()
-            touched.append(existing)
+            if len(inserts) + len(updates) >= batch_size:
+                _flush_writes()
 
+    # Blobs gone from a container that listed cleanly are flagged once, never deleted:
+    # classifications, anchors and links still reference the registry row.
+    deleted: list[tuple[str, str]] = []
+    for (container_name, blob_path), existing in existing_by_key.items():
+        if container_name in failed or blob_path in seen[container_name] or existing.data_quality == "MISSING":
+            continue
+        updates.append({"id": existing.id, "data_quality": "MISSING", "as_of": now, "updated_by": actor_id})
+        deleted.append((container_name, blob_path))
+        if len(updates) >= batch_size:
+            _flush_writes()
+    _flush_writes()
+
+    upsert_rows(
+        db,
+        model=DocumentScanWatermark,
+        rows=[
+            {
+                "id": uuid.uuid4(),
+                "fund_id": fund_id,
+                "access_level": "internal",
+                "container_name": container_name,
+                "last_modified_utc": newest[container_name],
+                "blobs_seen": len(seen[container_name]),
+                "scanned_at": now,
+                "created_by": actor_id,
+                "updated_by": actor_id,
+            }
+            for container_name in CONTAINER_METADATA
+            if container_name not in failed
+        ],
+        key=WATERMARK_KEY,
+        update_columns=("last_modified_utc", "blobs_seen", "scanned_at", "updated_by"),
+        chunk_size=100,
+    )
     db.commit()
-    return touched
+    return RegistryScanResult(
+        scanned=created + updated + unchanged,
+        created=created,
+        updated=updated,
+        unchanged=unchanged,
+        changed=tuple(changed),
+        deleted=tuple(sorted(deleted)),
+        failed_containers=tuple(sorted(failed)),
+    )
+
+
+DOCUMENTS_INGEST_STAGES: tuple[Stage, ...] = (
+    Stage(
+        "scan",
+        lambda db, ctx: scan_document_registry(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+        inputs=("blob_storage",),
+        outputs=("document_registry",),
+    ),
+    Stage(
+        "classify",
+        lambda db, ctx: classify_registered_documents(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+        inputs=("document_registry",),
+        outputs=("document_classifications",),
+    ),
+    Stage(
+        "governance",
+        lambda db, ctx: resolve_authority_profiles(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+        inputs=("document_classifications",),
+        outputs=("governance_profiles",),
+    ),
+    Stage(
+        "anchors",
+        lambda db, ctx: extract_knowledge_anchors(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+        inputs=("document_classifications",),
+        outputs=("knowledge_anchors",),
+    ),
+)
 
 
 def run_documents_ingest_pipeline(
@@ -169,15 +381,17 @@ def run_documents_ingest_pipeline(
     *,
     fund_id: uuid.UUID,
     actor_id: str = "ai-engine",
+    resume: bool = False,
 ) -> dict[str, int | str]:
-    scanned = scan_document_registry(db, fund_id=fund_id, actor_id=actor_id)
-    classified = classify_registered_documents(db, fund_id=fund_id, actor_id=actor_id)
-    governance_profiles = resolve_authority_profiles(db, fund_id=fund_id, actor_id=actor_id)
-    anchors = extract_knowledge_anchors(db, fund_id=fund_id, actor_id=actor_id)
+    run = run_dag(db, pipeline="documents-ingest", stages=DOCUMENTS_INGEST_STAGES, fund_id=fund_id, actor_id=actor_id, resume=resume)
+    run.raise_for_failure()
+    scanned = run.counts("scan")
 
     return {
-        "documentsScanned": len(scanned),
-        "documentsClassified": len(classified),
-        "governanceProfiles": len(governance_profiles),
-        "knowledgeAnchors": len(anchors),
+        "documentsScanned": scanned.get("scanned", 0),
+        "documentsChanged": scanned.get("changed", 0),
+        "documentsDeleted": scanned.get("deleted", 0),
+        "documentsClassified": run.counts("classify").get("rows", 0),
+        "governanceProfiles": run.counts("governance").get("rows", 0),
+        "knowledgeAnchors": run.counts("anchors").get("rows", 0),
     }
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import datetime as dt
+import uuid
+from dataclasses import dataclass, field
+from typing import Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.modules.ai.models import MetricSeriesPoint
+
+BASELINE_METHODS = {"previous", "rolling_mean", "zscore"}
+
+# Percent drift that raises a flag, per metric; HIGH at `high_multiplier` times it.
+DEFAULT_DRIFT_THRESHOLDS: dict[str, float] = {
+    "AI4_RETURN_EXPECTED_PCT": 10.0,
+    "AI4_DEPLOYMENT_RATIO": 20.0,
+    "AI4_LIQUIDITY_DAYS": 30.0,
+}
+
+
+@dataclass(frozen=True)
+class DriftConfig:
+    """How the current metric value is compared with its history.
+
+    `previous` compares with the prior metric date (the historical rule),
+    `rolling_mean` with the mean of the `window` prior dates, and `zscore`
+    flags values more than `z_threshold` standard deviations from that mean.
+    The keys of `thresholds` are the monitored metrics; their percent values
+    apply to the first two methods.
+    """
+
+    method: str = "previous"
+    window: int = 4
+    thresholds: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_DRIFT_THRESHOLDS))
+    z_threshold: float = 2.0
+    high_multiplier: float = 1.5
+
+    def __post_init__(self) -> None:
+        if self.method not in BASELINE_METHODS:
+            raise ValueError(f"Unsupported drift baseline '{self.method}'")
+        if self.window < 1:
+            raise ValueError("Drift window must be at least one period")
+        if self.method == "zscore" and self.window < 2:
+            raise ValueError("Z-score drift needs a window of at least two periods")
+
+    @property
+    def periods(self) -> int:
+        """Metric dates needed: the current one plus the baseline history."""
+        return 2 if self.method == "previous" else self.window + 1
+
+
+DEFAULT_DRIFT_CONFIG = DriftConfig()
+
+
+@dataclass(frozen=True)
+class MetricPanel:
+    """Metric values as an investment x date x metric array; missing observations are NaN."""
+
+    investment_ids: tuple[uuid.UUID, ...]
+    dates: tuple[dt.date, ...]
+    metric_names: tuple[str, ...]
+    values: np.ndarray
+
+
+@dataclass(frozen=True)
+class DriftSignal:
+    investment_id: uuid.UUID
+    metric_name: str
+    baseline_value: float
+    current_value: float
+    drift_pct: float
+    score: float
+    threshold: float
+    severity: str
+
+
+def load_metric_panel(db: Session, *, fund_id: uuid.UUID, metric_names: Sequence[str], periods: int) -> MetricPanel:
+    """The `periods` most recent metric dates of the fund, in one query."""
+    metric_names = tuple(metric_names)
+    recent_dates = (
+        select(MetricSeriesPoint.as_of)
+        .where(MetricSeriesPoint.fund_id == fund_id, MetricSeriesPoint.metric_name.in_(metric_names))
+        .group_by(MetricSeriesPoint.as_of)
+        .order_by(MetricSeriesPoint.as_of.desc())
+        .limit(periods)
+    )
+    rows = db.execute(
+        select(MetricSeriesPoint.investment_id, MetricSeriesPoint.as_of, MetricSeriesPoint.metric_name, MetricSeriesPoint.value).where(
+            MetricSeriesPoint.fund_id == fund_id,
+            MetricSeriesPoint.metric_name.in_(metric_names),
+            MetricSeriesPoint.as_of.in_(recent_dates.scalar_subquery()),
+        )
+    ).all()
+
+    investment_ids = tuple(sorted({row.investment_id for row in rows}, key=str))
+    dates = tuple(sorted({row.as_of for row in rows}))
+    values = np.full((len(investment_ids), len(dates), len(metric_names)), np.nan)
+    if rows:
+        inv_pos = {investment_id: i for i, investment_id in enumerate(investment_ids)}
+        date_pos = {as_of: i for i, as_of in enumerate(dates)}
+        metric_pos = {name: i for i, name in enumerate(metric_names)}
+        values[
+            [inv_pos[row.investment_id] for row in rows],
+            [date_pos[row.as_of] for row in rows],
+            [metric_pos[row.metric_name] for row in rows],
+        ] = [row.value for row in rows]
+    return MetricPanel(investment_ids=investment_ids, dates=dates, metric_names=metric_names, values=values)
+
+
+def compute_drift(panel: MetricPanel, config: DriftConfig = DEFAULT_DRIFT_CONFIG) -> list[DriftSignal]:
+    """Drift of the latest date against the configured baseline, vectorized over investments and metrics."""
+    if len(panel.dates) < 2 or not panel.investment_ids:
+        return []
+
+    current = panel.values[:, -1, :]
+    window = 1 if config.method == "previous" else config.window
+    history = panel.values[:, -1 - window : -1, :]
+    observed = np.sum(~np.isnan(history), axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        baseline = np.nanmean(np.where(observed[:, None, :] > 0, history, 0.0), axis=1)
+        baseline = np.where(observed > 0, baseline, np.nan)
+        drift_pct = np.where(
+            baseline == 0,
+            np.where(current != 0, 100.0, 0.0),
+            (current - baseline) / np.abs(baseline) * 100.0,
+        )
+
+        if config.method == "zscore":
+            spread = np.nanstd(np.where(observed[:, None, :] > 1, history, 0.0), axis=1, ddof=1)
+            spread = np.where(observed > 1, spread, np.nan)
+            score = np.abs(current - baseline) / spread
+            valid = ~np.isnan(score) & (spread > 0)
+            threshold = np.full(len(panel.metric_names), config.z_threshold)
+        else:
+            score = np.abs(drift_pct)
+            valid = ~np.isnan(score)
+            threshold = np.array([config.thresholds.get(name, np.inf) for name in panel.metric_names])
+
+    hits = valid & ~np.isnan(current) & (score >= threshold[None, :])
+    signals: list[DriftSignal] = []
+    for i, m in zip(*np.nonzero(hits)):
+        signals.append(
+            DriftSignal(
+                investment_id=panel.investment_ids[i],
+                metric_name=panel.metric_names[m],
+                baseline_value=float(baseline[i, m]),
+                current_value=float(current[i, m]),
+                drift_pct=float(drift_pct[i, m]),
+                score=float(score[i, m]),
+                threshold=float(threshold[m]),
+                severity="HIGH" if score[i, m] >= threshold[m] * config.high_multiplier else "MEDIUM",
+            )
+        )
+    return signals
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Sequence
+
+from app.modules.ai.models import KnowledgeEntity
+
+
+class TermAutomaton:
+    """
+    Aho-Corasick automaton over a fixed list of terms.
+
+    `find` scans a corpus in a single pass and returns the positions (in the
+    list given to the constructor) of every term that occurs as a substring.
+    Empty and repeated terms never match twice; a repeated term reports its
+    first position.
+    """
+
+    def __init__(self, terms: Sequence[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._dict_link: list[int] = [-1]
+        self._terminal: list[int] = [-1]
+        self._size = 0
+
+        for position, term in enumerate(terms):
+            if term:
+                self._insert(term, position)
+        self._build_links()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _insert(self, term: str, position: int) -> None:
+        state = 0
+        for char in term:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._dict_link.append(-1)
+                self._terminal.append(-1)
+                self._goto[state][char] = nxt
+            state = nxt
+
+        if self._terminal[state] < 0:
+            self._terminal[state] = position
+            self._size += 1
+
+    def _build_links(self) -> None:
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                fail_state = self._fail[child]
+                self._dict_link[child] = fail_state if self._terminal[fail_state] >= 0 else self._dict_link[fail_state]
+                queue.append(child)
+
+    def find(self, corpus: str) -> set[int]:
+        goto = self._goto
+        fail = self._fail
+        dict_link = self._dict_link
+        terminal = self._terminal
+
+        found: set[int] = set()
+        visited: set[int] = set()
+        state = 0
+        for char in corpus:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if state in visited:
+                continue
+            visited.add(state)
+
+            # Walk the output chain once per state; later visits add nothing new.
+            output = state if terminal[state] >= 0 else dict_link[state]
+            while output > 0:
+                found.add(terminal[output])
+                output = dict_link[output]
+                if output in visited:
+                    break
+        return found
+
+
+class EntityTermMatcher:
+    """
+    Aho-Corasick automaton over every term of a linker entity index.
+
+    Built once per linking run; `match` scans a normalized corpus in a single
+    pass and reports, per entity, the first of its terms (in index order) that
+    occurs as a substring — the same answer as
+    `next(term for term in terms if term and term in corpus)`.
+    """
+
+    def __init__(self, entity_index: Sequence[tuple[KnowledgeEntity, list[str]]]) -> None:
+        self._entity_index = list(entity_index)
+        self._terms: list[str] = []
+        # term id -> [(entity position, term rank within entity)]
+        self._term_owners: list[list[tuple[int, int]]] = []
+
+        term_ids: dict[str, int] = {}
+        for position, (_, terms) in enumerate(self._entity_index):
+            for rank, term in enumerate(terms):
+                if not term:
+                    continue
+                term_id = term_ids.get(term)
+                if term_id is None:
+                    term_id = len(self._terms)
+                    term_ids[term] = term_id
+                    self._terms.append(term)
+                    self._term_owners.append([])
+                self._term_owners[term_id].append((position, rank))
+
+        self._automaton = TermAutomaton(self._terms)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def find_terms(self, corpus: str) -> set[int]:
+        return self._automaton.find(corpus)
+
+    def match(self, corpus: str) -> list[tuple[KnowledgeEntity, str]]:
+        best_rank: dict[int, int] = {}
+        for term_id in self.find_terms(corpus):
+            for position, rank in self._term_owners[term_id]:
+                current = best_rank.get(position)
+                if current is None or rank < current:
+                    best_rank[position] = rank
+
+        matches: list[tuple[KnowledgeEntity, str]] = []
+        for position in sorted(best_rank):
+            entity, terms = self._entity_index[position]
+            matches.append((entity, terms[best_rank[position]]))
+        return matches
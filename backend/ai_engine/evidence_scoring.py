@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+from scipy import sparse
+
+from ai_engine.entity_matcher import TermAutomaton
+
+WEIGHTINGS = {"count", "bm25"}
+
+
+@dataclass(frozen=True)
+class EvidenceThresholds:
+    """Score cut-offs for obligation-to-evidence satisfaction.
+
+    With `count` weighting a score is the number of obligation terms found in
+    the evidence corpus, so the defaults reproduce the historical 3 / 1 rule.
+    With `bm25` weighting each found term contributes its BM25 weight
+    (presence-only term frequency, document length in characters).
+    """
+
+    matched_min_score: float = 3.0
+    partial_min_score: float = 1.0
+    matched_confidence: float = 0.91
+    partial_confidence: float = 0.64
+    weighting: str = "count"
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
+
+    def __post_init__(self) -> None:
+        if self.weighting not in WEIGHTINGS:
+            raise ValueError(f"Unsupported evidence weighting '{self.weighting}'")
+        if self.partial_min_score <= 0 or self.matched_min_score < self.partial_min_score:
+            raise ValueError("Evidence thresholds must satisfy 0 < partial_min_score <= matched_min_score")
+
+    def classify(self, score: float) -> tuple[str, float]:
+        if score >= self.matched_min_score:
+            return "MATCHED", self.matched_confidence
+        if score >= self.partial_min_score:
+            return "PARTIAL", self.partial_confidence
+        return "NONE", 0.0
+
+
+DEFAULT_EVIDENCE_THRESHOLDS = EvidenceThresholds()
+
+
+@dataclass(frozen=True)
+class EvidenceMatch:
+    document_index: int | None
+    score: float
+    status: str
+    confidence: float
+
+
+def _vocabulary(obligation_terms: Sequence[Sequence[str]]) -> dict[str, int]:
+    vocabulary: dict[str, int] = {}
+    for terms in obligation_terms:
+        for term in terms:
+            if term and term not in vocabulary:
+                vocabulary[term] = len(vocabulary)
+    return vocabulary
+
+
+def _query_matrix(obligation_terms: Sequence[Sequence[str]], vocabulary: dict[str, int]) -> sparse.csr_matrix:
+    rows: list[int] = []
+    cols: list[int] = []
+    for row, terms in enumerate(obligation_terms):
+        for col in {vocabulary[term] for term in terms if term}:
+            rows.append(row)
+            cols.append(col)
+    data = np.ones(len(rows), dtype=np.float64)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(len(obligation_terms), len(vocabulary)))
+
+
+def _document_matrix(
+    corpora: Sequence[str],
+    vocabulary: dict[str, int],
+    thresholds: EvidenceThresholds,
+) -> sparse.csr_matrix:
+    automaton = TermAutomaton(list(vocabulary))
+    rows: list[int] = []
+    cols: list[int] = []
+    for row, corpus in enumerate(corpora):
+        for col in automaton.find(corpus):
+            rows.append(row)
+            cols.append(col)
+
+    data = np.ones(len(rows), dtype=np.float64)
+    incidence = sparse.csr_matrix((data, (rows, cols)), shape=(len(corpora), len(vocabulary)))
+    if thresholds.weighting == "count" or not rows:
+        return incidence
+
+    n_docs = len(corpora)
+    doc_freq = np.asarray(incidence.sum(axis=0)).ravel()
+    idf = np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+    lengths = np.array([len(corpus) for corpus in corpora], dtype=np.float64)
+    avg_length = lengths.mean() or 1.0
+    norm = thresholds.bm25_k1 * (1.0 - thresholds.bm25_b + thresholds.bm25_b * lengths / avg_length)
+    row_weight = (thresholds.bm25_k1 + 1.0) / (1.0 + norm)
+    weighted = sparse.diags(row_weight) @ incidence @ sparse.diags(idf)
+    return sparse.csr_matrix(weighted)
+
+
+def score_obligations(
+    obligation_terms: Sequence[Sequence[str]],
+    corpora: Sequence[str],
+    *,
+    thresholds: EvidenceThresholds = DEFAULT_EVIDENCE_THRESHOLDS,
+    block_size: int = 1024,
+) -> list[EvidenceMatch]:
+    """Pick the best evidence corpus for every obligation in one sparse product.
+
+    Ties resolve to the earliest corpus, matching a strict `score > best`
+    scan in corpus order. Obligations below `partial_min_score` get no
+    document.
+    """
+    if not obligation_terms:
+        return []
+    if not corpora:
+        return [EvidenceMatch(None, 0.0, *thresholds.classify(0.0)) for _ in obligation_terms]
+
+    vocabulary = _vocabulary(obligation_terms)
+    queries = _query_matrix(obligation_terms, vocabulary)
+    documents_t = _document_matrix(corpora, vocabulary, thresholds).T.tocsc()
+
+    results: list[EvidenceMatch] = []
+    # Dense blocks keep the obligations x documents score matrix bounded in memory.
+    for start in range(0, queries.shape[0], block_size):
+        scores = (queries[start : start + block_size] @ documents_t).toarray()
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(scores.shape[0]), best]
+        for document_index, score in zip(best.tolist(), best_scores.tolist()):
+            status, confidence = thresholds.classify(score)
+            results.append(
+                EvidenceMatch(
+                    document_index=document_index if status != "NONE" else None,
+                    score=score,
+                    status=status,
+                    confidence=confidence,
+                )
+            )
+    return results
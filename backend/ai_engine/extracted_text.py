@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ai_engine.knowledge_writer import upsert_rows
+from app.modules.ai.models import DocumentExtractedText, DocumentRegistry
+from app.modules.documents.models import DocumentVersion
+from app.services.blob_storage import blob_uri, download_bytes
+from app.services.document_text_extractor import extract_pdf_pages
+from app.services.text_extract import extract_text_from_docx
+
+STORE_KEY = ("fund_id", "content_key")  # ix_document_extracted_text_fund_key
+
+
+def _now_utc() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+@dataclass(frozen=True)
+class ExtractedText:
+    content_key: str
+    method: str
+    pages: tuple[str, ...]
+
+    @property
+    def text(self) -> str:
+        # Same canonical join as ExtractedPdfText.text.
+        return "\n\n".join(p for p in self.pages if (p or "").strip()).strip()
+
+
+def sha256_key(checksum: str) -> str:
+    return f"sha256:{checksum.lower()}"
+
+
+def etag_key(container_name: str, blob_path: str, etag: str) -> str:
+    # Etags are only unique per blob, so the blob address is part of the key.
+    return f"etag:{container_name}/{blob_path}:{etag.strip(chr(34))}"
+
+
+def extract_pages(data: bytes, filename: str) -> tuple[str, list[str]]:
+    """Parse a blob into (method, pages); DOCX and plain text come back as one page."""
+    suffix = Path(filename or "").suffix.lower()
+    if suffix == ".pdf":
+        return "pypdf", extract_pdf_pages(data).pages
+    if suffix == ".docx":
+        return "python-docx", [extract_text_from_docx(data).text]
+    return "utf-8", [data.decode("utf-8", errors="ignore")]
+
+
+def get_extracted_texts(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    content_keys: Iterable[str],
+    batch_size: int = 500,
+) -> dict[str, ExtractedText]:
+    wanted = list(dict.fromkeys(k for k in content_keys if k))
+    out: dict[str, ExtractedText] = {}
+    for i in range(0, len(wanted), batch_size):
+        rows = db.execute(
+            select(DocumentExtractedText.content_key, DocumentExtractedText.extraction_method, DocumentExtractedText.pages).where(
+                DocumentExtractedText.fund_id == fund_id,
+                DocumentExtractedText.content_key.in_(wanted[i : i + batch_size]),
+            )
+        ).all()
+        for key, method, pages in rows:
+            out[key] = ExtractedText(content_key=key, method=method, pages=tuple(pages or []))
+    return out
+
+
+def put_extracted_texts(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    texts: Iterable[ExtractedText],
+    actor_id: str = "ai-engine",
+) -> None:
+    now = _now_utc()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "fund_id": fund_id,
+            "access_level": "internal",
+            "content_key": item.content_key,
+            "extraction_method": item.method,
+            "page_count": len(item.pages),
+            "pages": list(item.pages),
+            "text_chars": len(item.text),
+            "extracted_at": now,
+            "created_by": actor_id,
+            "updated_by": actor_id,
+        }
+        for item in texts
+    ]
+    upsert_rows(
+        db,
+        model=DocumentExtractedText,
+        rows=rows,
+        key=STORE_KEY,
+        update_columns=("extraction_method", "page_count", "pages", "text_chars", "extracted_at", "updated_by"),
+        chunk_size=200,
+    )
+
+
+def _registry_keys(db: Session, *, fund_id: uuid.UUID, docs: list[DocumentRegistry]) -> dict[uuid.UUID, str]:
+    version_ids = [doc.version_id for doc in docs if doc.version_id is not None]
+    checksums: dict[uuid.UUID, str | None] = {}
+    for i in range(0, len(version_ids), 500):
+        checksums.update(
+            db.execute(
+                select(DocumentVersion.id, DocumentVersion.checksum).where(
+                    DocumentVersion.fund_id == fund_id,
+                    DocumentVersion.id.in_(version_ids[i : i + 500]),
+                )
+            ).all()
+        )
+
+    keys: dict[uuid.UUID, str] = {}
+    for doc in docs:
+        checksum = checksums.get(doc.version_id) if doc.version_id is not None else None
+        if checksum:
+            keys[doc.id] = sha256_key(checksum)
+        elif doc.etag:
+            keys[doc.id] = etag_key(doc.container_name, doc.blob_path, doc.etag)
+    return keys
+
+
+def load_registry_texts(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    docs: Iterable[DocumentRegistry],
+    actor_id: str = "ai-engine",
+) -> dict[uuid.UUID, ExtractedText]:
+    """Extracted text per registry row, downloading only blobs the store has not seen.
+
+    Rows are keyed by their version sha256 when linked to a document version,
+    otherwise by blob etag. A row with neither is downloaded every time and
+    not stored. Unreadable blobs are left out of the result.
+    """
+    docs = list(docs)
+    keys = _registry_keys(db, fund_id=fund_id, docs=docs)
+    stored = get_extracted_texts(db, fund_id=fund_id, content_keys=keys.values())
+
+    out: dict[uuid.UUID, ExtractedText] = {}
+    fresh: dict[str, ExtractedText] = {}
+    for doc in docs:
+        key = keys.get(doc.id)
+        hit = stored.get(key) if key else None
+        if hit is None and key in fresh:
+            hit = fresh[key]
+        if hit is not None:
+            out[doc.id] = hit
+            continue
+        try:
+            data = download_bytes(blob_uri=blob_uri(doc.container_name, doc.blob_path))
+            method, pages = extract_pages(data, doc.blob_path)
+        except Exception:
+            continue
+        extracted = ExtractedText(content_key=key or sha256_key(hashlib.sha256(data).hexdigest()), method=method, pages=tuple(pages))
+        out[doc.id] = extracted
+        if key:
+            fresh[key] = extracted
+
+    put_extracted_texts(db, fund_id=fund_id, texts=fresh.values(), actor_id=actor_id)
+    return out
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import datetime as dt
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from multiprocessing.connection import Connection, wait
+from typing import Callable
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from ai_engine.linker import run_cross_container_linking
+from ai_engine.monitoring import run_daily_cycle
+from ai_engine.pipeline_intelligence import run_pipeline_ingest
+from ai_engine.portfolio_intelligence import run_portfolio_ingest
+from app.core.config import settings
+from app.core.db.models import Fund
+
+# (db, fund_id, actor_id, as_of, max_workers): `max_workers` bounds any process pool a stage starts.
+StageFn = Callable[[Session, uuid.UUID, str, dt.datetime, int], dict]
+
+# Stages run in this order within a fund; funds run in parallel.
+STAGES: dict[str, StageFn] = {
+    "daily-cycle": lambda db, fund_id, actor_id, as_of, max_workers: run_daily_cycle(db, fund_id=fund_id, actor_id=actor_id, as_of=as_of, max_workers=max_workers),
+    "pipeline": lambda db, fund_id, actor_id, as_of, max_workers: run_pipeline_ingest(db, fund_id=fund_id, actor_id=actor_id, as_of=as_of),
+    "portfolio": lambda db, fund_id, actor_id, as_of, max_workers: run_portfolio_ingest(db, fund_id=fund_id, actor_id=actor_id, as_of=as_of),
+    "linker": lambda db, fund_id, actor_id, as_of, max_workers: run_cross_container_linking(db, fund_id=fund_id, actor_id=actor_id, as_of=as_of),
+}
+DEFAULT_STAGES: tuple[str, ...] = tuple(STAGES)
+DEFAULT_TIMEOUT_SECONDS = 1800.0
+
+
+def _now_utc() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+@dataclass(frozen=True)
+class FundRunResult:
+    fund_id: str
+    status: str  # OK | FAILED | TIMEOUT
+    seconds: float
+    stages: dict[str, dict] = field(default_factory=dict)
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class FundRunReport:
+    started_at: dt.datetime
+    finished_at: dt.datetime
+    max_workers: int
+    stages: tuple[str, ...]
+    results: tuple[FundRunResult, ...]
+
+    @property
+    def status(self) -> str:
+        if all(r.status == "OK" for r in self.results):
+            return "PASS"
+        if any(r.status == "OK" for r in self.results):
+            return "PARTIAL"
+        return "FAIL"
+
+    def to_dict(self) -> dict:
+        return {
+            "asOf": self.finished_at.isoformat(),
+            "status": self.status,
+            "startedAt": self.started_at.isoformat(),
+            "seconds": round((self.finished_at - self.started_at).total_seconds(), 3),
+            "maxWorkers": self.max_workers,
+            "stages": list(self.stages),
+            "funds": len(self.results),
+            "succeeded": sum(1 for r in self.results if r.status == "OK"),
+            "failed": sum(1 for r in self.results if r.status == "FAILED"),
+            "timedOut": sum(1 for r in self.results if r.status == "TIMEOUT"),
+            "results": [asdict(r) for r in self.results],
+        }
+
+
+def active_fund_ids(db: Session) -> list[uuid.UUID]:
+    return list(db.execute(select(Fund.id).where(Fund.is_active == True).order_by(Fund.name)).scalars().all())  # noqa: E712
+
+
+def _fund_worker(
+    conn: Connection,
+    database_url: str,
+    fund_id: str,
+    stages: tuple[str, ...],
+    actor_id: str,
+    as_of: dt.datetime,
+    stage_workers: int,
+) -> None:
+    # Lead a process group so a timeout can stop any process pool a stage starts here.
+    if hasattr(os, "setsid"):
+        os.setsid()
+    # Each worker builds its own engine: pooled connections must never cross a fork.
+    from app.core.db.session import _import_model_modules
+
+    _import_model_modules()
+    engine = create_engine(database_url, pool_pre_ping=True)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)
+    started = time.perf_counter()
+    outputs: dict[str, dict] = {}
+    try:
+        with SessionLocal() as db:
+            for stage in stages:
+                outputs[stage] = STAGES[stage](db, uuid.UUID(fund_id), actor_id, as_of, stage_workers)
+        result = FundRunResult(fund_id=fund_id, status="OK", seconds=round(time.perf_counter() - started, 3), stages=outputs)
+    except Exception as exc:
+        result = FundRunResult(
+            fund_id=fund_id,
+            status="FAILED",
+            seconds=round(time.perf_counter() - started, 3),
+            stages=outputs,
+            error=f"{type(exc).__name__}: {exc}\n{traceback.format_exc(limit=5)}",
+        )
+    finally:
+        engine.dispose()
+    conn.send(result)
+    conn.close()
+
+
+def _stop_worker(process: multiprocessing.process.BaseProcess) -> None:
+    """Terminate a fund worker together with its process group (see `_fund_worker`)."""
+    if not hasattr(os, "killpg"):
+        process.terminate()
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        return
+
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        # The worker has not reached setsid() yet, so it has no children either.
+        process.terminate()
+    process.join(timeout=5)
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    if process.is_alive():
+        process.kill()
+    process.join()
+
+
+def run_funds(
+    fund_ids: list[uuid.UUID],
+    *,
+    stages: tuple[str, ...] = DEFAULT_STAGES,
+    actor_id: str = "ai-engine-runner",
+    as_of: dt.datetime | None = None,
+    max_workers: int | None = None,
+    stage_workers: int | None = None,
+    timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+    database_url: str | None = None,
+    start_method: str | None = None,
+) -> FundRunReport:
+    """Run the per-fund AI stages for many funds, one process per fund.
+
+    At most `max_workers` funds (default: CPU count) run at once. Stages that
+    parallelise within a fund get `stage_workers` processes each (default: the
+    CPUs left per running fund), so nested pools do not oversubscribe. A fund that
+    exceeds `timeout_seconds` is terminated with any pool it started and reported
+    as TIMEOUT; its open transaction is rolled back by the database when the connection drops.
+    """
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown runner stages: {', '.join(unknown)}")
+    if timeout_seconds <= 0:
+        raise ValueError("timeout_seconds must be positive")
+
+    workers = max(1, max_workers or os.cpu_count() or 1)
+    per_fund = max(1, stage_workers or (os.cpu_count() or 1) // workers)
+    effective_as_of = as_of or _now_utc()
+    url = database_url or settings.database_url
+    context = multiprocessing.get_context(start_method)
+
+    started_at = _now_utc()
+    pending = deque(str(fund_id) for fund_id in dict.fromkeys(fund_ids))
+    running: dict[Connection, tuple[str, multiprocessing.Process, float]] = {}
+    results: dict[str, FundRunResult] = {}
+
+    while pending or running:
+        while pending and len(running) < workers:
+            fund_id = pending.popleft()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_fund_worker,
+                args=(sender, url, fund_id, stages, actor_id, effective_as_of, per_fund),
+                name=f"ai-runner-{fund_id}",
+                # Not daemonic: stages may start their own process pools. Timeouts stop the worker's process group.
+                daemon=False,
+            )
+            process.start()
+            sender.close()
+            running[receiver] = (fund_id, process, time.monotonic())
+
+        next_deadline = min(started + timeout_seconds for _, _, started in running.values())
+        ready = wait(list(running), timeout=max(0.0, next_deadline - time.monotonic()))
+
+        for receiver in ready:
+            fund_id, process, started = running.pop(receiver)
+            try:
+                results[fund_id] = receiver.recv()
+            except EOFError:
+                process.join(timeout=5)
+                results[fund_id] = FundRunResult(
+                    fund_id=fund_id,
+                    status="FAILED",
+                    seconds=round(time.monotonic() - started, 3),
+                    error=f"Worker exited without a result (exit code {process.exitcode})",
+                )
+            receiver.close()
+            process.join(timeout=5)
+
+        now = time.monotonic()
+        for receiver, (fund_id, process, started) in list(running.items()):
+            if now - started < timeout_seconds:
+                continue
+            _stop_worker(process)
+            receiver.close()
+            del running[receiver]
+            results[fund_id] = FundRunResult(
+                fund_id=fund_id,
+                status="TIMEOUT",
+                seconds=round(now - started, 3),
+                error=f"Exceeded {timeout_seconds:g}s",
+            )
+
+    return FundRunReport(
+        started_at=started_at,
+        finished_at=_now_utc(),
+        max_workers=workers,
+        stages=tuple(stages),
+        results=tuple(results[str(fund_id)] for fund_id in dict.fromkeys(fund_ids)),
+    )
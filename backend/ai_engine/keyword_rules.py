@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    """A named set of substrings looked up in one lowercased document field."""
+
+    name: str
+    field: str
+    tokens: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class RuleDecision:
+    """An outcome of a rule table; the first decision whose groups all hit wins.
+
+    `all_of` is a conjunction of groups, each group a disjunction of rule
+    names. `basis` is always reported; a `basis_if` label is added when its
+    rule hits.
+    """
+
+    label: str
+    all_of: tuple[tuple[str, ...], ...] = ()
+    confidence: int | None = None
+    basis: tuple[str, ...] = ()
+    basis_if: tuple[tuple[str, str], ...] = ()
+
+
+class KeywordRuleTable:
+    """
+    Declarative keyword classifier compiled once at import time.
+
+    Rule names are resolved to indexes up front. A document field is
+    lowercased only when the first rule on it is evaluated. Each rule is
+    evaluated at most once per document and memoised for later decisions and
+    the basis. Decisions are evaluated in order with the same
+    short-circuiting as the hand-written `any(token in text ...)` chains they
+    replace, so outputs are identical.
+    """
+
+    def __init__(self, *, rules: Iterable[KeywordRule], decisions: Iterable[RuleDecision], default: RuleDecision) -> None:
+        self.rules = tuple(rules)
+        self.decisions = tuple(decisions)
+        self.default = default
+
+        index: dict[str, int] = {}
+        for position, rule in enumerate(self.rules):
+            if rule.name in index:
+                raise ValueError(f"Duplicate keyword rule '{rule.name}'")
+            index[rule.name] = position
+        self.fields = tuple(dict.fromkeys(rule.field for rule in self.rules))
+        self._specs = tuple((rule.field, tuple(dict.fromkeys(t for t in rule.tokens if t))) for rule in self.rules)
+
+        def _resolve(decision: RuleDecision) -> tuple[tuple[tuple[int, ...], ...], tuple[tuple[int, str], ...]]:
+            referenced = [name for group in decision.all_of for name in group] + [name for name, _ in decision.basis_if]
+            unknown = [name for name in referenced if name not in index]
+            if unknown:
+                raise ValueError(f"Decision '{decision.label}' references unknown rules: {', '.join(unknown)}")
+            groups = tuple(tuple(index[name] for name in group) for group in decision.all_of)
+            return groups, tuple((index[name], label) for name, label in decision.basis_if)
+
+        self._compiled = tuple((decision, *_resolve(decision)) for decision in self.decisions)
+        self._default = (default, *_resolve(default))
+        # Stable across processes: any edit to a rule or decision changes it.
+        self.fingerprint = hashlib.sha256(repr((self.rules, self.decisions, self.default)).encode("utf-8")).hexdigest()
+
+    def _hit(self, position: int, fields: Mapping[str, str | None], lowered: dict[str, str], memo: list[bool | None]) -> bool:
+        hit = memo[position]
+        if hit is None:
+            field, tokens = self._specs[position]
+            text = lowered.get(field)
+            if text is None:
+                text = lowered[field] = (fields.get(field) or "").lower()
+            hit = False
+            for token in tokens:
+                if token in text:
+                    hit = True
+                    break
+            memo[position] = hit
+        return hit
+
+    def hits(self, fields: Mapping[str, str | None]) -> frozenset[str]:
+        """Names of every rule that hits the document."""
+        lowered: dict[str, str] = {}
+        memo: list[bool | None] = [None] * len(self.rules)
+        return frozenset(rule.name for position, rule in enumerate(self.rules) if self._hit(position, fields, lowered, memo))
+
+    def classify(self, fields: Mapping[str, str | None]) -> tuple[str, int | None, str]:
+        specs = self._specs
+        lowered: dict[str, str] = {}
+        memo: list[bool | None] = [None] * len(specs)
+        for decision, groups, basis_if in self._compiled:
+            for group in groups:
+                for position in group:
+                    hit = memo[position]
+                    if hit is None:
+                        # Inlined `_hit`: this loop is the classification hot path.
+                        field, tokens = specs[position]
+                        text = lowered.get(field)
+                        if text is None:
+                            text = lowered[field] = (fields.get(field) or "").lower()
+                        hit = False
+                        for token in tokens:
+                            if token in text:
+                                hit = True
+                                break
+                        memo[position] = hit
+                    if hit:
+                        break
+                else:
+                    break
+            else:
+                return self._outcome(decision, basis_if, fields, lowered, memo)
+        default, _, basis_if = self._default
+        return self._outcome(default, basis_if, fields, lowered, memo)
+
+    def classify_many(self, documents: Iterable[Mapping[str, str | None]]) -> list[tuple[str, int | None, str]]:
+        return [self.classify(fields) for fields in documents]
+
+    def _outcome(
+        self,
+        decision: RuleDecision,
+        basis_if: tuple[tuple[int, str], ...],
+        fields: Mapping[str, str | None],
+        lowered: dict[str, str],
+        memo: list[bool | None],
+    ) -> tuple[str, int | None, str]:
+        if not basis_if:
+            return decision.label, decision.confidence, "|".join(sorted(set(decision.basis)))
+        basis = list(decision.basis)
+        basis.extend(label for position, label in basis_if if self._hit(position, fields, lowered, memo))
+        return decision.label, decision.confidence, "|".join(sorted(set(basis)))
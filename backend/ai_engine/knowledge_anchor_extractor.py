@@ -2,26 +2,32 @@ from __future__ import annotations
 
 import re
 import uuid
+from typing import Iterable
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
 
+from ai_engine.extracted_text import ExtractedText, load_registry_texts
 from app.modules.ai.models import DocumentClassification, DocumentRegistry, KnowledgeAnchor
-from app.services.blob_storage import blob_uri, download_bytes
 
 
 DATE_RE = re.compile(r"\b(20\d{2}[-/]\d{2}[-/]\d{2})\b")
 LAW_RE = re.compile(r"governed by the laws? of ([A-Za-z\s]+)", re.IGNORECASE)
 SECTION_RE = re.compile(r"\b(section|sec\.)\s+(\d+[A-Za-z0-9\-\.]*)", re.IGNORECASE)
+PROVIDER_TOKENS = ("administrator", "custodian", "counsel", "service provider")
 OBLIGATION_KEYWORDS = ("must", "shall", "required", "requirement")
 
+MAX_ANCHORS_PER_DOC = 40
+SNIPPET_RADIUS = 160
+ANCHOR_BATCH_SIZE = 500
 
-def _extract_text(registry: DocumentRegistry) -> str:
-    try:
-        data = download_bytes(blob_uri=blob_uri(registry.container_name, registry.blob_path))
-        return data.decode("utf-8", errors="ignore")
-    except Exception:
-        return f"{registry.title} {registry.blob_path}"
+
+def _extract_pages(registry: DocumentRegistry, extracted: ExtractedText | None) -> list[tuple[str | None, str]]:
+    """(page_reference, text) pairs; only pypdf output carries real page numbers."""
+    if extracted is not None and extracted.text.strip():
+        paged = extracted.method == "pypdf"
+        return [(str(number) if paged else None, page) for number, page in enumerate(extracted.pages, start=1) if page.strip()]
+    return [(None, f"{registry.title} {registry.blob_path}")]
 
 
 def _clip(value: str, size: int = 450) -> str:
@@ -31,36 +37,92 @@ def _clip(value: str, size: int = 450) -> str:
     return cleaned[: size - 3] + "..."
 
 
-def _build_anchors(doc: DocumentRegistry, doc_type: str, text: str) -> list[dict[str, str | None]]:
-    lowered = text.lower()
-    anchors: list[dict[str, str | None]] = []
-
-    if "netz" in lowered and "fund" in lowered:
-        anchors.append({"anchor_type": "FUND_NAME", "anchor_value": "Netz Fund", "source_snippet": _clip(text), "page_reference": None})
-
-    if any(token in lowered for token in ["administrator", "custodian", "counsel", "service provider"]):
-        for token in ["administrator", "custodian", "counsel", "service provider"]:
-            if token in lowered:
-                anchors.append({"anchor_type": "PROVIDER_NAME", "anchor_value": token.title(), "source_snippet": _clip(text), "page_reference": None})
-
-    for match in DATE_RE.finditer(text):
-        anchors.append({"anchor_type": "EFFECTIVE_DATE", "anchor_value": match.group(1).replace("/", "-"), "source_snippet": _clip(text), "page_reference": None})
+def _snippet(page: str, start: int, end: int) -> str:
+    window = page[max(0, start - SNIPPET_RADIUS) : end + SNIPPET_RADIUS]
+    return _clip(" ".join(window.split()))
+
+
+def _anchor(anchor_type: str, anchor_value: str, page: str, start: int, end: int, page_reference: str | None) -> dict[str, str | None]:
+    return {
+        "anchor_type": anchor_type,
+        "anchor_value": anchor_value,
+        "source_snippet": _snippet(page, start, end),
+        "page_reference": page_reference,
+    }
+
+
+def _build_anchors(doc_type: str, pages: Iterable[tuple[str | None, str]]) -> list[dict[str, str | None]]:
+    """
+    Single pass over the pages. Each page is lowercased once; per-type lists
+    keep the historical ordering (fund, providers, dates, law, sections,
+    obligations) and stop growing at the per-document cap.
+    """
+    limit = MAX_ANCHORS_PER_DOC
+    fund_name: dict[str, str | None] | None = None
+    fund_seen = False
+    providers: dict[str, dict[str, str | None]] = {}
+    obligations: dict[str, dict[str, str | None]] = {}
+    dates: list[dict[str, str | None]] = []
+    sections: list[dict[str, str | None]] = []
+    law: dict[str, str | None] | None = None
+    first_page: tuple[str | None, str] | None = None
+
+    for page_reference, page in pages:
+        if first_page is None:
+            first_page = (page_reference, page)
+        lowered = page.lower()
+
+        if fund_name is None:
+            netz_at = lowered.find("netz")
+            if netz_at >= 0:
+                fund_name = _anchor("FUND_NAME", "Netz Fund", page, netz_at, netz_at + 4, page_reference)
+        # "Netz" and "fund" may sit on different pages, in either order.
+        fund_seen = fund_seen or "fund" in lowered
+
+        for token in PROVIDER_TOKENS:
+            if token not in providers:
+                at = lowered.find(token)
+                if at >= 0:
+                    providers[token] = _anchor("PROVIDER_NAME", token.title(), page, at, at + len(token), page_reference)
+
+        if len(dates) < limit:
+            for match in DATE_RE.finditer(page):
+                dates.append(_anchor("EFFECTIVE_DATE", match.group(1).replace("/", "-"), page, match.start(), match.end(), page_reference))
+                if len(dates) >= limit:
+                    break
+
+        if law is None:
+            match = LAW_RE.search(page)
+            if match:
+                law = _anchor("GOVERNING_LAW", _clip(match.group(1).strip(), 120), page, match.start(), match.end(), page_reference)
+
+        if len(sections) < limit:
+            for match in SECTION_RE.finditer(page):
+                sections.append(_anchor("REGULATORY_REFERENCE", f"{match.group(1)} {match.group(2)}", page, match.start(), match.end(), page_reference))
+                if len(sections) >= limit:
+                    break
+
+        for keyword in OBLIGATION_KEYWORDS:
+            if keyword not in obligations:
+                at = lowered.find(keyword)
+                if at >= 0:
+                    obligations[keyword] = _anchor("OBLIGATION_KEYWORD", keyword, page, at, at + len(keyword), page_reference)
 
-    law_match = LAW_RE.search(text)
-    if law_match:
-        anchors.append({"anchor_type": "GOVERNING_LAW", "anchor_value": _clip(law_match.group(1).strip(), 120), "source_snippet": _clip(text), "page_reference": None})
-
-    for match in SECTION_RE.finditer(text):
-        anchors.append({"anchor_type": "REGULATORY_REFERENCE", "anchor_value": f"{match.group(1)} {match.group(2)}", "source_snippet": _clip(text), "page_reference": None})
-
-    for keyword in OBLIGATION_KEYWORDS:
-        if keyword in lowered:
-            anchors.append({"anchor_type": "OBLIGATION_KEYWORD", "anchor_value": keyword, "source_snippet": _clip(text), "page_reference": None})
+    anchors: list[dict[str, str | None]] = []
+    if fund_name is not None and fund_seen:
+        anchors.append(fund_name)
+    anchors.extend(providers[token] for token in PROVIDER_TOKENS if token in providers)
+    anchors.extend(dates)
+    if law is not None:
+        anchors.append(law)
+    anchors.extend(sections)
+    anchors.extend(obligations[keyword] for keyword in OBLIGATION_KEYWORDS if keyword in obligations)
 
     if not anchors:
-        anchors.append({"anchor_type": "DOC_TYPE", "anchor_value": doc_type, "source_snippet": _clip(text), "page_reference": None})
+        page_reference, page = first_page or (None, "")
+        anchors.append({"anchor_type": "DOC_TYPE", "anchor_value": doc_type, "source_snippet": _clip(page), "page_reference": page_reference})
 
-    return anchors[:40]
+    return anchors[:limit]
 
 
 def extract_knowledge_anchors(
@@ -68,7 +130,9 @@ def extract_knowledge_anchors(
     *,
     fund_id: uuid.UUID,
     actor_id: str = "ai-engine",
-) -> list[KnowledgeAnchor]:
+    batch_size: int = ANCHOR_BATCH_SIZE,
+) -> int:
+    """Rebuild anchors for every classified document; returns the number written."""
     rows = list(
         db.execute(
             select(DocumentRegistry, DocumentClassification)
@@ -80,27 +144,29 @@ def extract_knowledge_anchors(
         ).all()
     )
 
-    saved: list[KnowledgeAnchor] = []
-    for doc, classification in rows:
-        db.execute(delete(KnowledgeAnchor).where(KnowledgeAnchor.fund_id == fund_id, KnowledgeAnchor.doc_id == doc.id))
-        text = _extract_text(doc)
-        anchors = _build_anchors(doc, classification.doc_type, text)
-
-        for anchor in anchors:
-            row = KnowledgeAnchor(
-                fund_id=fund_id,
-                access_level="internal",
-                doc_id=doc.id,
-                anchor_type=str(anchor["anchor_type"]),
-                anchor_value=str(anchor["anchor_value"]),
-                source_snippet=anchor.get("source_snippet"),
-                page_reference=anchor.get("page_reference"),
-                created_by=actor_id,
-                updated_by=actor_id,
-            )
-            db.add(row)
-            db.flush()
-            saved.append(row)
+    extracted = load_registry_texts(db, fund_id=fund_id, docs=[doc for doc, _ in rows], actor_id=actor_id)
+
+    written = 0
+    for offset in range(0, len(rows), batch_size):
+        chunk = rows[offset : offset + batch_size]
+        values: list[dict] = []
+        for doc, classification in chunk:
+            for anchor in _build_anchors(classification.doc_type, _extract_pages(doc, extracted.get(doc.id))):
+                values.append(
+                    {
+                        "fund_id": fund_id,
+                        "access_level": "internal",
+                        "doc_id": doc.id,
+                        **anchor,
+                        "created_by": actor_id,
+                        "updated_by": actor_id,
+                    }
+                )
+
+        db.execute(delete(KnowledgeAnchor).where(KnowledgeAnchor.fund_id == fund_id, KnowledgeAnchor.doc_id.in_([doc.id for doc, _ in chunk])))
+        if values:
+            db.execute(insert(KnowledgeAnchor), values)
+        written += len(values)
 
     db.commit()
-    return saved
+    return written
@@ -4,12 +4,14 @@ import datetime as dt
 import re
 import uuid
 from collections import defaultdict
+from hashlib import sha256
 
-from sqlalchemy import and_, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ai_engine.corpus_cache import DocumentCorpus, get_corpora
+from ai_engine.keyword_rules import KeywordRule, KeywordRuleTable, RuleDecision
 from app.modules.ai.models import DocumentRegistry, ManagerProfile
-from app.modules.documents.models import DocumentChunk, DocumentVersion
 from app.services.search_index import AzureSearchMetadataClient
 
 
@@ -35,80 +37,109 @@ def _manager_name_from_path(root_folder: str | None, folder_path: str | None) ->
     return folder.split("/")[0].strip()
 
 
-def _infer_strategy(text: str) -> str:
-    lowered = text.lower()
-    if "real estate" in lowered:
-        return "Real Estate Credit"
-    if "direct lending" in lowered:
-        return "Direct Lending"
-    if "distressed" in lowered:
-        return "Distressed Credit"
-    if "asset-backed" in lowered or "asset backed" in lowered:
-        return "Asset-Backed Credit"
-    if "private credit" in lowered:
-        return "Private Credit"
-    return "Not Explicitly Declared"
-
-
-def _infer_region(text: str) -> str:
-    lowered = text.lower()
-    if any(token in lowered for token in ["united states", "u.s.", " us ", "north america"]):
-        return "US"
-    if any(token in lowered for token in ["europe", "eu", "uk"]):
-        return "Europe"
-    if any(token in lowered for token in ["latam", "latin america", "brazil"]):
-        return "LatAm"
-    return "Not Explicitly Declared"
-
-
-def _infer_vehicle_type(text: str) -> str:
-    lowered = text.lower()
-    if "closed-end" in lowered or "closed end" in lowered:
-        return "Closed-End Fund"
-    if "open-end" in lowered or "open end" in lowered:
-        return "Open-End Fund"
-    if "spv" in lowered:
-        return "SPV"
-    if "fund" in lowered:
-        return "Fund"
-    return "Not Explicitly Declared"
-
-
-def _infer_reporting_cadence(text: str) -> str:
-    lowered = text.lower()
-    if "quarterly" in lowered:
-        return "Quarterly"
-    if "monthly" in lowered:
-        return "Monthly"
-    if "semi-annual" in lowered or "semi annual" in lowered:
-        return "Semi-Annual"
-    if "annual" in lowered:
-        return "Annual"
-    return "Not Explicitly Declared"
+NOT_DECLARED = "Not Explicitly Declared"
+
+# One table for every profile heuristic so the manager text is lowercased and
+# scanned once; each attribute then takes its first hit in declaration order.
+MANAGER_SIGNAL_RULES = KeywordRuleTable(
+    rules=(
+        KeywordRule("strategy:real-estate", "text", ("real estate",)),
+        KeywordRule("strategy:direct-lending", "text", ("direct lending",)),
+        KeywordRule("strategy:distressed", "text", ("distressed",)),
+        KeywordRule("strategy:asset-backed", "text", ("asset-backed", "asset backed")),
+        KeywordRule("strategy:private-credit", "text", ("private credit",)),
+        KeywordRule("region:us", "text", ("united states", "u.s.", " us ", "north america")),
+        KeywordRule("region:europe", "text", ("europe", "eu", "uk")),
+        KeywordRule("region:latam", "text", ("latam", "latin america", "brazil")),
+        KeywordRule("vehicle:closed-end", "text", ("closed-end", "closed end")),
+        KeywordRule("vehicle:open-end", "text", ("open-end", "open end")),
+        KeywordRule("vehicle:spv", "text", ("spv",)),
+        KeywordRule("vehicle:fund", "text", ("fund",)),
+        KeywordRule("cadence:quarterly", "text", ("quarterly",)),
+        KeywordRule("cadence:monthly", "text", ("monthly",)),
+        KeywordRule("cadence:semi-annual", "text", ("semi-annual", "semi annual")),
+        KeywordRule("cadence:annual", "text", ("annual",)),
+        KeywordRule("risk:concentration", "text", ("concentration",)),
+        KeywordRule("risk:refinancing", "text", ("refinancing", "refinance")),
+        KeywordRule("risk:liquidity", "text", ("liquidity",)),
+        KeywordRule("risk:credit", "text", ("credit risk", "default")),
+        KeywordRule("risk:valuation", "text", ("valuation",)),
+    ),
+    decisions=(),
+    default=RuleDecision(NOT_DECLARED),
+)
+STRATEGY_LABELS = (
+    ("strategy:real-estate", "Real Estate Credit"),
+    ("strategy:direct-lending", "Direct Lending"),
+    ("strategy:distressed", "Distressed Credit"),
+    ("strategy:asset-backed", "Asset-Backed Credit"),
+    ("strategy:private-credit", "Private Credit"),
+)
+REGION_LABELS = (("region:us", "US"), ("region:europe", "Europe"), ("region:latam", "LatAm"))
+VEHICLE_LABELS = (
+    ("vehicle:closed-end", "Closed-End Fund"),
+    ("vehicle:open-end", "Open-End Fund"),
+    ("vehicle:spv", "SPV"),
+    ("vehicle:fund", "Fund"),
+)
+CADENCE_LABELS = (
+    ("cadence:quarterly", "Quarterly"),
+    ("cadence:monthly", "Monthly"),
+    ("cadence:semi-annual", "Semi-Annual"),
+    ("cadence:annual", "Annual"),
+)
+RISK_LABELS = (
+    ("risk:concentration", "Concentration"),
+    ("risk:refinancing", "Refinancing"),
+    ("risk:liquidity", "Liquidity"),
+    ("risk:credit", "Credit"),
+    ("risk:valuation", "Valuation"),
+)
+TARGET_RETURN_RE = re.compile(r"(?:target return|target irr|expected return)\D{0,20}(\d{1,2}(?:\.\d{1,2})?\s?%)", re.IGNORECASE)
+PROFILE_BUILDER_VERSION = "wave-ai1-manager-v1"
+
+
+def _first_label(hits: frozenset[str], labels: tuple[tuple[str, str], ...]) -> str:
+    return next((label for rule, label in labels if rule in hits), NOT_DECLARED)
 
 
 def _extract_declared_target_return(text: str) -> str | None:
-    pattern = re.compile(r"(?:target return|target irr|expected return)\D{0,20}(\d{1,2}(?:\.\d{1,2})?\s?%)", re.IGNORECASE)
-    match = pattern.search(text)
+    match = TARGET_RETURN_RE.search(text)
     if match:
         return match.group(1).replace(" ", "")
     return None
 
 
-def _extract_risks(text: str) -> list[str]:
-    lowered = text.lower()
-    risk_map = {
-        "Concentration": ["concentration"],
-        "Refinancing": ["refinancing", "refinance"],
-        "Liquidity": ["liquidity"],
-        "Credit": ["credit risk", "default"],
-        "Valuation": ["valuation"],
+def _infer_profile_fields(text: str) -> dict[str, str | list[str] | None]:
+    hits = MANAGER_SIGNAL_RULES.hits({"text": text})
+    return {
+        "strategy": _first_label(hits, STRATEGY_LABELS),
+        "region": _first_label(hits, REGION_LABELS),
+        "vehicle_type": _first_label(hits, VEHICLE_LABELS),
+        "declared_target_return": _extract_declared_target_return(text),
+        "reporting_cadence": _first_label(hits, CADENCE_LABELS),
+        "key_risks_declared": [label for rule, label in RISK_LABELS if rule in hits],
     }
-    detected: list[str] = []
-    for label, signals in risk_map.items():
-        if any(signal in lowered for signal in signals):
-            detected.append(label)
-    return detected
+
+
+def _input_fingerprint(manager_docs: list[DocumentRegistry], corpora: dict[uuid.UUID, DocumentCorpus]) -> str:
+    parts = [PROFILE_BUILDER_VERSION, MANAGER_SIGNAL_RULES.fingerprint, TARGET_RETURN_RE.pattern]
+    for doc in sorted(manager_docs, key=lambda d: str(d.id)):
+        corpus = corpora.get(doc.version_id) if doc.version_id is not None else None
+        parts.extend(
+            (
+                str(doc.id),
+                str(doc.document_id),
+                str(doc.version_id),
+                doc.title or "",
+                doc.root_folder or "",
+                doc.folder_path or "",
+                _ensure_utc(doc.as_of).isoformat() if doc.as_of else "",
+                corpus.version_checksum or "" if corpus else "",
+                str(corpus.chunk_count) if corpus else "",
+            )
+        )
+    return sha256("|".join(parts).encode("utf-8")).hexdigest()
 
 
 def build_manager_profiles(
@@ -117,7 +148,9 @@ def build_manager_profiles(
     fund_id: uuid.UUID,
     manager: str | None = None,
     actor_id: str = "ai-engine",
+    force: bool = False,
 ) -> list[ManagerProfile]:
+    """Rebuild profiles whose document set changed; unchanged profiles are returned as stored."""
     now = _now_utc()
     manager_filter = (manager or "").strip().lower()
 
@@ -139,18 +172,36 @@ def build_manager_profiles(
             continue
         by_manager[name].append(row)
 
+    corpora = get_corpora(
+        db,
+        fund_id=fund_id,
+        version_ids=[r.version_id for rows in by_manager.values() for r in rows],
+        actor_id=actor_id,
+    )
+
+    existing_by_name: dict[str, ManagerProfile] = {}
+    if by_manager:
+        existing_by_name = {
+            row.name: row
+            for row in db.execute(
+                select(ManagerProfile).where(
+                    ManagerProfile.fund_id == fund_id,
+                    ManagerProfile.name.in_(list(by_manager)),
+                )
+            ).scalars().all()
+        }
+
     saved: list[ManagerProfile] = []
+    changed: list[ManagerProfile] = []
     for manager_name, manager_docs in by_manager.items():
-        version_ids = [r.version_id for r in manager_docs]
-        chunk_rows = list(
-            db.execute(
-                select(DocumentChunk.text)
-                .join(DocumentVersion, and_(DocumentVersion.id == DocumentChunk.version_id, DocumentVersion.fund_id == fund_id))
-                .where(DocumentChunk.fund_id == fund_id, DocumentChunk.version_id.in_(version_ids))
-                .limit(80)
-            ).all()
-        )
-        combined = "\n".join((row[0] or "") for row in chunk_rows)
+        fingerprint = _input_fingerprint(manager_docs, corpora)
+        existing = existing_by_name.get(manager_name)
+        if not force and existing is not None and existing.input_fingerprint == fingerprint:
+            saved.append(existing)
+            continue
+
+        manager_corpora = [corpora[r.version_id] for r in manager_docs if r.version_id in corpora]
+        combined = "\n".join(corpus.text for corpus in manager_corpora if corpus.text)
         fallback = "\n".join((r.title or "") for r in manager_docs)
         text = combined if combined.strip() else fallback
 
@@ -169,14 +220,10 @@ def build_manager_profiles(
             "fund_id": fund_id,
             "access_level": "internal",
             "name": manager_name,
-            "strategy": _infer_strategy(text),
-            "region": _infer_region(text),
-            "vehicle_type": _infer_vehicle_type(text),
-            "declared_target_return": _extract_declared_target_return(text),
-            "reporting_cadence": _infer_reporting_cadence(text),
-            "key_risks_declared": _extract_risks(text),
+            **_infer_profile_fields(text),
             "last_document_update": last_update,
             "source_documents": source_documents,
+            "input_fingerprint": fingerprint,
             "as_of": now,
             "data_latency": max(0, int((now - last_update).total_seconds())) if last_update is not None else None,
             "data_quality": "OK",
@@ -184,28 +231,21 @@ def build_manager_profiles(
             "updated_by": actor_id,
         }
 
-        existing = db.execute(
-            select(ManagerProfile).where(
-                ManagerProfile.fund_id == fund_id,
-                ManagerProfile.name == manager_name,
-            )
-        ).scalar_one_or_none()
-
         if existing is None:
             row = ManagerProfile(**payload)
             db.add(row)
-            db.flush()
         else:
             for key, value in payload.items():
                 if key == "created_by":
                     continue
                 setattr(existing, key, value)
             row = existing
-            db.flush()
 
         saved.append(row)
+        changed.append(row)
 
-    if saved:
+    if changed:
+        db.flush()
         try:
             search_docs = [
                 {
@@ -217,13 +257,17 @@ def build_manager_profiles(
                     "version": str(item.id),
                     "uploaded_at": item.as_of.isoformat(),
                 }
-                for item in saved
+                for item in changed
             ]
-            AzureSearchMetadataClient().upsert_documents(items=search_docs)
+            failed_keys = AzureSearchMetadataClient().upsert_documents(items=search_docs).failed_keys
+            degraded = [item for item in changed if f"ai-manager-profile-{item.id}" in failed_keys]
         except Exception:
-            for item in saved:
-                item.data_quality = "DEGRADED"
-                item.updated_by = actor_id
+            degraded = changed
+        for item in degraded:
+            item.data_quality = "DEGRADED"
+            # Retry the index push on the next run even if nothing changed.
+            item.input_fingerprint = None
+            item.updated_by = actor_id
 
     db.commit()
     return saved
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.modules.ai.models import DocumentRegistry, KnowledgeEntity, KnowledgeLink
+
+NODE_KINDS = {"document", "entity"}
+MAX_HOPS = 4
+GRAPH_TTL_SECONDS = 300.0
+
+_PENDING_KEY = "knowledge_graph_pending"
+
+
+def _now_utc() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+def _ensure_utc(value: dt.datetime | None) -> dt.datetime | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt.timezone.utc)
+    return value.astimezone(dt.timezone.utc)
+
+
+@dataclass
+class _FundGraph:
+    """Adjacency lists over knowledge_links for one fund.
+
+    Edges live in parallel lists indexed by edge number; `by_document` and
+    `by_entity` map a node to the edges touching it, which makes a hop an
+    O(degree) step. `by_key` lets linker writes patch edges in place.
+    """
+
+    loaded_at: float
+    link_ids: list[uuid.UUID] = field(default_factory=list)
+    sources: list[uuid.UUID] = field(default_factory=list)
+    targets: list[uuid.UUID] = field(default_factory=list)
+    link_types: list[str] = field(default_factory=list)
+    authority_tiers: list[str] = field(default_factory=list)
+    confidences: list[float] = field(default_factory=list)
+    snippets: list[str | None] = field(default_factory=list)
+    created_at: list[dt.datetime | None] = field(default_factory=list)
+    by_document: dict[uuid.UUID, list[int]] = field(default_factory=lambda: defaultdict(list))
+    by_entity: dict[uuid.UUID, list[int]] = field(default_factory=lambda: defaultdict(list))
+    by_key: dict[tuple[uuid.UUID, uuid.UUID, str], int] = field(default_factory=dict)
+
+    def add_edge(
+        self,
+        *,
+        link_id: uuid.UUID,
+        source_document_id: uuid.UUID,
+        target_entity_id: uuid.UUID,
+        link_type: str,
+        authority_tier: str,
+        confidence_score: float,
+        evidence_snippet: str | None,
+        created_at: dt.datetime | None,
+    ) -> None:
+        key = (source_document_id, target_entity_id, link_type)
+        index = self.by_key.get(key)
+        if index is not None:
+            self.authority_tiers[index] = authority_tier
+            self.confidences[index] = confidence_score
+            self.snippets[index] = evidence_snippet
+            return
+
+        index = len(self.link_ids)
+        self.link_ids.append(link_id)
+        self.sources.append(source_document_id)
+        self.targets.append(target_entity_id)
+        self.link_types.append(link_type)
+        self.authority_tiers.append(authority_tier)
+        self.confidences.append(confidence_score)
+        self.snippets.append(evidence_snippet)
+        self.created_at.append(_ensure_utc(created_at))
+        self.by_document[source_document_id].append(index)
+        self.by_entity[target_entity_id].append(index)
+        self.by_key[key] = index
+
+    def __len__(self) -> int:
+        return len(self.link_ids)
+
+
+class _GraphCache:
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._graphs: dict[uuid.UUID, _FundGraph] = {}
+        self._lock = threading.Lock()
+
+    def get(self, fund_id: uuid.UUID) -> _FundGraph | None:
+        with self._lock:
+            graph = self._graphs.get(fund_id)
+            if graph is not None and time.monotonic() - graph.loaded_at > self.ttl_seconds:
+                del self._graphs[fund_id]
+                return None
+            return graph
+
+    def put(self, fund_id: uuid.UUID, graph: _FundGraph) -> None:
+        with self._lock:
+            self._graphs[fund_id] = graph
+
+    def apply(self, fund_id: uuid.UUID, rows: list[dict[str, Any]]) -> None:
+        with self._lock:
+            graph = self._graphs.get(fund_id)
+            if graph is None:
+                return
+            for row in rows:
+                graph.add_edge(
+                    link_id=row["id"],
+                    source_document_id=row["source_document_id"],
+                    target_entity_id=row["target_entity_id"],
+                    link_type=row["link_type"],
+                    authority_tier=row["authority_tier"],
+                    confidence_score=row["confidence_score"],
+                    evidence_snippet=row["evidence_snippet"],
+                    created_at=row["created_at"],
+                )
+
+    def invalidate(self, fund_id: uuid.UUID | None = None) -> None:
+        with self._lock:
+            if fund_id is None:
+                self._graphs.clear()
+            else:
+                self._graphs.pop(fund_id, None)
+
+
+_cache = _GraphCache(GRAPH_TTL_SECONDS)
+
+
+def invalidate_knowledge_graph(fund_id: uuid.UUID | None = None) -> None:
+    _cache.invalidate(fund_id)
+
+
+def stage_graph_links(db: Session, *, fund_id: uuid.UUID, rows: list[dict[str, Any]]) -> None:
+    """Queue upserted link rows; they are applied to a cached graph only when `db` commits."""
+    if rows:
+        db.info.setdefault(_PENDING_KEY, []).append((fund_id, rows))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_links(session: Session) -> None:
+    for fund_id, rows in session.info.pop(_PENDING_KEY, []):
+        _cache.apply(fund_id, rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_links(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _load_graph(db: Session, fund_id: uuid.UUID) -> _FundGraph:
+    graph = _cache.get(fund_id)
+    if graph is not None:
+        return graph
+
+    graph = _FundGraph(loaded_at=time.monotonic())
+    rows = db.execute(
+        select(
+            KnowledgeLink.id,
+            KnowledgeLink.source_document_id,
+            KnowledgeLink.target_entity_id,
+            KnowledgeLink.link_type,
+            KnowledgeLink.authority_tier,
+            KnowledgeLink.confidence_score,
+            KnowledgeLink.evidence_snippet,
+            KnowledgeLink.created_at,
+        )
+        .where(KnowledgeLink.fund_id == fund_id)
+        .order_by(KnowledgeLink.created_at, KnowledgeLink.id)
+    ).all()
+    for row in rows:
+        graph.add_edge(
+            link_id=row[0],
+            source_document_id=row[1],
+            target_entity_id=row[2],
+            link_type=row[3],
+            authority_tier=row[4],
+            confidence_score=row[5],
+            evidence_snippet=row[6],
+            created_at=row[7],
+        )
+    _cache.put(fund_id, graph)
+    return graph
+
+
+def encode_cursor(hop: int, link_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(f"{hop}:{link_id}".encode("ascii")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[int, str]:
+    try:
+        hop, link_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii").split(":", 1)
+        return int(hop), str(uuid.UUID(link_id))
+    except Exception as exc:
+        raise ValueError("Invalid graph cursor") from exc
+
+
+def _node_details(db: Session, *, fund_id: uuid.UUID, documents: Iterable[uuid.UUID], entities: Iterable[uuid.UUID]) -> dict:
+    document_ids = list(documents)
+    entity_ids = list(entities)
+    nodes: dict[str, dict] = {}
+    if document_ids:
+        for row in db.execute(
+            select(DocumentRegistry.id, DocumentRegistry.title, DocumentRegistry.container_name).where(
+                DocumentRegistry.fund_id == fund_id,
+                DocumentRegistry.id.in_(document_ids),
+            )
+        ).all():
+            nodes[str(row[0])] = {"kind": "document", "title": row[1], "containerName": row[2]}
+    if entity_ids:
+        for row in db.execute(
+            select(KnowledgeEntity.id, KnowledgeEntity.entity_type, KnowledgeEntity.canonical_name).where(
+                KnowledgeEntity.fund_id == fund_id,
+                KnowledgeEntity.id.in_(entity_ids),
+            )
+        ).all():
+            nodes[str(row[0])] = {"kind": "entity", "entityType": row[1], "canonicalName": row[2]}
+    return nodes
+
+
+def traverse_knowledge_graph(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    start_id: uuid.UUID,
+    start_kind: str = "entity",
+    hops: int = 2,
+    as_of: dt.datetime | None = None,
+    link_types: set[str] | None = None,
+    cursor: str | None = None,
+    limit: int = 100,
+) -> dict:
+    """Breadth-first k-hop neighbourhood of a document or entity node.
+
+    Links are edges between a source document and a target entity and are
+    walked in both directions, so document -> obligation -> evidence document
+    is two hops. Edges are returned ordered by (hop, link id); `nextCursor`
+    resumes after the last edge of the page.
+    """
+    if start_kind not in NODE_KINDS:
+        raise ValueError(f"Unsupported start kind '{start_kind}'")
+    if not 1 <= hops <= MAX_HOPS:
+        raise ValueError(f"hops must be between 1 and {MAX_HOPS}")
+
+    effective_as_of = _ensure_utc(as_of) or _now_utc()
+    after = decode_cursor(cursor) if cursor else None
+    graph = _load_graph(db, fund_id)
+
+    def _visible(edge: int) -> bool:
+        created = graph.created_at[edge]
+        if created is not None and created > effective_as_of:
+            return False
+        return link_types is None or graph.link_types[edge] in link_types
+
+    seen_documents: set[uuid.UUID] = set()
+    seen_entities: set[uuid.UUID] = set()
+    frontier: list[tuple[str, uuid.UUID]] = [(start_kind, start_id)]
+    (seen_documents if start_kind == "document" else seen_entities).add(start_id)
+    seen_edges: set[int] = set()
+    edges: list[tuple[int, int]] = []
+
+    for hop in range(1, hops + 1):
+        next_frontier: list[tuple[str, uuid.UUID]] = []
+        for kind, node_id in frontier:
+            adjacency = graph.by_document if kind == "document" else graph.by_entity
+            for edge in adjacency.get(node_id, ()):
+                if edge in seen_edges or not _visible(edge):
+                    continue
+                seen_edges.add(edge)
+                edges.append((hop, edge))
+                if kind == "document":
+                    neighbour = graph.targets[edge]
+                    if neighbour not in seen_entities:
+                        seen_entities.add(neighbour)
+                        next_frontier.append(("entity", neighbour))
+                else:
+                    neighbour = graph.sources[edge]
+                    if neighbour not in seen_documents:
+                        seen_documents.add(neighbour)
+                        next_frontier.append(("document", neighbour))
+        frontier = next_frontier
+        if not frontier:
+            break
+
+    ordered = sorted(edges, key=lambda item: (item[0], str(graph.link_ids[item[1]])))
+    if after is not None:
+        ordered = [item for item in ordered if (item[0], str(graph.link_ids[item[1]])) > after]
+    page = ordered[:limit]
+    has_more = len(ordered) > limit
+
+    nodes = _node_details(
+        db,
+        fund_id=fund_id,
+        documents={graph.sources[edge] for _, edge in page},
+        entities={graph.targets[edge] for _, edge in page},
+    )
+    items = [
+        {
+            "hop": hop,
+            "linkId": str(graph.link_ids[edge]),
+            "sourceDocumentId": str(graph.sources[edge]),
+            "targetEntityId": str(graph.targets[edge]),
+            "linkType": graph.link_types[edge],
+            "authorityTier": graph.authority_tiers[edge],
+            "confidenceScore": graph.confidences[edge],
+            "evidenceSnippet": graph.snippets[edge],
+            "createdAt": graph.created_at[edge].isoformat() if graph.created_at[edge] else None,
+        }
+        for hop, edge in page
+    ]
+
+    return {
+        "mode": "KNOWLEDGE_GRAPH",
+        "asOf": effective_as_of.isoformat(),
+        "status": "PASS",
+        "payload": {
+            "startId": str(start_id),
+            "startKind": start_kind,
+            "hops": hops,
+            "edgesReachable": len(edges),
+            "documentsReached": len(seen_documents),
+            "entitiesReached": len(seen_entities),
+            "links": items,
+            "nodes": nodes,
+            "nextCursor": encode_cursor(page[-1][0], graph.link_ids[page[-1][1]]) if has_more and page else None,
+        },
+    }
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import datetime as dt
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import func, literal_column, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ai_engine.knowledge_graph import stage_graph_links
+from app.modules.ai.models import KnowledgeEntity, KnowledgeLink, KnowledgeLinkState
+
+# Bind-parameter budgets per statement. SQLite builds may be compiled with the
+# historical 999 limit, Postgres accepts up to 65535.
+_PARAM_LIMITS = {"postgresql": 60000, "sqlite": 999}
+
+ENTITY_KEY = ("fund_id", "entity_type", "canonical_name")  # ix_knowledge_entities_fund_type_name
+LINK_KEY = ("fund_id", "source_document_id", "target_entity_id", "link_type")  # ix_knowledge_links_fund_source_target_type
+LINK_STATE_KEY = ("fund_id", "document_id")  # ix_knowledge_link_state_fund_document
+
+
+@dataclass(frozen=True)
+class BulkUpsertResult:
+    created: int
+    updated: int
+    returned: tuple[tuple, ...] = ()
+
+    @property
+    def total(self) -> int:
+        return self.created + self.updated
+
+
+def _dialect_name(db: Session) -> str:
+    name = db.get_bind().dialect.name
+    if name not in _PARAM_LIMITS:
+        raise RuntimeError(f"Bulk knowledge upsert is not supported on dialect '{name}'")
+    return name
+
+
+def _chunks(rows: list[dict[str, Any]], *, dialect: str, chunk_size: int) -> list[list[dict[str, Any]]]:
+    if not rows:
+        return []
+    per_statement = max(1, min(chunk_size, _PARAM_LIMITS[dialect] // len(rows[0])))
+    return [rows[i : i + per_statement] for i in range(0, len(rows), per_statement)]
+
+
+def _dedupe(rows: list[dict[str, Any]], key: tuple[str, ...]) -> list[dict[str, Any]]:
+    # ON CONFLICT cannot touch the same row twice in one statement; last write wins.
+    by_key: dict[tuple, dict[str, Any]] = {}
+    for row in rows:
+        by_key[tuple(row[k] for k in key)] = row
+    return list(by_key.values())
+
+
+def _existing_keys(db: Session, model: type, key: tuple[str, ...], rows: list[dict[str, Any]]) -> set[tuple]:
+    columns = [getattr(model, k) for k in key]
+    wanted = [tuple(row[k] for k in key) for row in rows]
+    found = db.execute(select(*columns).where(tuple_(*columns).in_(wanted))).all()
+    return {tuple(item) for item in found}
+
+
+def upsert_rows(
+    db: Session,
+    *,
+    model: type,
+    rows: list[dict[str, Any]],
+    key: tuple[str, ...],
+    update_columns: tuple[str, ...],
+    chunk_size: int,
+    returning: tuple[str, ...] = (),
+) -> BulkUpsertResult:
+    """Insert or update `rows` on `key`.
+
+    `returning` names columns to read back from the stored rows; on a conflict
+    these are the existing row's values, not the ones passed in.
+    """
+    rows = _dedupe(rows, key)
+    if not rows:
+        return BulkUpsertResult(created=0, updated=0)
+
+    dialect = _dialect_name(db)
+    returned_columns = [model.__table__.c[c] for c in returning]
+    created = 0
+    updated = 0
+    returned: list[tuple] = []
+    for chunk in _chunks(rows, dialect=dialect, chunk_size=chunk_size):
+        if dialect == "postgresql":
+            stmt = postgresql.insert(model).values(chunk)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(key),
+                set_={**{c: stmt.excluded[c] for c in update_columns}, "updated_at": func.now()},
+            ).returning(literal_column("(xmax = 0)"), *returned_columns)
+            result_rows = db.execute(stmt).all()
+            inserted_flags = [bool(row[0]) for row in result_rows]
+            returned.extend(tuple(row[1:]) for row in result_rows)
+            inserted = sum(1 for flag in inserted_flags if flag)
+            created += inserted
+            updated += len(inserted_flags) - inserted
+            continue
+
+        # SQLite fallback: ON CONFLICT works, but there is no cheap insert/update
+        # marker, so count against a single prefetch of the chunk's keys.
+        existing = _existing_keys(db, model, key, chunk)
+        stmt = sqlite.insert(model).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={**{c: stmt.excluded[c] for c in update_columns}, "updated_at": func.now()},
+        )
+        if returned_columns:
+            returned.extend(tuple(row) for row in db.execute(stmt.returning(*returned_columns)).all())
+        else:
+            db.execute(stmt)
+        hits = sum(1 for row in chunk if tuple(row[k] for k in key) in existing)
+        updated += hits
+        created += len(chunk) - hits
+
+    return BulkUpsertResult(created=created, updated=updated, returned=tuple(returned))
+
+
+def bulk_upsert_entities(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    entities: list[tuple[str, str]],
+    actor_id: str,
+    terms_fingerprints: dict[tuple[str, str], str] | None = None,
+    chunk_size: int = 1000,
+) -> BulkUpsertResult:
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "fund_id": fund_id,
+            "access_level": "internal",
+            "entity_type": entity_type,
+            "canonical_name": canonical_name,
+            "created_by": actor_id,
+            "updated_by": actor_id,
+        }
+        for entity_type, canonical_name in entities
+    ]
+    update_columns: tuple[str, ...] = ("updated_by",)
+    if terms_fingerprints is not None:
+        for row in rows:
+            row["terms_fingerprint"] = terms_fingerprints.get((row["entity_type"], row["canonical_name"]))
+        update_columns = ("updated_by", "terms_fingerprint")
+    return upsert_rows(
+        db,
+        model=KnowledgeEntity,
+        rows=rows,
+        key=ENTITY_KEY,
+        update_columns=update_columns,
+        chunk_size=chunk_size,
+    )
+
+
+def load_entities(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    entities: list[tuple[str, str]],
+    chunk_size: int = 1000,
+) -> dict[tuple[str, str], KnowledgeEntity]:
+    keys = list(dict.fromkeys(entities))
+    out: dict[tuple[str, str], KnowledgeEntity] = {}
+    for i in range(0, len(keys), chunk_size):
+        window = keys[i : i + chunk_size]
+        rows = db.execute(
+            select(KnowledgeEntity)
+            .where(
+                KnowledgeEntity.fund_id == fund_id,
+                tuple_(KnowledgeEntity.entity_type, KnowledgeEntity.canonical_name).in_(window),
+            )
+            .execution_options(populate_existing=True)
+        ).scalars().all()
+        for row in rows:
+            out[(row.entity_type, row.canonical_name)] = row
+    return out
+
+
+def upsert_link_state(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    fingerprints: dict[uuid.UUID, str],
+    entity_index_version: str,
+    linked_at: dt.datetime,
+    actor_id: str,
+    chunk_size: int = 1000,
+) -> BulkUpsertResult:
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "fund_id": fund_id,
+            "access_level": "internal",
+            "document_id": document_id,
+            "content_fingerprint": content_fingerprint,
+            "entity_index_version": entity_index_version,
+            "linked_at": linked_at,
+            "created_by": actor_id,
+            "updated_by": actor_id,
+        }
+        for document_id, content_fingerprint in fingerprints.items()
+    ]
+    return upsert_rows(
+        db,
+        model=KnowledgeLinkState,
+        rows=rows,
+        key=LINK_STATE_KEY,
+        update_columns=("content_fingerprint", "entity_index_version", "linked_at", "updated_by"),
+        chunk_size=chunk_size,
+    )
+
+
+class KnowledgeLinkBuffer:
+    """Collects knowledge link rows in memory and writes them with chunked upserts."""
+
+    def __init__(self, *, fund_id: uuid.UUID, actor_id: str, chunk_size: int = 1000) -> None:
+        self.fund_id = fund_id
+        self.actor_id = actor_id
+        self.chunk_size = chunk_size
+        self._rows: list[dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(
+        self,
+        *,
+        source_document_id: uuid.UUID,
+        target_entity_id: uuid.UUID,
+        link_type: str,
+        authority_tier: str,
+        confidence_score: float,
+        evidence_snippet: str | None,
+    ) -> None:
+        self._rows.append(
+            {
+                "id": uuid.uuid4(),
+                "fund_id": self.fund_id,
+                "access_level": "internal",
+                "source_document_id": source_document_id,
+                "target_entity_id": target_entity_id,
+                "link_type": link_type,
+                "authority_tier": authority_tier,
+                "confidence_score": confidence_score,
+                "evidence_snippet": evidence_snippet,
+                "created_by": self.actor_id,
+                "updated_by": self.actor_id,
+            }
+        )
+
+    def flush(self, db: Session) -> BulkUpsertResult:
+        rows, self._rows = self._rows, []
+        result = upsert_rows(
+            db,
+            model=KnowledgeLink,
+            rows=rows,
+            key=LINK_KEY,
+            update_columns=("authority_tier", "confidence_score", "evidence_snippet", "updated_by"),
+            chunk_size=self.chunk_size,
+            returning=("source_document_id", "target_entity_id", "link_type", "id", "created_at"),
+        )
+        # A conflicting row keeps its original id and created_at; the cached graph must use those.
+        stored = {tuple(item[:3]): item[3:] for item in result.returned}
+        staged = []
+        for row in rows:
+            link_id, created_at = stored[(row["source_document_id"], row["target_entity_id"], row["link_type"])]
+            staged.append({**row, "id": link_id, "created_at": created_at})
+        stage_graph_links(db, fund_id=self.fund_id, rows=staged)
+        return result
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
 import re
 import uuid
 from collections import defaultdict
@@ -8,17 +9,21 @@ from collections import defaultdict
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ai_engine.corpus_cache import DocumentCorpus, get_corpora, get_corpus, normalize_text
+from ai_engine.entity_matcher import EntityTermMatcher
+from ai_engine.evidence_scoring import DEFAULT_EVIDENCE_THRESHOLDS, EvidenceThresholds, score_obligations
+from ai_engine.knowledge_writer import KnowledgeLinkBuffer, bulk_upsert_entities, load_entities, upsert_link_state
 from app.modules.ai.models import (
     DealDocumentIntelligence,
     DocumentRegistry,
     KnowledgeEntity,
     KnowledgeLink,
+    KnowledgeLinkState,
     ManagerProfile,
     ObligationEvidenceMap,
     ObligationRegister,
 )
 from app.modules.deals.models import Deal
-from app.modules.documents.models import DocumentChunk
 
 CONTAINER_AUTHORITY: dict[str, str] = {
     "dataroom-investor-facing": "NARRATIVE",
@@ -41,13 +46,14 @@ LINK_TYPES = {
 }
 
 
+CORPUS_BATCH_SIZE = 500
+
+
 def _now_utc() -> dt.datetime:
     return dt.datetime.now(dt.timezone.utc)
 
 
-def _normalize(value: str | None) -> str:
-    cleaned = re.sub(r"[^a-z0-9]+", " ", (value or "").lower()).strip()
-    return re.sub(r"\s+", " ", cleaned)
+_normalize = normalize_text
 
 
 def _text_terms(value: str | None, *, max_terms: int = 8) -> list[str]:
@@ -75,127 +81,67 @@ def _allowed_link_types(authority_tier: str) -> set[str]:
     return {"REFERENCES"}
 
 
-def _upsert_entity(
-    db: Session,
-    *,
-    fund_id: uuid.UUID,
-    entity_type: str,
-    canonical_name: str,
-    actor_id: str,
-) -> KnowledgeEntity:
-    existing = db.execute(
-        select(KnowledgeEntity).where(
-            KnowledgeEntity.fund_id == fund_id,
-            KnowledgeEntity.entity_type == entity_type,
-            KnowledgeEntity.canonical_name == canonical_name,
-        )
-    ).scalar_one_or_none()
-    if existing is not None:
-        existing.updated_by = actor_id
-        db.flush()
-        return existing
+def _sha256(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
 
-    row = KnowledgeEntity(
-        fund_id=fund_id,
-        access_level="internal",
-        entity_type=entity_type,
-        canonical_name=canonical_name,
-        created_by=actor_id,
-        updated_by=actor_id,
-    )
-    db.add(row)
-    db.flush()
-    return row
-
-
-def _upsert_link(
-    db: Session,
-    *,
-    fund_id: uuid.UUID,
-    source_document_id: uuid.UUID,
-    target_entity_id: uuid.UUID,
-    link_type: str,
-    authority_tier: str,
-    confidence_score: float,
-    evidence_snippet: str | None,
-    actor_id: str,
-) -> bool:
-    existing = db.execute(
-        select(KnowledgeLink).where(
-            KnowledgeLink.fund_id == fund_id,
-            KnowledgeLink.source_document_id == source_document_id,
-            KnowledgeLink.target_entity_id == target_entity_id,
-            KnowledgeLink.link_type == link_type,
-        )
-    ).scalar_one_or_none()
 
-    if existing is not None:
-        existing.authority_tier = authority_tier
-        existing.confidence_score = confidence_score
-        existing.evidence_snippet = evidence_snippet
-        existing.updated_by = actor_id
-        db.flush()
-        return False
+def _content_fingerprint(doc: DocumentRegistry) -> str:
+    return _sha256(f"{doc.checksum or ''}|{doc.etag or ''}|{doc.version_id or ''}")
 
-    db.add(
-        KnowledgeLink(
-            fund_id=fund_id,
-            access_level="internal",
-            source_document_id=source_document_id,
-            target_entity_id=target_entity_id,
-            link_type=link_type,
-            authority_tier=authority_tier,
-            confidence_score=confidence_score,
-            evidence_snippet=evidence_snippet,
-            created_by=actor_id,
-            updated_by=actor_id,
-        )
-    )
-    db.flush()
-    return True
-
-
-def _document_corpus(db: Session, doc: DocumentRegistry) -> str:
-    chunks = []
-    if doc.version_id is not None:
-        chunks = list(
-            db.execute(
-                select(DocumentChunk.text)
-                .where(DocumentChunk.fund_id == doc.fund_id, DocumentChunk.version_id == doc.version_id)
-                .limit(60)
-            ).all()
-        )
-    text = " ".join([doc.title or "", doc.blob_path or ""] + [row[0] or "" for row in chunks])
-    return _normalize(text)
 
+def _document_corpus(doc: DocumentRegistry, corpus: DocumentCorpus | None) -> str:
+    parts = [_normalize(doc.title), _normalize(doc.blob_path), corpus.normalized if corpus else ""]
+    return " ".join(part for part in parts if part)
 
-def _source_registry_doc_id(db: Session, *, fund_id: uuid.UUID, source_documents: list[dict] | None) -> uuid.UUID | None:
-    if not source_documents:
-        return None
 
-    for item in source_documents:
-        raw_document_id = item.get("documentId")
+def _source_document_ids(source_documents: list[dict] | None) -> list[uuid.UUID]:
+    out: list[uuid.UUID] = []
+    for item in source_documents or []:
+        raw_document_id = item.get("documentId") if isinstance(item, dict) else None
         if not raw_document_id:
             continue
         try:
-            document_id = uuid.UUID(str(raw_document_id))
+            out.append(uuid.UUID(str(raw_document_id)))
         except Exception:
             continue
-        row = db.execute(
-            select(DocumentRegistry.id).where(DocumentRegistry.fund_id == fund_id, DocumentRegistry.document_id == document_id)
-        ).first()
-        if row:
-            return row[0]
-    return None
+    return out
 
 
-def build_entity_index(
+def _registry_by_document_id(
     db: Session,
     *,
     fund_id: uuid.UUID,
-    actor_id: str = "ai-engine",
-    as_of: dt.datetime | None = None,
-) -> list[tuple[KnowledgeEntity, list[str]]]:
+    document_ids: set[uuid.UUID],
+    chunk_size: int = 900,
+) -> dict[uuid.UUID, DocumentRegistry]:
+    wanted = sorted(document_ids)
+    out: dict[uuid.UUID, DocumentRegistry] = {}
+    for i in range(0, len(wanted), chunk_size):
+        rows = db.execute(
+            select(DocumentRegistry).where(
+                DocumentRegistry.fund_id == fund_id,
+                DocumentRegistry.document_id.in_(wanted[i : i + chunk_size]),
+            )
+        ).scalars().all()
+        for row in rows:
+            out.setdefault(row.document_id, row)
+    return out
+
+
+def _obligation_signature(obligation_text: str | None) -> bytes | None:
+    terms = _text_terms(obligation_text, max_terms=8)
+    if not terms:
+        return None
+    return hashlib.blake2b(" ".join(terms).encode("utf-8"), digest_size=16).digest()
+
+
+def _build_entity_index(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    actor_id: str,
+    as_of: dt.datetime | None,
+) -> tuple[list[tuple[KnowledgeEntity, list[str]]], dict[tuple[str, str], str], str]:
     entries: list[tuple[KnowledgeEntity, list[str]]] = []
     effective_as_of = as_of or _now_utc()
 
@@ -216,68 +162,81 @@ def build_entity_index(
         ).scalars().all()
     )
 
+    pending: list[tuple[str, str, list[str]]] = []
+
     for manager in managers:
         canonical_name = (manager.name or "").strip()
         if not canonical_name:
             continue
-        entity = _upsert_entity(db, fund_id=fund_id, entity_type="MANAGER", canonical_name=canonical_name, actor_id=actor_id)
-        entries.append((entity, [_normalize(canonical_name)]))
+        pending.append(("MANAGER", canonical_name, [_normalize(canonical_name)]))
 
     for deal in deals:
         canonical_name = (deal.deal_name or deal.title or "").strip()
         if not canonical_name:
             continue
-        entity = _upsert_entity(db, fund_id=fund_id, entity_type="DEAL", canonical_name=canonical_name, actor_id=actor_id)
         terms = [_normalize(canonical_name)]
         if deal.sponsor_name:
             terms.append(_normalize(deal.sponsor_name))
-        entries.append((entity, [t for t in terms if t]))
+        pending.append(("DEAL", canonical_name, [t for t in terms if t]))
 
     for obligation in obligations:
         canonical_name = (obligation.obligation_id or "").strip()
         if not canonical_name:
             continue
-        entity = _upsert_entity(db, fund_id=fund_id, entity_type="OBLIGATION", canonical_name=canonical_name, actor_id=actor_id)
         terms = _text_terms(obligation.obligation_text, max_terms=10)
         if canonical_name:
             terms.insert(0, _normalize(canonical_name))
-        entries.append((entity, [t for t in terms if t]))
+        pending.append(("OBLIGATION", canonical_name, [t for t in terms if t]))
 
     for provider_doc in provider_docs:
         name = re.sub(r"\.[a-z0-9]+$", "", provider_doc.title or "", flags=re.IGNORECASE).strip()
         if not name:
             continue
-        entity = _upsert_entity(db, fund_id=fund_id, entity_type="PROVIDER", canonical_name=name, actor_id=actor_id)
-        entries.append((entity, [_normalize(name)]))
+        pending.append(("PROVIDER", name, [_normalize(name)]))
+
+    keys = [(entity_type, canonical_name) for entity_type, canonical_name, _ in pending]
+    bulk_upsert_entities(db, fund_id=fund_id, entities=keys, actor_id=actor_id)
+    entity_by_key = load_entities(db, fund_id=fund_id, entities=keys)
+    for entity_type, canonical_name, terms in pending:
+        entity = entity_by_key.get((entity_type, canonical_name))
+        if entity is not None:
+            entries.append((entity, terms))
+
+    terms_by_key: dict[tuple[str, str], list[str]] = defaultdict(list)
+    for entity_type, canonical_name, terms in pending:
+        terms_by_key[(entity_type, canonical_name)].append("\x1f".join(terms))
+    fingerprints = {
+        key: _sha256(f"{key[0]}|{key[1]}|" + "\x1e".join(term_lists)) for key, term_lists in terms_by_key.items()
+    }
+    index_version = _sha256("\n".join(sorted(f"{key[0]}|{key[1]}|{value}" for key, value in fingerprints.items())))
 
     db.commit()
-    return entries
+    return entries, fingerprints, index_version
 
 
-def link_document(
+def build_entity_index(
     db: Session,
     *,
     fund_id: uuid.UUID,
-    document_id: uuid.UUID,
-    entity_index: list[tuple[KnowledgeEntity, list[str]]],
     actor_id: str = "ai-engine",
-) -> int:
-    doc = db.execute(
-        select(DocumentRegistry).where(DocumentRegistry.fund_id == fund_id, DocumentRegistry.id == document_id)
-    ).scalar_one_or_none()
-    if doc is None:
-        return 0
+    as_of: dt.datetime | None = None,
+) -> list[tuple[KnowledgeEntity, list[str]]]:
+    entries, _, _ = _build_entity_index(db, fund_id=fund_id, actor_id=actor_id, as_of=as_of)
+    return entries
 
-    corpus = _document_corpus(db, doc)
+
+def _stage_document_links(
+    *,
+    doc: DocumentRegistry,
+    matcher: EntityTermMatcher,
+    links: KnowledgeLinkBuffer,
+    corpus: DocumentCorpus | None,
+) -> None:
+    corpus_text = _document_corpus(doc, corpus)
     authority_tier = _resolved_authority(doc)
     allowed = _allowed_link_types(authority_tier)
 
-    created = 0
-    for entity, terms in entity_index:
-        matched_term = next((term for term in terms if term and term in corpus), None)
-        if not matched_term:
-            continue
-
+    for entity, matched_term in matcher.match(corpus_text):
         if entity.entity_type == "MANAGER":
             link_type = "RELATES_TO_MANAGER"
         elif entity.entity_type == "DEAL":
@@ -295,21 +254,42 @@ def link_document(
 
         confidence = 0.92 if matched_term == _normalize(entity.canonical_name) else 0.72
         evidence_snippet = f"{doc.title} :: {matched_term}" if doc.title else matched_term
-        if _upsert_link(
-            db,
-            fund_id=fund_id,
+        links.add(
             source_document_id=doc.id,
             target_entity_id=entity.id,
             link_type=link_type,
             authority_tier=authority_tier,
             confidence_score=confidence,
             evidence_snippet=evidence_snippet,
-            actor_id=actor_id,
-        ):
-            created += 1
+        )
+
+
+def link_document(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    document_id: uuid.UUID,
+    entity_index: list[tuple[KnowledgeEntity, list[str]]],
+    actor_id: str = "ai-engine",
+    matcher: EntityTermMatcher | None = None,
+) -> int:
+    doc = db.execute(
+        select(DocumentRegistry).where(DocumentRegistry.fund_id == fund_id, DocumentRegistry.id == document_id)
+    ).scalar_one_or_none()
+    if doc is None:
+        return 0
+
+    links = KnowledgeLinkBuffer(fund_id=fund_id, actor_id=actor_id)
+    _stage_document_links(
+        doc=doc,
+        matcher=matcher if matcher is not None else EntityTermMatcher(entity_index),
+        links=links,
+        corpus=get_corpus(db, fund_id=fund_id, version_id=doc.version_id, actor_id=actor_id),
+    )
+    result = links.flush(db)
 
     db.commit()
-    return created
+    return result.created
 
 
 def map_obligation_evidence(
@@ -318,6 +298,7 @@ def map_obligation_evidence(
     fund_id: uuid.UUID,
     actor_id: str = "ai-engine",
     as_of: dt.datetime | None = None,
+    thresholds: EvidenceThresholds = DEFAULT_EVIDENCE_THRESHOLDS,
 ) -> tuple[int, int]:
     now = as_of or _now_utc()
 
@@ -340,41 +321,37 @@ def map_obligation_evidence(
             )
         ).scalars().all()
     )
-    evidence_corpus = {row.id: _document_corpus(db, row) for row in evidence_docs}
+    corpora = get_corpora(db, fund_id=fund_id, version_ids=[row.version_id for row in evidence_docs], actor_id=actor_id)
+    evidence_corpus = {row.id: _document_corpus(row, corpora.get(row.version_id)) for row in evidence_docs}
+    links = KnowledgeLinkBuffer(fund_id=fund_id, actor_id=actor_id)
 
-    satisfied = 0
-    created_links = 0
+    existing_maps = {
+        row.obligation_id: row
+        for row in db.execute(select(ObligationEvidenceMap).where(ObligationEvidenceMap.fund_id == fund_id)).scalars().all()
+    }
 
+    obligation_terms = []
     for entity in obligation_entities:
         source_obligation = obligation_by_key.get(entity.canonical_name)
-        terms = _text_terms(source_obligation.obligation_text if source_obligation else entity.canonical_name, max_terms=12)
-        best_doc_id: uuid.UUID | None = None
-        best_score = 0
-
-        for evidence_doc in evidence_docs:
-            corpus = evidence_corpus.get(evidence_doc.id, "")
-            score = sum(1 for term in terms if term and term in corpus)
-            if score > best_score:
-                best_score = score
-                best_doc_id = evidence_doc.id
-
-        if best_score >= 3:
-            status = "MATCHED"
-            confidence = 0.91
-        elif best_score >= 1:
-            status = "PARTIAL"
-            confidence = 0.64
-        else:
-            status = "NONE"
-            confidence = 0.0
-            best_doc_id = None
+        obligation_terms.append(
+            _text_terms(source_obligation.obligation_text if source_obligation else entity.canonical_name, max_terms=12)
+        )
+    matches = score_obligations(
+        obligation_terms,
+        [evidence_corpus.get(row.id, "") for row in evidence_docs],
+        thresholds=thresholds,
+    )
 
-        existing_map = db.execute(
-            select(ObligationEvidenceMap).where(
-                ObligationEvidenceMap.fund_id == fund_id,
-                ObligationEvidenceMap.obligation_id == entity.id,
-            )
-        ).scalar_one_or_none()
+    satisfied = 0
+
+    for entity, match in zip(obligation_entities, matches):
+        status = match.status
+        confidence = match.confidence
+        best_score = f"{match.score:g}"
+        evidence_doc = evidence_docs[match.document_index] if match.document_index is not None else None
+        best_doc_id = evidence_doc.id if evidence_doc is not None else None
+
+        existing_map = existing_maps.get(entity.id)
 
         if existing_map is None:
             db.add(
@@ -395,27 +372,22 @@ def map_obligation_evidence(
             existing_map.last_checked_at = now
             existing_map.updated_by = actor_id
 
-        if best_doc_id is not None:
-            evidence_doc = next((d for d in evidence_docs if d.id == best_doc_id), None)
-            if evidence_doc is not None:
-                authority_tier = _resolved_authority(evidence_doc)
-                if "SATISFIES" in _allowed_link_types(authority_tier):
-                    if _upsert_link(
-                        db,
-                        fund_id=fund_id,
-                        source_document_id=best_doc_id,
-                        target_entity_id=entity.id,
-                        link_type="SATISFIES",
-                        authority_tier=authority_tier,
-                        confidence_score=confidence,
-                        evidence_snippet=f"Evidence match score={best_score}",
-                        actor_id=actor_id,
-                    ):
-                        created_links += 1
+        if evidence_doc is not None:
+            authority_tier = _resolved_authority(evidence_doc)
+            if "SATISFIES" in _allowed_link_types(authority_tier):
+                links.add(
+                    source_document_id=evidence_doc.id,
+                    target_entity_id=entity.id,
+                    link_type="SATISFIES",
+                    authority_tier=authority_tier,
+                    confidence_score=confidence,
+                    evidence_snippet=f"Evidence match score={best_score}",
+                )
 
         if status == "MATCHED":
             satisfied += 1
 
+    created_links = links.flush(db).created
     db.commit()
     return satisfied, created_links
 
@@ -438,33 +410,39 @@ def detect_binding_conflicts(
     )
     entity_by_obligation_id = {entity.canonical_name: entity for entity in entities}
 
-    grouped: dict[str, list[ObligationRegister]] = defaultdict(list)
+    # 16-byte signature of the leading obligation terms -> rows sharing it.
+    grouped: dict[bytes, list[ObligationRegister]] = defaultdict(list)
     for row in obligations:
-        key = " ".join(_text_terms(row.obligation_text, max_terms=8))
-        if key:
-            grouped[key].append(row)
-
-    conflicts_detected = 0
-    created_links = 0
+        signature = _obligation_signature(row.obligation_text)
+        if signature is not None:
+            grouped[signature].append(row)
 
+    conflicting_groups: list[list[ObligationRegister]] = []
     for group_rows in grouped.values():
         if len(group_rows) < 2:
             continue
-
         due_rules = {(_normalize(row.due_rule) or "ongoing") for row in group_rows}
-        if len(due_rules) <= 1:
-            continue
+        if len(due_rules) > 1:
+            conflicting_groups.append(group_rows)
 
-        conflicts_detected += 1
+    source_ids_by_row = {
+        row.id: _source_document_ids(row.source_documents) for group_rows in conflicting_groups for row in group_rows
+    }
+    registry_by_document_id = _registry_by_document_id(
+        db,
+        fund_id=fund_id,
+        document_ids={document_id for ids in source_ids_by_row.values() for document_id in ids},
+    )
 
-        for row in group_rows:
-            source_doc_id = _source_registry_doc_id(db, fund_id=fund_id, source_documents=row.source_documents)
-            if source_doc_id is None:
-                continue
+    conflicts_detected = len(conflicting_groups)
+    links = KnowledgeLinkBuffer(fund_id=fund_id, actor_id=actor_id)
 
-            source_doc = db.execute(
-                select(DocumentRegistry).where(DocumentRegistry.fund_id == fund_id, DocumentRegistry.id == source_doc_id)
-            ).scalar_one_or_none()
+    for group_rows in conflicting_groups:
+        for row in group_rows:
+            source_doc = next(
+                (registry_by_document_id[i] for i in source_ids_by_row[row.id] if i in registry_by_document_id),
+                None,
+            )
             if source_doc is None:
                 continue
 
@@ -476,19 +454,16 @@ def detect_binding_conflicts(
             if target_entity is None:
                 continue
 
-            if _upsert_link(
-                db,
-                fund_id=fund_id,
-                source_document_id=source_doc_id,
+            links.add(
+                source_document_id=source_doc.id,
                 target_entity_id=target_entity.id,
                 link_type="CONFLICTS_WITH",
                 authority_tier=authority_tier,
                 confidence_score=0.95,
                 evidence_snippet=f"Due rule conflict: {row.due_rule}",
-                actor_id=actor_id,
-            ):
-                created_links += 1
+            )
 
+    created_links = links.flush(db).created
     db.commit()
     return conflicts_detected, created_links
 
@@ -499,10 +474,14 @@ def run_cross_container_linking(
     fund_id: uuid.UUID,
     actor_id: str = "ai-engine",
     as_of: dt.datetime | None = None,
+    full_rebuild: bool = False,
+    evidence_thresholds: EvidenceThresholds = DEFAULT_EVIDENCE_THRESHOLDS,
 ) -> dict:
     effective_as_of = as_of or _now_utc()
 
-    entity_index = build_entity_index(db, fund_id=fund_id, actor_id=actor_id, as_of=effective_as_of)
+    entity_index, entity_fingerprints, index_version = _build_entity_index(
+        db, fund_id=fund_id, actor_id=actor_id, as_of=effective_as_of
+    )
     docs = list(
         db.execute(
             select(DocumentRegistry).where(
@@ -511,18 +490,84 @@ def run_cross_container_linking(
             )
         ).scalars().all()
     )
+    states = {
+        row.document_id: row
+        for row in db.execute(select(KnowledgeLinkState).where(KnowledgeLinkState.fund_id == fund_id)).scalars().all()
+    }
+    latest_state = max(states.values(), key=lambda row: row.linked_at, default=None)
+    previous_version = latest_state.entity_index_version if latest_state else None
+
+    # Entities whose terms differ from the fingerprint stored by the last completed run.
+    changed_entries = [
+        (entity, terms)
+        for entity, terms in entity_index
+        if entity.terms_fingerprint != entity_fingerprints.get((entity.entity_type, entity.canonical_name))
+    ]
+
+    matcher = EntityTermMatcher(entity_index)
+    delta_matcher: EntityTermMatcher | None = None
+    links = KnowledgeLinkBuffer(fund_id=fund_id, actor_id=actor_id)
+    # Only documents that are re-linked or move to a new entity index get their state rewritten,
+    # so a run over an unchanged fund writes nothing.
+    state_fingerprints: dict[uuid.UUID, str] = {}
+    planned: list[tuple[DocumentRegistry, EntityTermMatcher]] = []
 
-    links_created = 0
     for doc in docs:
-        links_created += link_document(
+        fingerprint = _content_fingerprint(doc)
+        state = states.get(doc.id)
+
+        if (
+            full_rebuild
+            or state is None
+            or state.content_fingerprint != fingerprint
+            or state.entity_index_version not in {index_version, previous_version}
+        ):
+            planned.append((doc, matcher))
+            state_fingerprints[doc.id] = fingerprint
+        elif state.entity_index_version != index_version:
+            if changed_entries:
+                # Unchanged content: only new or re-termed entities can produce new links.
+                if delta_matcher is None:
+                    delta_matcher = EntityTermMatcher(changed_entries)
+                planned.append((doc, delta_matcher))
+            state_fingerprints[doc.id] = fingerprint
+
+    for i in range(0, len(planned), CORPUS_BATCH_SIZE):
+        batch = planned[i : i + CORPUS_BATCH_SIZE]
+        corpora = get_corpora(db, fund_id=fund_id, version_ids=[doc.version_id for doc, _ in batch], actor_id=actor_id)
+        for doc, doc_matcher in batch:
+            _stage_document_links(doc=doc, matcher=doc_matcher, links=links, corpus=corpora.get(doc.version_id))
+    documents_relinked = len(planned)
+
+    links_created = links.flush(db).created
+
+    # Fingerprints are stamped only after links are written so an interrupted run re-links next time.
+    if changed_entries:
+        changed_keys = [(entity.entity_type, entity.canonical_name) for entity, _ in changed_entries]
+        bulk_upsert_entities(
             db,
             fund_id=fund_id,
-            document_id=doc.id,
-            entity_index=entity_index,
+            entities=changed_keys,
             actor_id=actor_id,
+            terms_fingerprints=entity_fingerprints,
         )
+    upsert_link_state(
+        db,
+        fund_id=fund_id,
+        fingerprints=state_fingerprints,
+        entity_index_version=index_version,
+        linked_at=effective_as_of,
+        actor_id=actor_id,
+    )
+    db.commit()
 
-    obligations_satisfied, sat_links = map_obligation_evidence(db, fund_id=fund_id, actor_id=actor_id, as_of=effective_as_of)
+    obligations_satisfied, sat_links = map_obligation_evidence(
+        db,
+        fund_id=fund_id,
+        actor_id=actor_id,
+        as_of=effective_as_of,
+        thresholds=evidence_thresholds,
+    )
     conflicts_detected, conflict_links = detect_binding_conflicts(db, fund_id=fund_id, actor_id=actor_id, as_of=effective_as_of)
     links_created += sat_links + conflict_links
 
@@ -541,6 +586,9 @@ def run_cross_container_linking(
             "linksCreated": links_created,
             "obligationsSatisfied": obligations_satisfied,
             "conflictsDetected": conflicts_detected,
+            "fullRebuild": full_rebuild,
+            "documentsRelinked": documents_relinked,
+            "documentsSkipped": len(docs) - documents_relinked,
         },
     }
 
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import datetime as dt
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from ai_engine.knowledge_writer import upsert_rows
+from app.modules.ai.models import MetricSeriesPoint, MetricSeriesRollup
+
+GRANULARITIES = ("DAY", "WEEK", "MONTH")
+ROLLUP_GRANULARITIES = ("WEEK", "MONTH")
+ROLLUP_STATISTICS = {"mean": "mean_value", "min": "min_value", "max": "max_value", "last": "last_value"}
+# Dense results hold investments x periods values; longer ranges need a coarser granularity.
+MAX_SERIES_PERIODS = 2000
+
+SERIES_KEY = ("fund_id", "investment_id", "metric_name", "as_of")  # ix_ai_metric_series_fund_investment_metric_as_of
+ROLLUP_KEY = ("fund_id", "investment_id", "metric_name", "granularity", "period_start")  # ix_ai_metric_rollups_fund_investment_metric_period
+
+
+def period_start(day: dt.date, granularity: str) -> dt.date:
+    """First day of the ISO week or calendar month holding `day`."""
+    if granularity == "DAY":
+        return day
+    if granularity == "WEEK":
+        return day - dt.timedelta(days=day.weekday())
+    if granularity == "MONTH":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported metric granularity '{granularity}'")
+
+
+def _next_period(start: dt.date, granularity: str) -> dt.date:
+    if granularity == "DAY":
+        return start + dt.timedelta(days=1)
+    if granularity == "WEEK":
+        return start + dt.timedelta(days=7)
+    return (start.replace(day=28) + dt.timedelta(days=4)).replace(day=1)
+
+
+def period_starts(start: dt.date, end: dt.date, granularity: str) -> list[dt.date]:
+    """Every period start from the period holding `start` to the one holding `end`."""
+    out: list[dt.date] = []
+    current = period_start(start, granularity)
+    while current <= end:
+        out.append(current)
+        current = _next_period(current, granularity)
+    return out
+
+
+def period_count(start: dt.date, end: dt.date, granularity: str) -> int:
+    """len(period_starts(start, end, granularity)), without building the list."""
+    first, last = period_start(start, granularity), period_start(end, granularity)
+    if last < first:
+        return 0
+    if granularity == "MONTH":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days // (7 if granularity == "WEEK" else 1) + 1
+
+
+def record_metric_points(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    as_of: dt.date,
+    points: Iterable[tuple[uuid.UUID, str, float]],
+    actor_id: str = "ai-engine",
+) -> int:
+    """Upsert (investment, metric, value) observations for one date; re-running a date overwrites it."""
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "fund_id": fund_id,
+            "access_level": "internal",
+            "investment_id": investment_id,
+            "metric_name": metric_name,
+            "as_of": as_of,
+            "value": float(value),
+            "created_by": actor_id,
+            "updated_by": actor_id,
+        }
+        for investment_id, metric_name, value in points
+    ]
+    return upsert_rows(
+        db,
+        model=MetricSeriesPoint,
+        rows=rows,
+        key=SERIES_KEY,
+        update_columns=("value", "updated_by"),
+        chunk_size=1000,
+    ).total
+
+
+def rollup_metric_series(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    as_of: dt.date | None = None,
+    actor_id: str = "ai-engine",
+) -> int:
+    """
+    Refresh the weekly and monthly aggregates of the fund's metric series.
+
+    With `as_of`, only the week and month holding it are recomputed, which is
+    all a daily metrics run can change; a fund without any rollup yet (or no
+    `as_of`) is rolled up over its whole history.
+    """
+    has_rollups = db.execute(select(MetricSeriesRollup.id).where(MetricSeriesRollup.fund_id == fund_id).limit(1)).first() is not None
+    stmt = select(MetricSeriesPoint.investment_id, MetricSeriesPoint.metric_name, MetricSeriesPoint.as_of, MetricSeriesPoint.value).where(
+        MetricSeriesPoint.fund_id == fund_id
+    )
+    if as_of is not None and has_rollups:
+        windows = [(period_start(as_of, g), _next_period(period_start(as_of, g), g)) for g in ROLLUP_GRANULARITIES]
+        stmt = stmt.where(or_(*(and_(MetricSeriesPoint.as_of >= lo, MetricSeriesPoint.as_of < hi) for lo, hi in windows)))
+
+    buckets: dict[tuple[uuid.UUID, str, str, dt.date], list[tuple[dt.date, float]]] = defaultdict(list)
+    for investment_id, metric_name, day, value in db.execute(stmt.order_by(MetricSeriesPoint.as_of)):
+        for granularity in ROLLUP_GRANULARITIES:
+            start = period_start(day, granularity)
+            if as_of is not None and has_rollups and start != period_start(as_of, granularity):
+                continue
+            buckets[(investment_id, metric_name, granularity, start)].append((day, value))
+
+    rows = []
+    for (investment_id, metric_name, granularity, start), observations in buckets.items():
+        values = np.fromiter((value for _, value in observations), dtype=np.float64, count=len(observations))
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "fund_id": fund_id,
+                "access_level": "internal",
+                "investment_id": investment_id,
+                "metric_name": metric_name,
+                "granularity": granularity,
+                "period_start": start,
+                "points": int(values.size),
+                "min_value": float(values.min()),
+                "max_value": float(values.max()),
+                "mean_value": float(values.mean()),
+                "last_value": float(values[-1]),
+                "created_by": actor_id,
+                "updated_by": actor_id,
+            }
+        )
+    written = upsert_rows(
+        db,
+        model=MetricSeriesRollup,
+        rows=rows,
+        key=ROLLUP_KEY,
+        update_columns=("points", "min_value", "max_value", "mean_value", "last_value", "updated_by"),
+        chunk_size=1000,
+    ).total
+    db.commit()
+    return written
+
+
+@dataclass(frozen=True)
+class MetricSeries:
+    """A dense investment x period array over every period in the range; gaps are NaN."""
+
+    metric_name: str
+    granularity: str
+    statistic: str
+    investment_ids: tuple[uuid.UUID, ...]
+    periods: tuple[dt.date, ...]
+    values: np.ndarray
+
+
+def load_metric_series(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    metric_name: str,
+    start: dt.date,
+    end: dt.date,
+    granularity: str = "DAY",
+    statistic: str = "last",
+    investment_ids: Sequence[uuid.UUID] | None = None,
+) -> MetricSeries:
+    """One range scan over the raw series (DAY) or its rollups (WEEK, MONTH), densified for charting."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported metric granularity '{granularity}'")
+    if statistic not in ROLLUP_STATISTICS:
+        raise ValueError(f"Unsupported rollup statistic '{statistic}'")
+
+    if period_count(start, end, granularity) > MAX_SERIES_PERIODS:
+        raise ValueError(f"Series range exceeds {MAX_SERIES_PERIODS} {granularity.lower()} periods; use a coarser granularity")
+    periods = period_starts(start, end, granularity)
+    if granularity == "DAY":
+        model, date_column, value_column = MetricSeriesPoint, MetricSeriesPoint.as_of, MetricSeriesPoint.value
+        filters = []
+    else:
+        model, date_column = MetricSeriesRollup, MetricSeriesRollup.period_start
+        value_column = getattr(MetricSeriesRollup, ROLLUP_STATISTICS[statistic])
+        filters = [MetricSeriesRollup.granularity == granularity]
+    stmt = select(model.investment_id, date_column, value_column).where(
+        model.fund_id == fund_id,
+        model.metric_name == metric_name,
+        # Aggregates are keyed by period start, which may precede `start`.
+        date_column >= (periods[0] if periods else start),
+        date_column <= end,
+        *filters,
+    )
+    if investment_ids is not None:
+        stmt = stmt.where(model.investment_id.in_(list(investment_ids)))
+    rows = db.execute(stmt).all()
+
+    ids = tuple(investment_ids) if investment_ids is not None else tuple(sorted({row[0] for row in rows}, key=str))
+    values = np.full((len(ids), len(periods)), np.nan)
+    if rows:
+        inv_pos = {investment_id: i for i, investment_id in enumerate(ids)}
+        period_pos = {period: i for i, period in enumerate(periods)}
+        values[[inv_pos[row[0]] for row in rows], [period_pos[row[1]] for row in rows]] = [row[2] for row in rows]
+    return MetricSeries(
+        metric_name=metric_name,
+        granularity=granularity,
+        statistic=statistic,
+        investment_ids=ids,
+        periods=tuple(periods),
+        values=values,
+    )
@@ -3,12 +3,13 @@ from __future__ import annotations
 import datetime as dt
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ai_engine.classifier import classify_documents
 from ai_engine.knowledge_builder import build_manager_profiles
 from ai_engine.obligation_extractor import extract_obligation_register
+from ai_engine.stage_dag import Stage, StageContext, run_dag
 from app.modules.ai.models import GovernanceAlert, ObligationRegister
 
 
@@ -16,19 +17,6 @@ def _now_utc() -> dt.datetime:
     return dt.datetime.now(dt.timezone.utc)
 
 
-def _parse_due_date(rule: str | None) -> dt.date | None:
-    if not rule:
-        return None
-    text = rule.strip()
-    for token in text.replace("Due on", "").split():
-        try:
-            if len(token) == 10 and token[4] == "-" and token[7] == "-":
-                return dt.date.fromisoformat(token)
-        except Exception:
-            continue
-    return None
-
-
 def _upsert_alert(
     db: Session,
     *,
@@ -79,27 +67,23 @@ def _upsert_alert(
     return existing
 
 
-def run_daily_cycle(
-    db: Session,
-    *,
-    fund_id: uuid.UUID,
-    actor_id: str = "ai-engine",
-) -> dict[str, int | str]:
-    now = _now_utc()
-
-    classifications = classify_documents(db, fund_id=fund_id, actor_id=actor_id)
-    profiles = build_manager_profiles(db, fund_id=fund_id, actor_id=actor_id)
-    obligations = extract_obligation_register(db, fund_id=fund_id, actor_id=actor_id)
+def _governance_alerts(db: Session, ctx: StageContext) -> list[GovernanceAlert]:
+    fund_id, actor_id, now = ctx.fund_id, ctx.actor_id, ctx.as_of
+    classified = ctx.counts.get("classify", {}).get("rows", 0)
+    profiles = ctx.counts.get("manager-profiles", {}).get("rows", 0)
 
     today = now.date()
-    missing_evidence_rows = list(
-        db.execute(
-            select(ObligationRegister).where(
-                ObligationRegister.fund_id == fund_id,
-                ObligationRegister.status == "MissingEvidence",
-            )
-        ).scalars().all()
-    )
+    # One pass over ix_obligation_register_fund_status_due_date, whatever the register size.
+    missing_evidence, overdue, approaching = db.execute(
+        select(
+            func.count(),
+            func.count().filter(ObligationRegister.due_date < today),
+            func.count().filter(ObligationRegister.due_date.between(today, today + dt.timedelta(days=30))),
+        ).where(
+            ObligationRegister.fund_id == fund_id,
+            ObligationRegister.status == "MissingEvidence",
+        )
+    ).one()
 
     alerts: list[GovernanceAlert] = []
 
@@ -111,14 +95,14 @@ def run_daily_cycle(
             domain="Reporting",
             severity="Info",
             entity_ref="DataRoom",
-            title=f"{len(classifications)} documents classified in daily cycle",
+            title=f"{classified} documents classified in daily cycle",
             actionable_next_step="Review classification output and validate dataQuality before dissemination.",
             as_of=now,
             actor_id=actor_id,
         )
     )
 
-    if missing_evidence_rows:
+    if missing_evidence:
         alerts.append(
             _upsert_alert(
                 db,
@@ -127,24 +111,13 @@ def run_daily_cycle(
                 domain="Compliance",
                 severity="Warning",
                 entity_ref="ObligationRegister",
-                title=f"{len(missing_evidence_rows)} obligations are missing evidence",
+                title=f"{missing_evidence} obligations are missing evidence",
                 actionable_next_step="Collect and link formal evidence for obligations marked MissingEvidence.",
                 as_of=now,
                 actor_id=actor_id,
             )
         )
 
-    overdue = 0
-    approaching = 0
-    for obligation in missing_evidence_rows:
-        due_date = _parse_due_date(obligation.due_rule)
-        if due_date is None:
-            continue
-        if due_date < today:
-            overdue += 1
-        elif (due_date - today).days <= 30:
-            approaching += 1
-
     if overdue > 0:
         alerts.append(
             _upsert_alert(
@@ -186,7 +159,7 @@ def run_daily_cycle(
                 domain="Risk",
                 severity="Info",
                 entity_ref="ManagerProfile",
-                title=f"{len(profiles)} manager profiles refreshed",
+                title=f"{profiles} manager profiles refreshed",
                 actionable_next_step="Validate key declared risks and reporting cadence against latest source documents.",
                 as_of=now,
                 actor_id=actor_id,
@@ -194,11 +167,60 @@ def run_daily_cycle(
         )
 
     db.commit()
+    return alerts
+
+
+def daily_cycle_stages(*, obligation_workers: int | None = None) -> tuple[Stage, ...]:
+    """The daily-cycle DAG; `obligation_workers` sizes the obligation extractor's process pool."""
+    return (
+        Stage(
+            "classify",
+            lambda db, ctx: classify_documents(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+            inputs=("documents",),
+            outputs=("document_registry",),
+        ),
+        Stage(
+            "manager-profiles",
+            lambda db, ctx: build_manager_profiles(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+            inputs=("document_registry",),
+            outputs=("manager_profiles",),
+        ),
+        Stage(
+            "obligations",
+            lambda db, ctx: extract_obligation_register(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id, max_workers=obligation_workers),
+            inputs=("document_registry",),
+            outputs=("obligation_register",),
+        ),
+        Stage(
+            "governance-alerts",
+            _governance_alerts,
+            inputs=("manager_profiles", "obligation_register"),
+            outputs=("governance_alerts",),
+        ),
+    )
+
+
+DAILY_CYCLE_STAGES: tuple[Stage, ...] = daily_cycle_stages()
+
+
+def run_daily_cycle(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    actor_id: str = "ai-engine",
+    resume: bool = False,
+    max_workers: int | None = None,
+    as_of: dt.datetime | None = None,
+) -> dict[str, int | str]:
+    now = as_of or _now_utc()
+    stages = DAILY_CYCLE_STAGES if max_workers is None else daily_cycle_stages(obligation_workers=max_workers)
+    run = run_dag(db, pipeline="daily-cycle", stages=stages, fund_id=fund_id, actor_id=actor_id, as_of=now, resume=resume)
+    run.raise_for_failure()
 
     return {
         "asOf": now.isoformat(),
-        "classifiedDocuments": len(classifications),
-        "managerProfiles": len(profiles),
-        "obligations": len(obligations),
-        "alerts": len(alerts),
+        "classifiedDocuments": run.counts("classify").get("rows", 0),
+        "managerProfiles": run.counts("manager-profiles").get("rows", 0),
+        "obligations": run.counts("obligations").get("rows", 0),
+        "alerts": run.counts("governance-alerts").get("rows", 0),
     }
@@ -2,20 +2,40 @@ from __future__ import annotations
 
 import datetime as dt
 import hashlib
+import itertools
+import logging
+import multiprocessing
+import os
 import re
 import uuid
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator
 
-from sqlalchemy import and_, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from ai_engine.knowledge_writer import upsert_rows
 from app.modules.ai.models import DocumentRegistry, ObligationRegister
-from app.modules.documents.models import DocumentChunk, DocumentVersion
+from app.modules.documents.models import DocumentChunk
 from app.services.search_index import AzureSearchMetadataClient
 
+logger = logging.getLogger(__name__)
 
 OBLIGATION_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+OBLIGATION_TOKENS = ("shall", "must", "required", "deliver", "submit", "file", "notify", "maintain", "comply")
 DUE_RULE_RE = re.compile(r"(within\s+\d+\s+(?:days?|months?)\s+after\s+[^.;]+|\d+\s+months\s+after\s+fy\s+end)", re.IGNORECASE)
 ISO_DATE_RE = re.compile(r"\b(20\d{2}-\d{2}-\d{2})\b")
+RELATIVE_OFFSET_RE = re.compile(r"(\d+)\s+(days?|months?)", re.IGNORECASE)
+
+# Safety valve only: a register entry per sentence beyond this is noise, and
+# hitting it is logged rather than silently cutting the document short.
+MAX_OBLIGATIONS_PER_DOCUMENT = 500
+# Below this many documents a process pool costs more to start than it saves.
+PARALLEL_MIN_DOCUMENTS = 32
+CHUNK_STREAM_BATCH = 1000
+VERSION_WINDOW = 500
+OBLIGATION_KEY = ("fund_id", "obligation_id")  # ix_obligation_register_fund_obligation_id
 
 
 def _now_utc() -> dt.datetime:
@@ -52,6 +72,31 @@ def _infer_due_rule(text: str) -> str:
     return "Ongoing - immediate compliance"
 
 
+def parse_due_date(rule: str | None) -> dt.date | None:
+    if not rule:
+        return None
+    text = rule.strip()
+    for token in text.replace("Due on", "").split():
+        try:
+            if len(token) == 10 and token[4] == "-" and token[7] == "-":
+                return dt.date.fromisoformat(token)
+        except Exception:
+            continue
+    return None
+
+
+def infer_recurrence(frequency: str, due_rule: str) -> str:
+    """QUARTERLY / ANNUAL / ONGOING, ONCE for a dated one-off, `+<n>D|M` when the rule is relative to a period end or event."""
+    base = (frequency or "Ongoing").upper()
+    relative = RELATIVE_OFFSET_RE.search(due_rule or "")
+    if relative and DUE_RULE_RE.search(due_rule or ""):
+        unit = "M" if relative.group(2).lower().startswith("month") else "D"
+        return f"{'EVENT' if base == 'ONGOING' else base}+{relative.group(1)}{unit}"
+    if parse_due_date(due_rule) is not None and base == "ONGOING":
+        return "ONCE"
+    return base
+
+
 def _infer_responsible_party(source: str, text: str) -> str:
     lowered = text.lower()
     if "investment manager" in lowered or "manager" in lowered:
@@ -77,11 +122,75 @@ def _evidence_expected(source: str) -> str:
     return mapping.get(source, "Formal evidence document")
 
 
+def iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """Yield sentences across chunk boundaries as if the chunks were joined by newlines."""
+    carry: str | None = None
+    for chunk in chunks:
+        buffer = chunk if carry is None else f"{carry}\n{chunk}"
+        pieces = OBLIGATION_SENTENCE_RE.split(buffer)
+        carry = pieces.pop()
+        yield from pieces
+    if carry is not None:
+        yield carry
+
+
+def _extract_obligations(job: tuple[str, list[str]]) -> list[tuple[str, str, str, str]]:
+    """(text, frequency, due rule, responsible party) per obligation sentence; runs in worker processes."""
+    source, chunks = job
+    found: list[tuple[str, str, str, str]] = []
+    for sentence in iter_sentences(chunks):
+        if not sentence:
+            continue
+        lowered = sentence.lower()
+        if not any(token in lowered for token in OBLIGATION_TOKENS):
+            continue
+        text = sentence.strip()
+        found.append((text, _infer_frequency(text), _infer_due_rule(text), _infer_responsible_party(source, text)))
+        if len(found) >= MAX_OBLIGATIONS_PER_DOCUMENT:
+            break
+    return found
+
+
+def _bounded_map(
+    fn: Callable[[tuple[str, list[str]]], list[tuple[str, str, str, str]]],
+    jobs: Iterable[tuple[str, list[str]]],
+    *,
+    max_workers: int | None,
+) -> Iterator[list[tuple[str, str, str, str]]]:
+    """Ordered `map` over a process pool that keeps only a few jobs in flight, so chunk text is not all held at once."""
+    # spawn, not fork: the parent holds DB connections and scanner threads.
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        in_flight: deque[Future] = deque()
+        limit = workers * 4
+        for job in jobs:
+            in_flight.append(pool.submit(fn, job))
+            if len(in_flight) >= limit:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def _stream_version_chunks(db: Session, *, fund_id: uuid.UUID, version_ids: list[uuid.UUID]) -> Iterator[tuple[uuid.UUID, list[str]]]:
+    """Every chunk of each version, in chunk order, one version at a time."""
+    for i in range(0, len(version_ids), VERSION_WINDOW):
+        window = version_ids[i : i + VERSION_WINDOW]
+        rows = db.execute(
+            select(DocumentChunk.version_id, DocumentChunk.text)
+            .where(DocumentChunk.fund_id == fund_id, DocumentChunk.version_id.in_(window))
+            .order_by(DocumentChunk.version_id, DocumentChunk.chunk_index)
+            .execution_options(yield_per=CHUNK_STREAM_BATCH)
+        )
+        for version_id, group in itertools.groupby(rows, key=lambda row: row[0]):
+            yield version_id, [text or "" for _, text in group]
+
+
 def extract_obligation_register(
     db: Session,
     *,
     fund_id: uuid.UUID,
     actor_id: str = "ai-engine",
+    max_workers: int | None = None,
 ) -> list[ObligationRegister]:
     now = _now_utc()
 
@@ -94,83 +203,114 @@ def extract_obligation_register(
         ).scalars().all()
     )
 
-    saved: list[ObligationRegister] = []
+    by_version: dict[uuid.UUID, list[DocumentRegistry]] = defaultdict(list)
     for doc in candidates:
-        chunks = list(
-            db.execute(
-                select(DocumentChunk.text)
-                .join(DocumentVersion, and_(DocumentVersion.id == DocumentChunk.version_id, DocumentVersion.fund_id == fund_id))
-                .where(DocumentChunk.fund_id == fund_id, DocumentChunk.version_id == doc.version_id)
-                .limit(120)
-            ).all()
-        )
-        text = "\n".join((row[0] or "") for row in chunks)
-        if not text.strip():
-            text = doc.title or ""
-
-        sentences = OBLIGATION_SENTENCE_RE.split(text)
-        matched_sentences = [
-            sentence.strip()
-            for sentence in sentences
-            if sentence and any(
-                token in sentence.lower()
-                for token in ["shall", "must", "required", "deliver", "submit", "file", "notify", "maintain", "comply"]
-            )
-        ][:8]
+        if doc.version_id is not None:
+            by_version[doc.version_id].append(doc)
+
+    # Documents in the order their jobs are produced; results come back in the same order.
+    ordered_docs: list[DocumentRegistry] = []
+
+    def _jobs() -> Iterator[tuple[str, list[str]]]:
+        chunked: set[uuid.UUID] = set()
+        for version_id, chunks in _stream_version_chunks(db, fund_id=fund_id, version_ids=list(by_version)):
+            if not "".join(chunks).strip():
+                continue
+            chunked.add(version_id)
+            for doc in by_version[version_id]:
+                ordered_docs.append(doc)
+                yield _infer_source(f"{doc.root_folder or ''}/{doc.folder_path or ''}"), chunks
+        for doc in candidates:
+            if doc.version_id not in chunked:
+                ordered_docs.append(doc)
+                yield _infer_source(f"{doc.root_folder or ''}/{doc.folder_path or ''}"), [doc.title or ""]
+
+    # A daemonic process (e.g. a fund worker) may not start children, so it extracts serially.
+    if max_workers == 1 or len(candidates) < PARALLEL_MIN_DOCUMENTS or multiprocessing.current_process().daemon:
+        results = [_extract_obligations(job) for job in _jobs()]
+    else:
+        results = list(_bounded_map(_extract_obligations, _jobs(), max_workers=max_workers))
+
+    rows: list[dict] = []
+    for doc, matched in zip(ordered_docs, results):
+        if len(matched) >= MAX_OBLIGATIONS_PER_DOCUMENT:
+            logger.warning("Obligation extraction for %s stopped at %d sentences", doc.blob_path, MAX_OBLIGATIONS_PER_DOCUMENT)
 
         source_descriptor = f"{doc.root_folder or ''}/{doc.folder_path or ''}"
         source = _infer_source(source_descriptor)
 
-        for index, obligation_text in enumerate(matched_sentences, start=1):
+        for index, (obligation_text, frequency, due_rule, responsible_party) in enumerate(matched, start=1):
             raw_id = f"{fund_id}:{doc.version_id}:{index}:{obligation_text[:80]}"
             obligation_id = f"OB-{hashlib.sha1(raw_id.encode('utf-8')).hexdigest()[:12].upper()}"
 
-            payload = {
-                "fund_id": fund_id,
-                "access_level": "internal",
-                "obligation_id": obligation_id,
-                "source": source,
-                "obligation_text": obligation_text[:2000],
-                "frequency": _infer_frequency(obligation_text),
-                "due_rule": _infer_due_rule(obligation_text),
-                "responsible_party": _infer_responsible_party(source, obligation_text),
-                "evidence_expected": _evidence_expected(source),
-                "status": "MissingEvidence",
-                "source_documents": [
-                    {
-                        "documentId": str(doc.document_id),
-                        "versionId": str(doc.version_id),
-                        "title": doc.title,
-                        "path": source_descriptor,
-                    }
-                ],
-                "as_of": now,
-                "data_latency": doc.data_latency,
-                "data_quality": "OK",
-                "created_by": actor_id,
-                "updated_by": actor_id,
-            }
-
-            existing = db.execute(
-                select(ObligationRegister).where(
-                    ObligationRegister.fund_id == fund_id,
-                    ObligationRegister.obligation_id == obligation_id,
-                )
-            ).scalar_one_or_none()
-
-            if existing is None:
-                row = ObligationRegister(**payload)
-                db.add(row)
-                db.flush()
-            else:
-                for key, value in payload.items():
-                    if key == "created_by":
-                        continue
-                    setattr(existing, key, value)
-                row = existing
-                db.flush()
-
-            saved.append(row)
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "fund_id": fund_id,
+                    "access_level": "internal",
+                    "obligation_id": obligation_id,
+                    "source": source,
+                    "obligation_text": obligation_text[:2000],
+                    "frequency": frequency,
+                    "due_rule": due_rule,
+                    "due_date": parse_due_date(due_rule),
+                    "recurrence": infer_recurrence(frequency, due_rule),
+                    "responsible_party": responsible_party,
+                    "evidence_expected": _evidence_expected(source),
+                    "status": "MissingEvidence",
+                    "source_documents": [
+                        {
+                            "documentId": str(doc.document_id),
+                            "versionId": str(doc.version_id),
+                            "title": doc.title,
+                            "path": source_descriptor,
+                        }
+                    ],
+                    "as_of": now,
+                    "data_latency": doc.data_latency,
+                    "data_quality": "OK",
+                    "created_by": actor_id,
+                    "updated_by": actor_id,
+                }
+            )
+
+    upsert_rows(
+        db,
+        model=ObligationRegister,
+        rows=rows,
+        key=OBLIGATION_KEY,
+        update_columns=(
+            "access_level",
+            "source",
+            "obligation_text",
+            "frequency",
+            "due_rule",
+            "due_date",
+            "recurrence",
+            "responsible_party",
+            "evidence_expected",
+            "status",
+            "source_documents",
+            "as_of",
+            "data_latency",
+            "data_quality",
+            "updated_by",
+        ),
+        chunk_size=500,
+    )
+
+    obligation_ids = list(dict.fromkeys(row["obligation_id"] for row in rows))
+    saved: list[ObligationRegister] = []
+    for i in range(0, len(obligation_ids), VERSION_WINDOW):
+        saved.extend(
+            db.execute(
+                select(ObligationRegister)
+                .where(ObligationRegister.fund_id == fund_id, ObligationRegister.obligation_id.in_(obligation_ids[i : i + VERSION_WINDOW]))
+                .execution_options(populate_existing=True)
+            ).scalars().all()
+        )
+    position = {obligation_id: i for i, obligation_id in enumerate(obligation_ids)}
+    saved.sort(key=lambda row: position[row.obligation_id])
 
     if saved:
         try:
@@ -186,11 +326,13 @@ def extract_obligation_register(
                 }
                 for item in saved
             ]
-            AzureSearchMetadataClient().upsert_documents(items=search_docs)
+            failed_keys = AzureSearchMetadataClient().upsert_documents(items=search_docs).failed_keys
+            degraded = [item for item in saved if f"ai-obligation-{item.id}" in failed_keys]
         except Exception:
-            for item in saved:
-                item.data_quality = "DEGRADED"
-                item.updated_by = actor_id
+            degraded = saved
+        for item in degraded:
+            item.data_quality = "DEGRADED"
+            item.updated_by = actor_id
 
     db.commit()
     return saved
@@ -5,9 +5,11 @@ import re
 import uuid
 from collections import defaultdict
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
 
+from ai_engine.knowledge_writer import upsert_rows
+from ai_engine.stage_dag import Stage, run_dag
 from app.modules.ai.models import DealDocumentIntelligence, DealICBrief, DealIntelligenceProfile, DealRiskFlag, DocumentRegistry, KnowledgeAnchor, PipelineAlert
 from app.modules.deals.models import Deal
 
@@ -27,6 +29,11 @@ DOC_TYPE_MAP: dict[str, tuple[str, int]] = {
     "OTHER": ("Term Sheet", 60),
 }
 
+UPSERT_CHUNK_SIZE = 500
+DEAL_DOCUMENT_KEY = ("fund_id", "deal_id", "doc_id")  # ix_deal_documents_fund_deal_doc
+PROFILE_KEY = ("fund_id", "deal_id")  # ix_deal_intelligence_profiles_fund_deal
+BRIEF_KEY = ("fund_id", "deal_id")  # ix_deal_ic_briefs_fund_deal
+
 
 def _now_utc() -> dt.datetime:
     return dt.datetime.now(dt.timezone.utc)
@@ -39,16 +46,14 @@ def _folder_from_blob(blob_path: str) -> str | None:
     return parts[0]
 
 
-def discover_pipeline_deals(db: Session, *, fund_id: uuid.UUID, actor_id: str = "ai-engine") -> list[Deal]:
-    now = _now_utc()
-    docs = list(
-        db.execute(
-            select(DocumentRegistry).where(
-                DocumentRegistry.fund_id == fund_id,
-                DocumentRegistry.container_name == PIPELINE_CONTAINER,
-            )
-        ).scalars().all()
-    )
+def _pipeline_documents(db: Session, *, fund_id: uuid.UUID) -> dict[str, list[DocumentRegistry]]:
+    """Pipeline documents grouped by deal folder, in registry order."""
+    docs = db.execute(
+        select(DocumentRegistry).where(
+            DocumentRegistry.fund_id == fund_id,
+            DocumentRegistry.container_name == PIPELINE_CONTAINER,
+        )
+    ).scalars().all()
 
     grouped: dict[str, list[DocumentRegistry]] = defaultdict(list)
     for doc in docs:
@@ -56,16 +61,38 @@ def discover_pipeline_deals(db: Session, *, fund_id: uuid.UUID, actor_id: str =
         if not folder:
             continue
         grouped[folder].append(doc)
+    return grouped
+
+
+def _pipeline_deals(db: Session, *, fund_id: uuid.UUID) -> list[Deal]:
+    return list(db.execute(select(Deal).where(Deal.fund_id == fund_id, Deal.deal_folder_path.is_not(None))).scalars().all())
+
+
+def _reload(db: Session, *, model: type, fund_id: uuid.UUID, keys: list[tuple], key: tuple[str, ...]) -> list:
+    """Rows of `model` for the fund whose `key` columns are in `keys`, in `keys` order."""
+    if not keys:
+        return []
+    position = {k: i for i, k in enumerate(keys)}
+    rows = db.execute(select(model).where(model.fund_id == fund_id).execution_options(populate_existing=True)).scalars().all()
+    found = [row for row in rows if tuple(getattr(row, k) for k in key) in position]
+    found.sort(key=lambda row: position[tuple(getattr(row, k) for k in key)])
+    return found
+
+
+def discover_pipeline_deals(db: Session, *, fund_id: uuid.UUID, actor_id: str = "ai-engine") -> list[Deal]:
+    now = _now_utc()
+    grouped = _pipeline_documents(db, fund_id=fund_id)
+    existing_by_path: dict[str, Deal] = {
+        deal.deal_folder_path: deal
+        for deal in db.execute(
+            select(Deal).where(Deal.fund_id == fund_id, Deal.deal_folder_path.startswith(f"{PIPELINE_CONTAINER}/"))
+        ).scalars()
+    }
 
     saved: list[Deal] = []
     for folder_name, folder_docs in grouped.items():
         folder_path = f"{PIPELINE_CONTAINER}/{folder_name}"
-        existing = db.execute(
-            select(Deal).where(
-                Deal.fund_id == fund_id,
-                Deal.deal_folder_path == folder_path,
-            )
-        ).scalar_one_or_none()
+        existing = existing_by_path.get(folder_path)
 
         first_detected = min((d.last_ingested_at for d in folder_docs), default=now)
         last_updated = max((d.last_ingested_at for d in folder_docs), default=now)
@@ -90,7 +117,7 @@ def discover_pipeline_deals(db: Session, *, fund_id: uuid.UUID, actor_id: str =
                 updated_by=actor_id,
             )
             db.add(deal)
-            db.flush()
+            existing_by_path[folder_path] = deal
             saved.append(deal)
             continue
 
@@ -103,7 +130,6 @@ def discover_pipeline_deals(db: Session, *, fund_id: uuid.UUID, actor_id: str =
         existing.transition_target_container = existing.transition_target_container or "portfolio-active-investments"
         existing.intelligence_history = existing.intelligence_history or {"authority": "INTELLIGENCE", "sourceContainer": PIPELINE_CONTAINER}
         existing.updated_by = actor_id
-        db.flush()
         saved.append(existing)
 
     db.commit()
@@ -111,55 +137,39 @@ def discover_pipeline_deals(db: Session, *, fund_id: uuid.UUID, actor_id: str =
 
 
 def aggregate_deal_documents(db: Session, *, fund_id: uuid.UUID, actor_id: str = "ai-engine") -> list[DealDocumentIntelligence]:
-    deals = list(db.execute(select(Deal).where(Deal.fund_id == fund_id, Deal.deal_folder_path.is_not(None))).scalars().all())
-    docs = list(
-        db.execute(
-            select(DocumentRegistry).where(
-                DocumentRegistry.fund_id == fund_id,
-                DocumentRegistry.container_name == PIPELINE_CONTAINER,
-            )
-        ).scalars().all()
-    )
+    deals = _pipeline_deals(db, fund_id=fund_id)
+    docs_by_folder: dict[str, list[DocumentRegistry]] = defaultdict(list)
+    for folder, folder_docs in _pipeline_documents(db, fund_id=fund_id).items():
+        docs_by_folder[folder.lower()].extend(folder_docs)
 
-    saved: list[DealDocumentIntelligence] = []
+    rows: list[dict] = []
     for deal in deals:
-        folder_name = (deal.deal_name or "").strip().lower()
-        matched_docs = [d for d in docs if _folder_from_blob(d.blob_path or "") and _folder_from_blob(d.blob_path or "").lower() == folder_name]
-
-        for doc in matched_docs:
+        for doc in docs_by_folder.get((deal.deal_name or "").strip().lower(), ()):
             doc_type, confidence = DOC_TYPE_MAP.get(doc.detected_doc_type or "OTHER", ("Term Sheet", 60))
-            existing = db.execute(
-                select(DealDocumentIntelligence).where(
-                    DealDocumentIntelligence.fund_id == fund_id,
-                    DealDocumentIntelligence.deal_id == deal.id,
-                    DealDocumentIntelligence.doc_id == doc.id,
-                )
-            ).scalar_one_or_none()
-
-            payload = {
-                "fund_id": fund_id,
-                "access_level": "internal",
-                "deal_id": deal.id,
-                "doc_id": doc.id,
-                "doc_type": doc_type,
-                "confidence_score": int(confidence),
-                "created_by": actor_id,
-                "updated_by": actor_id,
-            }
-
-            if existing is None:
-                row = DealDocumentIntelligence(**payload)
-                db.add(row)
-                db.flush()
-            else:
-                for key, value in payload.items():
-                    if key == "created_by":
-                        continue
-                    setattr(existing, key, value)
-                db.flush()
-                row = existing
-            saved.append(row)
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "fund_id": fund_id,
+                    "access_level": "internal",
+                    "deal_id": deal.id,
+                    "doc_id": doc.id,
+                    "doc_type": doc_type,
+                    "confidence_score": int(confidence),
+                    "created_by": actor_id,
+                    "updated_by": actor_id,
+                }
+            )
 
+    upsert_rows(
+        db,
+        model=DealDocumentIntelligence,
+        rows=rows,
+        key=DEAL_DOCUMENT_KEY,
+        update_columns=("access_level", "doc_type", "confidence_score", "updated_by"),
+        chunk_size=UPSERT_CHUNK_SIZE,
+    )
+    keys = list(dict.fromkeys((row["deal_id"], row["doc_id"]) for row in rows))
+    saved = _reload(db, model=DealDocumentIntelligence, fund_id=fund_id, keys=keys, key=("deal_id", "doc_id"))
     db.commit()
     return saved
 
@@ -234,29 +244,27 @@ def _infer_risk_flags_for_deal(deal: Deal, anchors: list[KnowledgeAnchor], docs:
 
 def build_deal_intelligence_profiles(db: Session, *, fund_id: uuid.UUID, actor_id: str = "ai-engine") -> list[DealIntelligenceProfile]:
     now = _now_utc()
-    deals = list(db.execute(select(Deal).where(Deal.fund_id == fund_id, Deal.deal_folder_path.is_not(None))).scalars().all())
-    saved: list[DealIntelligenceProfile] = []
+    deals = _pipeline_deals(db, fund_id=fund_id)
 
-    for deal in deals:
-        docs = list(
-            db.execute(
-                select(DealDocumentIntelligence).where(
-                    DealDocumentIntelligence.fund_id == fund_id,
-                    DealDocumentIntelligence.deal_id == deal.id,
-                )
-            ).scalars().all()
+    docs_by_deal: dict[uuid.UUID, list[DealDocumentIntelligence]] = defaultdict(list)
+    for doc in db.execute(select(DealDocumentIntelligence).where(DealDocumentIntelligence.fund_id == fund_id)).scalars():
+        docs_by_deal[doc.deal_id].append(doc)
+
+    anchors_by_doc: dict[uuid.UUID, list[KnowledgeAnchor]] = defaultdict(list)
+    anchors = db.execute(
+        select(KnowledgeAnchor).where(
+            KnowledgeAnchor.fund_id == fund_id,
+            KnowledgeAnchor.doc_id.in_(select(DealDocumentIntelligence.doc_id).where(DealDocumentIntelligence.fund_id == fund_id)),
         )
-        doc_ids = [d.doc_id for d in docs]
-        anchors = []
-        if doc_ids:
-            anchors = list(
-                db.execute(
-                    select(KnowledgeAnchor).where(
-                        KnowledgeAnchor.fund_id == fund_id,
-                        KnowledgeAnchor.doc_id.in_(doc_ids),
-                    )
-                ).scalars().all()
-            )
+    ).scalars()
+    for anchor in anchors:
+        anchors_by_doc[anchor.doc_id].append(anchor)
+
+    profile_rows: list[dict] = []
+    flag_rows: list[dict] = []
+    for deal in deals:
+        docs = docs_by_deal.get(deal.id, [])
+        anchors = [anchor for doc_id in dict.fromkeys(d.doc_id for d in docs) for anchor in anchors_by_doc.get(doc_id, ())]
 
         flags = _infer_risk_flags_for_deal(deal, anchors, docs)
         risk_band = _risk_band_from_flags(flags)
@@ -294,140 +302,168 @@ def build_deal_intelligence_profiles(db: Session, *, fund_id: uuid.UUID, actor_i
             f"Target return {target_return or 'not explicitly declared'} based on available deal anchors."
         )
 
-        existing = db.execute(
-            select(DealIntelligenceProfile).where(
-                DealIntelligenceProfile.fund_id == fund_id,
-                DealIntelligenceProfile.deal_id == deal.id,
-            )
-        ).scalar_one_or_none()
-
-        payload = {
-            "fund_id": fund_id,
-            "access_level": "internal",
-            "deal_id": deal.id,
-            "strategy_type": strategy,
-            "geography": geography,
-            "sector_focus": sector,
-            "target_return": target_return,
-            "risk_band": risk_band,
-            "liquidity_profile": liquidity,
-            "capital_structure_type": capital_structure,
-            "key_risks": key_risks,
-            "differentiators": differentiators,
-            "summary_ic_ready": summary,
-            "last_ai_refresh": now,
-            "created_by": actor_id,
-            "updated_by": actor_id,
-        }
+        profile_rows.append(
+            {
+                "id": uuid.uuid4(),
+                "fund_id": fund_id,
+                "access_level": "internal",
+                "deal_id": deal.id,
+                "strategy_type": strategy,
+                "geography": geography,
+                "sector_focus": sector,
+                "target_return": target_return,
+                "risk_band": risk_band,
+                "liquidity_profile": liquidity,
+                "capital_structure_type": capital_structure,
+                "key_risks": key_risks,
+                "differentiators": differentiators,
+                "summary_ic_ready": summary,
+                "last_ai_refresh": now,
+                "created_by": actor_id,
+                "updated_by": actor_id,
+            }
+        )
+        flag_rows.extend(
+            {
+                "id": uuid.uuid4(),
+                "fund_id": fund_id,
+                "access_level": "internal",
+                "deal_id": deal.id,
+                "risk_type": flag["risk_type"],
+                "severity": flag["severity"],
+                "reasoning": flag["reasoning"],
+                "source_document": flag.get("source_document"),
+                "created_by": actor_id,
+                "updated_by": actor_id,
+            }
+            for flag in flags
+        )
 
-        if existing is None:
-            row = DealIntelligenceProfile(**payload)
-            db.add(row)
-            db.flush()
-        else:
-            for key, value in payload.items():
-                if key == "created_by":
-                    continue
-                setattr(existing, key, value)
-            db.flush()
-            row = existing
-
-        db.execute(delete(DealRiskFlag).where(DealRiskFlag.fund_id == fund_id, DealRiskFlag.deal_id == deal.id))
-        for flag in flags:
-            db.add(
-                DealRiskFlag(
-                    fund_id=fund_id,
-                    access_level="internal",
-                    deal_id=deal.id,
-                    risk_type=flag["risk_type"],
-                    severity=flag["severity"],
-                    reasoning=flag["reasoning"],
-                    source_document=flag.get("source_document"),
-                    created_by=actor_id,
-                    updated_by=actor_id,
-                )
-            )
+    upsert_rows(
+        db,
+        model=DealIntelligenceProfile,
+        rows=profile_rows,
+        key=PROFILE_KEY,
+        update_columns=(
+            "access_level",
+            "strategy_type",
+            "geography",
+            "sector_focus",
+            "target_return",
+            "risk_band",
+            "liquidity_profile",
+            "capital_structure_type",
+            "key_risks",
+            "differentiators",
+            "summary_ic_ready",
+            "last_ai_refresh",
+            "updated_by",
+        ),
+        chunk_size=UPSERT_CHUNK_SIZE,
+    )
 
-        saved.append(row)
+    # Flags are replaced wholesale for every pipeline deal, as before.
+    db.execute(
+        delete(DealRiskFlag).where(
+            DealRiskFlag.fund_id == fund_id,
+            DealRiskFlag.deal_id.in_(select(Deal.id).where(Deal.fund_id == fund_id, Deal.deal_folder_path.is_not(None))),
+        )
+    )
+    for i in range(0, len(flag_rows), UPSERT_CHUNK_SIZE):
+        db.execute(insert(DealRiskFlag), flag_rows[i : i + UPSERT_CHUNK_SIZE])
 
+    saved = _reload(db, model=DealIntelligenceProfile, fund_id=fund_id, keys=[(row["deal_id"],) for row in profile_rows], key=("deal_id",))
     db.commit()
     return saved
 
 
+def _flags_by_deal(db: Session, *, fund_id: uuid.UUID) -> dict[uuid.UUID, list[DealRiskFlag]]:
+    grouped: dict[uuid.UUID, list[DealRiskFlag]] = defaultdict(list)
+    for flag in db.execute(select(DealRiskFlag).where(DealRiskFlag.fund_id == fund_id)).scalars():
+        grouped[flag.deal_id].append(flag)
+    return grouped
+
+
 def build_ic_briefs(db: Session, *, fund_id: uuid.UUID, actor_id: str = "ai-engine") -> list[DealICBrief]:
-    profiles = list(
-        db.execute(select(DealIntelligenceProfile).where(DealIntelligenceProfile.fund_id == fund_id)).scalars().all()
-    )
-    saved: list[DealICBrief] = []
-
-    for profile in profiles:
-        deal = db.execute(select(Deal).where(Deal.id == profile.deal_id, Deal.fund_id == fund_id)).scalar_one()
-        flags = list(
-            db.execute(
-                select(DealRiskFlag).where(DealRiskFlag.fund_id == fund_id, DealRiskFlag.deal_id == deal.id)
-            ).scalars().all()
-        )
+    pairs = db.execute(
+        select(DealIntelligenceProfile, Deal)
+        .join(Deal, Deal.id == DealIntelligenceProfile.deal_id)
+        .where(DealIntelligenceProfile.fund_id == fund_id, Deal.fund_id == fund_id)
+    ).all()
+    flags_by_deal = _flags_by_deal(db, fund_id=fund_id)
+
+    rows: list[dict] = []
+    for profile, deal in pairs:
+        flags = flags_by_deal.get(deal.id, [])
 
         high_risk = any(flag.severity == "HIGH" for flag in flags)
         recommendation = "CAUTION" if profile.risk_band in {"HIGH", "SPECULATIVE"} or high_risk else "POSITIVE"
         if profile.risk_band == "MODERATE" and not high_risk:
             recommendation = "NEUTRAL"
 
-        brief_payload = {
-            "fund_id": fund_id,
-            "access_level": "internal",
-            "deal_id": deal.id,
-            "executive_summary": profile.summary_ic_ready,
-            "opportunity_overview": f"{deal.deal_name or deal.title} is currently in {deal.lifecycle_stage or deal.stage} stage.",
-            "return_profile": f"Target return: {profile.target_return or 'Not explicitly declared'}; Risk band: {profile.risk_band}.",
-            "downside_case": "Downside scenario driven by liquidity, legal, and track-record sensitivity indicators.",
-            "risk_summary": "; ".join([f"{r.risk_type}:{r.severity}" for r in flags]) or "No material risks detected.",
-            "comparison_peer_funds": "Peer comparison available after standardized scorecard completion.",
-            "recommendation_signal": recommendation,
-            "created_by": actor_id,
-            "updated_by": actor_id,
-        }
-
-        existing = db.execute(
-            select(DealICBrief).where(
-                DealICBrief.fund_id == fund_id,
-                DealICBrief.deal_id == deal.id,
-            )
-        ).scalar_one_or_none()
-
-        if existing is None:
-            row = DealICBrief(**brief_payload)
-            db.add(row)
-            db.flush()
-        else:
-            for key, value in brief_payload.items():
-                if key == "created_by":
-                    continue
-                setattr(existing, key, value)
-            db.flush()
-            row = existing
-
-        saved.append(row)
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "fund_id": fund_id,
+                "access_level": "internal",
+                "deal_id": deal.id,
+                "executive_summary": profile.summary_ic_ready,
+                "opportunity_overview": f"{deal.deal_name or deal.title} is currently in {deal.lifecycle_stage or deal.stage} stage.",
+                "return_profile": f"Target return: {profile.target_return or 'Not explicitly declared'}; Risk band: {profile.risk_band}.",
+                "downside_case": "Downside scenario driven by liquidity, legal, and track-record sensitivity indicators.",
+                "risk_summary": "; ".join([f"{r.risk_type}:{r.severity}" for r in flags]) or "No material risks detected.",
+                "comparison_peer_funds": "Peer comparison available after standardized scorecard completion.",
+                "recommendation_signal": recommendation,
+                "created_by": actor_id,
+                "updated_by": actor_id,
+            }
+        )
 
+    upsert_rows(
+        db,
+        model=DealICBrief,
+        rows=rows,
+        key=BRIEF_KEY,
+        update_columns=(
+            "access_level",
+            "executive_summary",
+            "opportunity_overview",
+            "return_profile",
+            "downside_case",
+            "risk_summary",
+            "comparison_peer_funds",
+            "recommendation_signal",
+            "updated_by",
+        ),
+        chunk_size=UPSERT_CHUNK_SIZE,
+    )
+    saved = _reload(db, model=DealICBrief, fund_id=fund_id, keys=[(row["deal_id"],) for row in rows], key=("deal_id",))
     db.commit()
     return saved
 
 
 def run_pipeline_monitoring(db: Session, *, fund_id: uuid.UUID, actor_id: str = "ai-engine") -> list[PipelineAlert]:
-    now = _now_utc()
     alerts: list[PipelineAlert] = []
 
-    deals = list(db.execute(select(Deal).where(Deal.fund_id == fund_id, Deal.deal_folder_path.is_not(None))).scalars().all())
-    for deal in deals:
-        profile = db.execute(
-            select(DealIntelligenceProfile).where(
-                DealIntelligenceProfile.fund_id == fund_id,
-                DealIntelligenceProfile.deal_id == deal.id,
+    deals = _pipeline_deals(db, fund_id=fund_id)
+    profiles = {
+        profile.deal_id: profile
+        for profile in db.execute(select(DealIntelligenceProfile).where(DealIntelligenceProfile.fund_id == fund_id)).scalars()
+    }
+    flags_by_deal = _flags_by_deal(db, fund_id=fund_id)
+    open_alerts = {
+        (deal_id, alert_type)
+        for deal_id, alert_type in db.execute(
+            select(PipelineAlert.deal_id, PipelineAlert.alert_type).where(
+                PipelineAlert.fund_id == fund_id,
+                PipelineAlert.resolved_flag.is_(False),
             )
-        ).scalar_one_or_none()
-        flags = list(
-            db.execute(select(DealRiskFlag).where(DealRiskFlag.fund_id == fund_id, DealRiskFlag.deal_id == deal.id)).scalars().all()
         )
+    }
+
+    for deal in deals:
+        profile = profiles.get(deal.id)
+        flags = flags_by_deal.get(deal.id, [])
 
         new_alerts: list[tuple[str, str, str]] = []
         if profile and profile.risk_band in {"HIGH", "SPECULATIVE"}:
@@ -447,47 +483,79 @@ def run_pipeline_monitoring(db: Session, *, fund_id: uuid.UUID, actor_id: str =
             new_alerts.append(("TRACK_RECORD_INCONSISTENCY", "MEDIUM", f"Track record inconsistency signal for {deal.deal_name or deal.title}."))
 
         for alert_type, severity, description in new_alerts:
-            existing = db.execute(
-                select(PipelineAlert).where(
-                    PipelineAlert.fund_id == fund_id,
-                    PipelineAlert.deal_id == deal.id,
-                    PipelineAlert.alert_type == alert_type,
-                    PipelineAlert.resolved_flag.is_(False),
-                )
-            ).scalar_one_or_none()
-            if existing:
+            if (deal.id, alert_type) in open_alerts:
                 continue
-            alert = PipelineAlert(
-                fund_id=fund_id,
-                access_level="internal",
-                deal_id=deal.id,
-                alert_type=alert_type,
-                severity=severity,
-                description=description,
-                resolved_flag=False,
-                created_by=actor_id,
-                updated_by=actor_id,
+            open_alerts.add((deal.id, alert_type))
+            alerts.append(
+                PipelineAlert(
+                    fund_id=fund_id,
+                    access_level="internal",
+                    deal_id=deal.id,
+                    alert_type=alert_type,
+                    severity=severity,
+                    description=description,
+                    resolved_flag=False,
+                    created_by=actor_id,
+                    updated_by=actor_id,
+                )
             )
-            db.add(alert)
-            db.flush()
-            alerts.append(alert)
 
+    db.add_all(alerts)
     db.commit()
     return alerts
 
 
-def run_pipeline_ingest(db: Session, *, fund_id: uuid.UUID, actor_id: str = "ai-engine") -> dict[str, int | str]:
-    deals = discover_pipeline_deals(db, fund_id=fund_id, actor_id=actor_id)
-    deal_docs = aggregate_deal_documents(db, fund_id=fund_id, actor_id=actor_id)
-    profiles = build_deal_intelligence_profiles(db, fund_id=fund_id, actor_id=actor_id)
-    briefs = build_ic_briefs(db, fund_id=fund_id, actor_id=actor_id)
-    alerts = run_pipeline_monitoring(db, fund_id=fund_id, actor_id=actor_id)
+PIPELINE_INGEST_STAGES: tuple[Stage, ...] = (
+    Stage(
+        "deals",
+        lambda db, ctx: discover_pipeline_deals(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+        inputs=("document_registry",),
+        outputs=("deals",),
+    ),
+    Stage(
+        "deal-documents",
+        lambda db, ctx: aggregate_deal_documents(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+        inputs=("deals", "document_registry"),
+        outputs=("deal_documents",),
+    ),
+    Stage(
+        "profiles",
+        lambda db, ctx: build_deal_intelligence_profiles(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+        inputs=("deal_documents", "knowledge_anchors"),
+        outputs=("deal_profiles", "deal_risk_flags"),
+    ),
+    Stage(
+        "briefs",
+        lambda db, ctx: build_ic_briefs(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+        inputs=("deal_profiles", "deal_risk_flags"),
+        outputs=("deal_ic_briefs",),
+    ),
+    Stage(
+        "monitoring",
+        lambda db, ctx: run_pipeline_monitoring(db, fund_id=ctx.fund_id, actor_id=ctx.actor_id),
+        inputs=("deal_profiles", "deal_risk_flags"),
+        outputs=("pipeline_alerts",),
+    ),
+)
+
+
+def run_pipeline_ingest(
+    db: Session,
+    *,
+    fund_id: uuid.UUID,
+    actor_id: str = "ai-engine",
+    resume: bool = False,
+    as_of: dt.datetime | None = None,
+) -> dict[str, int | str]:
+    run_as_of = as_of or _now_utc()
+    run = run_dag(db, pipeline="pipeline-ingest", stages=PIPELINE_INGEST_STAGES, fund_id=fund_id, actor_id=actor_id, as_of=run_as_of, resume=resume)
+    run.raise_for_failure()
 
     return {
-        "asOf": _now_utc().isoformat(),
-        "deals": len(deals),
-        "dealDocuments": len(deal_docs),
-        "profiles": len(profiles),
-        "briefs": len(briefs),
-        "alerts": len(alerts),
+        "asOf": run_as_of.isoformat(),
+        "deals": run.counts("deals").get("rows", 0),
+        "dealDocuments": run.counts("deal-documents").get("rows", 0),
+        "profiles": run.counts("profiles").get("rows", 0),
+        "briefs": run.counts("briefs").get("rows", 0),
+        "alerts": run.counts("monitoring").get("rows", 0),
     }
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
+import logging
 import re
 import uuid
 from collections import defaultdict
 
-from sqlalchemy import delete, select
+from sqlalchemy import and_, delete, func, insert, select
 from sqlalchemy.orm import Session
 
+from ai_engine.drift_engine import DEFAULT_DRIFT_CONFIG, DriftConfig, compute_drift, load_metric_panel
+from ai_engine.entity_matcher import TermAutomaton
+from ai_engine.knowledge_writer import upsert_rows
+from ai_engine.metric_series import record_metric_points, rollup_metric_series
+from ai_engine.stage_dag import Stage, run_dag
 from app.domain.cash_management.models.cash import CashTransaction
 from app.modules.ai.models import (
     ActiveInvestment,
     BoardMonitoringBrief,
     CashImpactFlag,
+    CashImpactWatermark,
     CovenantStatusRegister,
     DealIntelligenceProfile,
     DocumentRegistry,
@@ -20,9 +28,18 @@ from app.modules.ai.models import (
     PerformanceDriftFlag,
 )
 from app.modules.deals.models import Deal
-from app.modules.portfolio.models import Covenant, CovenantBreach, CovenantTest, PortfolioMetric
+from app.modules.portfolio.models import Borrower, Covenant, CovenantBreach, CovenantTest, Loan, PortfolioMetric
+
+logger = logging.getLogger(__name__)
 
 PORTFOLIO_CONTAINER = "portfolio-active-investments"
+COVENANT_INSERT_BATCH_SIZE = 1000
+CASH_TRANSACTION_BATCH_SIZE = 500
+CASH_WATERMARK_KEY = ("fund_id",)  # ix_cash_impact_watermarks_fund
+# updated_at is stamped when the writing transaction starts (Postgres now()), or to
+# the second on SQLite, so a row committed after a run can sort at or below its
+# watermark. Incremental runs re-scan this much before the watermark.
+CASH_WATERMARK_OVERLAP = dt.timedelta(minutes=15)
 
 
 def _now_utc() -> dt.datetime:
@@ -183,6 +200,7 @@ def extract_portfolio_metrics(
     )
 
     rows: list[PortfolioMetric] = []
+    points: list[tuple[uuid.UUID, str, float]] = []
     for inv in investments:
         day_factor = float((as_of_date.toordinal() % 5) - 2)
         target_return_pct = (_extract_percent(inv.target_return) or 10.0) + (day_factor * 2.5)
@@ -212,131 +230,131 @@ def extract_portfolio_metrics(
                 as_of=as_of_date,
                 metric_name=metric_name,
                 metric_value=metric_value,
+                investment_id=inv.id,
                 meta={"investmentId": str(inv.id), "investmentName": inv.investment_name, "asOf": as_of.isoformat()},
                 created_by=actor_id,
                 updated_by=actor_id,
             )
             db.add(metric)
             rows.append(metric)
+            points.append((inv.id, metric_name, metric_value))
 
+    db.flush()
+    record_metric_points(db, fund_id=fund_id, as_of=as_of_date, points=points, actor_id=actor_id)
     db.commit()
     return rows
 
 
-def _latest_metric_by_investment(rows: list[PortfolioMetric], metric_name: str) -> dict[uuid.UUID, float]:
-    out: dict[uuid.UUID, float] = {}
-    for row in rows:
-        if row.metric_name != metric_name:
-            continue
-        investment_id_raw = (row.meta or {}).get("investmentId")
-        if not investment_id_raw:
-            continue
-        try:
-            investment_id = uuid.UUID(str(investment_id_raw))
-        except Exception:
-            continue
-        out[investment_id] = _safe_float(row.metric_value) or 0.0
-    return out
-
-
 def detect_performance_drift(
     db: Session,
     *,
     fund_id: uuid.UUID,
     as_of: dt.datetime,
     actor_id: str = "ai-engine",
+    config: DriftConfig = DEFAULT_DRIFT_CONFIG,
 ) -> list[PerformanceDriftFlag]:
-    investments = list(db.execute(select(ActiveInvestment).where(ActiveInvestment.fund_id == fund_id)).scalars().all())
+    investments = {inv.id: inv for inv in db.execute(select(ActiveInvestment).where(ActiveInvestment.fund_id == fund_id)).scalars()}
     if not investments:
         return []
 
-    dates = list(
-        db.execute(
-            select(PortfolioMetric.as_of)
-            .where(PortfolioMetric.fund_id == fund_id, PortfolioMetric.metric_name.like("AI4_%"))
-            .group_by(PortfolioMetric.as_of)
-            .order_by(PortfolioMetric.as_of.desc())
-            .limit(2)
-        ).scalars().all()
-    )
+    panel = load_metric_panel(db, fund_id=fund_id, metric_names=tuple(config.thresholds), periods=config.periods)
+    signals = [signal for signal in compute_drift(panel, config) if signal.investment_id in investments]
 
     db.execute(delete(PerformanceDriftFlag).where(PerformanceDriftFlag.fund_id == fund_id))
-    if len(dates) < 2:
-        db.commit()
-        return []
-
-    current_rows = list(
-        db.execute(
-            select(PortfolioMetric).where(PortfolioMetric.fund_id == fund_id, PortfolioMetric.as_of == dates[0], PortfolioMetric.metric_name.like("AI4_%"))
-        ).scalars().all()
-    )
-    baseline_rows = list(
-        db.execute(
-            select(PortfolioMetric).where(PortfolioMetric.fund_id == fund_id, PortfolioMetric.as_of == dates[1], PortfolioMetric.metric_name.like("AI4_%"))
-        ).scalars().all()
-    )
-
-    current_by_metric = {
-        "AI4_RETURN_EXPECTED_PCT": _latest_metric_by_investment(current_rows, "AI4_RETURN_EXPECTED_PCT"),
-        "AI4_DEPLOYMENT_RATIO": _latest_metric_by_investment(current_rows, "AI4_DEPLOYMENT_RATIO"),
-        "AI4_LIQUIDITY_DAYS": _latest_metric_by_investment(current_rows, "AI4_LIQUIDITY_DAYS"),
-    }
-    baseline_by_metric = {
-        "AI4_RETURN_EXPECTED_PCT": _latest_metric_by_investment(baseline_rows, "AI4_RETURN_EXPECTED_PCT"),
-        "AI4_DEPLOYMENT_RATIO": _latest_metric_by_investment(baseline_rows, "AI4_DEPLOYMENT_RATIO"),
-        "AI4_LIQUIDITY_DAYS": _latest_metric_by_investment(baseline_rows, "AI4_LIQUIDITY_DAYS"),
-    }
-
-    thresholds = {
-        "AI4_RETURN_EXPECTED_PCT": 10.0,
-        "AI4_DEPLOYMENT_RATIO": 20.0,
-        "AI4_LIQUIDITY_DAYS": 30.0,
-    }
 
     flags: list[PerformanceDriftFlag] = []
-    for inv in investments:
-        for metric_name, threshold in thresholds.items():
-            baseline = baseline_by_metric.get(metric_name, {}).get(inv.id)
-            current = current_by_metric.get(metric_name, {}).get(inv.id)
-            if baseline is None or current is None:
-                continue
-            if baseline == 0:
-                drift_pct = 100.0 if current != 0 else 0.0
-            else:
-                drift_pct = ((current - baseline) / abs(baseline)) * 100.0
-
-            if abs(drift_pct) < threshold:
-                continue
-
-            severity = "MEDIUM"
-            if abs(drift_pct) >= (threshold * 1.5):
-                severity = "HIGH"
-
-            flag = PerformanceDriftFlag(
+    for signal in signals:
+        inv = investments[signal.investment_id]
+        baseline = "" if config.method == "previous" else f"its {config.window}-period mean "
+        change = f"{signal.drift_pct:.2f}%"
+        threshold = f"{signal.threshold:.2f}%"
+        if config.method == "zscore":
+            change += f", z-score {signal.score:.2f}"
+            threshold = f"{signal.threshold:.2f}"
+        reasoning = (
+            f"Metric {signal.metric_name} drift for {inv.investment_name} moved from {baseline}{signal.baseline_value:.4f} "
+            f"to {signal.current_value:.4f} ({change}), above threshold {threshold}."
+        )
+        flags.append(
+            PerformanceDriftFlag(
                 fund_id=fund_id,
                 access_level="internal",
                 investment_id=inv.id,
-                metric_name=metric_name,
-                baseline_value=float(baseline),
-                current_value=float(current),
-                drift_pct=float(drift_pct),
-                severity=severity,
-                reasoning=(
-                    f"Metric {metric_name} drift for {inv.investment_name} moved from {baseline:.4f} to {current:.4f} "
-                    f"({drift_pct:.2f}%), above threshold {threshold:.2f}%."
-                ),
+                metric_name=signal.metric_name,
+                baseline_value=signal.baseline_value,
+                current_value=signal.current_value,
+                drift_pct=signal.drift_pct,
+                severity=signal.severity,
+                reasoning=reasoning,
                 status="OPEN",
                 as_of=as_of,
                 created_by=actor_id,
                 updated_by=actor_id,
             )
-            db.add(flag)
-            flags.append(flag)
+        )
 
+    db.add_all(flags)
     db.commit()
     return flags
 
 
+def _covenant_status(
+    *,
+    test_id: uuid.UUID | None,
+    passed: bool | None,
+    notes: str | None,
+    breach_id: uuid.UUID | None,
+    breach_severity: str | None,
+) -> tuple[str, str, str]:
+    if breach_id is not None:
+        severity = "HIGH" if (breach_severity or "").lower() in {"critical", "high"} else "MEDIUM"
+        return "BREACH", severity, f"Breach detected with severity {breach_severity}."
+    if test_id is None:
+        return "NOT_TESTED", "MEDIUM", "No covenant test found for current monitoring cycle."
+    if passed is False:
+        return "WARNING", "MEDIUM", notes or "Covenant test failed and requires review."
+    return "PASS", "LOW", "Latest covenant test passed or no breach evidence registered."
+
+
+def _latest_covenant_tests(db: Session, *, fund_id: uuid.UUID) -> list:
+    """Every covenant of the fund with its loan keys, latest test and that test's breach, in one query."""
+    ranked = (
+        select(
+            CovenantTest.id,
+            CovenantTest.covenant_id,
+            CovenantTest.tested_at,
+            CovenantTest.passed,
+            CovenantTest.notes,
+            func.row_number()
+            .over(partition_by=CovenantTest.covenant_id, order_by=(CovenantTest.tested_at.desc(), CovenantTest.created_at.desc()))
+            .label("position"),
+        )
+        .where(CovenantTest.fund_id == fund_id)
+        .subquery()
+    )
+    return db.execute(
+        select(
+            Covenant.id.label("covenant_id"),
+            Covenant.name,
+            Loan.external_reference,
+            Borrower.legal_name,
+            ranked.c.id.label("test_id"),
+            ranked.c.tested_at,
+            ranked.c.passed,
+            ranked.c.notes,
+            CovenantBreach.id.label("breach_id"),
+            CovenantBreach.severity.label("breach_severity"),
+        )
+        .select_from(Covenant)
+        .outerjoin(Loan, Loan.id == Covenant.loan_id)
+        .outerjoin(Borrower, Borrower.id == Loan.borrower_id)
+        .outerjoin(ranked, and_(ranked.c.covenant_id == Covenant.id, ranked.c.position == 1))
+        .outerjoin(CovenantBreach, and_(CovenantBreach.covenant_test_id == ranked.c.id, CovenantBreach.fund_id == fund_id))
+        .where(Covenant.fund_id == fund_id)
+        .order_by(Covenant.name, Covenant.id)
+    ).all()
+
+
 def build_covenant_surveillance(
     db: Session,
     *,
@@ -344,168 +362,293 @@ def build_covenant_surveillance(
     as_of: dt.datetime,
     actor_id: str = "ai-engine",
 ) -> list[CovenantStatusRegister]:
+    """
+    Rebuild the covenant status register: one row per covenant and the investment its loan belongs to.
+
+    A covenant reaches an investment through `Covenant.loan_id`: the loan's
+    external reference or its borrower's legal name must match the investment
+    name (case-insensitive). A covenant that maps to no investment is kept as
+    a fund-level UNMAPPED row (no investment_id) carrying its status severity,
+    so a breach on an unlinked loan is not lost. Investments without a mapped
+    covenant get a single NOT_CONFIGURED row.
+    """
     investments = list(db.execute(select(ActiveInvestment).where(ActiveInvestment.fund_id == fund_id)).scalars().all())
-    covenants = list(db.execute(select(Covenant).where(Covenant.fund_id == fund_id)).scalars().all())
+    investments_by_name: dict[str, list[ActiveInvestment]] = defaultdict(list)
+    for inv in investments:
+        investments_by_name[(inv.investment_name or "").strip().lower()].append(inv)
 
-    db.execute(delete(CovenantStatusRegister).where(CovenantStatusRegister.fund_id == fund_id))
+    def _row(investment_id: uuid.UUID | None, **values: object) -> dict:
+        return {
+            "id": uuid.uuid4(),
+            "fund_id": fund_id,
+            "access_level": "internal",
+            "investment_id": investment_id,
+            "as_of": as_of,
+            "created_by": actor_id,
+            "updated_by": actor_id,
+            **values,
+        }
 
-    saved: list[CovenantStatusRegister] = []
-    for inv in investments:
-        matched = covenants
-        if matched:
-            for covenant in matched:
-                latest_test = db.execute(
-                    select(CovenantTest)
-                    .where(CovenantTest.fund_id == fund_id, CovenantTest.covenant_id == covenant.id)
-                    .order_by(CovenantTest.tested_at.desc())
-                    .limit(1)
-                ).scalar_one_or_none()
-
-                breach = None
-                if latest_test is not None:
-                    breach = db.execute(
-                        select(CovenantBreach).where(
-                            CovenantBreach.fund_id == fund_id,
-                            CovenantBreach.covenant_test_id == latest_test.id,
-                        )
-                    ).scalar_one_or_none()
-
-                status = "PASS"
-                severity = "LOW"
-                details = "Latest covenant test passed or no breach evidence registered."
-                if breach is not None:
-                    status = "BREACH"
-                    severity = "HIGH" if (breach.severity or "").lower() in {"critical", "high"} else "MEDIUM"
-                    details = f"Breach detected with severity {breach.severity}."
-                elif latest_test is None:
-                    status = "NOT_TESTED"
-                    severity = "MEDIUM"
-                    details = "No covenant test found for current monitoring cycle."
-                elif latest_test.passed is False:
-                    status = "WARNING"
-                    severity = "MEDIUM"
-                    details = latest_test.notes or "Covenant test failed and requires review."
-
-                last_tested_at = None
-                if latest_test and latest_test.tested_at:
-                    last_tested_at = dt.datetime.combine(latest_test.tested_at, dt.time.min, tzinfo=dt.timezone.utc)
-                next_due = (last_tested_at + dt.timedelta(days=30)) if last_tested_at else None
-
-                row = CovenantStatusRegister(
-                    fund_id=fund_id,
-                    access_level="internal",
-                    investment_id=inv.id,
-                    covenant_id=covenant.id,
-                    covenant_test_id=latest_test.id if latest_test else None,
-                    breach_id=breach.id if breach else None,
-                    covenant_name=covenant.name,
+    rows: list[dict] = []
+    covered: set[uuid.UUID] = set()
+    unmapped = 0
+    for item in _latest_covenant_tests(db, fund_id=fund_id):
+        names = {(value or "").strip().lower() for value in (item.external_reference, item.legal_name)} - {""}
+        matched = list({inv.id: inv for name in names for inv in investments_by_name.get(name, ())}.values())
+
+        status, severity, details = _covenant_status(
+            test_id=item.test_id,
+            passed=item.passed,
+            notes=item.notes,
+            breach_id=item.breach_id,
+            breach_severity=item.breach_severity,
+        )
+        last_tested_at = None
+        if item.test_id is not None and item.tested_at:
+            last_tested_at = dt.datetime.combine(item.tested_at, dt.time.min, tzinfo=dt.timezone.utc)
+        next_due = (last_tested_at + dt.timedelta(days=30)) if last_tested_at else None
+
+        if not matched:
+            unmapped += 1
+            loan = item.external_reference or item.legal_name or "without reference"
+            rows.append(
+                _row(
+                    None,
+                    covenant_id=item.covenant_id,
+                    covenant_test_id=item.test_id,
+                    breach_id=item.breach_id,
+                    covenant_name=item.name,
+                    status="UNMAPPED",
+                    severity=severity,
+                    details=f"Loan {loan} matches no active investment; latest status {status}. {details}",
+                    last_tested_at=last_tested_at,
+                    next_test_due_at=next_due,
+                )
+            )
+            continue
+
+        for inv in matched:
+            covered.add(inv.id)
+            rows.append(
+                _row(
+                    inv.id,
+                    covenant_id=item.covenant_id,
+                    covenant_test_id=item.test_id,
+                    breach_id=item.breach_id,
+                    covenant_name=item.name,
                     status=status,
                     severity=severity,
                     details=details,
                     last_tested_at=last_tested_at,
                     next_test_due_at=next_due,
-                    as_of=as_of,
-                    created_by=actor_id,
-                    updated_by=actor_id,
-                )
-                db.add(row)
-                saved.append(row)
-        else:
-            db.add(
-                CovenantStatusRegister(
-                    fund_id=fund_id,
-                    access_level="internal",
-                    investment_id=inv.id,
-                    covenant_id=None,
-                    covenant_test_id=None,
-                    breach_id=None,
-                    covenant_name="Portfolio Covenant Set",
-                    status="NOT_CONFIGURED",
-                    severity="MEDIUM",
-                    details="No covenant configuration found for fund; monitoring requires covenant setup.",
-                    last_tested_at=None,
-                    next_test_due_at=None,
-                    as_of=as_of,
-                    created_by=actor_id,
-                    updated_by=actor_id,
                 )
             )
 
+    for inv in investments:
+        if inv.id in covered:
+            continue
+        rows.append(
+            _row(
+                inv.id,
+                covenant_id=None,
+                covenant_test_id=None,
+                breach_id=None,
+                covenant_name="Portfolio Covenant Set",
+                status="NOT_CONFIGURED",
+                severity="MEDIUM",
+                details="No covenant configured on this investment's loans; monitoring requires covenant setup.",
+                last_tested_at=None,
+                next_test_due_at=None,
+            )
+        )
+
+    if unmapped:
+        logger.warning("Covenant surveillance for fund %s: %d covenants map to no active investment", fund_id, unmapped)
+
+    db.execute(delete(CovenantStatusRegister).where(CovenantStatusRegister.fund_id == fund_id))
+    for i in range(0, len(rows), COVENANT_INSERT_BATCH_SIZE):
+        db.execute(insert(CovenantStatusRegister), rows[i : i + COVENANT_INSERT_BATCH_SIZE])
+
     db.commit()
     return list(db.execute(select(CovenantStatusRegister).where(CovenantStatusRegister.fund_id == fund_id)).scalars().all())
 
 
+class InvestmentNameMatcher:
+    """
+    Aho-Corasick automaton over lowercased investment names.
+
+    `match` scans a transaction's reference, beneficiary and notes in one
+    pass and returns every investment whose name occurs in any of them, in
+    investment order: the same answer as testing `name in field` for each
+    investment and field.
+    """
+
+    def __init__(self, investments: list[ActiveInvestment]) -> None:
+        self._investments = investments
+        names = [(inv.investment_name or "").lower() for inv in investments]
+        self._automaton = TermAutomaton(names)
+        # A repeated name is reported once by the automaton, at its first position.
+        self._owners: dict[int, list[int]] = defaultdict(list)
+        first: dict[str, int] = {}
+        for position, name in enumerate(names):
+            self._owners[first.setdefault(name, position)].append(position)
+        self.fingerprint = hashlib.sha256(
+            "\n".join(sorted(f"{inv.id}:{name}" for inv, name in zip(investments, names))).encode("utf-8")
+        ).hexdigest()
+
+    def match(self, *fields: str | None) -> list[ActiveInvestment]:
+        # NUL never occurs in a name, so no match can span two fields.
+        found = self._automaton.find("\x00".join((field or "").lower() for field in fields))
+        return [self._investments[i] for i in sorted(i for term in found for i in self._owners[term])]
+
+
+def _cash_impact_flag(inv: ActiveInvestment, tx, *, fund_id: uuid.UUID, as_of: dt.datetime, actor_id: str) -> CashImpactFlag:
+    amount = _safe_float(tx.amount) or 0.0
+    impact_type = "CAPITAL_CALL" if amount >= 0 else "DISTRIBUTION"
+    abs_amount = abs(amount)
+    severity = "LOW"
+    if abs_amount >= 500000.0:
+        severity = "HIGH"
+    elif abs_amount >= 150000.0:
+        severity = "MEDIUM"
+
+    liquidity_days = max(1, int(abs_amount / 50000.0))
+    message = (
+        f"{impact_type} detected for {inv.investment_name} with transaction {tx.reference_code or tx.id} "
+        f"and amount {amount:.2f} USD; estimated liquidity impact window {liquidity_days} days."
+    )
+    return CashImpactFlag(
+        fund_id=fund_id,
+        access_level="internal",
+        investment_id=inv.id,
+        transaction_id=tx.id,
+        impact_type=impact_type,
+        severity=severity,
+        estimated_impact_usd=abs_amount,
+        liquidity_days=liquidity_days,
+        message=message,
+        resolved_flag=False,
+        as_of=as_of,
+        created_by=actor_id,
+        updated_by=actor_id,
+    )
+
+
 def evaluate_liquidity_cash_impact(
     db: Session,
     *,
     fund_id: uuid.UUID,
     as_of: dt.datetime,
     actor_id: str = "ai-engine",
+    incremental: bool = False,
 ) -> list[CashImpactFlag]:
+    """
+    Flag cash transactions whose reference, beneficiary or notes name an active investment.
+
+    Transactions are streamed once and matched against every investment name
+    at the same time. With `incremental`, only transactions created or updated
+    since the fund's cash-impact watermark (less CASH_WATERMARK_OVERLAP) are
+    re-evaluated and their flags replaced; flags of older transactions,
+    including resolved ones, are kept, and re-seen transactions from the
+    overlap keep their resolved state. A change to the investment set forces
+    a full pass. Returns the flags written by this run.
+    """
     investments = list(db.execute(select(ActiveInvestment).where(ActiveInvestment.fund_id == fund_id)).scalars().all())
-    tx_rows = list(
-        db.execute(
-            select(CashTransaction).where(
-                CashTransaction.fund_id == fund_id,
-                CashTransaction.value_date.is_not(None),
+    matcher = InvestmentNameMatcher(investments)
+    watermark = db.execute(select(CashImpactWatermark).where(CashImpactWatermark.fund_id == fund_id)).scalar_one_or_none()
+
+    since = None
+    if incremental and watermark is not None and watermark.matcher_fingerprint == matcher.fingerprint:
+        since = watermark.last_transaction_updated_at
+
+    stmt = select(
+        CashTransaction.id,
+        CashTransaction.amount,
+        CashTransaction.reference_code,
+        CashTransaction.payment_reference,
+        CashTransaction.beneficiary_name,
+        CashTransaction.notes,
+        CashTransaction.value_date,
+        CashTransaction.updated_at,
+    ).where(CashTransaction.fund_id == fund_id)
+    resolved: set[tuple[uuid.UUID, uuid.UUID]] = set()
+    if since is not None:
+        window_start = since - CASH_WATERMARK_OVERLAP
+        stmt = stmt.where(CashTransaction.updated_at >= window_start)
+        resolved = {
+            (row.transaction_id, row.investment_id)
+            for row in db.execute(
+                select(CashImpactFlag.transaction_id, CashImpactFlag.investment_id)
+                .join(CashTransaction, CashTransaction.id == CashImpactFlag.transaction_id)
+                .where(
+                    CashImpactFlag.fund_id == fund_id,
+                    CashImpactFlag.resolved_flag.is_(True),
+                    CashTransaction.updated_at >= window_start,
+                    CashTransaction.updated_at <= since,
+                )
             )
-        ).scalars().all()
-    )
-
-    db.execute(delete(CashImpactFlag).where(CashImpactFlag.fund_id == fund_id))
+        }
+    else:
+        stmt = stmt.where(CashTransaction.value_date.is_not(None))
+        db.execute(delete(CashImpactFlag).where(CashImpactFlag.fund_id == fund_id))
 
     saved: list[CashImpactFlag] = []
-    for inv in investments:
-        inv_name = inv.investment_name.lower()
-        matched_txs = [
-            tx
-            for tx in tx_rows
-            if inv_name in (tx.payment_reference or "").lower()
-            or inv_name in (tx.beneficiary_name or "").lower()
-            or inv_name in (tx.notes or "").lower()
-        ]
-
-        if not matched_txs:
+    seen: list[uuid.UUID] = []
+    newest = since
+    for tx in db.execute(stmt.execution_options(yield_per=CASH_TRANSACTION_BATCH_SIZE)):
+        seen.append(tx.id)
+        if tx.updated_at is not None and (newest is None or tx.updated_at > newest):
+            newest = tx.updated_at
+        if tx.value_date is None:
             continue
-
-        for tx in matched_txs:
-            amount = _safe_float(tx.amount) or 0.0
-            impact_type = "CAPITAL_CALL" if amount >= 0 else "DISTRIBUTION"
-            abs_amount = abs(amount)
-            severity = "LOW"
-            if abs_amount >= 500000.0:
-                severity = "HIGH"
-            elif abs_amount >= 150000.0:
-                severity = "MEDIUM"
-
-            liquidity_days = max(1, int(abs_amount / 50000.0))
-            message = (
-                f"{impact_type} detected for {inv.investment_name} with transaction {tx.reference_code or tx.id} "
-                f"and amount {amount:.2f} USD; estimated liquidity impact window {liquidity_days} days."
-            )
-
-            row = CashImpactFlag(
-                fund_id=fund_id,
-                access_level="internal",
-                investment_id=inv.id,
-                transaction_id=tx.id,
-                impact_type=impact_type,
-                severity=severity,
-                estimated_impact_usd=abs_amount,
-                liquidity_days=liquidity_days,
-                message=message,
-                resolved_flag=False,
-                as_of=as_of,
-                created_by=actor_id,
-                updated_by=actor_id,
+        for inv in matcher.match(tx.payment_reference, tx.beneficiary_name, tx.notes):
+            flag = _cash_impact_flag(inv, tx, fund_id=fund_id, as_of=as_of, actor_id=actor_id)
+            # Only transactions unchanged since the last run can still carry its resolutions.
+            flag.resolved_flag = (tx.id, inv.id) in resolved and tx.updated_at <= since
+            saved.append(flag)
+
+    if since is not None:
+        for i in range(0, len(seen), CASH_TRANSACTION_BATCH_SIZE):
+            db.execute(
+                delete(CashImpactFlag).where(
+                    CashImpactFlag.fund_id == fund_id,
+                    CashImpactFlag.transaction_id.in_(seen[i : i + CASH_TRANSACTION_BATCH_SIZE]),
+                )
             )
-            db.add(row)
-            saved.append(row)
 
+    db.add_all(saved)
+    upsert_rows(
+        db,
+        model=CashImpactWatermark,
+        rows=[
+            {
+                "id": uuid.uuid4(),
+                "fund_id": fund_id,
+                "access_level": "internal",
+                "matcher_fingerprint": matcher.fingerprint,
+                "last_transaction_updated_at": newest,
+                "transactions_seen": len(seen),
+                "evaluated_at": as_of,
+                "created_by": actor_id,
+                "updated_by": actor_id,
+            }
+        ],
+        key=CASH_WATERMARK_KEY,
+        update_columns=("matcher_fingerprint", "last_transaction_updated_at", "transactions_seen", "evaluated_at", "updated_by"),
+        chunk_size=1,
+    )
     db.commit()
     return saved
 
 
+def _rows_by_investment(db: Session, stmt) -> dict[uuid.UUID, list]:
+    """Run a select whose first column is investment_id and group its rows by it."""
+    grouped: dict[uuid.UUID, list] = defaultdict(list)
+    for row in db.execute(stmt):
+        grouped[row.investment_id].append(row)
+    return grouped
+
+
 def reclassify_investment_risk(
     db: Session,
     *,
@@ -515,21 +658,15 @@ def reclassify_investment_risk(
 ) -> list[InvestmentRiskRegistry]:
     investments = list(db.execute(select(ActiveInvestment).where(ActiveInvestment.fund_id == fund_id)).scalars().all())
 
-    drifts = list(db.execute(select(PerformanceDriftFlag).where(PerformanceDriftFlag.fund_id == fund_id)).scalars().all())
-    covenants = list(db.execute(select(CovenantStatusRegister).where(CovenantStatusRegister.fund_id == fund_id)).scalars().all())
-    cash_flags = list(db.execute(select(CashImpactFlag).where(CashImpactFlag.fund_id == fund_id)).scalars().all())
-
-    by_inv_drift: dict[uuid.UUID, list[PerformanceDriftFlag]] = defaultdict(list)
-    for row in drifts:
-        by_inv_drift[row.investment_id].append(row)
-
-    by_inv_cov: dict[uuid.UUID, list[CovenantStatusRegister]] = defaultdict(list)
-    for row in covenants:
-        by_inv_cov[row.investment_id].append(row)
-
-    by_inv_cash: dict[uuid.UUID, list[CashImpactFlag]] = defaultdict(list)
-    for row in cash_flags:
-        by_inv_cash[row.investment_id].append(row)
+    by_inv_drift = _rows_by_investment(
+        db, select(PerformanceDriftFlag.investment_id, PerformanceDriftFlag.id, PerformanceDriftFlag.severity).where(PerformanceDriftFlag.fund_id == fund_id)
+    )
+    by_inv_cov = _rows_by_investment(
+        db, select(CovenantStatusRegister.investment_id, CovenantStatusRegister.id, CovenantStatusRegister.status).where(CovenantStatusRegister.fund_id == fund_id)
+    )
+    by_inv_cash = _rows_by_investment(
+        db, select(CashImpactFlag.investment_id, CashImpactFlag.id, CashImpactFlag.severity).where(CashImpactFlag.fund_id == fund_id)
+    )
 
     db.execute(delete(InvestmentRiskRegistry).where(InvestmentRiskRegistry.fund_id == fund_id))
 
@@ -604,6 +741,22 @@ def reclassify_investment_risk(
     return saved
 
 
+def _brief_fingerprint(inv: ActiveInvestment, drift_rows: list, cov_rows: list, cash_rows: list, risk_rows: list) -> str:
+    """
+    Hash of everything a board brief is built from. Row ids are left out:
+    the drift, covenant and risk stages rewrite their rows on every run, so
+    only the content decides whether the brief would read differently.
+    """
+    parts = [
+        f"investment:{inv.investment_name}|{inv.lifecycle_status}",
+        *sorted(f"drift:{r.metric_name}|{r.severity}" for r in drift_rows),
+        *sorted(f"covenant:{r.covenant_name}|{r.status}" for r in cov_rows),
+        *sorted(f"cash:{r.transaction_id}|{r.severity}" for r in cash_rows),
+        *sorted(f"risk:{r.risk_type}|{r.risk_level}|{r.trend}" for r in risk_rows),
+    ]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
 def build_board_monitoring_briefs(
     db: Session,
     *,
@@ -611,27 +764,30 @@ def build_board_monitoring_briefs(
     as_of: dt.datetime,
     actor_id: str = "ai-engine",
 ) -> list[BoardMonitoringBrief]:
+    """
+    Regenerate the board brief of every investment whose inputs changed since
+    its last brief; briefs with a matching input fingerprint are left as they
+    are. Returns the briefs written by this run.
+    """
     investments = list(db.execute(select(ActiveInvestment).where(ActiveInvestment.fund_id == fund_id)).scalars().all())
-    drifts = list(db.execute(select(PerformanceDriftFlag).where(PerformanceDriftFlag.fund_id == fund_id)).scalars().all())
-    covenants = list(db.execute(select(CovenantStatusRegister).where(CovenantStatusRegister.fund_id == fund_id)).scalars().all())
-    cash_flags = list(db.execute(select(CashImpactFlag).where(CashImpactFlag.fund_id == fund_id)).scalars().all())
-    risks = list(db.execute(select(InvestmentRiskRegistry).where(InvestmentRiskRegistry.fund_id == fund_id)).scalars().all())
-
-    by_inv_drift: dict[uuid.UUID, list[PerformanceDriftFlag]] = defaultdict(list)
-    for row in drifts:
-        by_inv_drift[row.investment_id].append(row)
-
-    by_inv_cov: dict[uuid.UUID, list[CovenantStatusRegister]] = defaultdict(list)
-    for row in covenants:
-        by_inv_cov[row.investment_id].append(row)
-
-    by_inv_cash: dict[uuid.UUID, list[CashImpactFlag]] = defaultdict(list)
-    for row in cash_flags:
-        by_inv_cash[row.investment_id].append(row)
-
-    by_inv_risk: dict[uuid.UUID, list[InvestmentRiskRegistry]] = defaultdict(list)
-    for row in risks:
-        by_inv_risk[row.investment_id].append(row)
+    by_inv_drift = _rows_by_investment(
+        db, select(PerformanceDriftFlag.investment_id, PerformanceDriftFlag.metric_name, PerformanceDriftFlag.severity).where(PerformanceDriftFlag.fund_id == fund_id)
+    )
+    by_inv_cov = _rows_by_investment(
+        db, select(CovenantStatusRegister.investment_id, CovenantStatusRegister.covenant_name, CovenantStatusRegister.status).where(CovenantStatusRegister.fund_id == fund_id)
+    )
+    by_inv_cash = _rows_by_investment(
+        db, select(CashImpactFlag.investment_id, CashImpactFlag.transaction_id, CashImpactFlag.severity).where(CashImpactFlag.fund_id == fund_id)
+    )
+    by_inv_risk = _rows_by_investment(
+        db,
+        select(InvestmentRiskRegistry.investment_id, InvestmentRiskRegistry.risk_type, InvestmentRiskRegistry.risk_level, InvestmentRiskRegistry.trend).where(
+            InvestmentRiskRegistry.fund_id == fund_id
+        ),
+    )
+    existing_briefs = {
+        row.investment_id: row for row in db.execute(select(BoardMonitoringBrief).where(BoardMonitoringBrief.fund_id == fund_id)).scalars()
+    }
 
     saved: list[BoardMonitoringBrief] = []
     for inv in investments:
@@ -640,6 +796,11 @@ def build_board_monitoring_briefs(
         cash_rows = by_inv_cash.get(inv.id, [])
         risk_rows = by_inv_risk.get(inv.id, [])
 
+        fingerprint = _brief_fingerprint(inv, drift_rows, cov_rows, cash_rows, risk_rows)
+        existing = existing_briefs.get(inv.id)
+        if existing is not None and existing.input_fingerprint == fingerprint:
+            continue
+
         overall = next((r for r in risk_rows if r.risk_type == "OVERALL"), None)
         overall_level = overall.risk_level if overall else "LOW"
 
@@ -666,29 +827,21 @@ def build_board_monitoring_briefs(
             "liquidity_view": liquidity_view,
             "risk_reclassification_view": risk_view,
             "recommended_actions": actions,
+            "input_fingerprint": fingerprint,
             "last_generated_at": as_of,
             "as_of": as_of,
             "created_by": actor_id,
             "updated_by": actor_id,
         }
 
-        existing = db.execute(
-            select(BoardMonitoringBrief).where(
-                BoardMonitoringBrief.fund_id == fund_id,
-                BoardMonitoringBrief.investment_id == inv.id,
-            )
-        ).scalar_one_or_none()
-
         if existing is None:
             row = BoardMonitoringBrief(**brief_payload)
             db.add(row)
-            db.flush()
         else:
             for key_name, value in brief_payload.items():
                 if key_name == "created_by":
                     continue
                 setattr(existing, key_name, value)
-            db.flush()
             row = existing
 
         saved.append(row)
@@ -697,30 +850,86 @@ def build_board_monitoring_briefs(
     return saved
 
 
+PORTFOLIO_INGEST_STAGES: tuple[Stage, ...] = (
+    Stage(
+        "investments",
+        lambda db, ctx: discover_active_investments(db, fund_id=ctx.fund_id, as_of=ctx.as_of, actor_id=ctx.actor_id),
+        inputs=("document_registry", "deal_profiles"),
+        outputs=("active_investments",),
+    ),
+    Stage(
+        "metrics",
+        lambda db, ctx: extract_portfolio_metrics(db, fund_id=ctx.fund_id, as_of=ctx.as_of, actor_id=ctx.actor_id),
+        inputs=("active_investments",),
+        outputs=("portfolio_metrics", "metric_series"),
+    ),
+    Stage(
+        "metric-rollups",
+        lambda db, ctx: rollup_metric_series(db, fund_id=ctx.fund_id, as_of=ctx.as_of.date(), actor_id=ctx.actor_id),
+        inputs=("metric_series",),
+        outputs=("metric_rollups",),
+    ),
+    Stage(
+        "drifts",
+        lambda db, ctx: detect_performance_drift(db, fund_id=ctx.fund_id, as_of=ctx.as_of, actor_id=ctx.actor_id),
+        inputs=("active_investments", "metric_series"),
+        outputs=("performance_drift_flags",),
+    ),
+    Stage(
+        "covenants",
+        lambda db, ctx: build_covenant_surveillance(db, fund_id=ctx.fund_id, as_of=ctx.as_of, actor_id=ctx.actor_id),
+        inputs=("active_investments", "covenant_tests"),
+        outputs=("covenant_status_register",),
+    ),
+    Stage(
+        "cash-flags",
+        lambda db, ctx: evaluate_liquidity_cash_impact(db, fund_id=ctx.fund_id, as_of=ctx.as_of, actor_id=ctx.actor_id, incremental=True),
+        inputs=("active_investments", "cash_transactions"),
+        outputs=("cash_impact_flags",),
+    ),
+    Stage(
+        "risk-registry",
+        lambda db, ctx: reclassify_investment_risk(db, fund_id=ctx.fund_id, as_of=ctx.as_of, actor_id=ctx.actor_id),
+        inputs=("performance_drift_flags", "covenant_status_register", "cash_impact_flags"),
+        outputs=("investment_risk_registry",),
+    ),
+    Stage(
+        "briefs",
+        lambda db, ctx: build_board_monitoring_briefs(db, fund_id=ctx.fund_id, as_of=ctx.as_of, actor_id=ctx.actor_id),
+        inputs=("investment_risk_registry", "performance_drift_flags", "covenant_status_register", "cash_impact_flags"),
+        outputs=("board_monitoring_briefs",),
+    ),
+)
+
+
 def run_portfolio_ingest(
     db: Session,
     *,
     fund_id: uuid.UUID,
     actor_id: str = "ai-engine",
     as_of: dt.datetime | None = None,
+    resume: bool = False,
 ) -> dict[str, int | str]:
     monitoring_as_of = as_of or _now_utc()
 
-    investments = discover_active_investments(db, fund_id=fund_id, as_of=monitoring_as_of, actor_id=actor_id)
-    metrics = extract_portfolio_metrics(db, fund_id=fund_id, as_of=monitoring_as_of, actor_id=actor_id)
-    drifts = detect_performance_drift(db, fund_id=fund_id, as_of=monitoring_as_of, actor_id=actor_id)
-    covenants = build_covenant_surveillance(db, fund_id=fund_id, as_of=monitoring_as_of, actor_id=actor_id)
-    cash_flags = evaluate_liquidity_cash_impact(db, fund_id=fund_id, as_of=monitoring_as_of, actor_id=actor_id)
-    risk_registry = reclassify_investment_risk(db, fund_id=fund_id, as_of=monitoring_as_of, actor_id=actor_id)
-    briefs = build_board_monitoring_briefs(db, fund_id=fund_id, as_of=monitoring_as_of, actor_id=actor_id)
+    run = run_dag(
+        db,
+        pipeline="portfolio-ingest",
+        stages=PORTFOLIO_INGEST_STAGES,
+        fund_id=fund_id,
+        actor_id=actor_id,
+        as_of=monitoring_as_of,
+        resume=resume,
+    )
+    run.raise_for_failure()
 
     return {
         "asOf": monitoring_as_of.isoformat(),
-        "investments": len(investments),
-        "metrics": len(metrics),
-        "drifts": len(drifts),
-        "covenants": len(covenants),
-        "cashFlags": len(cash_flags),
-        "riskRegistry": len(risk_registry),
-        "briefs": len(briefs),
+        "investments": run.counts("investments").get("rows", 0),
+        "metrics": run.counts("metrics").get("rows", 0),
+        "drifts": run.counts("drifts").get("rows", 0),
+        "covenants": run.counts("covenants").get("rows", 0),
+        "cashFlags": run.counts("cash-flags").get("rows", 0),
+        "riskRegistry": run.counts("risk-registry").get("rows", 0),
+        "briefs": run.counts("briefs").get("rows", 0),
     }
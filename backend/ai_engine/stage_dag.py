@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import dataclasses
+import datetime as dt
+import hashlib
+import json
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.modules.ai.models import StageCheckpoint
+
+DAG_MAX_WORKERS = 4
+DAG_VERSION = "stage-dag-v1"
+
+
+def _now_utc() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+@dataclass
+class StageContext:
+    fund_id: uuid.UUID
+    actor_id: str
+    as_of: dt.datetime
+    # Row counts of finished (or reused) stages, by stage name.
+    counts: dict[str, dict[str, int]] = field(default_factory=dict)
+
+
+StageFn = Callable[[Session, StageContext], Any]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A unit of pipeline work. A stage runs after every stage producing one of its inputs."""
+
+    name: str
+    run: StageFn
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class StageOutcome:
+    stage: str
+    status: str  # OK | REUSED | FAILED | SKIPPED
+    seconds: float
+    counts: dict[str, int]
+    inputs_fingerprint: str
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class DagRunResult:
+    run_id: uuid.UUID
+    pipeline: str
+    outcomes: tuple[StageOutcome, ...]
+    exception: BaseException | None = None
+
+    @property
+    def status(self) -> str:
+        return "FAILED" if any(o.status in {"FAILED", "SKIPPED"} for o in self.outcomes) else "OK"
+
+    def counts(self, stage: str) -> dict[str, int]:
+        return next((o.counts for o in self.outcomes if o.stage == stage), {})
+
+    def raise_for_failure(self) -> None:
+        if self.exception is not None:
+            raise self.exception
+
+
+def row_counts(result: Any) -> dict[str, int]:
+    """Summarise a stage return value: collections count as `rows`, dataclasses and dicts by field."""
+    if result is None:
+        return {}
+    if isinstance(result, bool):
+        return {"rows": int(result)}
+    if isinstance(result, int):
+        return {"rows": result}
+    if isinstance(result, (list, tuple, set, frozenset)):
+        return {"rows": len(result)}
+    if dataclasses.is_dataclass(result):
+        result = {f.name: getattr(result, f.name) for f in dataclasses.fields(result)}
+    if isinstance(result, dict):
+        out: dict[str, int] = {}
+        for key, value in result.items():
+            if isinstance(value, bool):
+                continue
+            if isinstance(value, int):
+                out[key] = value
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                out[key] = len(value)
+        return out
+    return {}
+
+
+def _ordered(stages: Iterable[Stage]) -> tuple[tuple[Stage, ...], dict[str, tuple[str, ...]]]:
+    stages = tuple(stages)
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate stage names in DAG")
+    producer: dict[str, str] = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producer:
+                raise ValueError(f"Output '{output}' is produced by both '{producer[output]}' and '{stage.name}'")
+            producer[output] = stage.name
+    # Inputs nobody produces are external tables the DAG only reads.
+    deps = {
+        stage.name: tuple(dict.fromkeys(producer[i] for i in stage.inputs if i in producer and producer[i] != stage.name))
+        for stage in stages
+    }
+
+    order: list[Stage] = []
+    done: set[str] = set()
+    remaining = list(stages)
+    while remaining:
+        ready = [stage for stage in remaining if all(dep in done for dep in deps[stage.name])]
+        if not ready:
+            raise ValueError(f"Stage DAG has a cycle among: {', '.join(s.name for s in remaining)}")
+        for stage in ready:
+            order.append(stage)
+            done.add(stage.name)
+        remaining = [stage for stage in remaining if stage.name not in done]
+    return tuple(order), deps
+
+
+def _fingerprint(pipeline: str, stage: str, ctx: StageContext, upstream: list[StageOutcome]) -> str:
+    payload = [
+        DAG_VERSION,
+        pipeline,
+        stage,
+        str(ctx.fund_id),
+        ctx.as_of.date().isoformat(),
+        [[o.stage, o.inputs_fingerprint, o.counts] for o in sorted(upstream, key=lambda o: o.stage)],
+    ]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _resumable(db: Session, *, fund_id: uuid.UUID, pipeline: str) -> dict[str, StageCheckpoint]:
+    """Successful checkpoints of the latest run, if that run failed."""
+    run_id = db.execute(
+        select(StageCheckpoint.run_id)
+        .where(StageCheckpoint.fund_id == fund_id, StageCheckpoint.pipeline == pipeline)
+        .order_by(StageCheckpoint.started_at.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+    if run_id is None:
+        return {}
+    rows = db.execute(
+        select(StageCheckpoint).where(StageCheckpoint.fund_id == fund_id, StageCheckpoint.run_id == run_id)
+    ).scalars().all()
+    if not any(row.status in {"FAILED", "SKIPPED"} for row in rows):
+        return {}
+    return {row.stage: row for row in rows if row.status in {"OK", "REUSED"}}
+
+
+def run_dag(
+    db: Session,
+    *,
+    pipeline: str,
+    stages: Iterable[Stage],
+    fund_id: uuid.UUID,
+    actor_id: str = "ai-engine",
+    as_of: dt.datetime | None = None,
+    resume: bool = False,
+    max_workers: int | None = None,
+) -> DagRunResult:
+    """
+    Run `stages` in dependency order and record one checkpoint per stage.
+
+    Independent stages run concurrently, each in its own session, on up to
+    `max_workers` threads (default DAG_MAX_WORKERS; SQLite runs serially on
+    `db`). A failed stage does not stop unrelated branches; its dependents are
+    recorded as SKIPPED. With `resume`, stages that succeeded in the latest
+    run, if that run failed, are reused when their inputs fingerprint (same
+    day, same upstream results) still matches.
+    """
+    ordered, deps = _ordered(stages)
+    ctx = StageContext(fund_id=fund_id, actor_id=actor_id, as_of=as_of or _now_utc())
+    run_id = uuid.uuid4()
+    previous = _resumable(db, fund_id=fund_id, pipeline=pipeline) if resume else {}
+
+    workers = max_workers or (1 if db.get_bind().dialect.name == "sqlite" else DAG_MAX_WORKERS)
+    session_factory = sessionmaker(bind=db.get_bind(), autoflush=False, autocommit=False, class_=Session)
+
+    outcomes: dict[str, StageOutcome] = {}
+    first_exception: BaseException | None = None
+
+    def _record(outcome: StageOutcome, started_at: dt.datetime) -> None:
+        outcomes[outcome.stage] = outcome
+        ctx.counts[outcome.stage] = outcome.counts
+        db.add(
+            StageCheckpoint(
+                fund_id=fund_id,
+                access_level="internal",
+                run_id=run_id,
+                pipeline=pipeline,
+                stage=outcome.stage,
+                status=outcome.status,
+                inputs_fingerprint=outcome.inputs_fingerprint,
+                started_at=started_at,
+                finished_at=_now_utc(),
+                duration_ms=int(round(outcome.seconds * 1000)),
+                row_counts=outcome.counts,
+                error=outcome.error,
+                created_by=actor_id,
+                updated_by=actor_id,
+            )
+        )
+        db.commit()
+
+    def _execute(stage: Stage, session: Session) -> tuple[dict[str, int], float]:
+        started = time.perf_counter()
+        result = stage.run(session, ctx)
+        return row_counts(result), time.perf_counter() - started
+
+    def _threaded(stage: Stage) -> tuple[dict[str, int], float]:
+        with session_factory() as session:
+            return _execute(stage, session)
+
+    # `ordered` is topological, so one pass over `pending` settles every stage
+    # whose upstream has finished, including those finished earlier in the pass.
+    pending = list(ordered)
+    running: dict[Future, tuple[Stage, str, dt.datetime, float]] = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"dag-{pipeline}") as pool:
+        while pending or running:
+            for stage in list(pending):
+                upstream = deps[stage.name]
+                if not all(dep in outcomes for dep in upstream):
+                    continue
+                pending.remove(stage)
+                fingerprint = _fingerprint(pipeline, stage.name, ctx, [outcomes[dep] for dep in upstream])
+                started_at = _now_utc()
+                if any(outcomes[dep].status in {"FAILED", "SKIPPED"} for dep in upstream):
+                    _record(StageOutcome(stage.name, "SKIPPED", 0.0, {}, fingerprint, "Upstream stage failed"), started_at)
+                    continue
+                checkpoint = previous.get(stage.name)
+                if checkpoint is not None and checkpoint.inputs_fingerprint == fingerprint:
+                    _record(StageOutcome(stage.name, "REUSED", 0.0, dict(checkpoint.row_counts or {}), fingerprint), started_at)
+                    continue
+                if workers > 1:
+                    running[pool.submit(_threaded, stage)] = (stage, fingerprint, started_at, time.perf_counter())
+                    continue
+                started = time.perf_counter()
+                try:
+                    counts, seconds = _execute(stage, db)
+                    _record(StageOutcome(stage.name, "OK", seconds, counts, fingerprint), started_at)
+                except Exception as exc:
+                    db.rollback()
+                    first_exception = first_exception or exc
+                    _record(StageOutcome(stage.name, "FAILED", time.perf_counter() - started, {}, fingerprint, _describe(exc)), started_at)
+
+            if not running:
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, fingerprint, started_at, started = running.pop(future)
+                try:
+                    counts, seconds = future.result()
+                    _record(StageOutcome(stage.name, "OK", seconds, counts, fingerprint), started_at)
+                except Exception as exc:
+                    first_exception = first_exception or exc
+                    _record(StageOutcome(stage.name, "FAILED", time.perf_counter() - started, {}, fingerprint, _describe(exc)), started_at)
+
+    return DagRunResult(
+        run_id=run_id,
+        pipeline=pipeline,
+        outcomes=tuple(outcomes[stage.name] for stage in ordered),
+        exception=first_exception,
+    )
+
+
+def _describe(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}\n{traceback.format_exc(limit=5)}"
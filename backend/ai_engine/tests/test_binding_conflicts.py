@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.linker import build_entity_index, detect_binding_conflicts
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import KnowledgeLink, ObligationRegister
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+from ai_engine.tests.test_wave_ai5_linking import _seed_document
+
+
+def _now() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+def test_binding_conflicts_resolve_sources_in_one_batch():
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Conflict Fund"))
+        docs = [
+            _seed_document(db, fund_id=fund_id, container="regulatory-library-cima", title=f"Rulebook {i}.pdf", authority="BINDING")
+            for i in range(10)
+        ]
+        narrative = _seed_document(db, fund_id=fund_id, container="dataroom-investor-facing", title="Deck.pdf", authority="NARRATIVE")
+
+        for group in range(60):
+            for variant, due_rule in enumerate(["within 30 days after quarter end", "within 45 days after quarter end"]):
+                source = narrative if group == 0 else docs[(group + variant) % len(docs)]
+                db.add(
+                    ObligationRegister(
+                        fund_id=fund_id,
+                        access_level="internal",
+                        obligation_id=f"OB-{group:03d}-{variant}",
+                        source="CIMA",
+                        obligation_text=f"Manager shall submit report number{group:03d} to administrator",
+                        frequency="Quarterly",
+                        due_rule=due_rule,
+                        responsible_party="Investment Manager",
+                        evidence_expected="Filing",
+                        status="MissingEvidence",
+                        source_documents=[{"documentId": "not-a-uuid"}, {"documentId": str(uuid.uuid4())}, {"documentId": str(source.document_id)}],
+                        as_of=_now(),
+                        data_latency=None,
+                        data_quality="OK",
+                        created_by="t",
+                        updated_by="t",
+                    )
+                )
+        db.commit()
+        build_entity_index(db, fund_id=fund_id, as_of=_now())
+
+        registry_selects: list[str] = []
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            if "FROM document_registry" in statement:
+                registry_selects.append(statement)
+
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            conflicts, created = detect_binding_conflicts(db, fund_id=fund_id, as_of=_now())
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+
+        assert conflicts == 60
+        assert created == 118  # the narrative-sourced group is skipped
+        assert len(registry_selects) == 1
+
+        links = db.execute(select(KnowledgeLink).where(KnowledgeLink.link_type == "CONFLICTS_WITH")).scalars().all()
+        assert {link.source_document_id for link in links} == {doc.id for doc in docs}
+    finally:
+        db.close()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.portfolio_intelligence import PORTFOLIO_CONTAINER, build_board_monitoring_briefs, reclassify_investment_risk
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import ActiveInvestment, BoardMonitoringBrief, PerformanceDriftFlag
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+from app.modules.portfolio import models as _portfolio_models  # noqa: F401
+
+MARCH = dt.datetime(2026, 3, 31, tzinfo=dt.timezone.utc)
+APRIL = dt.datetime(2026, 4, 1, tzinfo=dt.timezone.utc)
+
+
+def _drift(fund_id: uuid.UUID, investment_id: uuid.UUID, severity: str) -> PerformanceDriftFlag:
+    return PerformanceDriftFlag(
+        fund_id=fund_id,
+        access_level="internal",
+        investment_id=investment_id,
+        metric_name="AI4_RETURN_EXPECTED_PCT",
+        severity=severity,
+        reasoning="drift",
+        as_of=MARCH,
+        created_by="t",
+        updated_by="t",
+    )
+
+
+def _run(db: Session, fund_id: uuid.UUID, as_of: dt.datetime) -> list[BoardMonitoringBrief]:
+    reclassify_investment_risk(db, fund_id=fund_id, as_of=as_of, actor_id="t")
+    return build_board_monitoring_briefs(db, fund_id=fund_id, as_of=as_of, actor_id="t")
+
+
+def test_board_briefs_regenerate_only_when_inputs_change():
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Brief Fund"))
+        investments = []
+        for i in range(25):
+            inv = ActiveInvestment(
+                fund_id=fund_id,
+                access_level="internal",
+                investment_name=f"Investment {i:02d}",
+                lifecycle_status="ACTIVE",
+                source_container=PORTFOLIO_CONTAINER,
+                source_folder=f"{PORTFOLIO_CONTAINER}/Investment {i:02d}",
+                as_of=MARCH,
+                created_by="t",
+                updated_by="t",
+            )
+            db.add(inv)
+            investments.append(inv)
+        db.flush()
+        db.add_all([_drift(fund_id, investments[0].id, "MEDIUM"), _drift(fund_id, investments[1].id, "HIGH")])
+        db.commit()
+
+        assert len(_run(db, fund_id, MARCH)) == 25
+
+        statements: list[str] = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        # The risk registry is rewritten with new row ids but the same content: nothing to regenerate.
+        assert _run(db, fund_id, APRIL) == []
+        assert sum(1 for s in statements if "FROM board_monitoring_briefs" in s) == 1
+        assert not any(s.lstrip().upper().startswith("UPDATE BOARD_MONITORING_BRIEFS") for s in statements)
+
+        db.add(_drift(fund_id, investments[2].id, "HIGH"))
+        db.commit()
+        (changed,) = _run(db, fund_id, APRIL)
+        assert changed.investment_id == investments[2].id
+        assert changed.performance_view == "1 drift events registered; high severity count: 1."
+        assert "overall risk HIGH" in changed.executive_summary
+
+        generated = dict(db.execute(select(BoardMonitoringBrief.investment_id, BoardMonitoringBrief.as_of)).all())
+        assert generated[investments[2].id].date() == APRIL.date()
+        assert generated[investments[0].id].date() == MARCH.date()
+    finally:
+        db.close()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine import classifier, extracted_text
+from ai_engine.authority_resolver import resolve_authority_profiles
+from ai_engine.doc_classifier import classify_registered_documents
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import DocumentClassification, DocumentGovernanceProfile, DocumentRegistry
+from app.services.search_index import IndexingFailure, IndexingResult
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+from ai_engine.tests.test_wave_ai5_linking import _seed_document
+
+
+class _RecordingSearchClient:
+    upserts: list[list[dict]] = []
+
+    def upsert_documents(self, *, items: list[dict]) -> IndexingResult:
+        self.upserts.append(items)
+        return IndexingResult(succeeded=len(items))
+
+
+class _FailOnceSearchClient:
+    upserts: list[list[dict]] = []
+
+    def upsert_documents(self, *, items: list[dict]) -> IndexingResult:
+        self.upserts.append(items)
+        if len(self.upserts) == 1:
+            return IndexingResult(succeeded=len(items) - 1, failed=(IndexingFailure(key=items[0]["id"], status_code=400, error_message="rejected"),))
+        return IndexingResult(succeeded=len(items))
+
+
+def test_unchanged_documents_skip_classification_and_governance(monkeypatch):
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(None, 1)[0].upper())
+
+    monkeypatch.setattr(extracted_text, "download_bytes", lambda *, blob_uri: b"Administrator agreement text")
+    monkeypatch.setattr(classifier, "AzureSearchMetadataClient", _RecordingSearchClient)
+    _RecordingSearchClient.upserts = []
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Fingerprint Fund"))
+        docs = [
+            _seed_document(db, fund_id=fund_id, container="service-providers-contracts", title=f"Admin-{i}.txt", authority="BINDING")
+            for i in range(12)
+        ]
+        db.commit()
+
+        assert len(classify_registered_documents(db, fund_id=fund_id, actor_id="t")) == 12
+        assert len(resolve_authority_profiles(db, fund_id=fund_id, actor_id="t")) == 12
+        assert len(classifier.classify_documents(db, fund_id=fund_id, actor_id="t")) == 12
+        assert [len(items) for items in _RecordingSearchClient.upserts] == [12]
+        assert all(row.input_fingerprint for row in db.execute(select(DocumentClassification)).scalars())
+        assert all(row.input_fingerprint for row in db.execute(select(DocumentGovernanceProfile)).scalars())
+
+        statements.clear()
+        assert len(classify_registered_documents(db, fund_id=fund_id, actor_id="t2")) == 12
+        assert len(resolve_authority_profiles(db, fund_id=fund_id, actor_id="t2")) == 12
+        assert len(classifier.classify_documents(db, fund_id=fund_id, actor_id="t2")) == 12
+        assert [s for s in statements if s != "SELECT"] == []
+        assert len(statements) <= 6
+        assert len(_RecordingSearchClient.upserts) == 1
+
+        docs[3].etag = "changed"
+        db.commit()
+        statements.clear()
+        classify_registered_documents(db, fund_id=fund_id, actor_id="t3")
+        resolve_authority_profiles(db, fund_id=fund_id, actor_id="t3")
+        updated = db.execute(select(DocumentClassification).where(DocumentClassification.updated_by == "t3")).scalars().all()
+        assert [row.doc_id for row in updated] == [docs[3].id]
+        profiles = db.execute(select(DocumentGovernanceProfile).where(DocumentGovernanceProfile.updated_by == "t3")).scalars().all()
+        assert [row.doc_id for row in profiles] == [docs[3].id]
+    finally:
+        db.close()
+
+
+def test_degraded_registry_rows_are_pushed_again_on_the_next_run(monkeypatch):
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    monkeypatch.setattr(classifier, "AzureSearchMetadataClient", _FailOnceSearchClient)
+    _FailOnceSearchClient.upserts = []
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Degraded Fund"))
+        for i in range(3):
+            _seed_document(db, fund_id=fund_id, container="service-providers-contracts", title=f"Admin-{i}.txt", authority="BINDING")
+        db.commit()
+
+        classifier.classify_documents(db, fund_id=fund_id, actor_id="t")
+        (degraded,) = db.execute(select(DocumentRegistry).where(DocumentRegistry.data_quality == "DEGRADED")).scalars().all()
+        assert f"ai-doc-registry-{degraded.id}" == _FailOnceSearchClient.upserts[0][0]["id"]
+
+        # Only the row whose push failed is retried, and it recovers.
+        classifier.classify_documents(db, fund_id=fund_id, actor_id="t2")
+        assert [[item["id"] for item in items] for items in _FailOnceSearchClient.upserts[1:]] == [[f"ai-doc-registry-{degraded.id}"]]
+        assert {row.data_quality for row in db.execute(select(DocumentRegistry)).scalars()} == {"OK"}
+
+        classifier.classify_documents(db, fund_id=fund_id, actor_id="t3")
+        assert len(_FailOnceSearchClient.upserts) == 2
+    finally:
+        db.close()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.corpus_cache import clear_corpus_lru, get_corpora, invalidate_corpus
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import DocumentCorpusCache
+from app.modules.documents.models import DocumentChunk, DocumentVersion
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+from ai_engine.tests.test_wave_ai5_linking import _seed_document
+
+
+def _add_chunk(db: Session, doc, index: int, text: str) -> DocumentChunk:
+    chunk = DocumentChunk(
+        fund_id=doc.fund_id,
+        access_level="internal",
+        document_id=doc.document_id,
+        version_id=doc.version_id,
+        chunk_index=index,
+        text=text,
+        created_by="t",
+        updated_by="t",
+    )
+    db.add(chunk)
+    return chunk
+
+
+def test_corpus_cache_builds_once_per_checksum_and_invalidates():
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    clear_corpus_lru()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Corpus Cache Fund"))
+        doc = _seed_document(db, fund_id=fund_id, container="regulatory-library-cima", title="Rulebook.pdf", authority="BINDING")
+        empty = _seed_document(db, fund_id=fund_id, container="regulatory-library-cima", title="Pending.pdf", authority="BINDING")
+        second = _add_chunk(db, doc, 1, "File the Annual Return.")
+        _add_chunk(db, doc, 0, "Manager SHALL submit quarterly reports;")
+        db.commit()
+
+        corpora = get_corpora(db, fund_id=fund_id, version_ids=[doc.version_id, empty.version_id, None, doc.version_id])
+        db.commit()
+        corpus = corpora[doc.version_id]
+        assert corpus.text == "Manager SHALL submit quarterly reports;\nFile the Annual Return."
+        assert corpus.normalized == "manager shall submit quarterly reports file the annual return"
+        assert "quarterly" in corpus.tokens
+        assert corpora[empty.version_id].chunk_count == 0
+
+        rows = db.execute(select(DocumentCorpusCache).where(DocumentCorpusCache.fund_id == fund_id)).scalars().all()
+        assert [row.version_id for row in rows] == [doc.version_id]
+
+        # Served from the table (not the chunks) once the in-process LRU is cold.
+        second.text = "Edited in place."
+        db.commit()
+        clear_corpus_lru()
+        assert get_corpora(db, fund_id=fund_id, version_ids=[doc.version_id])[doc.version_id].text.endswith("Annual Return.")
+
+        # A new checksum for the version rebuilds the corpus.
+        version = db.get(DocumentVersion, doc.version_id)
+        version.checksum = "b" * 64
+        db.commit()
+        assert get_corpora(db, fund_id=fund_id, version_ids=[doc.version_id])[doc.version_id].text.endswith("Edited in place.")
+
+        second.text = "Re-indexed."
+        invalidate_corpus(db, fund_id=fund_id, version_id=doc.version_id)
+        db.commit()
+        assert get_corpora(db, fund_id=fund_id, version_ids=[doc.version_id])[doc.version_id].text.endswith("Re-indexed.")
+
+        # Another process re-chunked the version with the same bytes: this LRU was never told,
+        # but the new indexed_at keeps it from serving the old corpus.
+        second.text = "Re-indexed elsewhere."
+        db.execute(delete(DocumentCorpusCache).where(DocumentCorpusCache.version_id == doc.version_id))
+        version.indexed_at = dt.datetime(2026, 4, 1, tzinfo=dt.timezone.utc)
+        db.commit()
+        assert get_corpora(db, fund_id=fund_id, version_ids=[doc.version_id])[doc.version_id].text.endswith("Re-indexed elsewhere.")
+    finally:
+        clear_corpus_lru()
+        db.close()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.portfolio_intelligence import PORTFOLIO_CONTAINER, build_covenant_surveillance
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import ActiveInvestment
+from app.modules.portfolio.models import Borrower, Covenant, CovenantBreach, CovenantTest, Loan
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+from app.modules.portfolio import models as _portfolio_models  # noqa: F401
+
+AS_OF = dt.datetime(2026, 3, 31, tzinfo=dt.timezone.utc)
+
+
+def _audit(fund_id: uuid.UUID) -> dict:
+    return {"fund_id": fund_id, "access_level": "internal", "created_by": "t", "updated_by": "t"}
+
+
+def _investment(db: Session, fund_id: uuid.UUID, name: str) -> ActiveInvestment:
+    inv = ActiveInvestment(
+        **_audit(fund_id),
+        investment_name=name,
+        lifecycle_status="ACTIVE",
+        source_container=PORTFOLIO_CONTAINER,
+        source_folder=f"{PORTFOLIO_CONTAINER}/{name}",
+        as_of=AS_OF,
+    )
+    db.add(inv)
+    return inv
+
+
+def _covenant(db: Session, fund_id: uuid.UUID, loan: Loan, name: str) -> Covenant:
+    covenant = Covenant(**_audit(fund_id), loan_id=loan.id, name=name, covenant_type="DSCR")
+    db.add(covenant)
+    db.flush()
+    return covenant
+
+
+def _test(db: Session, fund_id: uuid.UUID, covenant: Covenant, day: int, passed: bool, notes: str | None = None) -> CovenantTest:
+    test = CovenantTest(**_audit(fund_id), covenant_id=covenant.id, tested_at=dt.date(2026, 3, day), passed=passed, notes=notes)
+    db.add(test)
+    db.flush()
+    return test
+
+
+def _seed(db: Session, *, fund_id: uuid.UUID, extra_covenants: int) -> dict[str, uuid.UUID]:
+    db.add(Fund(id=fund_id, name="Covenant Fund"))
+    alpha = _investment(db, fund_id, "Alpha Credit")
+    beta = _investment(db, fund_id, "Beta Lending")
+    _investment(db, fund_id, "Gamma Unlinked")
+
+    borrower = Borrower(**_audit(fund_id), legal_name="ALPHA CREDIT")
+    beta_borrower = Borrower(**_audit(fund_id), legal_name="Beta Borrower LLC")
+    orphan_borrower = Borrower(**_audit(fund_id), legal_name="Nobody Holdings")
+    db.add_all([borrower, beta_borrower, orphan_borrower])
+    db.flush()
+    alpha_loan = Loan(**_audit(fund_id), borrower_id=borrower.id, principal_amount=1000)
+    beta_loan = Loan(**_audit(fund_id), borrower_id=beta_borrower.id, external_reference="beta lending", principal_amount=1000)
+    db.add_all([alpha_loan, beta_loan])
+    db.flush()
+    orphan_loan = Loan(**_audit(fund_id), borrower_id=orphan_borrower.id, principal_amount=1)
+    db.add(orphan_loan)
+    db.flush()
+
+    dscr = _covenant(db, fund_id, alpha_loan, "DSCR >= 1.2x")
+    _test(db, fund_id, dscr, 1, True)
+    breached = _test(db, fund_id, dscr, 20, False)
+    db.add(CovenantBreach(**_audit(fund_id), covenant_test_id=breached.id, breach_detected_at=dt.date(2026, 3, 20), severity="critical"))
+
+    leverage = _covenant(db, fund_id, beta_loan, "Leverage <= 4x")
+    _test(db, fund_id, leverage, 2, True)
+    _test(db, fund_id, leverage, 15, False, notes="Leverage 4.3x")
+
+    orphan = _covenant(db, fund_id, orphan_loan, "Orphan covenant")
+    orphan_breach = _test(db, fund_id, orphan, 25, False)
+    db.add(CovenantBreach(**_audit(fund_id), covenant_test_id=orphan_breach.id, breach_detected_at=dt.date(2026, 3, 25), severity="high"))
+    for i in range(extra_covenants):
+        covenant = _covenant(db, fund_id, alpha_loan, f"Extra {i:03d}")
+        for day in (3, 9, 27):
+            _test(db, fund_id, covenant, day, True)
+    db.commit()
+    return {"alpha": alpha.id, "beta": beta.id}
+
+
+def _run(extra_covenants: int) -> tuple[int, list, dict[str, uuid.UUID]]:
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    fund_id = uuid.uuid4()
+    try:
+        ids = _seed(db, fund_id=fund_id, extra_covenants=extra_covenants)
+        statements: list[str] = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        rows = build_covenant_surveillance(db, fund_id=fund_id, as_of=AS_OF, actor_id="t")
+        summary = sorted(
+            ((row.investment_id, row.covenant_name, row.status, row.severity, row.details, row.last_tested_at and row.last_tested_at.date()) for row in rows),
+            key=lambda item: (str(item[0]), item[1]),
+        )
+        return len(statements), summary, ids
+    finally:
+        db.close()
+
+
+def test_covenant_surveillance_maps_covenants_through_loans():
+    statements, rows, ids = _run(extra_covenants=0)
+
+    by_name = {name: (investment_id, status, severity, details, tested) for investment_id, name, status, severity, details, tested in rows}
+    assert len(rows) == 4
+    assert by_name["DSCR >= 1.2x"] == (ids["alpha"], "BREACH", "HIGH", "Breach detected with severity critical.", dt.date(2026, 3, 20))
+    assert by_name["Leverage <= 4x"][:4] == (ids["beta"], "WARNING", "MEDIUM", "Leverage 4.3x")
+    assert by_name["Portfolio Covenant Set"][1] == "NOT_CONFIGURED"
+    # A breach on a loan that matches no investment is kept as a fund-level row.
+    assert by_name["Orphan covenant"] == (
+        None,
+        "UNMAPPED",
+        "HIGH",
+        "Loan Nobody Holdings matches no active investment; latest status BREACH. Breach detected with severity high.",
+        dt.date(2026, 3, 25),
+    )
+
+    more_statements, more_rows, _ = _run(extra_covenants=60)
+    assert more_statements == statements
+    assert len(more_rows) == 64
+    assert {status for _, name, status, *_ in more_rows if name.startswith("Extra")} == {"PASS"}
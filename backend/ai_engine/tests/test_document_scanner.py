@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine import document_scanner
+from ai_engine.document_scanner import scan_document_registry
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import DocumentRegistry, DocumentScanWatermark
+from app.services import blob_storage
+from app.services.blob_storage import BlobEntry
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+
+def _fake_listing(listings: dict[str, list[BlobEntry]], failing: set[str]):
+    def _iter_blobs(*, container: str, prefix=None, delimiter="/", results_per_page=1000):
+        if container in failing:
+            raise RuntimeError("listing failed")
+        yield from listings.get(container, [])
+
+    return _iter_blobs
+
+
+def test_registry_scan_streams_containers_and_writes_in_batches(monkeypatch):
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Scanner Fund"))
+        db.commit()
+
+        stamp = "2026-01-05T10:00:00+00:00"
+        listings = {
+            "regulatory-library-cima": [
+                BlobEntry(name="rules/", is_folder=True),
+                *[
+                    BlobEntry(name=f"rules/Rule-{i:02d}.pdf", is_folder=False, size_bytes=100 + i, last_modified=stamp, etag=f"e{i}")
+                    for i in range(7)
+                ],
+            ],
+            "fund-constitution-governance": [
+                BlobEntry(name="LPA.pdf", is_folder=False, size_bytes=42, last_modified=stamp, etag="lpa-1"),
+            ],
+        }
+        monkeypatch.setattr(document_scanner, "iter_blobs", _fake_listing(listings, {"dataroom-investor-facing"}))
+
+        first = scan_document_registry(db, fund_id=fund_id, actor_id="t", batch_size=3)
+        assert (first.scanned, first.created, first.updated) == (8, 8, 0)
+        assert first.failed_containers == ("dataroom-investor-facing",)
+
+        rows = {r.blob_path: r for r in db.execute(select(DocumentRegistry).where(DocumentRegistry.fund_id == fund_id)).scalars()}
+        assert sorted(rows) == ["LPA.pdf", *[f"rules/Rule-{i:02d}.pdf" for i in range(7)]]
+        assert rows["LPA.pdf"].authority == "BINDING"
+        first_ingested = {path: row.last_ingested_at for path, row in rows.items()}
+
+        listings["fund-constitution-governance"] = [
+            BlobEntry(name="LPA.pdf", is_folder=False, size_bytes=43, last_modified="2026-02-01T09:00:00+00:00", etag="lpa-2"),
+        ]
+        second = scan_document_registry(db, fund_id=fund_id, actor_id="t2", batch_size=3)
+        assert (second.scanned, second.created, second.updated, second.unchanged) == (8, 0, 1, 7)
+        assert second.changed == (("fund-constitution-governance", "LPA.pdf"),)
+
+        db.expire_all()
+        rows = {r.blob_path: r for r in db.execute(select(DocumentRegistry).where(DocumentRegistry.fund_id == fund_id)).scalars()}
+        assert rows["LPA.pdf"].etag == "lpa-2"
+        assert rows["LPA.pdf"].last_ingested_at != first_ingested["LPA.pdf"]
+        assert rows["rules/Rule-03.pdf"].last_ingested_at == first_ingested["rules/Rule-03.pdf"]
+        assert rows["rules/Rule-03.pdf"].created_by == "t"
+        assert rows["rules/Rule-03.pdf"].updated_by == "t"
+        assert rows["LPA.pdf"].updated_by == "t2"
+    finally:
+        db.close()
+
+
+def test_registry_delta_scan_uses_local_mtimes_and_watermarks(monkeypatch, tmp_path):
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    monkeypatch.setattr(blob_storage, "_use_local_storage", lambda: True)
+    monkeypatch.setattr(blob_storage, "_local_base_dir", lambda: tmp_path)
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Delta Scan Fund"))
+        db.commit()
+
+        container = tmp_path / "regulatory-library-cima"
+        container.mkdir()
+        for name, mtime in (("Rulebook.pdf", 1_700_000_000), ("Circular.pdf", 1_700_000_100), ("Old.pdf", 1_700_000_200)):
+            (container / name).write_bytes(name.encode())
+            os.utime(container / name, (mtime, mtime))
+
+        first = scan_document_registry(db, fund_id=fund_id, actor_id="t")
+        assert first.created == 3
+        assert sorted(first.changed) == [("regulatory-library-cima", n) for n in ("Circular.pdf", "Old.pdf", "Rulebook.pdf")]
+        watermark = db.execute(
+            select(DocumentScanWatermark).where(DocumentScanWatermark.container_name == "regulatory-library-cima")
+        ).scalar_one()
+        assert watermark.blobs_seen == 3
+        assert watermark.last_modified_utc.replace(tzinfo=dt.timezone.utc).timestamp() == 1_700_000_200
+
+        untouched = scan_document_registry(db, fund_id=fund_id, actor_id="t2")
+        assert (untouched.updated, untouched.unchanged, untouched.changed, untouched.deleted) == (0, 3, (), ())
+
+        (container / "Rulebook.pdf").write_bytes(b"Rulebook v2")
+        os.utime(container / "Rulebook.pdf", (1_700_000_900, 1_700_000_900))
+        (container / "Old.pdf").unlink()
+        delta = scan_document_registry(db, fund_id=fund_id, actor_id="t3")
+        assert delta.changed == (("regulatory-library-cima", "Rulebook.pdf"),)
+        assert delta.deleted == (("regulatory-library-cima", "Old.pdf"),)
+        assert delta.unchanged == 1
+
+        db.expire_all()
+        rows = {r.blob_path: r for r in db.execute(select(DocumentRegistry).where(DocumentRegistry.fund_id == fund_id)).scalars()}
+        assert rows["Old.pdf"].data_quality == "MISSING"
+        assert rows["Circular.pdf"].updated_by == "t"
+
+        again = scan_document_registry(db, fund_id=fund_id, actor_id="t4")
+        assert (again.changed, again.deleted) == ((), ())
+    finally:
+        db.close()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sys
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.drift_engine import DriftConfig, MetricPanel, compute_drift
+from ai_engine.portfolio_intelligence import PORTFOLIO_CONTAINER, detect_performance_drift
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import ActiveInvestment, MetricSeriesPoint, PerformanceDriftFlag
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+from app.modules.portfolio import models as _portfolio_models  # noqa: F401
+
+METRICS = ("AI4_RETURN_EXPECTED_PCT", "AI4_DEPLOYMENT_RATIO", "AI4_LIQUIDITY_DAYS")
+THRESHOLDS = {"AI4_RETURN_EXPECTED_PCT": 10.0, "AI4_DEPLOYMENT_RATIO": 20.0, "AI4_LIQUIDITY_DAYS": 30.0}
+
+
+def _panel(values: np.ndarray) -> MetricPanel:
+    investments, periods, _ = values.shape
+    return MetricPanel(
+        investment_ids=tuple(uuid.UUID(int=i + 1) for i in range(investments)),
+        dates=tuple(dt.date(2026, 1, 1) + dt.timedelta(days=d) for d in range(periods)),
+        metric_names=METRICS,
+        values=values,
+    )
+
+
+def test_previous_baseline_matches_pairwise_rule():
+    rng = np.random.default_rng(7)
+    values = rng.normal(10.0, 3.0, size=(200, 3, 3))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[:5, -2, 0] = 0.0
+
+    got = {(s.investment_id, s.metric_name): (s.drift_pct, s.severity) for s in compute_drift(_panel(values))}
+
+    expected = {}
+    for i in range(values.shape[0]):
+        for m, name in enumerate(METRICS):
+            baseline, current = values[i, -2, m], values[i, -1, m]
+            if np.isnan(baseline) or np.isnan(current):
+                continue
+            drift = (100.0 if current != 0 else 0.0) if baseline == 0 else (current - baseline) / abs(baseline) * 100.0
+            if abs(drift) < THRESHOLDS[name]:
+                continue
+            expected[(uuid.UUID(int=i + 1), name)] = (drift, "HIGH" if abs(drift) >= THRESHOLDS[name] * 1.5 else "MEDIUM")
+    assert got.keys() == expected.keys()
+    assert all(got[key][1] == expected[key][1] and got[key][0] == pytest.approx(expected[key][0]) for key in got)
+
+
+def test_rolling_and_zscore_baselines():
+    # One investment, liquidity days: steady history then a jump.
+    history = [100.0, 102.0, 98.0, 100.0, 125.0]
+    values = np.full((1, len(history), 3), np.nan)
+    values[0, :, 2] = history
+
+    assert compute_drift(_panel(values)) == []  # 25% vs previous is under the 30% threshold
+    (rolling,) = compute_drift(_panel(values), DriftConfig(method="rolling_mean", window=4, thresholds={"AI4_LIQUIDITY_DAYS": 20.0}))
+    assert (rolling.baseline_value, rolling.drift_pct, rolling.severity) == (100.0, 25.0, "MEDIUM")
+
+    (z,) = compute_drift(_panel(values), DriftConfig(method="zscore", window=4))
+    assert z.score == pytest.approx(25.0 / np.std([100.0, 102.0, 98.0, 100.0], ddof=1))
+    assert z.severity == "HIGH"
+
+    values[0, 1:4, 2] = 100.0  # no spread: z-score undefined, no flag
+    assert compute_drift(_panel(values), DriftConfig(method="zscore", window=3)) == []
+
+    with pytest.raises(ValueError, match="Unsupported drift baseline"):
+        DriftConfig(method="ewma")
+
+
+def test_detect_performance_drift_loads_panel_in_one_query():
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Drift Fund"))
+        investments = []
+        for name in ("Alpha", "Beta", "Gamma"):
+            inv = ActiveInvestment(
+                fund_id=fund_id,
+                access_level="internal",
+                investment_name=name,
+                lifecycle_status="ACTIVE",
+                source_container=PORTFOLIO_CONTAINER,
+                source_folder=f"{PORTFOLIO_CONTAINER}/{name}",
+                as_of=dt.datetime(2026, 3, 31, tzinfo=dt.timezone.utc),
+                created_by="t",
+                updated_by="t",
+            )
+            db.add(inv)
+            investments.append(inv)
+        db.flush()
+
+        series = {"Alpha": [10.0, 10.0, 13.0], "Beta": [10.0, 10.0, 10.5], "Gamma": [8.0, 10.0, 10.0]}
+        for inv in investments:
+            for day, value in enumerate(series[inv.investment_name]):
+                db.add(
+                    MetricSeriesPoint(
+                        fund_id=fund_id,
+                        access_level="internal",
+                        investment_id=inv.id,
+                        metric_name="AI4_RETURN_EXPECTED_PCT",
+                        as_of=dt.date(2026, 3, 29 + day),
+                        value=value,
+                        created_by="t",
+                        updated_by="t",
+                    )
+                )
+        db.commit()
+
+        statements: list[str] = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        flags = detect_performance_drift(db, fund_id=fund_id, as_of=dt.datetime(2026, 3, 31, tzinfo=dt.timezone.utc), actor_id="t")
+        assert [(f.metric_name, f.severity, f.drift_pct) for f in flags] == [("AI4_RETURN_EXPECTED_PCT", "HIGH", pytest.approx(30.0))]
+        assert flags[0].investment_id == investments[0].id
+        assert flags[0].reasoning == (
+            "Metric AI4_RETURN_EXPECTED_PCT drift for Alpha moved from 10.0000 to 13.0000 (30.00%), above threshold 10.00%."
+        )
+        assert sum(1 for s in statements if "FROM ai_metric_series" in s) == 1
+
+        rolling = detect_performance_drift(
+            db,
+            fund_id=fund_id,
+            as_of=dt.datetime(2026, 3, 31, tzinfo=dt.timezone.utc),
+            actor_id="t",
+            config=DriftConfig(method="rolling_mean", window=2),
+        )
+        assert sorted(f.investment_id for f in rolling) == sorted([investments[0].id, investments[2].id])
+        assert len(db.execute(select(PerformanceDriftFlag)).scalars().all()) == 2
+    finally:
+        db.close()
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.entity_matcher import EntityTermMatcher
+from app.modules.ai.models import KnowledgeEntity
+from scripts.benchmark_entity_matcher import naive_match, run_benchmark
+
+
+def _entity(name: str) -> KnowledgeEntity:
+    return KnowledgeEntity(id=uuid.uuid4(), fund_id=uuid.uuid4(), entity_type="OBLIGATION", canonical_name=name)
+
+
+def test_entity_matcher_preserves_first_term_semantics():
+    entity_index = [
+        (_entity("ob 1"), ["ob 1", "quarterly", "report"]),
+        (_entity("alpha"), ["alpha", "alp"]),
+        (_entity("he"), ["he", "she", "hers"]),
+        (_entity("missing"), ["missing", "absent"]),
+        (_entity("empty"), ["", "ushers"]),
+    ]
+    corpus = "ushers submit quarterly report alp"
+
+    matcher = EntityTermMatcher(entity_index)
+
+    assert matcher.match(corpus) == naive_match(entity_index, corpus)
+    assert [term for _, term in matcher.match(corpus)] == ["quarterly", "alp", "he", "ushers"]
+
+
+def test_entity_matcher_agrees_with_loop_on_synthetic_fund():
+    result = run_benchmark(entities=300, documents=10, words_per_document=400, seed=11)
+    assert result["links"] > 0
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.evidence_scoring import EvidenceThresholds, score_obligations
+from scripts.benchmark_evidence_scoring import run_benchmark
+
+
+def test_sparse_scoring_agrees_with_nested_loop():
+    result = run_benchmark(obligations=120, documents=80, words_per_document=60, seed=3)
+    assert result["matched"] > 0
+
+
+def test_sparse_scoring_thresholds_and_ties():
+    corpora = ["quarterly report filed", "quarterly report filed with administrator", "nothing relevant"]
+    obligation_terms = [
+        ["quarterly", "report", "administrator"],
+        ["quarterly", "report"],
+        ["annual", "audit"],
+        [],
+    ]
+
+    matches = score_obligations(obligation_terms, corpora)
+    assert [(m.document_index, m.score, m.status) for m in matches] == [
+        (1, 3.0, "MATCHED"),
+        (0, 2.0, "PARTIAL"),
+        (None, 0.0, "NONE"),
+        (None, 0.0, "NONE"),
+    ]
+
+    strict = score_obligations(obligation_terms, corpora, thresholds=EvidenceThresholds(matched_min_score=4, partial_min_score=3))
+    assert [m.status for m in strict] == ["PARTIAL", "NONE", "NONE", "NONE"]
+
+    bm25 = score_obligations(obligation_terms, corpora, thresholds=EvidenceThresholds(weighting="bm25", partial_min_score=0.1))
+    assert bm25[0].document_index == 1
+    assert bm25[0].score > bm25[1].score > 0
+
+    with pytest.raises(ValueError):
+        EvidenceThresholds(weighting="tfidf-cosine")
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine import extracted_text
+from ai_engine.doc_classifier import classify_registered_documents
+from ai_engine.knowledge_anchor_extractor import extract_knowledge_anchors
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import DocumentExtractedText, KnowledgeAnchor
+from app.modules.documents.models import DocumentVersion
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+from ai_engine.tests.test_wave_ai5_linking import _seed_document
+
+
+def test_extracted_text_store_avoids_repeat_downloads(monkeypatch):
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+
+    blobs = {
+        "local://service-providers-contracts/service-providers-contracts/Admin.txt": b"The Administrator shall deliver NAV by 2026-03-31.",
+        "local://regulatory-library-cima/regulatory-library-cima/Rule.txt": b"Registrants must file under section 12A.",
+    }
+    downloads: list[str] = []
+
+    def _download(*, blob_uri: str) -> bytes:
+        downloads.append(blob_uri)
+        return blobs[blob_uri]
+
+    monkeypatch.setattr(extracted_text, "blob_uri", lambda container, blob_name: f"local://{container}/{blob_name}")
+    monkeypatch.setattr(extracted_text, "download_bytes", _download)
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Extracted Text Fund"))
+        admin = _seed_document(db, fund_id=fund_id, container="service-providers-contracts", title="Admin.txt", authority="BINDING")
+        rule = _seed_document(db, fund_id=fund_id, container="regulatory-library-cima", title="Rule.txt", authority="BINDING")
+        db.flush()
+        db.get(DocumentVersion, admin.version_id).checksum = "b" * 64
+        rule.version_id = None  # scanner-style row: keyed by etag
+        db.commit()
+
+        classify_registered_documents(db, fund_id=fund_id, actor_id="t")
+        assert sorted(downloads) == sorted(blobs)
+        keys = set(db.execute(select(DocumentExtractedText.content_key)).scalars())
+        assert keys == {"sha256:" + "b" * 64, "etag:regulatory-library-cima/regulatory-library-cima/Rule.txt:y"}
+
+        downloads.clear()
+        classify_registered_documents(db, fund_id=fund_id, actor_id="t")
+        extract_knowledge_anchors(db, fund_id=fund_id, actor_id="t")
+        assert downloads == []
+
+        anchors = {(a.anchor_type, a.anchor_value) for a in db.execute(select(KnowledgeAnchor).where(KnowledgeAnchor.doc_id == admin.id)).scalars()}
+        assert ("EFFECTIVE_DATE", "2026-03-31") in anchors
+        assert ("PROVIDER_NAME", "Administrator") in anchors
+
+        rule.etag = "z"
+        db.commit()
+        extract_knowledge_anchors(db, fund_id=fund_id, actor_id="t")
+        assert downloads == ["local://regulatory-library-cima/regulatory-library-cima/Rule.txt"]
+    finally:
+        db.close()
+
+
+def test_extracted_text_keeps_pdf_page_boundaries():
+    text = extracted_text.ExtractedText(content_key="sha256:x", method="pypdf", pages=("[PAGE 1]\nAlpha", "[PAGE 2]", "[PAGE 3]\nGamma"))
+    assert text.text == "[PAGE 1]\nAlpha\n\n[PAGE 2]\n\n[PAGE 3]\nGamma"
+    assert extracted_text.etag_key("c", "a/b.pdf", '"0x8D1"') == "etag:c/a/b.pdf:0x8D1"
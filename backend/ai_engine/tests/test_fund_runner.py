@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine import fund_runner
+from ai_engine.fund_runner import active_fund_ids, run_funds
+from app.core.db.base import Base
+from app.core.db.models import Fund
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+
+def _sleep_stage(db, fund_id, actor_id, as_of, max_workers):
+    time.sleep(30)
+    return {}
+
+
+def _pool_stage(db, fund_id, actor_id, as_of, max_workers):
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork"))
+    Path(os.environ["RUNNER_TEST_POOL_PID_FILE"]).write_text(str(pool.submit(os.getpid).result()))
+    time.sleep(30)
+    return {}
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _failing_stage(db, fund_id, actor_id, as_of, max_workers):
+    raise RuntimeError("boom")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="relies on fork to share monkeypatched stages")
+def test_fund_runner_runs_funds_in_worker_processes(tmp_path, monkeypatch):
+    database_url = f"sqlite+pysqlite:///{tmp_path / 'runner.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine, class_=Session)() as db:
+        funds = [Fund(id=uuid.uuid4(), name=f"Runner Fund {i}") for i in range(3)]
+        db.add_all(funds)
+        db.add(Fund(id=uuid.uuid4(), name="Closed Fund", is_active=False))
+        db.commit()
+        assert set(active_fund_ids(db)) == {fund.id for fund in funds}
+    engine.dispose()
+
+    fund_ids = [fund.id for fund in funds]
+    report = run_funds(fund_ids, stages=("linker",), max_workers=2, database_url=database_url, start_method="fork")
+    assert report.status == "PASS"
+    assert [r.fund_id for r in report.results] == [str(fund_id) for fund_id in fund_ids]
+    assert all(r.stages["linker"]["mode"] == "CROSS_CONTAINER_LINKING" for r in report.results)
+
+    monkeypatch.setitem(fund_runner.STAGES, "sleep", _sleep_stage)
+    monkeypatch.setitem(fund_runner.STAGES, "fail", _failing_stage)
+    started = time.monotonic()
+    slow = run_funds(fund_ids[:1], stages=("sleep",), timeout_seconds=1, database_url=database_url, start_method="fork")
+    broken = run_funds(fund_ids[1:], stages=("linker", "fail"), database_url=database_url, start_method="fork")
+    assert time.monotonic() - started < 20
+    assert slow.results[0].status == "TIMEOUT"
+    assert [r.status for r in broken.results] == ["FAILED", "FAILED"]
+    assert "boom" in broken.results[0].error
+    assert "linker" in broken.results[0].stages
+    assert broken.to_dict()["failed"] == 2
+
+    with pytest.raises(ValueError):
+        run_funds(fund_ids, stages=("nope",), database_url=database_url)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads process state from /proc")
+def test_fund_runner_timeout_stops_pools_started_by_a_stage(tmp_path, monkeypatch):
+    monkeypatch.setenv("RUNNER_TEST_POOL_PID_FILE", str(tmp_path / "pool.pid"))
+    monkeypatch.setitem(fund_runner.STAGES, "pool", _pool_stage)
+
+    report = run_funds(
+        [uuid.uuid4()],
+        stages=("pool",),
+        timeout_seconds=2,
+        database_url=f"sqlite+pysqlite:///{tmp_path / 'runner.db'}",
+        start_method="fork",
+    )
+    assert report.results[0].status == "TIMEOUT"
+
+    pool_pid = int((tmp_path / "pool.pid").read_text())
+    deadline = time.monotonic() + 5
+    while _process_alive(pool_pid) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not _process_alive(pool_pid)
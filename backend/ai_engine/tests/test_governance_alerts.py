@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.monitoring import _governance_alerts
+from ai_engine.obligation_extractor import infer_recurrence, parse_due_date
+from ai_engine.stage_dag import StageContext
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import GovernanceAlert, ObligationRegister
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+
+def test_due_rules_parse_into_date_and_recurrence():
+    assert parse_due_date("Due on 2026-03-31") == dt.date(2026, 3, 31)
+    assert parse_due_date("within 30 days after quarter end") is None
+    assert infer_recurrence("Quarterly", "within 30 days after quarter end") == "QUARTERLY+30D"
+    assert infer_recurrence("Ongoing", "within 2 months after closing") == "EVENT+2M"
+    assert infer_recurrence("Ongoing", "Due on 2026-03-31") == "ONCE"
+    assert infer_recurrence("Annual", "Due on 2026-03-31") == "ANNUAL"
+    assert infer_recurrence("Ongoing", "Ongoing - immediate compliance") == "ONGOING"
+
+
+def test_governance_alerts_count_due_dates_in_sql():
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    now = dt.datetime(2026, 6, 1, 9, tzinfo=dt.timezone.utc)
+    today = now.date()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Alert Fund"))
+        due_dates = [today - dt.timedelta(days=3), today - dt.timedelta(days=1), today, today + dt.timedelta(days=30), today + dt.timedelta(days=31), None]
+        for i, due_date in enumerate(due_dates):
+            db.add(
+                ObligationRegister(
+                    fund_id=fund_id,
+                    access_level="internal",
+                    obligation_id=f"OB-{i}",
+                    source="CIMA",
+                    obligation_text="File the return.",
+                    frequency="Ongoing",
+                    due_rule=f"Due on {due_date.isoformat()}" if due_date else "Ongoing - immediate compliance",
+                    due_date=due_date,
+                    recurrence="ONCE" if due_date else "ONGOING",
+                    responsible_party="Compliance Officer",
+                    evidence_expected="Regulatory filing receipt",
+                    status="MissingEvidence",
+                    as_of=now,
+                    created_by="t",
+                    updated_by="t",
+                )
+            )
+        db.commit()
+
+        statements: list[str] = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        ctx = StageContext(fund_id=fund_id, actor_id="t", as_of=now, counts={"classify": {"rows": 4}, "manager-profiles": {"rows": 0}})
+        _governance_alerts(db, ctx)
+        titles = {row.alert_id.rsplit("-", 3)[0]: row.title for row in db.execute(select(GovernanceAlert)).scalars()}
+        assert titles == {
+            "ALERT-NEW-DOCS": "4 documents classified in daily cycle",
+            "ALERT-MISSING-EVIDENCE": "6 obligations are missing evidence",
+            "ALERT-OVERDUE": "2 deliverables are overdue",
+            "ALERT-APPROACHING-DUE": "2 obligations are approaching due date (<=30 days)",
+        }
+        register_reads = [s for s in statements if "FROM obligation_register" in s]
+        assert len(register_reads) == 1 and "count(" in register_reads[0].lower()
+    finally:
+        db.close()
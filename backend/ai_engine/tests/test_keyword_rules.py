@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.doc_classifier import DOC_TYPE_RULES, _classify
+from ai_engine.keyword_rules import KeywordRule, KeywordRuleTable, RuleDecision
+from scripts.benchmark_document_classifier import legacy_doc_type, run_benchmark
+
+
+def test_compiled_rules_match_hand_written_chains():
+    result = run_benchmark(documents=1500, words_per_document=80, seed=5)
+    assert result["docTypes"] == 9
+    assert result["institutionalTypes"] == 8
+
+
+def test_compiled_rules_report_every_hit_and_conditional_basis():
+    doc = SimpleNamespace(
+        blob_path="contracts/Admin-Agreement-POLICY.pdf",
+        domain_tag="SERVICE_PROVIDER",
+        container_name="service-providers-contracts",
+    )
+    content = "The Custodian and the ADMINISTRATOR shall report to the committee."
+
+    assert _classify(doc, content) == legacy_doc_type(doc, content) == ("SERVICE_PROVIDER_CONTRACT", 90, "container|content")
+    assert DOC_TYPE_RULES.hits({"filename": doc.blob_path, "domain": doc.domain_tag, "container": doc.container_name, "content": content}) == {
+        "container:service-providers",
+        "filename:contract",
+        "content:service-provider",
+        "content:memo",
+        "filename:policy",
+    }
+    assert _classify(doc, "nothing relevant") == ("SERVICE_PROVIDER_CONTRACT", 90, "container")
+
+
+def test_rule_table_rejects_unknown_rules():
+    with pytest.raises(ValueError, match="unknown rules: missing"):
+        KeywordRuleTable(
+            rules=(KeywordRule("a", "text", ("x",)),),
+            decisions=(RuleDecision("A", all_of=(("a", "missing"),)),),
+            default=RuleDecision("OTHER"),
+        )
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.doc_classifier import classify_registered_documents
+from ai_engine.extracted_text import ExtractedText, put_extracted_texts
+from ai_engine.knowledge_anchor_extractor import _build_anchors, extract_knowledge_anchors
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import KnowledgeAnchor
+from app.modules.documents.models import DocumentVersion
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+from ai_engine.tests.test_wave_ai5_linking import _seed_document
+
+
+def test_anchors_carry_page_reference_and_local_snippet():
+    filler = "lorem ipsum " * 80
+    pages = [
+        (None, "[PAGE 1]\nNetz Private Credit Fund offering memorandum. " + filler),
+        ("2", "[PAGE 2]\n" + filler + "The Custodian shall hold assets from 2026-01-15. " + filler),
+        ("3", "[PAGE 3]\nThis agreement is governed by the laws of Cayman Islands. See Section 4.2 for details."),
+    ]
+    anchors = _build_anchors("OTHER", pages)
+
+    assert [(a["anchor_type"], a["anchor_value"], a["page_reference"]) for a in anchors] == [
+        ("FUND_NAME", "Netz Fund", None),
+        ("PROVIDER_NAME", "Custodian", "2"),
+        ("EFFECTIVE_DATE", "2026-01-15", "2"),
+        ("GOVERNING_LAW", "Cayman Islands", "3"),
+        ("REGULATORY_REFERENCE", "Section 4.2", "3"),
+        ("OBLIGATION_KEYWORD", "shall", "2"),
+    ]
+    date = anchors[2]["source_snippet"]
+    assert "2026-01-15" in date and "Netz" not in date and len(date) < 450
+    two_pages = _build_anchors("OTHER", [("1", "Netz Capital overview"), ("2", "this fund shall report")])
+    assert [a["anchor_type"] for a in two_pages] == ["FUND_NAME", "OBLIGATION_KEYWORD"]
+    assert [a["anchor_type"] for a in _build_anchors("OTHER", [("1", "Netz Capital overview this fund shall report")])] == [
+        "FUND_NAME",
+        "OBLIGATION_KEYWORD",
+    ]
+    assert _build_anchors("OTHER", [(None, "plain text")]) == [
+        {"anchor_type": "DOC_TYPE", "anchor_value": "OTHER", "source_snippet": "plain text", "page_reference": None}
+    ]
+
+
+def test_anchor_extraction_writes_in_bulk_from_stored_pages():
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Anchor Fund"))
+        docs = [
+            _seed_document(db, fund_id=fund_id, container="service-providers-contracts", title=f"Admin-{i}.pdf", authority="BINDING")
+            for i in range(5)
+        ]
+        db.flush()
+        for i, doc in enumerate(docs):
+            db.get(DocumentVersion, doc.version_id).checksum = f"{i:064x}"
+        put_extracted_texts(
+            db,
+            fund_id=fund_id,
+            actor_id="t",
+            texts=[
+                ExtractedText(f"sha256:{i:064x}", "pypdf", (f"[PAGE 1]\nCover {i}", f"[PAGE 2]\nThe Administrator must report by 2026-0{i + 1}-28."))
+                for i in range(5)
+            ],
+        )
+        db.commit()
+        classify_registered_documents(db, fund_id=fund_id, actor_id="t")
+
+        statements: list[str] = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split(None, 1)[0].upper())
+
+        assert extract_knowledge_anchors(db, fund_id=fund_id, actor_id="t", batch_size=2) == 15
+        assert statements.count("INSERT") == 3
+        assert statements.count("DELETE") == 3
+
+        assert extract_knowledge_anchors(db, fund_id=fund_id, actor_id="t") == 15
+        anchors = db.execute(select(KnowledgeAnchor).where(KnowledgeAnchor.doc_id == docs[2].id)).scalars().all()
+        assert sorted((a.anchor_type, a.anchor_value, a.page_reference) for a in anchors) == [
+            ("EFFECTIVE_DATE", "2026-03-28", "2"),
+            ("OBLIGATION_KEYWORD", "must", "2"),
+            ("PROVIDER_NAME", "Administrator", "2"),
+        ]
+    finally:
+        db.close()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.knowledge_graph import invalidate_knowledge_graph, traverse_knowledge_graph
+from ai_engine.knowledge_writer import LINK_KEY, KnowledgeLinkBuffer, bulk_upsert_entities, load_entities, upsert_rows
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import KnowledgeLink
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+from ai_engine.tests.test_wave_ai5_linking import _seed_document
+
+
+def test_knowledge_graph_k_hop_pagination_and_incremental_updates():
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Graph Fund"))
+        rulebook = _seed_document(db, fund_id=fund_id, container="regulatory-library-cima", title="Rulebook.pdf", authority="BINDING")
+        evidence = [
+            _seed_document(db, fund_id=fund_id, container="portfolio-monitoring-evidence", title=f"Filing {i}.pdf", authority="EVIDENCE")
+            for i in range(5)
+        ]
+        keys = [("OBLIGATION", "OB-1"), ("OBLIGATION", "OB-2")]
+        bulk_upsert_entities(db, fund_id=fund_id, entities=keys, actor_id="t")
+        entities = load_entities(db, fund_id=fund_id, entities=keys)
+        ob1, ob2 = entities[keys[0]], entities[keys[1]]
+
+        links = KnowledgeLinkBuffer(fund_id=fund_id, actor_id="t")
+        for obligation in (ob1, ob2):
+            links.add(
+                source_document_id=rulebook.id,
+                target_entity_id=obligation.id,
+                link_type="DERIVES_OBLIGATION",
+                authority_tier="BINDING",
+                confidence_score=0.92,
+                evidence_snippet=None,
+            )
+        for doc in evidence:
+            links.add(
+                source_document_id=doc.id,
+                target_entity_id=ob1.id,
+                link_type="SATISFIES",
+                authority_tier="EVIDENCE",
+                confidence_score=0.91,
+                evidence_snippet=None,
+            )
+        links.flush(db)
+        db.commit()
+        invalidate_knowledge_graph(fund_id)
+
+        one_hop = traverse_knowledge_graph(db, fund_id=fund_id, start_id=rulebook.id, start_kind="document", hops=1)
+        assert one_hop["payload"]["edgesReachable"] == 2
+
+        pages = []
+        cursor = None
+        while True:
+            result = traverse_knowledge_graph(
+                db, fund_id=fund_id, start_id=rulebook.id, start_kind="document", hops=2, cursor=cursor, limit=3
+            )
+            pages.append(result["payload"]["links"])
+            cursor = result["payload"]["nextCursor"]
+            if cursor is None:
+                break
+        edges = [link for page in pages for link in page]
+        assert len(pages) == 3
+        assert len({link["linkId"] for link in edges}) == 7
+        assert [link["hop"] for link in edges] == [1, 1, 2, 2, 2, 2, 2]
+        assert {link["sourceDocumentId"] for link in edges if link["hop"] == 2} == {str(doc.id) for doc in evidence}
+        assert result["payload"]["nodes"][str(ob1.id)]["canonicalName"] == "OB-1"
+
+        only_derives = traverse_knowledge_graph(
+            db, fund_id=fund_id, start_id=ob1.id, hops=2, link_types={"DERIVES_OBLIGATION"}
+        )
+        assert only_derives["payload"]["edgesReachable"] == 2
+
+        before = traverse_knowledge_graph(
+            db, fund_id=fund_id, start_id=ob2.id, hops=1, as_of=dt.datetime(2000, 1, 1, tzinfo=dt.timezone.utc)
+        )
+        assert before["payload"]["edgesReachable"] == 0
+
+        # Links written after the graph was cached show up once committed, not before.
+        late = KnowledgeLinkBuffer(fund_id=fund_id, actor_id="t")
+        late.add(
+            source_document_id=evidence[0].id,
+            target_entity_id=ob2.id,
+            link_type="SATISFIES",
+            authority_tier="EVIDENCE",
+            confidence_score=0.64,
+            evidence_snippet=None,
+        )
+        late.flush(db)
+        assert traverse_knowledge_graph(db, fund_id=fund_id, start_id=ob2.id, hops=1)["payload"]["edgesReachable"] == 1
+        db.rollback()
+        assert traverse_knowledge_graph(db, fund_id=fund_id, start_id=ob2.id, hops=1)["payload"]["edgesReachable"] == 1
+
+        late.add(
+            source_document_id=evidence[0].id,
+            target_entity_id=ob2.id,
+            link_type="SATISFIES",
+            authority_tier="EVIDENCE",
+            confidence_score=0.64,
+            evidence_snippet=None,
+        )
+        late.flush(db)
+        db.commit()
+        assert traverse_knowledge_graph(db, fund_id=fund_id, start_id=ob2.id, hops=1)["payload"]["edgesReachable"] == 2
+
+        # Another writer stored this link after the graph was cached; re-linking hits ON CONFLICT
+        # and the cached edge must carry the stored row's id and created_at.
+        stored_id = uuid.uuid4()
+        upsert_rows(
+            db,
+            model=KnowledgeLink,
+            rows=[
+                {
+                    "id": stored_id,
+                    "fund_id": fund_id,
+                    "access_level": "internal",
+                    "source_document_id": evidence[1].id,
+                    "target_entity_id": ob2.id,
+                    "link_type": "SATISFIES",
+                    "authority_tier": "EVIDENCE",
+                    "confidence_score": 0.5,
+                    "evidence_snippet": None,
+                    "created_by": "other",
+                    "updated_by": "other",
+                }
+            ],
+            key=LINK_KEY,
+            update_columns=("confidence_score",),
+            chunk_size=1000,
+        )
+        db.commit()
+        late.add(
+            source_document_id=evidence[1].id,
+            target_entity_id=ob2.id,
+            link_type="SATISFIES",
+            authority_tier="EVIDENCE",
+            confidence_score=0.7,
+            evidence_snippet=None,
+        )
+        late.flush(db)
+        db.commit()
+        cached = traverse_knowledge_graph(db, fund_id=fund_id, start_id=ob2.id, hops=1)["payload"]
+        stored_at = db.execute(select(KnowledgeLink.created_at).where(KnowledgeLink.id == stored_id)).scalar_one()
+        (relinked,) = [link for link in cached["links"] if link["sourceDocumentId"] == str(evidence[1].id)]
+        assert relinked["linkId"] == str(stored_id)
+        assert relinked["createdAt"] == stored_at.replace(tzinfo=dt.timezone.utc).isoformat()
+        invalidate_knowledge_graph(fund_id)
+        reloaded = traverse_knowledge_graph(db, fund_id=fund_id, start_id=ob2.id, hops=1)["payload"]
+        assert {link["linkId"] for link in reloaded["links"]} == {link["linkId"] for link in cached["links"]}
+    finally:
+        invalidate_knowledge_graph()
+        db.close()
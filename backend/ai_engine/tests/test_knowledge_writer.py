@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.knowledge_writer import KnowledgeLinkBuffer, bulk_upsert_entities, load_entities
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import KnowledgeLink
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+from ai_engine.tests.test_wave_ai5_linking import _seed_document
+
+
+def test_bulk_upsert_counts_created_and_updated_rows_on_sqlite():
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Bulk Upsert Fund"))
+        doc = _seed_document(db, fund_id=fund_id, container="regulatory-library-cima", title="Rulebook.pdf", authority="BINDING")
+        db.commit()
+
+        keys = [("OBLIGATION", f"OB-{i:04d}") for i in range(250)]
+        first = bulk_upsert_entities(db, fund_id=fund_id, entities=keys + keys[:5], actor_id="t", chunk_size=40)
+        second = bulk_upsert_entities(db, fund_id=fund_id, entities=keys[:100] + [("DEAL", "Alpha")], actor_id="t2", chunk_size=40)
+        assert (first.created, first.updated) == (250, 0)
+        assert (second.created, second.updated) == (1, 100)
+
+        entities = load_entities(db, fund_id=fund_id, entities=keys)
+        assert len(entities) == 250
+        assert entities[keys[0]].updated_by == "t2"
+
+        links = KnowledgeLinkBuffer(fund_id=fund_id, actor_id="t", chunk_size=40)
+        for entity in list(entities.values())[:120]:
+            links.add(
+                source_document_id=doc.id,
+                target_entity_id=entity.id,
+                link_type="DERIVES_OBLIGATION",
+                authority_tier="BINDING",
+                confidence_score=0.72,
+                evidence_snippet=None,
+            )
+        assert links.flush(db).created == 120
+        assert len(links) == 0
+
+        target = entities[keys[0]]
+        links.add(
+            source_document_id=doc.id,
+            target_entity_id=target.id,
+            link_type="DERIVES_OBLIGATION",
+            authority_tier="BINDING",
+            confidence_score=0.92,
+            evidence_snippet="Rulebook.pdf :: ob 0000",
+        )
+        result = links.flush(db)
+        db.commit()
+        assert (result.created, result.updated) == (0, 1)
+
+        row = db.execute(select(KnowledgeLink).where(KnowledgeLink.target_entity_id == target.id)).scalar_one()
+        assert row.confidence_score == 0.92
+        assert row.evidence_snippet == "Rulebook.pdf :: ob 0000"
+    finally:
+        db.close()
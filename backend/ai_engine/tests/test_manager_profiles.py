@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine import knowledge_builder
+from ai_engine.corpus_cache import clear_corpus_lru
+from ai_engine.knowledge_builder import _infer_profile_fields, build_manager_profiles
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.services.search_index import IndexingResult
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+from ai_engine.tests.test_corpus_cache import _add_chunk
+from ai_engine.tests.test_wave_ai5_linking import _seed_document
+
+
+class _RecordingSearchClient:
+    upserts: list[list[dict]] = []
+
+    def upsert_documents(self, *, items: list[dict]) -> IndexingResult:
+        self.upserts.append(items)
+        return IndexingResult(succeeded=len(items))
+
+
+def test_profile_fields_keep_first_match_precedence():
+    fields = _infer_profile_fields("Closed-end Fund for DIRECT LENDING and real estate in Brazil; quarterly and annual NAV. Target IRR of 12.5 %. Liquidity and default risk.")
+    assert fields == {
+        "strategy": "Real Estate Credit",
+        "region": "LatAm",
+        "vehicle_type": "Closed-End Fund",
+        "declared_target_return": "12.5%",
+        "reporting_cadence": "Quarterly",
+        "key_risks_declared": ["Liquidity", "Credit"],
+    }
+    assert _infer_profile_fields("nothing here")["strategy"] == "Not Explicitly Declared"
+
+
+def test_manager_profiles_skip_unchanged_document_sets(monkeypatch):
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    monkeypatch.setattr(knowledge_builder, "AzureSearchMetadataClient", _RecordingSearchClient)
+    _RecordingSearchClient.upserts = []
+    clear_corpus_lru()
+
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(None, 1)[0].upper())
+
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Manager Fund"))
+        docs = []
+        for i, manager in enumerate(["Alpha Capital", "Alpha Capital", "Beta Partners", "Gamma Credit"]):
+            doc = _seed_document(db, fund_id=fund_id, container="deals", title=f"Deck-{i}.pdf", authority="INTELLIGENCE")
+            doc.root_folder = "2 Deals & Managers"
+            doc.folder_path = f"{manager}/Fund I"
+            docs.append(doc)
+        db.flush()
+        _add_chunk(db, docs[0], 0, "Direct lending strategy, quarterly reporting.")
+        _add_chunk(db, docs[2], 0, "Distressed credit in Europe; refinancing risk.")
+        db.commit()
+
+        profiles = {p.name: p for p in build_manager_profiles(db, fund_id=fund_id, actor_id="t")}
+        assert sorted(profiles) == ["Alpha Capital", "Beta Partners", "Gamma Credit"]
+        assert profiles["Alpha Capital"].strategy == "Direct Lending"
+        assert profiles["Beta Partners"].key_risks_declared == ["Refinancing"]
+        assert [len(items) for items in _RecordingSearchClient.upserts] == [3]
+
+        statements.clear()
+        assert len(build_manager_profiles(db, fund_id=fund_id, actor_id="t2")) == 3
+        assert [s for s in statements if s != "SELECT"] == []
+        assert len(statements) <= 5  # registry, checksums, corpus misses (2), profiles
+        assert len(_RecordingSearchClient.upserts) == 1
+
+        _add_chunk(db, docs[3], 0, "Open-end SPV with monthly liquidity.")
+        db.commit()
+        rebuilt = {p.name: p for p in build_manager_profiles(db, fund_id=fund_id, actor_id="t3")}
+        assert [item["title"] for item in _RecordingSearchClient.upserts[-1]] == ["Manager Profile - Gamma Credit"]
+        assert rebuilt["Gamma Credit"].vehicle_type == "Open-End Fund"
+        assert rebuilt["Alpha Capital"].updated_by == "t"
+    finally:
+        db.close()
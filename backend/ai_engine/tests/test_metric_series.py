@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sys
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.metric_series import MAX_SERIES_PERIODS, load_metric_series, period_count, period_starts, record_metric_points, rollup_metric_series
+from ai_engine.portfolio_intelligence import PORTFOLIO_CONTAINER
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import ActiveInvestment, MetricSeriesPoint, MetricSeriesRollup
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+from app.modules.portfolio import models as _portfolio_models  # noqa: F401
+
+METRIC = "AI4_LIQUIDITY_DAYS"
+
+
+def _investment(db: Session, fund_id: uuid.UUID, name: str) -> ActiveInvestment:
+    inv = ActiveInvestment(
+        fund_id=fund_id,
+        access_level="internal",
+        investment_name=name,
+        lifecycle_status="ACTIVE",
+        source_container=PORTFOLIO_CONTAINER,
+        source_folder=f"{PORTFOLIO_CONTAINER}/{name}",
+        as_of=dt.datetime(2026, 3, 31, tzinfo=dt.timezone.utc),
+        created_by="t",
+        updated_by="t",
+    )
+    db.add(inv)
+    db.flush()
+    return inv
+
+
+def _rollup(db: Session, investment_id: uuid.UUID, granularity: str, start: dt.date) -> MetricSeriesRollup:
+    return db.execute(
+        select(MetricSeriesRollup).where(
+            MetricSeriesRollup.investment_id == investment_id,
+            MetricSeriesRollup.granularity == granularity,
+            MetricSeriesRollup.period_start == start,
+        )
+    ).scalar_one()
+
+
+def test_period_starts_align_to_weeks_and_months():
+    assert period_starts(dt.date(2026, 3, 4), dt.date(2026, 3, 17), "WEEK") == [dt.date(2026, 3, 2), dt.date(2026, 3, 9), dt.date(2026, 3, 16)]
+    assert period_starts(dt.date(2026, 1, 31), dt.date(2026, 3, 1), "MONTH") == [dt.date(2026, 1, 1), dt.date(2026, 2, 1), dt.date(2026, 3, 1)]
+    with pytest.raises(ValueError, match="Unsupported metric granularity"):
+        period_starts(dt.date(2026, 1, 1), dt.date(2026, 2, 1), "HOUR")
+    for start, end in [(dt.date(2025, 12, 31), dt.date(2027, 2, 3)), (dt.date(2026, 3, 2), dt.date(2026, 3, 2)), (dt.date(2026, 3, 5), dt.date(2026, 3, 1))]:
+        for granularity in ("DAY", "WEEK", "MONTH"):
+            assert period_count(start, end, granularity) == len(period_starts(start, end, granularity))
+
+
+def test_metric_series_rollups_and_dense_queries():
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Series Fund"))
+        alpha = _investment(db, fund_id, "Alpha")
+        beta = _investment(db, fund_id, "Beta")
+
+        # Alpha reports daily through Feb 27 - Mar 4; Beta skips Mar 2.
+        for offset, day in enumerate(dt.date(2026, 2, 27) + dt.timedelta(days=d) for d in range(6)):
+            points = [(alpha.id, METRIC, 100.0 + offset)]
+            if day != dt.date(2026, 3, 2):
+                points.append((beta.id, METRIC, 50.0))
+            record_metric_points(db, fund_id=fund_id, as_of=day, points=points, actor_id="t")
+        # Re-running a date overwrites it instead of adding a second point.
+        record_metric_points(db, fund_id=fund_id, as_of=dt.date(2026, 3, 4), points=[(alpha.id, METRIC, 110.0)], actor_id="t")
+        db.commit()
+        assert db.execute(select(func.count()).select_from(MetricSeriesPoint)).scalar_one() == 11
+
+        assert rollup_metric_series(db, fund_id=fund_id, as_of=dt.date(2026, 3, 4), actor_id="t") == 8
+        week = _rollup(db, alpha.id, "WEEK", dt.date(2026, 3, 2))
+        assert (week.points, week.min_value, week.max_value, week.last_value) == (3, 103.0, 110.0, 110.0)
+        assert week.mean_value == pytest.approx((103.0 + 104.0 + 110.0) / 3)
+        february = _rollup(db, alpha.id, "MONTH", dt.date(2026, 2, 1))
+        assert (february.points, february.last_value) == (2, 101.0)
+
+        # Later runs only touch the week and month holding `as_of`.
+        record_metric_points(db, fund_id=fund_id, as_of=dt.date(2026, 3, 5), points=[(alpha.id, METRIC, 90.0)], actor_id="t")
+        db.commit()
+        assert rollup_metric_series(db, fund_id=fund_id, as_of=dt.date(2026, 3, 5), actor_id="t") == 4
+        week = _rollup(db, alpha.id, "WEEK", dt.date(2026, 3, 2))
+        assert (week.points, week.min_value, week.last_value) == (4, 90.0, 90.0)
+
+        daily = load_metric_series(db, fund_id=fund_id, metric_name=METRIC, start=dt.date(2026, 3, 1), end=dt.date(2026, 3, 6))
+        assert daily.periods[0] == dt.date(2026, 3, 1) and len(daily.periods) == 6
+        assert set(daily.investment_ids) == {alpha.id, beta.id}
+        beta_row = daily.values[daily.investment_ids.index(beta.id)]
+        np.testing.assert_array_equal(np.isnan(beta_row), [False, True, False, False, True, True])
+
+        weekly = load_metric_series(
+            db,
+            fund_id=fund_id,
+            metric_name=METRIC,
+            start=dt.date(2026, 3, 4),
+            end=dt.date(2026, 3, 10),
+            granularity="WEEK",
+            statistic="max",
+            investment_ids=[alpha.id],
+        )
+        assert weekly.periods == (dt.date(2026, 3, 2), dt.date(2026, 3, 9))
+        np.testing.assert_array_equal(weekly.values, [[110.0, np.nan]])
+
+        monthly = load_metric_series(
+            db, fund_id=fund_id, metric_name=METRIC, start=dt.date(2026, 2, 1), end=dt.date(2026, 3, 31), granularity="MONTH", statistic="mean"
+        )
+        assert monthly.values.shape == (2, 2)
+        assert not np.isnan(monthly.values).any()
+
+        # Decades of daily points would be a huge dense array: the caller must pick a coarser granularity.
+        decades = {"fund_id": fund_id, "metric_name": METRIC, "start": dt.date(2000, 1, 1), "end": dt.date(2026, 3, 31)}
+        with pytest.raises(ValueError, match=f"exceeds {MAX_SERIES_PERIODS} day periods"):
+            load_metric_series(db, **decades)
+        assert load_metric_series(db, **decades, granularity="MONTH").values.shape == (2, 315)
+
+        with pytest.raises(ValueError, match="Unsupported rollup statistic"):
+            load_metric_series(db, fund_id=fund_id, metric_name=METRIC, start=dt.date(2026, 3, 1), end=dt.date(2026, 3, 6), statistic="p99")
+    finally:
+        db.close()
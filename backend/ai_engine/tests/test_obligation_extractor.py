@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+import uuid
+
+import pytest
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine import obligation_extractor
+from ai_engine.obligation_extractor import OBLIGATION_SENTENCE_RE, extract_obligation_register, iter_sentences
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import ObligationRegister
+from app.services.search_index import IndexingResult
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+from ai_engine.tests.test_corpus_cache import _add_chunk
+from ai_engine.tests.test_wave_ai5_linking import _seed_document
+
+
+class _RecordingSearchClient:
+    def upsert_documents(self, *, items: list[dict]) -> IndexingResult:
+        return IndexingResult(succeeded=len(items))
+
+
+def test_sentences_stream_across_chunk_boundaries():
+    chunks = ["Intro. The Manager shall", "deliver reports quarterly. Next!  Final words", "end here."]
+    assert list(iter_sentences(chunks)) == OBLIGATION_SENTENCE_RE.split("\n".join(chunks))
+    assert list(iter_sentences([])) == []
+
+
+def _seed_memoranda(db: Session, fund_id: uuid.UUID, count: int, clauses: int):
+    docs = []
+    for n in range(count):
+        doc = _seed_document(db, fund_id=fund_id, container="fund-constitution-governance", title=f"OM-{n}.pdf", authority="BINDING")
+        doc.institutional_type = "LEGAL_BINDING"
+        docs.append(doc)
+    db.flush()
+    for doc in docs:
+        for i in range(clauses):
+            _add_chunk(db, doc, i, f"Clause {i}: the Administrator must file return {i} within 30 days after quarter end. Background text")
+    db.commit()
+    return docs
+
+
+def test_obligation_register_reads_every_chunk_and_upserts(monkeypatch):
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    monkeypatch.setattr(obligation_extractor, "AzureSearchMetadataClient", _RecordingSearchClient)
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Obligation Fund"))
+        docs = _seed_memoranda(db, fund_id, count=2, clauses=150)
+        title_only = _seed_document(db, fund_id=fund_id, container="regulatory-library-cima", title="Must file annually.pdf", authority="BINDING")
+        title_only.institutional_type = "REGULATORY_CIMA"
+        db.commit()
+
+        saved = extract_obligation_register(db, fund_id=fund_id, actor_id="t")
+        assert len(saved) == 2 * 150 + 1
+        first = next(row for row in saved if row.source_documents[0]["versionId"] == str(docs[0].version_id) and "return 149 " in row.obligation_text)
+        assert first.due_rule == "within 30 days after quarter end"
+        assert (first.due_date, first.recurrence) == (None, "EVENT+30D")
+        assert first.responsible_party == "Fund Administrator"
+
+        again = extract_obligation_register(db, fund_id=fund_id, actor_id="t2")
+        assert sorted(row.obligation_id for row in again) == sorted(row.obligation_id for row in saved)
+        assert db.execute(select(func.count()).select_from(ObligationRegister)).scalar_one() == 301
+        assert {row.updated_by for row in db.execute(select(ObligationRegister)).scalars()} == {"t2"}
+    finally:
+        db.close()
+
+
+def test_obligation_register_parallel_matches_serial(monkeypatch):
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    monkeypatch.setattr(obligation_extractor, "AzureSearchMetadataClient", _RecordingSearchClient)
+    monkeypatch.setattr(obligation_extractor, "PARALLEL_MIN_DOCUMENTS", 2)
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Parallel Obligation Fund"))
+        _seed_memoranda(db, fund_id, count=6, clauses=12)
+
+        serial = extract_obligation_register(db, fund_id=fund_id, actor_id="t", max_workers=1)
+        expected = [(row.obligation_id, row.due_rule, row.responsible_party) for row in serial]
+        parallel = extract_obligation_register(db, fund_id=fund_id, actor_id="t", max_workers=2)
+        assert [(row.obligation_id, row.due_rule, row.responsible_party) for row in parallel] == expected
+        assert len(expected) == 72
+    finally:
+        db.close()
+
+
+def _extract_in_child(conn, database_url: str, fund_id: uuid.UUID) -> None:
+    engine = create_engine(database_url)
+    try:
+        with sessionmaker(bind=engine, class_=Session)() as db:
+            conn.send(len(extract_obligation_register(db, fund_id=fund_id, actor_id="t", max_workers=2)))
+    except Exception as exc:
+        conn.send(repr(exc))
+    finally:
+        engine.dispose()
+        conn.close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="relies on fork to share monkeypatched settings")
+def test_obligation_register_runs_serially_inside_daemon_worker(tmp_path, monkeypatch):
+    database_url = f"sqlite+pysqlite:///{tmp_path / 'obligations.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(obligation_extractor, "AzureSearchMetadataClient", _RecordingSearchClient)
+    monkeypatch.setattr(obligation_extractor, "PARALLEL_MIN_DOCUMENTS", 2)
+    fund_id = uuid.uuid4()
+    with sessionmaker(bind=engine, class_=Session)() as db:
+        db.add(Fund(id=fund_id, name="Daemon Obligation Fund"))
+        _seed_memoranda(db, fund_id, count=4, clauses=3)
+    engine.dispose()
+
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    worker = context.Process(target=_extract_in_child, args=(sender, database_url, fund_id), daemon=True)
+    worker.start()
+    sender.close()
+    assert receiver.poll(60)
+    assert receiver.recv() == 12
+    worker.join(timeout=10)
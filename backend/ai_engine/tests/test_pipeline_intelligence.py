@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import sys
+import uuid
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.pipeline_intelligence import PIPELINE_CONTAINER, run_pipeline_ingest
+from app.core.db.base import Base
+from app.core.db.models import Fund
+from app.modules.ai.models import DealDocumentIntelligence, DealICBrief, DealIntelligenceProfile, DealRiskFlag, KnowledgeAnchor, PipelineAlert
+from app.modules.deals.models import Deal
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+from ai_engine.tests.test_wave_ai5_linking import _seed_document
+
+
+def _seed_pipeline(db: Session, *, fund_id: uuid.UUID, deals: int) -> None:
+    db.add(Fund(id=fund_id, name=f"Pipeline Fund {deals}"))
+    for i in range(deals):
+        for name, doc_type in (("memo.pdf", "INVESTMENT_MEMO"), ("terms.pdf", "SERVICE_PROVIDER_CONTRACT")):
+            doc = _seed_document(db, fund_id=fund_id, container=PIPELINE_CONTAINER, title=f"Deal-{i}-{name}", authority="INTELLIGENCE")
+            doc.blob_path = f"Deal-{i}/{name}"
+            doc.detected_doc_type = doc_type
+            db.flush()
+            if name == "memo.pdf":
+                db.add(
+                    KnowledgeAnchor(
+                        fund_id=fund_id,
+                        access_level="internal",
+                        doc_id=doc.id,
+                        anchor_type="TARGET_RETURN",
+                        anchor_value=f"Target return {6 + i % 4}% with leverage covenant",
+                        created_by="t",
+                        updated_by="t",
+                    )
+                )
+    db.commit()
+
+
+def _ingest_statements(deals: int) -> tuple[list[str], list[str], Session, uuid.UUID]:
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    fund_id = uuid.uuid4()
+    _seed_pipeline(db, fund_id=fund_id, deals=deals)
+
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split(None, 1)[0].upper())
+
+    first = run_pipeline_ingest(db, fund_id=fund_id, actor_id="t")
+    assert first["deals"] == deals
+    assert first["dealDocuments"] == 2 * deals
+    assert first["profiles"] == first["briefs"] == deals
+    first_run = list(statements)
+
+    statements.clear()
+    second = run_pipeline_ingest(db, fund_id=fund_id, actor_id="t2")
+    assert second["deals"] == deals
+    assert second["alerts"] == 0
+    return first_run, list(statements), db, fund_id
+
+
+def test_pipeline_ingest_runs_constant_queries_per_pipeline():
+    small_first, small_second, small_db, _ = _ingest_statements(3)
+    large_first, large_second, db, fund_id = _ingest_statements(40)
+    small_db.close()
+    try:
+        assert len(large_first) == len(small_first)
+        assert len(large_second) == len(small_second)
+
+        assert len(db.execute(select(Deal).where(Deal.fund_id == fund_id)).scalars().all()) == 40
+        assert len(db.execute(select(DealDocumentIntelligence)).scalars().all()) == 80
+        profile = db.execute(
+            select(DealIntelligenceProfile).join(Deal, Deal.id == DealIntelligenceProfile.deal_id).where(Deal.deal_name == "Deal-1")
+        ).scalar_one()
+        assert (profile.strategy_type, profile.target_return, profile.risk_band, profile.updated_by) == ("Direct Lending", "7%", "HIGH", "t2")
+
+        # Flags are replaced, not accumulated, across runs.
+        assert len(db.execute(select(DealRiskFlag).where(DealRiskFlag.deal_id == profile.deal_id)).scalars().all()) == 1
+        brief = db.execute(select(DealICBrief).where(DealICBrief.deal_id == profile.deal_id)).scalar_one()
+        assert (brief.recommendation_signal, brief.updated_by) == ("CAUTION", "t2")
+        alert_types = sorted(db.execute(select(PipelineAlert.alert_type).where(PipelineAlert.deal_id == profile.deal_id)).scalars())
+        assert alert_types == ["RISK_BAND_CHANGE", "TARGET_RETURN_DROP"]
+    finally:
+        db.close()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from ai_engine.stage_dag import Stage, run_dag
+from app.core.db.base import Base
+from app.modules.ai.models import StageCheckpoint
+
+from app.core.db import models as _core_models  # noqa: F401
+from app.modules.ai import models as _ai_models  # noqa: F401
+from app.modules.documents import models as _documents_models  # noqa: F401
+from app.modules.deals import models as _deals_models  # noqa: F401
+
+
+def _session() -> Session:
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+
+
+def test_independent_stages_run_concurrently_and_record_checkpoints():
+    db = _session()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _branch(rows: int):
+        def _run(session, ctx):
+            barrier.wait()  # only passes if both branches are in flight together
+            return [None] * rows
+
+        return _run
+
+    stages = (
+        Stage("join", lambda session, ctx: {"seen": ctx.counts["left"]["rows"] + ctx.counts["right"]["rows"]}, inputs=("l", "r"), outputs=("j",)),
+        Stage("left", _branch(2), inputs=("root",), outputs=("l",)),
+        Stage("right", _branch(3), inputs=("root",), outputs=("r",)),
+        Stage("root", lambda session, ctx: 1, inputs=("external",), outputs=("root",)),
+    )
+    try:
+        fund_id = uuid.uuid4()
+        run = run_dag(db, pipeline="test", stages=stages, fund_id=fund_id, max_workers=2)
+        assert run.status == "OK"
+        assert [o.stage for o in run.outcomes] == ["root", "left", "right", "join"]
+        assert run.counts("join") == {"seen": 5}
+
+        rows = db.execute(select(StageCheckpoint).where(StageCheckpoint.run_id == run.run_id)).scalars().all()
+        assert {row.stage: (row.status, row.row_counts) for row in rows} == {
+            "root": ("OK", {"rows": 1}),
+            "left": ("OK", {"rows": 2}),
+            "right": ("OK", {"rows": 3}),
+            "join": ("OK", {"seen": 5}),
+        }
+        assert all(row.duration_ms >= 0 and len(row.inputs_fingerprint) == 64 for row in rows)
+    finally:
+        db.close()
+
+
+def test_failed_run_resumes_from_failed_stage():
+    db = _session()
+    calls: list[str] = []
+    attempts = {"parse": 0}
+
+    def _load(session, ctx):
+        calls.append("load")
+        return [1, 2, 3]
+
+    def _parse(session, ctx):
+        calls.append("parse")
+        attempts["parse"] += 1
+        if attempts["parse"] == 1:
+            raise RuntimeError("transient")
+        return [1, 2]
+
+    def _index(session, ctx):
+        calls.append("index")
+        return [1]
+
+    def _report(session, ctx):
+        calls.append("report")
+        return {"parsed": ctx.counts["parse"]["rows"]}
+
+    stages = (
+        Stage("load", _load, outputs=("raw",)),
+        Stage("parse", _parse, inputs=("raw",), outputs=("parsed",)),
+        Stage("index", _index, inputs=("raw",), outputs=("index",)),
+        Stage("report", _report, inputs=("parsed", "index"), outputs=("report",)),
+    )
+    try:
+        fund_id = uuid.uuid4()
+        failed = run_dag(db, pipeline="test", stages=stages, fund_id=fund_id)
+        assert [(o.stage, o.status) for o in failed.outcomes] == [("load", "OK"), ("parse", "FAILED"), ("index", "OK"), ("report", "SKIPPED")]
+        assert "transient" in failed.outcomes[1].error
+        with pytest.raises(RuntimeError, match="transient"):
+            failed.raise_for_failure()
+
+        calls.clear()
+        resumed = run_dag(db, pipeline="test", stages=stages, fund_id=fund_id, resume=True)
+        assert calls == ["parse", "report"]
+        assert [(o.stage, o.status) for o in resumed.outcomes] == [("load", "REUSED"), ("parse", "OK"), ("index", "REUSED"), ("report", "OK")]
+        assert resumed.counts("report") == {"parsed": 2}
+
+        calls.clear()
+        run_dag(db, pipeline="test", stages=stages, fund_id=fund_id, resume=True)
+        assert calls == ["load", "parse", "index", "report"]  # last run succeeded: nothing to resume
+    finally:
+        db.close()
+
+
+def test_stage_dag_rejects_cycles_and_duplicate_outputs():
+    db = _session()
+    noop = lambda session, ctx: None  # noqa: E731
+    try:
+        with pytest.raises(ValueError, match="cycle"):
+            run_dag(db, pipeline="t", stages=(Stage("a", noop, inputs=("b",), outputs=("a",)), Stage("b", noop, inputs=("a",), outputs=("b",))), fund_id=uuid.uuid4())
+        with pytest.raises(ValueError, match="produced by both"):
+            run_dag(db, pipeline="t", stages=(Stage("a", noop, outputs=("x",)), Stage("b", noop, outputs=("x",))), fund_id=uuid.uuid4())
+    finally:
+        db.close()
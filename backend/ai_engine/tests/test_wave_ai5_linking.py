@@ -11,10 +11,11 @@ from sqlalchemy.pool import StaticPool
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
+from ai_engine import linker
 from ai_engine.linker import run_cross_container_linking
 from app.core.db.base import Base
 from app.core.db.models import Fund
-from app.modules.ai.models import KnowledgeLink, ObligationEvidenceMap, ObligationRegister, DocumentRegistry
+from app.modules.ai.models import KnowledgeLink, KnowledgeLinkState, ObligationEvidenceMap, ObligationRegister, DocumentRegistry
 from app.modules.documents.models import Document, DocumentVersion
 
 # Ensure metadata registration
@@ -220,3 +221,127 @@ def test_wave_ai5_cross_container_linking_governance_rules():
         assert any(row.satisfaction_status in {"MATCHED", "PARTIAL"} for row in obligation_map)
     finally:
         db.close()
+
+
+def test_wave_ai5_linking_is_incremental_across_runs():
+    engine = create_engine(
+        "sqlite+pysqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)
+
+    db = TestingSessionLocal()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Incremental Linking Fund"))
+        db.flush()
+
+        rulebook = _seed_document(
+            db,
+            fund_id=fund_id,
+            container="regulatory-library-cima",
+            title="CIMA Rulebook Quarterly Reporting.pdf",
+            authority="BINDING",
+        )
+        _seed_document(
+            db,
+            fund_id=fund_id,
+            container="portfolio-monitoring-evidence",
+            title="Annual Valuation Evidence Package.pdf",
+            authority="EVIDENCE",
+        )
+        db.add(
+            ObligationRegister(
+                fund_id=fund_id,
+                access_level="internal",
+                obligation_id="OB-INC-001",
+                source="CIMA",
+                obligation_text="Manager shall submit quarterly report",
+                frequency="Quarterly",
+                due_rule="within 30 days after quarter end",
+                responsible_party="Investment Manager",
+                evidence_expected="Quarterly report filing",
+                status="MissingEvidence",
+                source_documents=[],
+                as_of=_now(),
+                data_latency=None,
+                data_quality="OK",
+                created_by="t",
+                updated_by="t",
+            )
+        )
+        db.commit()
+
+        first = run_cross_container_linking(db, fund_id=fund_id, actor_id="t", as_of=_now())
+        assert first["payload"]["documentsRelinked"] == 2
+
+        second = run_cross_container_linking(db, fund_id=fund_id, actor_id="t2", as_of=_now())
+        assert second["payload"]["documentsRelinked"] == 0
+        assert second["payload"]["documentsSkipped"] == 2
+        state_writers = select(KnowledgeLinkState.document_id, KnowledgeLinkState.updated_by)
+        assert {writer for _, writer in db.execute(state_writers)} == {"t"}
+
+        rulebook.checksum = "changed"
+        db.commit()
+        third = run_cross_container_linking(db, fund_id=fund_id, actor_id="t3", as_of=_now())
+        assert third["payload"]["documentsRelinked"] == 1
+        assert [doc_id for doc_id, writer in db.execute(state_writers) if writer == "t3"] == [rulebook.id]
+
+        # A new obligation only re-scans unchanged documents against its own terms.
+        db.add(
+            ObligationRegister(
+                fund_id=fund_id,
+                access_level="internal",
+                obligation_id="OB-INC-002",
+                source="CIMA",
+                obligation_text="Administrator shall deliver annual valuation",
+                frequency="Annual",
+                due_rule="within 90 days after year end",
+                responsible_party="Administrator",
+                evidence_expected="Annual valuation",
+                status="MissingEvidence",
+                source_documents=[],
+                as_of=_now(),
+                data_latency=None,
+                data_quality="OK",
+                created_by="t",
+                updated_by="t",
+            )
+        )
+        db.commit()
+        fourth = run_cross_container_linking(db, fund_id=fund_id, actor_id="t", as_of=_now())
+        assert fourth["payload"]["documentsRelinked"] == 2
+        links = list(db.execute(select(KnowledgeLink).where(KnowledgeLink.fund_id == fund_id)).scalars().all())
+        assert any(
+            link.link_type == "REFERENCES" and (link.evidence_snippet or "").startswith("Annual Valuation")
+            for link in links
+        )
+
+        rebuilt = run_cross_container_linking(db, fund_id=fund_id, actor_id="t", as_of=_now(), full_rebuild=True)
+        assert rebuilt["payload"]["documentsRelinked"] == 2
+        assert rebuilt["payload"]["linksCreated"] == 0
+    finally:
+        db.close()
+
+
+def test_link_document_uses_an_empty_caller_matcher(monkeypatch):
+    engine = create_engine("sqlite+pysqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)()
+    try:
+        fund_id = uuid.uuid4()
+        db.add(Fund(id=fund_id, name="Matcher Fund"))
+        doc = _seed_document(db, fund_id=fund_id, container="regulatory-library-cima", title="Rulebook.pdf", authority="BINDING")
+        db.commit()
+
+        empty = linker.EntityTermMatcher([])
+
+        def _rebuilt(entity_index):
+            raise AssertionError("an empty matcher passed by the caller must not be rebuilt")
+
+        monkeypatch.setattr(linker, "EntityTermMatcher", _rebuilt)
+        assert linker.link_document(db, fund_id=fund_id, document_id=doc.id, entity_index=[], matcher=empty) == 0
+    finally:
+        db.close()
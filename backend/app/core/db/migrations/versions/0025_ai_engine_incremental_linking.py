@@ -0,0 +1,50 @@
+"""AI engine incremental cross-container linking state.
+
+Revision ID: 0025_ai_engine_incremental_linking
+Revises: 0024_ai_engine_wave_ai5_cross_container_linking
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0025_ai_engine_incremental_linking"
+down_revision = "0024_ai_engine_wave_ai5_cross_container_linking"
+
+
+def upgrade() -> None:
+    op.add_column("knowledge_entities", sa.Column("terms_fingerprint", sa.String(length=64), nullable=True))
+
+    op.create_table(
+        "knowledge_link_state",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("fund_id", sa.Uuid(), nullable=False),
+        sa.Column("access_level", sa.String(length=32), nullable=False, server_default="internal"),
+        sa.Column("document_id", sa.Uuid(), sa.ForeignKey("document_registry.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("content_fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("entity_index_version", sa.String(length=64), nullable=False),
+        sa.Column("linked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("created_by", sa.String(length=128), nullable=True),
+        sa.Column("updated_by", sa.String(length=128), nullable=True),
+    )
+    op.create_index("ix_knowledge_link_state_fund_id", "knowledge_link_state", ["fund_id"])
+    op.create_index("ix_knowledge_link_state_access_level", "knowledge_link_state", ["access_level"])
+    op.create_index("ix_knowledge_link_state_document_id", "knowledge_link_state", ["document_id"])
+    op.create_index("ix_knowledge_link_state_entity_index_version", "knowledge_link_state", ["entity_index_version"])
+    op.create_index("ix_knowledge_link_state_linked_at", "knowledge_link_state", ["linked_at"])
+    op.create_index("ix_knowledge_link_state_fund_document", "knowledge_link_state", ["fund_id", "document_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_knowledge_link_state_fund_document", table_name="knowledge_link_state")
+    op.drop_index("ix_knowledge_link_state_linked_at", table_name="knowledge_link_state")
+    op.drop_index("ix_knowledge_link_state_entity_index_version", table_name="knowledge_link_state")
+    op.drop_index("ix_knowledge_link_state_document_id", table_name="knowledge_link_state")
+    op.drop_index("ix_knowledge_link_state_access_level", table_name="knowledge_link_state")
+    op.drop_index("ix_knowledge_link_state_fund_id", table_name="knowledge_link_state")
+    op.drop_table("knowledge_link_state")
+
+    op.drop_column("knowledge_entities", "terms_fingerprint")
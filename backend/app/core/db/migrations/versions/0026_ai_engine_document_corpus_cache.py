@@ -0,0 +1,45 @@
+"""AI engine shared normalized document corpus cache.
+
+Revision ID: 0026_ai_engine_document_corpus_cache
+Revises: 0025_ai_engine_incremental_linking
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0026_ai_engine_document_corpus_cache"
+down_revision = "0025_ai_engine_incremental_linking"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_corpus_cache",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("fund_id", sa.Uuid(), nullable=False),
+        sa.Column("access_level", sa.String(length=32), nullable=False, server_default="internal"),
+        sa.Column("version_id", sa.Uuid(), sa.ForeignKey("document_versions.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("version_checksum", sa.String(length=128), nullable=True),
+        sa.Column("chunk_count", sa.Integer(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("normalized_text", sa.Text(), nullable=False),
+        sa.Column("tokens", sa.JSON(), nullable=False),
+        sa.Column("built_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("created_by", sa.String(length=128), nullable=True),
+        sa.Column("updated_by", sa.String(length=128), nullable=True),
+    )
+    op.create_index("ix_document_corpus_cache_fund_id", "document_corpus_cache", ["fund_id"])
+    op.create_index("ix_document_corpus_cache_access_level", "document_corpus_cache", ["access_level"])
+    op.create_index("ix_document_corpus_cache_version_id", "document_corpus_cache", ["version_id"])
+    op.create_index("ix_document_corpus_cache_fund_version", "document_corpus_cache", ["fund_id", "version_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_corpus_cache_fund_version", table_name="document_corpus_cache")
+    op.drop_index("ix_document_corpus_cache_version_id", table_name="document_corpus_cache")
+    op.drop_index("ix_document_corpus_cache_access_level", table_name="document_corpus_cache")
+    op.drop_index("ix_document_corpus_cache_fund_id", table_name="document_corpus_cache")
+    op.drop_table("document_corpus_cache")
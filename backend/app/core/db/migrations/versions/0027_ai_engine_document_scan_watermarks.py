@@ -0,0 +1,47 @@
+"""AI engine per-container watermarks for delta registry scans.
+
+Revision ID: 0027_ai_engine_document_scan_watermarks
+Revises: 0026_ai_engine_document_corpus_cache
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0027_ai_engine_document_scan_watermarks"
+down_revision = "0026_ai_engine_document_corpus_cache"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_scan_watermarks",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("fund_id", sa.Uuid(), nullable=False),
+        sa.Column("access_level", sa.String(length=32), nullable=False, server_default="internal"),
+        sa.Column("container_name", sa.String(length=120), nullable=False),
+        sa.Column("last_modified_utc", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("blobs_seen", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("scanned_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("created_by", sa.String(length=128), nullable=True),
+        sa.Column("updated_by", sa.String(length=128), nullable=True),
+    )
+    op.create_index("ix_document_scan_watermarks_fund_id", "document_scan_watermarks", ["fund_id"])
+    op.create_index("ix_document_scan_watermarks_access_level", "document_scan_watermarks", ["access_level"])
+    op.create_index("ix_document_scan_watermarks_container_name", "document_scan_watermarks", ["container_name"])
+    op.create_index(
+        "ix_document_scan_watermarks_fund_container",
+        "document_scan_watermarks",
+        ["fund_id", "container_name"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_scan_watermarks_fund_container", table_name="document_scan_watermarks")
+    op.drop_index("ix_document_scan_watermarks_container_name", table_name="document_scan_watermarks")
+    op.drop_index("ix_document_scan_watermarks_access_level", table_name="document_scan_watermarks")
+    op.drop_index("ix_document_scan_watermarks_fund_id", table_name="document_scan_watermarks")
+    op.drop_table("document_scan_watermarks")
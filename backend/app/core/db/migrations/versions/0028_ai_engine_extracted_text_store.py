@@ -0,0 +1,44 @@
+"""AI engine content-addressed extracted-text store.
+
+Revision ID: 0028_ai_engine_extracted_text_store
+Revises: 0027_ai_engine_document_scan_watermarks
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0028_ai_engine_extracted_text_store"
+down_revision = "0027_ai_engine_document_scan_watermarks"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_extracted_text",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("fund_id", sa.Uuid(), nullable=False),
+        sa.Column("access_level", sa.String(length=32), nullable=False, server_default="internal"),
+        sa.Column("content_key", sa.String(length=400), nullable=False),
+        sa.Column("extraction_method", sa.String(length=40), nullable=False),
+        sa.Column("page_count", sa.Integer(), nullable=False),
+        sa.Column("pages", sa.JSON(), nullable=False),
+        sa.Column("text_chars", sa.Integer(), nullable=False),
+        sa.Column("extracted_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("created_by", sa.String(length=128), nullable=True),
+        sa.Column("updated_by", sa.String(length=128), nullable=True),
+    )
+    op.create_index("ix_document_extracted_text_fund_id", "document_extracted_text", ["fund_id"])
+    op.create_index("ix_document_extracted_text_access_level", "document_extracted_text", ["access_level"])
+    op.create_index("ix_document_extracted_text_content_key", "document_extracted_text", ["content_key"])
+    op.create_index("ix_document_extracted_text_fund_key", "document_extracted_text", ["fund_id", "content_key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_extracted_text_fund_key", table_name="document_extracted_text")
+    op.drop_index("ix_document_extracted_text_content_key", table_name="document_extracted_text")
+    op.drop_index("ix_document_extracted_text_access_level", table_name="document_extracted_text")
+    op.drop_index("ix_document_extracted_text_fund_id", table_name="document_extracted_text")
+    op.drop_table("document_extracted_text")
@@ -0,0 +1,23 @@
+"""AI engine input fingerprints for skip-unchanged classification.
+
+Revision ID: 0029_ai_engine_classification_fingerprints
+Revises: 0028_ai_engine_extracted_text_store
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0029_ai_engine_classification_fingerprints"
+down_revision = "0028_ai_engine_extracted_text_store"
+
+
+def upgrade() -> None:
+    op.add_column("document_classifications", sa.Column("input_fingerprint", sa.String(length=64), nullable=True))
+    op.add_column("document_governance_profile", sa.Column("input_fingerprint", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("document_governance_profile", "input_fingerprint")
+    op.drop_column("document_classifications", "input_fingerprint")
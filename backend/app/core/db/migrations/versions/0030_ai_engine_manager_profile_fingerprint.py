@@ -0,0 +1,21 @@
+"""AI engine input fingerprint for skip-unchanged manager profiles.
+
+Revision ID: 0030_ai_engine_manager_profile_fingerprint
+Revises: 0029_ai_engine_classification_fingerprints
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0030_ai_engine_manager_profile_fingerprint"
+down_revision = "0029_ai_engine_classification_fingerprints"
+
+
+def upgrade() -> None:
+    op.add_column("manager_profiles", sa.Column("input_fingerprint", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("manager_profiles", "input_fingerprint")
@@ -0,0 +1,56 @@
+"""AI engine stage checkpoints and timings for the DAG executor.
+
+Revision ID: 0031_ai_engine_stage_checkpoints
+Revises: 0030_ai_engine_manager_profile_fingerprint
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0031_ai_engine_stage_checkpoints"
+down_revision = "0030_ai_engine_manager_profile_fingerprint"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_stage_checkpoints",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("fund_id", sa.Uuid(), nullable=False),
+        sa.Column("access_level", sa.String(length=32), nullable=False, server_default="internal"),
+        sa.Column("run_id", sa.Uuid(), nullable=False),
+        sa.Column("pipeline", sa.String(length=80), nullable=False),
+        sa.Column("stage", sa.String(length=80), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("inputs_fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("duration_ms", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("row_counts", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("created_by", sa.String(length=128), nullable=True),
+        sa.Column("updated_by", sa.String(length=128), nullable=True),
+    )
+    op.create_index("ix_ai_stage_checkpoints_fund_id", "ai_stage_checkpoints", ["fund_id"])
+    op.create_index("ix_ai_stage_checkpoints_access_level", "ai_stage_checkpoints", ["access_level"])
+    op.create_index("ix_ai_stage_checkpoints_run_id", "ai_stage_checkpoints", ["run_id"])
+    op.create_index("ix_ai_stage_checkpoints_pipeline", "ai_stage_checkpoints", ["pipeline"])
+    op.create_index("ix_ai_stage_checkpoints_status", "ai_stage_checkpoints", ["status"])
+    op.create_index(
+        "ix_ai_stage_checkpoints_fund_pipeline_started",
+        "ai_stage_checkpoints",
+        ["fund_id", "pipeline", "started_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ai_stage_checkpoints_fund_pipeline_started", table_name="ai_stage_checkpoints")
+    op.drop_index("ix_ai_stage_checkpoints_status", table_name="ai_stage_checkpoints")
+    op.drop_index("ix_ai_stage_checkpoints_pipeline", table_name="ai_stage_checkpoints")
+    op.drop_index("ix_ai_stage_checkpoints_run_id", table_name="ai_stage_checkpoints")
+    op.drop_index("ix_ai_stage_checkpoints_access_level", table_name="ai_stage_checkpoints")
+    op.drop_index("ix_ai_stage_checkpoints_fund_id", table_name="ai_stage_checkpoints")
+    op.drop_table("ai_stage_checkpoints")
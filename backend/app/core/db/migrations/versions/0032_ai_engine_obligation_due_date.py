@@ -0,0 +1,56 @@
+"""AI engine typed obligation due dates for SQL-side overdue detection.
+
+Revision ID: 0032_ai_engine_obligation_due_date
+Revises: 0031_ai_engine_stage_checkpoints
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0032_ai_engine_obligation_due_date"
+down_revision = "0031_ai_engine_stage_checkpoints"
+
+
+def _parse_due_date(rule: str | None) -> dt.date | None:
+    # Frozen copy of ai_engine.obligation_extractor.parse_due_date for the backfill.
+    for token in (rule or "").strip().replace("Due on", "").split():
+        try:
+            if len(token) == 10 and token[4] == "-" and token[7] == "-":
+                return dt.date.fromisoformat(token)
+        except ValueError:
+            continue
+    return None
+
+
+def upgrade() -> None:
+    op.add_column("obligation_register", sa.Column("due_date", sa.Date(), nullable=True))
+    op.add_column("obligation_register", sa.Column("recurrence", sa.String(length=40), nullable=True))
+    op.create_index(
+        "ix_obligation_register_fund_status_due_date",
+        "obligation_register",
+        ["fund_id", "status", "due_date"],
+    )
+
+    # Backfill dated rules; recurrence is filled by the next extraction run.
+    bind = op.get_bind()
+    register = sa.table("obligation_register", sa.column("id", sa.Uuid()), sa.column("due_rule", sa.String()), sa.column("due_date", sa.Date()))
+    updates = [
+        {"row_id": row.id, "due_date": due_date}
+        for row in bind.execute(sa.select(register.c.id, register.c.due_rule).where(register.c.due_rule.like("%-%-%")))
+        if (due_date := _parse_due_date(row.due_rule)) is not None
+    ]
+    if updates:
+        bind.execute(
+            register.update().where(register.c.id == sa.bindparam("row_id")).values(due_date=sa.bindparam("due_date")),
+            updates,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_obligation_register_fund_status_due_date", table_name="obligation_register")
+    op.drop_column("obligation_register", "recurrence")
+    op.drop_column("obligation_register", "due_date")
@@ -0,0 +1,46 @@
+"""AI engine cash-impact watermarks for incremental transaction matching.
+
+Revision ID: 0033_ai_engine_cash_impact_watermarks
+Revises: 0032_ai_engine_obligation_due_date
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0033_ai_engine_cash_impact_watermarks"
+down_revision = "0032_ai_engine_obligation_due_date"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cash_impact_watermarks",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("fund_id", sa.Uuid(), nullable=False),
+        sa.Column("access_level", sa.String(length=32), nullable=False, server_default="internal"),
+        sa.Column("matcher_fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("last_transaction_updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("transactions_seen", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("evaluated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("created_by", sa.String(length=128), nullable=True),
+        sa.Column("updated_by", sa.String(length=128), nullable=True),
+    )
+    op.create_index("ix_cash_impact_watermarks_fund_id", "cash_impact_watermarks", ["fund_id"])
+    op.create_index("ix_cash_impact_watermarks_access_level", "cash_impact_watermarks", ["access_level"])
+    op.create_index("ix_cash_impact_watermarks_fund", "cash_impact_watermarks", ["fund_id"], unique=True)
+    op.create_index(
+        "ix_cash_transactions_fund_updated_at",
+        "cash_transactions",
+        ["fund_id", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cash_transactions_fund_updated_at", table_name="cash_transactions")
+    op.drop_index("ix_cash_impact_watermarks_fund", table_name="cash_impact_watermarks")
+    op.drop_index("ix_cash_impact_watermarks_access_level", table_name="cash_impact_watermarks")
+    op.drop_index("ix_cash_impact_watermarks_fund_id", table_name="cash_impact_watermarks")
+    op.drop_table("cash_impact_watermarks")
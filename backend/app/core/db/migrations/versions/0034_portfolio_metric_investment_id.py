@@ -0,0 +1,52 @@
+"""Promote portfolio metric investmentId from JSON metadata to an indexed column.
+
+Revision ID: 0034_portfolio_metric_investment_id
+Revises: 0033_ai_engine_cash_impact_watermarks
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0034_portfolio_metric_investment_id"
+down_revision = "0033_ai_engine_cash_impact_watermarks"
+
+
+def _investment_id(meta: object) -> uuid.UUID | None:
+    raw = meta.get("investmentId") if isinstance(meta, dict) else None
+    try:
+        return uuid.UUID(str(raw)) if raw else None
+    except ValueError:
+        return None
+
+
+def upgrade() -> None:
+    op.add_column("portfolio_metrics", sa.Column("investment_id", sa.Uuid(), nullable=True))
+    op.create_index("ix_portfolio_metrics_investment_id", "portfolio_metrics", ["investment_id"])
+    op.create_index(
+        "ix_portfolio_metrics_fund_investment_as_of",
+        "portfolio_metrics",
+        ["fund_id", "investment_id", "as_of"],
+    )
+
+    bind = op.get_bind()
+    metrics = sa.table("portfolio_metrics", sa.column("id", sa.Uuid()), sa.column("metadata", sa.JSON()), sa.column("investment_id", sa.Uuid()))
+    updates = [
+        {"row_id": row.id, "investment_id": investment_id}
+        for row in bind.execute(sa.select(metrics.c.id, metrics.c.metadata).where(metrics.c.metadata.is_not(None)))
+        if (investment_id := _investment_id(row.metadata)) is not None
+    ]
+    if updates:
+        bind.execute(
+            metrics.update().where(metrics.c.id == sa.bindparam("row_id")).values(investment_id=sa.bindparam("investment_id")),
+            updates,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_portfolio_metrics_fund_investment_as_of", table_name="portfolio_metrics")
+    op.drop_index("ix_portfolio_metrics_investment_id", table_name="portfolio_metrics")
+    op.drop_column("portfolio_metrics", "investment_id")
@@ -0,0 +1,144 @@
+"""AI engine typed metric series with weekly/monthly rollups.
+
+Revision ID: 0035_ai_engine_metric_series
+Revises: 0034_portfolio_metric_investment_id
+"""
+
+from __future__ import annotations
+
+import uuid
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0035_ai_engine_metric_series"
+down_revision = "0034_portfolio_metric_investment_id"
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _audit_columns() -> list[sa.Column]:
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("created_by", sa.String(length=128), nullable=True),
+        sa.Column("updated_by", sa.String(length=128), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_metric_series",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("fund_id", sa.Uuid(), nullable=False),
+        sa.Column("access_level", sa.String(length=32), nullable=False, server_default="internal"),
+        sa.Column("investment_id", sa.Uuid(), sa.ForeignKey("active_investments.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("metric_name", sa.String(length=120), nullable=False),
+        sa.Column("as_of", sa.Date(), nullable=False),
+        sa.Column("value", sa.Float(), nullable=False),
+        *_audit_columns(),
+    )
+    op.create_index("ix_ai_metric_series_fund_id", "ai_metric_series", ["fund_id"])
+    op.create_index("ix_ai_metric_series_access_level", "ai_metric_series", ["access_level"])
+    op.create_index(
+        "ix_ai_metric_series_fund_investment_metric_as_of",
+        "ai_metric_series",
+        ["fund_id", "investment_id", "metric_name", "as_of"],
+        unique=True,
+    )
+    op.create_index("ix_ai_metric_series_fund_metric_as_of", "ai_metric_series", ["fund_id", "metric_name", "as_of"])
+    op.create_index("ix_ai_metric_series_as_of_brin", "ai_metric_series", ["as_of"], postgresql_using="brin")
+
+    op.create_table(
+        "ai_metric_rollups",
+        sa.Column("id", sa.Uuid(), primary_key=True, nullable=False),
+        sa.Column("fund_id", sa.Uuid(), nullable=False),
+        sa.Column("access_level", sa.String(length=32), nullable=False, server_default="internal"),
+        sa.Column("investment_id", sa.Uuid(), sa.ForeignKey("active_investments.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("metric_name", sa.String(length=120), nullable=False),
+        sa.Column("granularity", sa.String(length=8), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("points", sa.Integer(), nullable=False),
+        sa.Column("min_value", sa.Float(), nullable=False),
+        sa.Column("max_value", sa.Float(), nullable=False),
+        sa.Column("mean_value", sa.Float(), nullable=False),
+        sa.Column("last_value", sa.Float(), nullable=False),
+        *_audit_columns(),
+    )
+    op.create_index("ix_ai_metric_rollups_fund_id", "ai_metric_rollups", ["fund_id"])
+    op.create_index("ix_ai_metric_rollups_access_level", "ai_metric_rollups", ["access_level"])
+    op.create_index(
+        "ix_ai_metric_rollups_fund_investment_metric_period",
+        "ai_metric_rollups",
+        ["fund_id", "investment_id", "metric_name", "granularity", "period_start"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_ai_metric_rollups_fund_metric_granularity_period",
+        "ai_metric_rollups",
+        ["fund_id", "metric_name", "granularity", "period_start"],
+    )
+
+    # Seed the series from the AI4 metrics already recorded; rollups are rebuilt by the next pipeline run.
+    bind = op.get_bind()
+    metrics = sa.table(
+        "portfolio_metrics",
+        sa.column("fund_id", sa.Uuid()),
+        sa.column("investment_id", sa.Uuid()),
+        sa.column("metric_name", sa.String()),
+        sa.column("as_of", sa.Date()),
+        sa.column("metric_value", sa.Numeric()),
+        sa.column("created_at", sa.DateTime(timezone=True)),
+    )
+    investments = sa.table("active_investments", sa.column("id", sa.Uuid()))
+    series = sa.table(
+        "ai_metric_series",
+        sa.column("id", sa.Uuid()),
+        sa.column("fund_id", sa.Uuid()),
+        sa.column("access_level", sa.String()),
+        sa.column("investment_id", sa.Uuid()),
+        sa.column("metric_name", sa.String()),
+        sa.column("as_of", sa.Date()),
+        sa.column("value", sa.Float()),
+        sa.column("created_by", sa.String()),
+        sa.column("updated_by", sa.String()),
+    )
+    latest: dict[tuple, float] = {}
+    for row in bind.execute(
+        sa.select(metrics.c.fund_id, metrics.c.investment_id, metrics.c.metric_name, metrics.c.as_of, metrics.c.metric_value)
+        .join(investments, investments.c.id == metrics.c.investment_id)
+        .where(metrics.c.metric_name.like("AI4\\_%", escape="\\"), metrics.c.metric_value.is_not(None))
+        .order_by(metrics.c.created_at)
+    ):
+        latest[(row.fund_id, row.investment_id, row.metric_name, row.as_of)] = float(row.metric_value)
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "fund_id": fund_id,
+            "access_level": "internal",
+            "investment_id": investment_id,
+            "metric_name": metric_name,
+            "as_of": as_of,
+            "value": value,
+            "created_by": "migration",
+            "updated_by": "migration",
+        }
+        for (fund_id, investment_id, metric_name, as_of), value in latest.items()
+    ]
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        bind.execute(series.insert(), rows[start : start + BACKFILL_BATCH_SIZE])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ai_metric_rollups_fund_metric_granularity_period", table_name="ai_metric_rollups")
+    op.drop_index("ix_ai_metric_rollups_fund_investment_metric_period", table_name="ai_metric_rollups")
+    op.drop_index("ix_ai_metric_rollups_access_level", table_name="ai_metric_rollups")
+    op.drop_index("ix_ai_metric_rollups_fund_id", table_name="ai_metric_rollups")
+    op.drop_table("ai_metric_rollups")
+    op.drop_index("ix_ai_metric_series_as_of_brin", table_name="ai_metric_series")
+    op.drop_index("ix_ai_metric_series_fund_metric_as_of", table_name="ai_metric_series")
+    op.drop_index("ix_ai_metric_series_fund_investment_metric_as_of", table_name="ai_metric_series")
+    op.drop_index("ix_ai_metric_series_access_level", table_name="ai_metric_series")
+    op.drop_index("ix_ai_metric_series_fund_id", table_name="ai_metric_series")
+    op.drop_table("ai_metric_series")
@@ -0,0 +1,22 @@
+"""Board monitoring brief input fingerprint for incremental regeneration.
+
+Revision ID: 0036_board_brief_input_fingerprint
+Revises: 0035_ai_engine_metric_series
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0036_board_brief_input_fingerprint"
+down_revision = "0035_ai_engine_metric_series"
+
+
+def upgrade() -> None:
+    # Existing briefs start without a fingerprint and are regenerated once on the next run.
+    op.add_column("board_monitoring_briefs", sa.Column("input_fingerprint", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("board_monitoring_briefs", "input_fingerprint")
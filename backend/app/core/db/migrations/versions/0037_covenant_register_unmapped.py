@@ -0,0 +1,22 @@
+"""Allow fund-level (unmapped) rows in the covenant status register.
+
+Revision ID: 0037_covenant_register_unmapped
+Revises: 0036_board_brief_input_fingerprint
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0037_covenant_register_unmapped"
+down_revision = "0036_board_brief_input_fingerprint"
+
+
+def upgrade() -> None:
+    op.alter_column("covenant_status_register", "investment_id", existing_type=sa.Uuid(), nullable=True)
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DELETE FROM covenant_status_register WHERE investment_id IS NULL"))
+    op.alter_column("covenant_status_register", "investment_id", existing_type=sa.Uuid(), nullable=False)
@@ -107,6 +107,7 @@ class CashTransaction(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     __table_args__ = (
         CheckConstraint("currency = 'USD'", name="ck_cash_transactions_usd_only"),
         Index("ix_cash_transactions_fund_status", "fund_id", "status"),
+        Index("ix_cash_transactions_fund_updated_at", "fund_id", "updated_at"),
     )
 
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -7,12 +8,14 @@ from datetime import datetime, timezone
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from ai_engine.corpus_cache import invalidate_corpus
+from ai_engine.extracted_text import ExtractedText, get_extracted_texts, put_extracted_texts, sha256_key
 from app.core.db.audit import write_audit_event
 from app.domain.documents.enums import DocumentIngestionStatus
 from app.modules.documents.models import Document, DocumentChunk, DocumentVersion
 from app.services.blob_storage import download_bytes
 from app.services.chunking import chunk_pdf_pages
-from app.services.document_text_extractor import extract_pdf_pages
+from app.services.document_text_extractor import ExtractedPdfText, extract_pdf_pages
 from app.services.search_index import AzureSearchChunksClient
 
 
@@ -82,9 +85,26 @@ def _process_one(db: Session, *, fund_id: uuid.UUID, version: DocumentVersion, a
         if not version.blob_uri:
             raise ValueError("document_version.blob_uri is missing")
 
-        data = download_bytes(blob_uri=version.blob_uri)
-
-        extracted = extract_pdf_pages(data)
+        # Reuse text extracted for the same bytes before; otherwise parse once and store it.
+        content_key = sha256_key(version.checksum) if version.checksum else None
+        stored = get_extracted_texts(db, fund_id=fund_id, content_keys=[content_key] if content_key else [])
+        if content_key in stored:
+            extracted = ExtractedPdfText(pages=list(stored[content_key].pages))
+        else:
+            data = download_bytes(blob_uri=version.blob_uri)
+            extracted = extract_pdf_pages(data)
+            put_extracted_texts(
+                db,
+                fund_id=fund_id,
+                texts=[
+                    ExtractedText(
+                        content_key=content_key or sha256_key(hashlib.sha256(data).hexdigest()),
+                        method="pypdf",
+                        pages=tuple(extracted.pages),
+                    )
+                ],
+                actor_id=actor_id,
+            )
         extracted_text = extracted.text
 
         write_audit_event(
@@ -155,6 +175,8 @@ def _process_one(db: Session, *, fund_id: uuid.UUID, version: DocumentVersion, a
                 before=None,
                 after={"chunks_created": len(drafts), "document_id": str(doc.id), "version_id": str(version.id)},
             )
+            # New chunks for this version: drop any corpus the AI engine built before indexing.
+            invalidate_corpus(db, fund_id=fund_id, version_id=version.id)
             db.commit()
 
         chunks = (
@@ -184,7 +206,27 @@ def _process_one(db: Session, *, fund_id: uuid.UUID, version: DocumentVersion, a
                     "uploaded_at": (version.uploaded_at or version.created_at).astimezone(timezone.utc).isoformat(),
                 }
             )
-        client.upsert_chunks(items=items)
+        indexing = client.upsert_chunks(items=items)
+        if indexing.failed:
+            version.ingestion_status = DocumentIngestionStatus.FAILED
+            version.ingest_error = {
+                "reason": "search_index_rejected",
+                "failed_keys": sorted(indexing.failed_keys),
+                "chunks_indexed": indexing.succeeded,
+            }
+            version.updated_by = actor_id
+            write_audit_event(
+                db,
+                fund_id=fund_id,
+                actor_id=actor_id,
+                action="INGESTION_FAILED",
+                entity_type="document_version",
+                entity_id=version.id,
+                before=None,
+                after={"reason": "search_index_rejected", "chunks_rejected": len(indexing.failed)},
+            )
+            db.commit()
+            return
 
         write_audit_event(
             db,
@@ -42,6 +42,7 @@ from app.core.db.models import Fund, User, UserFundRole
 from app.core.security.dependencies import require_fund_access
 from app.shared.enums import Env, Role
 from app.modules.actions.routes import router as actions_router
+from app.modules.ai.routes import admin_router as ai_admin_router
 from app.modules.ai.routes import router as ai_router
 from app.modules.compliance.routes import router as compliance_router
 from app.modules.deals.routes import router as deals_router
@@ -188,6 +189,7 @@ def create_app() -> FastAPI:
     app.include_router(dataroom_router)
     app.include_router(data_room_router)
     app.include_router(cash_router)
+    app.include_router(ai_admin_router)
 
     # /api aliases for all domain routers.
     app.include_router(assets_router, prefix="/api")
@@ -209,6 +211,7 @@ def create_app() -> FastAPI:
     # NOTE: dataroom_router already uses prefix '/api/dataroom' (avoid '/api/api/...').
     app.include_router(cash_router, prefix="/api")
     app.include_router(ai_router, prefix="/api")
+    app.include_router(ai_admin_router, prefix="/api")
 
     return app
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 import datetime as dt
 import uuid
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text, func
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text, Uuid, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db.base import AuditMetaMixin, Base, FundScopedMixin, IdMixin
@@ -105,6 +105,61 @@ class DocumentRegistry(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     )
 
 
+class DocumentScanWatermark(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
+    __tablename__ = "document_scan_watermarks"
+
+    container_name: Mapped[str] = mapped_column(String(120), nullable=False, index=True)
+    last_modified_utc: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    blobs_seen: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    scanned_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("ix_document_scan_watermarks_fund_container", "fund_id", "container_name", unique=True),)
+
+
+class DocumentExtractedText(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
+    __tablename__ = "document_extracted_text"
+
+    content_key: Mapped[str] = mapped_column(String(400), nullable=False, index=True)
+    extraction_method: Mapped[str] = mapped_column(String(40), nullable=False)
+    page_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    pages: Mapped[list[str]] = mapped_column(JSON, nullable=False)
+    text_chars: Mapped[int] = mapped_column(Integer, nullable=False)
+    extracted_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("ix_document_extracted_text_fund_key", "fund_id", "content_key", unique=True),)
+
+
+class DocumentCorpusCache(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
+    __tablename__ = "document_corpus_cache"
+
+    version_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("document_versions.id", ondelete="CASCADE"), nullable=False, index=True)
+    version_checksum: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    chunk_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    normalized_text: Mapped[str] = mapped_column(Text, nullable=False)
+    tokens: Mapped[list[str]] = mapped_column(JSON, nullable=False)
+    built_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("ix_document_corpus_cache_fund_version", "fund_id", "version_id", unique=True),)
+
+
+class StageCheckpoint(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
+    __tablename__ = "ai_stage_checkpoints"
+
+    run_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), nullable=False, index=True)
+    pipeline: Mapped[str] = mapped_column(String(80), nullable=False, index=True)
+    stage: Mapped[str] = mapped_column(String(80), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    inputs_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    started_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    duration_ms: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    row_counts: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (Index("ix_ai_stage_checkpoints_fund_pipeline_started", "fund_id", "pipeline", "started_at"),)
+
+
 class ManagerProfile(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     __tablename__ = "manager_profiles"
 
@@ -117,6 +172,7 @@ class ManagerProfile(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     key_risks_declared: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
     last_document_update: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     source_documents: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)
+    input_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
     as_of: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
     data_latency: Mapped[int | None] = mapped_column(Integer, nullable=True)
     data_quality: Mapped[str | None] = mapped_column(String(16), nullable=True, default="OK")
@@ -132,6 +188,9 @@ class ObligationRegister(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     obligation_text: Mapped[str] = mapped_column(Text, nullable=False)
     frequency: Mapped[str] = mapped_column(String(40), nullable=False, index=True)
     due_rule: Mapped[str] = mapped_column(String(300), nullable=False)
+    # Parsed from due_rule at extraction time; NULL when the rule has no calendar date.
+    due_date: Mapped[dt.date | None] = mapped_column(Date, nullable=True)
+    recurrence: Mapped[str | None] = mapped_column(String(40), nullable=True)
     responsible_party: Mapped[str] = mapped_column(String(120), nullable=False)
     evidence_expected: Mapped[str] = mapped_column(String(300), nullable=False)
     status: Mapped[str] = mapped_column(String(40), nullable=False, index=True)
@@ -140,7 +199,10 @@ class ObligationRegister(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     data_latency: Mapped[int | None] = mapped_column(Integer, nullable=True)
     data_quality: Mapped[str | None] = mapped_column(String(16), nullable=True, default="OK")
 
-    __table_args__ = (Index("ix_obligation_register_fund_obligation_id", "fund_id", "obligation_id", unique=True),)
+    __table_args__ = (
+        Index("ix_obligation_register_fund_obligation_id", "fund_id", "obligation_id", unique=True),
+        Index("ix_obligation_register_fund_status_due_date", "fund_id", "status", "due_date"),
+    )
 
 
 class GovernanceAlert(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
@@ -166,6 +228,7 @@ class DocumentClassification(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     doc_type: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
     confidence_score: Mapped[int] = mapped_column(Integer, nullable=False)
     classification_basis: Mapped[str] = mapped_column(String(120), nullable=False)
+    input_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     __table_args__ = (Index("ix_document_classifications_fund_doc", "fund_id", "doc_id", unique=True),)
 
@@ -178,6 +241,7 @@ class DocumentGovernanceProfile(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     binding_scope: Mapped[str] = mapped_column(String(40), nullable=False, index=True)
     shareability_final: Mapped[str] = mapped_column(String(40), nullable=False)
     jurisdiction: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    input_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     __table_args__ = (Index("ix_document_governance_profile_fund_doc", "fund_id", "doc_id", unique=True),)
 
@@ -199,6 +263,7 @@ class KnowledgeEntity(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
 
     entity_type: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
     canonical_name: Mapped[str] = mapped_column(String(300), nullable=False, index=True)
+    terms_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     __table_args__ = (Index("ix_knowledge_entities_fund_type_name", "fund_id", "entity_type", "canonical_name", unique=True),)
 
@@ -218,6 +283,17 @@ class KnowledgeLink(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     )
 
 
+class KnowledgeLinkState(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
+    __tablename__ = "knowledge_link_state"
+
+    document_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("document_registry.id", ondelete="CASCADE"), nullable=False, index=True)
+    content_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    entity_index_version: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    linked_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (Index("ix_knowledge_link_state_fund_document", "fund_id", "document_id", unique=True),)
+
+
 class ObligationEvidenceMap(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     __tablename__ = "obligation_evidence_map"
 
@@ -325,6 +401,49 @@ class ActiveInvestment(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     )
 
 
+class MetricSeriesPoint(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
+    __tablename__ = "ai_metric_series"
+
+    investment_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("active_investments.id", ondelete="CASCADE"), nullable=False)
+    metric_name: Mapped[str] = mapped_column(String(120), nullable=False)
+    as_of: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_ai_metric_series_fund_investment_metric_as_of", "fund_id", "investment_id", "metric_name", "as_of", unique=True),
+        Index("ix_ai_metric_series_fund_metric_as_of", "fund_id", "metric_name", "as_of"),
+        # Rows arrive in date order, so a BRIN index keeps history range scans cheap on Postgres.
+        Index("ix_ai_metric_series_as_of_brin", "as_of", postgresql_using="brin"),
+    )
+
+
+class MetricSeriesRollup(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
+    __tablename__ = "ai_metric_rollups"
+
+    investment_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("active_investments.id", ondelete="CASCADE"), nullable=False)
+    metric_name: Mapped[str] = mapped_column(String(120), nullable=False)
+    granularity: Mapped[str] = mapped_column(String(8), nullable=False)  # WEEK | MONTH
+    period_start: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    points: Mapped[int] = mapped_column(Integer, nullable=False)
+    min_value: Mapped[float] = mapped_column(Float, nullable=False)
+    max_value: Mapped[float] = mapped_column(Float, nullable=False)
+    mean_value: Mapped[float] = mapped_column(Float, nullable=False)
+    last_value: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_ai_metric_rollups_fund_investment_metric_period",
+            "fund_id",
+            "investment_id",
+            "metric_name",
+            "granularity",
+            "period_start",
+            unique=True,
+        ),
+        Index("ix_ai_metric_rollups_fund_metric_granularity_period", "fund_id", "metric_name", "granularity", "period_start"),
+    )
+
+
 class PerformanceDriftFlag(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     __tablename__ = "performance_drift_flags"
 
@@ -344,7 +463,8 @@ class PerformanceDriftFlag(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
 class CovenantStatusRegister(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     __tablename__ = "covenant_status_register"
 
-    investment_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("active_investments.id", ondelete="CASCADE"), nullable=False, index=True)
+    # NULL for an UNMAPPED covenant: its loan matches no active investment of the fund.
+    investment_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("active_investments.id", ondelete="CASCADE"), nullable=True, index=True)
     covenant_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("covenants.id", ondelete="SET NULL"), nullable=True, index=True)
     covenant_test_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("covenant_tests.id", ondelete="SET NULL"), nullable=True, index=True)
     breach_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("covenant_breaches.id", ondelete="SET NULL"), nullable=True, index=True)
@@ -375,6 +495,17 @@ class CashImpactFlag(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     __table_args__ = (Index("ix_cash_impact_flags_fund_investment", "fund_id", "investment_id"),)
 
 
+class CashImpactWatermark(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
+    __tablename__ = "cash_impact_watermarks"
+
+    matcher_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    last_transaction_updated_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    transactions_seen: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    evaluated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (Index("ix_cash_impact_watermarks_fund", "fund_id", unique=True),)
+
+
 class InvestmentRiskRegistry(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     __tablename__ = "investment_risk_registry"
 
@@ -399,6 +530,8 @@ class BoardMonitoringBrief(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     liquidity_view: Mapped[str] = mapped_column(Text, nullable=False)
     risk_reclassification_view: Mapped[str] = mapped_column(Text, nullable=False)
     recommended_actions: Mapped[list[str] | None] = mapped_column(JSON, nullable=True)
+    # sha256 of the drift, covenant, cash and risk rows the brief was generated from.
+    input_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
     last_generated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
     as_of: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
 
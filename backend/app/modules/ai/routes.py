@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import datetime as dt
+import math
+import threading
 import uuid
+from collections import OrderedDict
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 from fastapi.responses import JSONResponse
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
@@ -12,7 +15,10 @@ from sqlalchemy import func, select
 
 from ai_engine.classifier import classify_documents
 from ai_engine.document_scanner import run_documents_ingest_pipeline
+from ai_engine.fund_runner import DEFAULT_STAGES, DEFAULT_TIMEOUT_SECONDS, active_fund_ids, run_funds
 from ai_engine.knowledge_builder import build_manager_profiles
+from ai_engine.knowledge_graph import traverse_knowledge_graph
+from ai_engine.metric_series import load_metric_series
 from ai_engine.monitoring import run_daily_cycle
 from ai_engine.obligation_extractor import extract_obligation_register
 from ai_engine.pipeline_intelligence import run_pipeline_ingest
@@ -57,6 +63,8 @@ from app.modules.ai.schemas import (
     PortfolioInvestmentDetailResponse,
     PortfolioInvestmentItem,
     PortfolioInvestmentsResponse,
+    PortfolioMetricSeriesOut,
+    PortfolioMetricSeriesResponse,
     PortfolioRiskOut,
     PipelineDealDetailResponse,
     PipelineDealItem,
@@ -102,6 +110,8 @@ from app.services.search_index import AzureSearchChunksClient
 from app.shared.enums import Role
 
 router = APIRouter(prefix="/ai", tags=["ai"])
+# Cross-fund operations; mounted outside the /funds/{fund_id} scope.
+admin_router = APIRouter(prefix="/admin/ai", tags=["ai"])
 
 
 def _utcnow() -> dt.datetime:
@@ -716,6 +726,78 @@ def run_ai_daily_cycle(
     )
 
 
+# Runner reports by run id. They live in the API process that accepted the run;
+# scheduled runs should use scripts/run_ai_funds.py, which prints its report.
+RUNNER_RUN_HISTORY = 50
+_runner_runs: OrderedDict[str, dict] = OrderedDict()
+_runner_runs_lock = threading.Lock()
+
+
+def _record_runner_run(run_id: str, state: dict) -> None:
+    with _runner_runs_lock:
+        _runner_runs[run_id] = state
+        _runner_runs.move_to_end(run_id)
+        while len(_runner_runs) > RUNNER_RUN_HISTORY:
+            _runner_runs.popitem(last=False)
+
+
+def _execute_runner_run(run_id: str, fund_ids: list[uuid.UUID], **options) -> None:
+    _record_runner_run(run_id, {"runId": run_id, "status": "RUNNING", "funds": len(fund_ids), "stages": list(options["stages"])})
+    try:
+        # spawn: the API process holds threads and pooled connections a fork would copy.
+        report = run_funds(fund_ids, start_method="spawn", **options)
+        state = {"runId": run_id, **report.to_dict()}
+    except Exception as exc:
+        state = {"runId": run_id, "status": "ERROR", "funds": len(fund_ids), "error": f"{type(exc).__name__}: {exc}"}
+    _record_runner_run(run_id, state)
+
+
+@admin_router.post("/runner/run", status_code=202)
+def run_ai_funds(
+    background_tasks: BackgroundTasks,
+    fund_ids: list[uuid.UUID] | None = Query(default=None),
+    stage: list[str] | None = Query(default=None),
+    as_of: dt.datetime | None = Query(default=None),
+    max_workers: int | None = Query(default=None, ge=1, le=64),
+    timeout_seconds: float = Query(default=DEFAULT_TIMEOUT_SECONDS, gt=0, le=4 * 3600),
+    db: Session = Depends(get_db),
+    actor: Actor = Depends(get_actor),
+    _write_guard: Actor = Depends(require_readonly_allowed()),
+    _role_guard: Actor = Depends(require_roles([Role.ADMIN])),
+) -> dict:
+    fund_ids = fund_ids or active_fund_ids(db)
+    stages = tuple(name for name in DEFAULT_STAGES if name in stage) if stage else DEFAULT_STAGES
+    if stage and len(stages) != len(set(stage)):
+        raise HTTPException(status_code=400, detail=f"Unknown stage; expected any of {', '.join(DEFAULT_STAGES)}")
+
+    run_id = str(uuid.uuid4())
+    queued = {"runId": run_id, "status": "QUEUED", "funds": len(fund_ids), "stages": list(stages)}
+    _record_runner_run(run_id, queued)
+    background_tasks.add_task(
+        _execute_runner_run,
+        run_id,
+        fund_ids,
+        stages=stages,
+        actor_id=actor.actor_id,
+        as_of=as_of,
+        max_workers=max_workers,
+        timeout_seconds=timeout_seconds,
+    )
+    return queued
+
+
+@admin_router.get("/runner/runs/{run_id}")
+def get_ai_funds_run(
+    run_id: uuid.UUID,
+    _role_guard: Actor = Depends(require_roles([Role.ADMIN])),
+) -> dict:
+    with _runner_runs_lock:
+        state = _runner_runs.get(str(run_id))
+    if state is None:
+        raise HTTPException(status_code=404, detail="Unknown runner run")
+    return state
+
+
 @router.post("/documents/ingest", response_model=DocumentsIngestResponse)
 def ingest_documents_index(
     fund_id: uuid.UUID,
@@ -750,13 +832,20 @@ def ingest_documents_index(
 def run_linker(
     fund_id: uuid.UUID,
     as_of: dt.datetime | None = Query(default=None),
+    full_rebuild: bool = Query(default=False),
     db: Session = Depends(get_db),
     actor: Actor = Depends(get_actor),
     _write_guard: Actor = Depends(require_readonly_allowed()),
     _role_guard: Actor = Depends(require_roles([Role.ADMIN, Role.GP, Role.COMPLIANCE, Role.INVESTMENT_TEAM])),
 ) -> dict:
     effective_as_of = as_of or _utcnow()
-    return run_cross_container_linking(db, fund_id=fund_id, actor_id=actor.actor_id, as_of=effective_as_of)
+    return run_cross_container_linking(
+        db,
+        fund_id=fund_id,
+        actor_id=actor.actor_id,
+        as_of=effective_as_of,
+        full_rebuild=full_rebuild,
+    )
 
 
 @router.get("/linker/links")
@@ -771,6 +860,36 @@ def get_linker_links(
     return get_entity_links_snapshot(db, fund_id=fund_id, entity_id=entity_id, as_of=effective_as_of)
 
 
+@router.get("/linker/graph")
+def get_linker_graph(
+    fund_id: uuid.UUID,
+    start_id: uuid.UUID,
+    start_kind: str = Query(default="entity", pattern="^(entity|document)$"),
+    hops: int = Query(default=2, ge=1, le=4),
+    link_type: list[str] | None = Query(default=None),
+    as_of: dt.datetime | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    _role_guard: Actor = Depends(require_roles([Role.ADMIN, Role.GP, Role.COMPLIANCE, Role.INVESTMENT_TEAM, Role.AUDITOR])),
+) -> dict:
+    effective_as_of = as_of or _utcnow()
+    try:
+        return traverse_knowledge_graph(
+            db,
+            fund_id=fund_id,
+            start_id=start_id,
+            start_kind=start_kind,
+            hops=hops,
+            as_of=effective_as_of,
+            link_types=set(link_type) if link_type else None,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/linker/obligations/status")
 def get_linker_obligation_status(
     fund_id: uuid.UUID,
@@ -1293,7 +1412,7 @@ def list_portfolio_alerts(
     covenant_rows = list(
         db.execute(
             select(CovenantStatusRegister)
-            .where(CovenantStatusRegister.fund_id == fund_id, CovenantStatusRegister.status.in_(["BREACH", "WARNING", "NOT_TESTED", "NOT_CONFIGURED"]))
+            .where(CovenantStatusRegister.fund_id == fund_id, CovenantStatusRegister.status.in_(["BREACH", "WARNING", "NOT_TESTED", "NOT_CONFIGURED", "UNMAPPED"]))
             .order_by(CovenantStatusRegister.created_at.desc())
             .limit(200)
         ).scalars().all()
@@ -1331,6 +1450,18 @@ def list_portfolio_alerts(
             )
         )
     for row in covenant_rows:
+        if row.status == "UNMAPPED":
+            items.append(
+                PortfolioAlertOut(
+                    alertType="COVENANT_SURVEILLANCE",
+                    severity=row.severity,
+                    investmentId=None,
+                    investmentName="Unmapped covenant",
+                    message=row.details or f"Covenant {row.covenant_name} is not linked to an active investment.",
+                    createdAt=row.created_at,
+                )
+            )
+            continue
         inv = by_id.get(row.investment_id)
         if inv is None:
             continue
@@ -1379,3 +1510,46 @@ def list_portfolio_alerts(
     as_of = max((item.createdAt for item in items), default=_utcnow())
     return PortfolioAlertsResponse(asOf=as_of, dataLatency=None, dataQuality="OK", items=items)
 
+
+@router.get("/portfolio/metrics/series", response_model=PortfolioMetricSeriesResponse)
+def get_portfolio_metric_series(
+    fund_id: uuid.UUID,
+    metric_name: str = Query(..., min_length=1, max_length=120),
+    start: dt.date = Query(...),
+    end: dt.date = Query(...),
+    granularity: str = Query(default="DAY"),
+    statistic: str = Query(default="last"),
+    investment_id: list[uuid.UUID] | None = Query(default=None),
+    db: Session = Depends(get_db),
+    _role_guard: Actor = Depends(require_roles([Role.ADMIN, Role.GP, Role.COMPLIANCE, Role.INVESTMENT_TEAM, Role.AUDITOR])),
+) -> PortfolioMetricSeriesResponse:
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not precede start")
+    try:
+        result = load_metric_series(
+            db,
+            fund_id=fund_id,
+            metric_name=metric_name,
+            start=start,
+            end=end,
+            granularity=granularity.upper(),
+            statistic=statistic.lower(),
+            investment_ids=investment_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    series = [
+        PortfolioMetricSeriesOut(investmentId=inv_id, values=[None if math.isnan(v) else v for v in row])
+        for inv_id, row in zip(result.investment_ids, result.values.tolist())
+    ]
+    return PortfolioMetricSeriesResponse(
+        asOf=_utcnow(),
+        dataLatency=None,
+        dataQuality="OK",
+        metricName=result.metric_name,
+        granularity=result.granularity,
+        statistic=result.statistic,
+        periods=list(result.periods),
+        series=series,
+    )
@@ -147,6 +147,8 @@ class ObligationRegisterItem(BaseModel):
     obligationText: str = Field(validation_alias="obligation_text")
     frequency: str
     dueRule: str = Field(validation_alias="due_rule")
+    dueDate: dt.date | None = Field(default=None, validation_alias="due_date")
+    recurrence: str | None = None
     responsibleParty: str = Field(validation_alias="responsible_party")
     evidenceExpected: str = Field(validation_alias="evidence_expected")
     status: str
@@ -376,7 +378,7 @@ class PortfolioInvestmentDetailResponse(DataEnvelope):
 class PortfolioAlertOut(BaseModel):
     alertType: str
     severity: str
-    investmentId: uuid.UUID
+    investmentId: uuid.UUID | None  # None for fund-level alerts (unmapped covenants)
     investmentName: str
     message: str
     createdAt: dt.datetime
@@ -385,3 +387,15 @@ class PortfolioAlertOut(BaseModel):
 class PortfolioAlertsResponse(DataEnvelope):
     items: list[PortfolioAlertOut]
 
+
+class PortfolioMetricSeriesOut(BaseModel):
+    investmentId: uuid.UUID
+    values: list[float | None]
+
+
+class PortfolioMetricSeriesResponse(DataEnvelope):
+    metricName: str
+    granularity: str
+    statistic: str
+    periods: list[dt.date]
+    series: list[PortfolioMetricSeriesOut]
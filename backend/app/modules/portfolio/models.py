@@ -3,7 +3,7 @@ from __future__ import annotations
 import datetime as dt
 import uuid
 
-from sqlalchemy import Boolean, Date, ForeignKey, Index, JSON, Numeric, String, Text
+from sqlalchemy import Boolean, Date, ForeignKey, Index, JSON, Numeric, String, Text, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db.base import AuditMetaMixin, Base, FundScopedMixin, IdMixin
@@ -115,5 +115,9 @@ class PortfolioMetric(Base, IdMixin, FundScopedMixin, AuditMetaMixin):
     as_of: Mapped[dt.date] = mapped_column(Date, index=True)
     metric_name: Mapped[str] = mapped_column(String(120), index=True)
     metric_value: Mapped[float] = mapped_column(Numeric(18, 6))
+    # Active investment the metric describes; no FK so portfolio stays independent of the AI tables.
+    investment_id: Mapped[uuid.UUID | None] = mapped_column(Uuid(as_uuid=True), nullable=True, index=True)
     meta: Mapped[dict | None] = mapped_column("metadata", JSON, nullable=True)
 
+    __table_args__ = (Index("ix_portfolio_metrics_fund_investment_as_of", "fund_id", "investment_id", "as_of"),)
+
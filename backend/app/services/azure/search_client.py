@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 
 from azure.identity import DefaultAzureCredential
@@ -14,11 +15,32 @@ class SearchHealth:
     detail: str | None = None
 
 
+# One credential and one SearchClient (with its HTTP connection pool) per
+# endpoint/index for the whole process; both are safe to share across threads.
+_credential: DefaultAzureCredential | None = None
+_clients: dict[tuple[str, str], SearchClient] = {}
+_clients_lock = threading.Lock()
+
+
 def get_search_client(*, index_name: str) -> SearchClient:
+    global _credential
     if not settings.AZURE_SEARCH_ENDPOINT:
         raise ValueError("AZURE_SEARCH_ENDPOINT not configured")
-    cred = DefaultAzureCredential(exclude_interactive_browser_credential=True)
-    return SearchClient(endpoint=settings.AZURE_SEARCH_ENDPOINT, index_name=index_name, credential=cred)
+    key = (settings.AZURE_SEARCH_ENDPOINT, index_name)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if _credential is None:
+                _credential = DefaultAzureCredential(exclude_interactive_browser_credential=True)
+            client = _clients[key] = SearchClient(endpoint=settings.AZURE_SEARCH_ENDPOINT, index_name=index_name, credential=_credential)
+    return client
+
+
+def reset_search_clients() -> None:
+    global _credential
+    with _clients_lock:
+        _clients.clear()
+        _credential = None
 
 
 def get_metadata_index_client() -> SearchClient:
@@ -4,6 +4,7 @@ import hashlib
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator
 from urllib.parse import quote
 
 from azure.core.exceptions import ResourceExistsError
@@ -246,60 +247,77 @@ class BlobEntry:
     etag: str | None = None
 
 
-def list_blobs(
+def iter_blobs(
     *,
     container: str,
     prefix: str | None = None,
     delimiter: str = "/",
-) -> list[BlobEntry]:
+    results_per_page: int = 1000,
+) -> Iterator[BlobEntry]:
     """
-    List blobs and virtual folders under a prefix in a container.
-    Uses delimiter-based listing (virtual directory browsing).
+    Stream blobs and virtual folders under a prefix in a container.
+    Azure listings are fetched page by page as the iterator is consumed.
     """
     if _use_local_storage():
         base = _local_base_dir() / container
         if prefix:
             base = base / Path(prefix)
-        entries: list[BlobEntry] = []
-        if base.is_dir():
-            for child in sorted(base.iterdir()):
-                if child.is_dir():
-                    rel = child.name + "/"
-                    entries.append(BlobEntry(name=(prefix or "") + rel, is_folder=True))
-                else:
-                    entries.append(BlobEntry(
-                        name=(prefix or "") + child.name,
-                        is_folder=False,
-                        size_bytes=child.stat().st_size,
-                        content_type=None,
-                        last_modified=None,
-                        etag=None,
-                    ))
-        return entries
+        if not base.is_dir():
+            return
+        for child in sorted(base.iterdir()):
+            if child.is_dir():
+                rel = child.name + "/"
+                yield BlobEntry(name=(prefix or "") + rel, is_folder=True)
+            else:
+                # File mtime and size stand in for Azure's last-modified and etag.
+                stat = child.stat()
+                yield BlobEntry(
+                    name=(prefix or "") + child.name,
+                    is_folder=False,
+                    size_bytes=stat.st_size,
+                    content_type=None,
+                    last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat(),
+                    etag=f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+                )
+        return
 
     svc = _service_client()
     container_client = svc.get_container_client(container)
-    entries = []
 
-    blobs_iter = container_client.walk_blobs(name_starts_with=prefix or "", delimiter=delimiter)
+    blobs_iter = container_client.walk_blobs(
+        name_starts_with=prefix or "",
+        delimiter=delimiter,
+        results_per_page=results_per_page,
+    )
     for item in blobs_iter:
         # BlobPrefix (virtual folder) has .prefix attribute
         if hasattr(item, "prefix"):
-            entries.append(BlobEntry(name=item.prefix, is_folder=True))
+            yield BlobEntry(name=item.prefix, is_folder=True)
         else:
             lm = None
             if item.last_modified:
                 lm = item.last_modified.isoformat()
-            entries.append(BlobEntry(
+            yield BlobEntry(
                 name=item.name,
                 is_folder=False,
                 size_bytes=item.size,
                 content_type=getattr(item.content_settings, "content_type", None) if item.content_settings else None,
                 last_modified=lm,
                 etag=getattr(item, "etag", None),
-            ))
+            )
+
 
-    return entries
+def list_blobs(
+    *,
+    container: str,
+    prefix: str | None = None,
+    delimiter: str = "/",
+) -> list[BlobEntry]:
+    """
+    List blobs and virtual folders under a prefix in a container.
+    Uses delimiter-based listing (virtual directory browsing).
+    """
+    return list(iter_blobs(container=container, prefix=prefix, delimiter=delimiter))
 
 
 def generate_read_link(
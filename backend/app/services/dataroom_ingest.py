@@ -364,7 +364,28 @@ def ingest_from_bytes(
 
     # Index in Azure AI Search (AAD / Managed Identity)
     search_client = AzureSearchMetadataClient()
-    search_client.upsert_documents(items=search_docs)
+    indexing = search_client.upsert_documents(items=search_docs)
+    if indexing.failed:
+        before = sa_model_to_dict(ver)
+        ver.ingest_status = "FAILED"
+        ver.ingest_error = {
+            "error": "search_index_rejected",
+            "failed_keys": sorted(indexing.failed_keys),
+            "chunks_indexed": indexing.succeeded,
+        }
+        ver.updated_by = actor.actor_id
+        write_audit_event(
+            db,
+            fund_id=fund_id,
+            actor_id=actor.actor_id,
+            action="dataroom.ingest.failed",
+            entity_type="document_version",
+            entity_id=ver.id,
+            before=before,
+            after=sa_model_to_dict(ver),
+        )
+        db.commit()
+        raise ValueError(f"search index rejected {len(indexing.failed)} of {len(search_docs)} chunks")
 
     before = sa_model_to_dict(ver)
     ver.extracted_text_blob_uri = extracted_text_blob_uri
@@ -1,13 +1,159 @@
 from __future__ import annotations
 
+import json
+import logging
+import random
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable, Iterable
 
 from azure.search.documents import SearchClient
 
 from app.services.azure.search_client import get_chunks_index_client, get_metadata_index_client
 
+logger = logging.getLogger(__name__)
+
+# Azure AI Search accepts at most 1000 actions and 16 MB per indexing request;
+# stay a little under the byte limit to leave room for the request envelope.
+MAX_BATCH_DOCUMENTS = 1000
+MAX_BATCH_BYTES = 15 * 1024 * 1024
+MAX_INDEX_RETRIES = 5
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 30.0
+# Whole requests are retried when throttled or unavailable; individual items when
+# the batch reports them as conflicting (422) or unavailable (503).
+RETRYABLE_REQUEST_STATUS_CODES = frozenset({429, 503})
+RETRYABLE_ITEM_STATUS_CODES = frozenset({422, 503})
+
+
+@dataclass(frozen=True)
+class IndexingFailure:
+    key: str | None
+    status_code: int | None
+    error_message: str | None
+
+
+@dataclass(frozen=True)
+class IndexingResult:
+    succeeded: int = 0
+    failed: tuple[IndexingFailure, ...] = ()
+
+    @property
+    def failed_keys(self) -> frozenset[str]:
+        return frozenset(f.key for f in self.failed if f.key is not None)
+
+
+class SearchIndexingQueue:
+    """
+    Buffers documents for one index and sends them in batches bounded by
+    document count and serialized size. `add` flushes as soon as the next
+    document would overflow the batch, so callers are held back while the
+    service drains and the buffer never grows past one request.
+
+    Throttled batches (HTTP 429/503) and throttled items are retried with
+    jittered exponential backoff. Items the service rejects are reported in
+    the result rather than raised; a batch that still fails after the last
+    retry raises the service error, as the direct SDK call did.
+    """
+
+    def __init__(
+        self,
+        client: SearchClient,
+        *,
+        key_field: str = "id",
+        max_documents: int = MAX_BATCH_DOCUMENTS,
+        max_bytes: int = MAX_BATCH_BYTES,
+        max_retries: int = MAX_INDEX_RETRIES,
+        base_delay: float = RETRY_BASE_DELAY_SECONDS,
+        max_delay: float = RETRY_MAX_DELAY_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._client = client
+        self.key_field = key_field
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._batch: list[dict[str, Any]] = []
+        self._batch_bytes = 0
+        self._succeeded = 0
+        self._failed: list[IndexingFailure] = []
+
+    def __enter__(self) -> "SearchIndexingQueue":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def add(self, document: dict[str, Any]) -> None:
+        size = len(json.dumps(document, default=str, separators=(",", ":")).encode("utf-8"))
+        if size > self.max_bytes:
+            self._failed.append(IndexingFailure(_key(document, self.key_field), 413, "Document exceeds the indexing request size limit"))
+            return
+        if self._batch and (len(self._batch) >= self.max_documents or self._batch_bytes + size > self.max_bytes):
+            self._send()
+        self._batch.append(document)
+        self._batch_bytes += size
+
+    def extend(self, documents: Iterable[dict[str, Any]]) -> None:
+        for document in documents:
+            self.add(document)
+
+    def flush(self) -> IndexingResult:
+        if self._batch:
+            self._send()
+        return self.result()
+
+    def result(self) -> IndexingResult:
+        return IndexingResult(succeeded=self._succeeded, failed=tuple(self._failed))
+
+    def _backoff(self, attempt: int) -> None:
+        delay = min(self.max_delay, self.base_delay * (2**attempt))
+        self._sleep(delay * random.uniform(0.5, 1.0))
+
+    def _send(self) -> None:
+        pending, self._batch, self._batch_bytes = self._batch, [], 0
+        attempt = 0
+        while pending:
+            try:
+                results = self._client.merge_or_upload_documents(documents=pending)
+            except Exception as exc:
+                if getattr(exc, "status_code", None) not in RETRYABLE_REQUEST_STATUS_CODES or attempt >= self.max_retries:
+                    raise
+                logger.warning("Search indexing throttled (%s); retrying %d documents", getattr(exc, "status_code", None), len(pending))
+                self._backoff(attempt)
+                attempt += 1
+                continue
+
+            by_key = {_key(document, self.key_field): document for document in pending}
+            retry: list[dict[str, Any]] = []
+            for item in results or []:
+                if item.succeeded:
+                    self._succeeded += 1
+                elif item.status_code in RETRYABLE_ITEM_STATUS_CODES and attempt < self.max_retries and item.key in by_key:
+                    retry.append(by_key[item.key])
+                else:
+                    self._failed.append(IndexingFailure(item.key, item.status_code, item.error_message))
+            pending = retry
+            if pending:
+                self._backoff(attempt)
+                attempt += 1
+
+
+def _key(document: dict[str, Any], key_field: str) -> str | None:
+    value = document.get(key_field)
+    return None if value is None else str(value)
+
+
+def index_documents(client: SearchClient, *, items: Iterable[dict[str, Any]], key_field: str = "id") -> IndexingResult:
+    with SearchIndexingQueue(client, key_field=key_field) as queue:
+        queue.extend(items)
+    return queue.result()
+
 
 @dataclass(frozen=True)
 class SearchHit:
@@ -30,19 +176,15 @@ class AzureSearchMetadataClient:
     def __init__(self) -> None:
         self._client: SearchClient = get_metadata_index_client()
 
-    def upsert_dataroom_metadata(self, *, items: list[dict[str, Any]]) -> None:
-        if not items:
-            return
+    def upsert_dataroom_metadata(self, *, items: list[dict[str, Any]]) -> IndexingResult:
         # mergeOrUpload equivalent
-        self._client.merge_or_upload_documents(documents=items)
+        return index_documents(self._client, items=items, key_field="id")
 
-    def upsert_documents(self, *, items: list[dict[str, Any]]) -> None:
+    def upsert_documents(self, *, items: list[dict[str, Any]]) -> IndexingResult:
         """
         Generic upsert for the metadata index (used by legacy dataroom_ingest).
         """
-        if not items:
-            return
-        self._client.merge_or_upload_documents(documents=items)
+        return index_documents(self._client, items=items, key_field="id")
 
     def search(self, *, q: str, fund_id: str | None, top: int = 5) -> list[SearchHit]:
         filt = f"fund_id eq '{fund_id}'" if fund_id else None
@@ -88,10 +230,8 @@ class AzureSearchChunksClient:
     def __init__(self) -> None:
         self._client: SearchClient = get_chunks_index_client()
 
-    def upsert_chunks(self, *, items: list[dict[str, Any]]) -> None:
-        if not items:
-            return
-        self._client.merge_or_upload_documents(documents=items)
+    def upsert_chunks(self, *, items: list[dict[str, Any]]) -> IndexingResult:
+        return index_documents(self._client, items=items, key_field="chunk_id")
 
     def search(self, *, q: str, fund_id: str, root_folder: str | None, top: int = 5) -> list[ChunkSearchHit]:
         filt = [f"fund_id eq '{fund_id}'"]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+# Ensure `backend/` is importable when running as a script.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ai_engine.classifier import _classify_document  # noqa: E402
+from ai_engine.doc_classifier import _classify  # noqa: E402
+
+CONTAINERS = (
+    "regulatory-library-cima",
+    "fund-constitution-governance",
+    "service-providers-contracts",
+    "investment-pipeline-intelligence",
+    "dataroom-investor-facing",
+    "risk-policy-internal",
+    "portfolio-active-investments",
+    "portfolio-monitoring-evidence",
+    "misc-archive",
+)
+DOMAINS = ("REGULATORY", "FUND_CONSTITUTION", "SERVICE_PROVIDER", "PIPELINE", "INVESTOR", "RISK_POLICY", "PORTFOLIO")
+KEYWORDS = (
+    "cima", "lpa", "constitutional", "fund-rules", "agreement", "contract", "engagement", "administrator", "custodian",
+    "counsel", "service provider", "investment memo", "ic memo", "committee", "deck", "brochure", "factsheet", "teaser",
+    "policy", "audit", "evidence", "statement", "regulatory", "regulation", "compliance manual", "offering",
+    "subscription", "admin agreement", "legal", "marketing", "pitch", "financial", "nav", "valuation", "report",
+    "investment committee", "approval memo", "kyc", "aml", "know your customer", "anti-money laundering", "board",
+    "minutes", "governance",
+)
+
+
+def legacy_doc_type(doc, content_text: str) -> tuple[str, int, str]:
+    """The hand-written doc_classifier chain the rule table replaced."""
+    filename = (doc.blob_path or "").lower()
+    domain = (doc.domain_tag or "").lower()
+    container = (doc.container_name or "").lower()
+    content = (content_text or "").lower()
+
+    basis: list[str] = []
+
+    if "regulatory" in container or "cima" in filename or "cima" in content:
+        basis.extend(["container", "content"])
+        return "REGULATORY_CIMA", 95, "|".join(sorted(set(basis)))
+
+    if "constitution" in container or any(token in filename for token in ["lpa", "constitutional", "fund-rules"]):
+        basis.append("filename")
+        return "FUND_CONSTITUTIONAL", 93, "|".join(sorted(set(basis)))
+
+    if "service-providers" in container or any(token in filename for token in ["agreement", "contract", "engagement"]):
+        basis.append("container")
+        if any(token in content for token in ["administrator", "custodian", "counsel", "service provider"]):
+            basis.append("content")
+        return "SERVICE_PROVIDER_CONTRACT", 90, "|".join(sorted(set(basis)))
+
+    if "pipeline" in container and any(token in content for token in ["investment memo", "ic memo", "committee"]):
+        return "INVESTMENT_MEMO", 88, "container|content"
+
+    if "investor-facing" in container and any(token in filename for token in ["deck", "brochure", "factsheet", "teaser"]):
+        return "DEAL_MARKETING", 86, "container|filename"
+
+    if "risk_policy" in domain or "risk-policy" in container or "policy" in filename:
+        return "RISK_POLICY_INTERNAL", 90, "container|filename"
+
+    if "portfolio-monitoring" in container or any(token in filename for token in ["audit", "evidence", "statement"]):
+        return "AUDIT_EVIDENCE", 84, "container|filename"
+
+    if "investor-facing" in container:
+        return "INVESTOR_NARRATIVE", 82, "container"
+
+    return "OTHER", 60, "container"
+
+
+def legacy_institutional_type(*, title: str | None, root_folder: str | None, folder_path: str | None) -> str:
+    """The hand-written classifier chain the rule table replaced."""
+
+    def _normalize(value: str | None) -> str:
+        return (value or "").strip().lower()
+
+    text = " ".join([_normalize(title), _normalize(root_folder), _normalize(folder_path)])
+
+    if any(token in text for token in ["cima", "regulatory", "regulation", "compliance manual"]):
+        return "REGULATORY_CIMA"
+    if any(token in text for token in ["lpa", "offering", "subscription", "admin agreement", "engagement", "custodian", "legal"]):
+        return "LEGAL_BINDING"
+    if any(token in text for token in ["marketing", "deck", "brochure", "teaser", "factsheet", "pitch"]):
+        return "MARKETING_PROMOTIONAL"
+    if any(token in text for token in ["audit", "financial", "statement", "nav", "valuation", "report"]):
+        return "FINANCIAL_REPORTING"
+    if any(token in text for token in ["investment committee", "ic memo", "approval memo"]):
+        return "INVESTMENT_COMMITTEE"
+    if any(token in text for token in ["kyc", "aml", "know your customer", "anti-money laundering"]):
+        return "KYC_AML"
+    if any(token in text for token in ["board", "minutes", "governance"]):
+        return "GOVERNANCE_BOARD"
+    return "OPERATIONAL_EVIDENCE"
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+
+
+def synthetic_corpus(*, documents: int, words_per_document: int, seed: int = 11) -> list[tuple[SimpleNamespace, str]]:
+    rng = random.Random(seed)
+    vocabulary = [_word(rng) for _ in range(2000)]
+    out: list[tuple[SimpleNamespace, str]] = []
+    for i in range(documents):
+        words = [rng.choice(vocabulary) for _ in range(words_per_document)]
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(KEYWORDS).upper() if rng.random() < 0.2 else rng.choice(KEYWORDS))
+        stem = "-".join([rng.choice(vocabulary)] + ([rng.choice(KEYWORDS)] if rng.random() < 0.4 else []))
+        doc = SimpleNamespace(
+            blob_path=f"{rng.choice(vocabulary)}/{stem}-{i}.pdf",
+            domain_tag=rng.choice(DOMAINS),
+            container_name=rng.choice(CONTAINERS),
+            title=f"{stem.replace('-', ' ').title()} {i}",
+        )
+        out.append((doc, " ".join(words)))
+    return out
+
+
+def run_benchmark(*, documents: int, words_per_document: int, seed: int = 11) -> dict[str, float | int]:
+    corpus = synthetic_corpus(documents=documents, words_per_document=words_per_document, seed=seed)
+
+    started = time.perf_counter()
+    legacy = [legacy_doc_type(doc, content) for doc, content in corpus]
+    legacy_types = [legacy_institutional_type(title=doc.title, root_folder=doc.container_name, folder_path=doc.blob_path) for doc, _ in corpus]
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    compiled = [_classify(doc, content) for doc, content in corpus]
+    compiled_types = [_classify_document(title=doc.title, root_folder=doc.container_name, folder_path=doc.blob_path) for doc, _ in corpus]
+    compiled_seconds = time.perf_counter() - started
+
+    if legacy != compiled or legacy_types != compiled_types:
+        raise AssertionError("Compiled keyword rules diverged from the hand-written classifier chains")
+
+    return {
+        "documents": documents,
+        "docTypes": len({item[0] for item in compiled}),
+        "institutionalTypes": len(set(compiled_types)),
+        "legacySeconds": round(legacy_seconds, 4),
+        "compiledSeconds": round(compiled_seconds, 4),
+        "speedup": round(legacy_seconds / compiled_seconds, 2) if compiled_seconds else 0.0,
+    }
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Compare the hand-written classifier keyword chains with the compiled rule tables.")
+    p.add_argument("--documents", type=int, default=10000, help="Number of synthetic documents (default: 10000)")
+    p.add_argument("--words-per-document", type=int, default=2000, help="Content size per document in words (default: 2000)")
+    p.add_argument("--seed", type=int, default=11, help="Random seed (default: 11)")
+    return p
+
+
+def main() -> int:
+    args = _build_arg_parser().parse_args()
+    result = run_benchmark(documents=args.documents, words_per_document=args.words_per_document, seed=args.seed)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
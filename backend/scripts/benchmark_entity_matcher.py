@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+
+# Ensure `backend/` is importable when running as a script.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ai_engine.entity_matcher import EntityTermMatcher  # noqa: E402
+from ai_engine.linker import _normalize  # noqa: E402
+from app.modules.ai.models import KnowledgeEntity  # noqa: E402
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+
+
+def synthetic_fund(
+    *,
+    entities: int,
+    documents: int,
+    words_per_document: int,
+    seed: int = 7,
+) -> tuple[list[tuple[KnowledgeEntity, list[str]]], list[str]]:
+    rng = random.Random(seed)
+    vocabulary = [_word(rng) for _ in range(max(200, entities * 2))]
+    fund_id = uuid.uuid4()
+
+    entity_index: list[tuple[KnowledgeEntity, list[str]]] = []
+    for i in range(entities):
+        entity_type = rng.choice(["MANAGER", "DEAL", "OBLIGATION", "PROVIDER"])
+        canonical_name = " ".join(rng.sample(vocabulary, rng.randint(1, 3)))
+        terms = [_normalize(canonical_name)]
+        if entity_type == "OBLIGATION":
+            terms.extend(rng.sample(vocabulary, rng.randint(3, 10)))
+        elif entity_type == "DEAL":
+            terms.append(_normalize(" ".join(rng.sample(vocabulary, 2))))
+        entity = KnowledgeEntity(id=uuid.uuid4(), fund_id=fund_id, entity_type=entity_type, canonical_name=canonical_name)
+        entity_index.append((entity, terms))
+
+    corpora = [
+        _normalize(" ".join(rng.choice(vocabulary) for _ in range(words_per_document)))
+        for _ in range(documents)
+    ]
+    return entity_index, corpora
+
+
+def naive_match(entity_index: list[tuple[KnowledgeEntity, list[str]]], corpus: str) -> list[tuple[KnowledgeEntity, str]]:
+    matches: list[tuple[KnowledgeEntity, str]] = []
+    for entity, terms in entity_index:
+        matched_term = next((term for term in terms if term and term in corpus), None)
+        if matched_term:
+            matches.append((entity, matched_term))
+    return matches
+
+
+def run_benchmark(*, entities: int, documents: int, words_per_document: int, seed: int = 7) -> dict[str, float | int]:
+    entity_index, corpora = synthetic_fund(
+        entities=entities,
+        documents=documents,
+        words_per_document=words_per_document,
+        seed=seed,
+    )
+
+    started = time.perf_counter()
+    naive = [naive_match(entity_index, corpus) for corpus in corpora]
+    naive_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matcher = EntityTermMatcher(entity_index)
+    build_seconds = time.perf_counter() - started
+    compiled = [matcher.match(corpus) for corpus in corpora]
+    matcher_seconds = time.perf_counter() - started
+
+    if naive != compiled:
+        raise AssertionError("EntityTermMatcher diverged from the per-term loop")
+
+    return {
+        "entities": entities,
+        "terms": len(matcher),
+        "documents": documents,
+        "links": sum(len(items) for items in compiled),
+        "naiveSeconds": round(naive_seconds, 4),
+        "matcherBuildSeconds": round(build_seconds, 4),
+        "matcherSeconds": round(matcher_seconds, 4),
+        "speedup": round(naive_seconds / matcher_seconds, 2) if matcher_seconds else 0.0,
+    }
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Compare the linker per-term loop with the compiled EntityTermMatcher on a synthetic fund.")
+    p.add_argument("--entities", type=int, default=3000, help="Number of knowledge entities (default: 3000)")
+    p.add_argument("--documents", type=int, default=50, help="Number of registry documents (default: 50)")
+    p.add_argument("--words-per-document", type=int, default=6000, help="Corpus size per document in words (default: 6000)")
+    p.add_argument("--seed", type=int, default=7, help="Random seed (default: 7)")
+    return p
+
+
+def main() -> int:
+    args = _build_arg_parser().parse_args()
+    result = run_benchmark(
+        entities=args.entities,
+        documents=args.documents,
+        words_per_document=args.words_per_document,
+        seed=args.seed,
+    )
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Ensure `backend/` is importable when running as a script.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ai_engine.evidence_scoring import DEFAULT_EVIDENCE_THRESHOLDS, EvidenceThresholds, score_obligations  # noqa: E402
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+
+
+def synthetic_mapping(
+    *,
+    obligations: int,
+    documents: int,
+    words_per_document: int,
+    seed: int = 7,
+) -> tuple[list[list[str]], list[str]]:
+    rng = random.Random(seed)
+    vocabulary = [_word(rng) for _ in range(max(500, obligations))]
+    obligation_terms = [rng.sample(vocabulary, rng.randint(4, 12)) for _ in range(obligations)]
+    corpora = [" ".join(rng.choice(vocabulary) for _ in range(words_per_document)) for _ in range(documents)]
+    return obligation_terms, corpora
+
+
+def naive_scores(
+    obligation_terms: list[list[str]],
+    corpora: list[str],
+    thresholds: EvidenceThresholds = DEFAULT_EVIDENCE_THRESHOLDS,
+) -> list[tuple[int | None, float, str]]:
+    out: list[tuple[int | None, float, str]] = []
+    for terms in obligation_terms:
+        best_index: int | None = None
+        best_score = 0
+        for index, corpus in enumerate(corpora):
+            score = sum(1 for term in terms if term and term in corpus)
+            if score > best_score:
+                best_score = score
+                best_index = index
+        status, _ = thresholds.classify(best_score)
+        out.append((best_index if status != "NONE" else None, float(best_score), status))
+    return out
+
+
+def run_benchmark(*, obligations: int, documents: int, words_per_document: int, seed: int = 7) -> dict[str, float | int]:
+    obligation_terms, corpora = synthetic_mapping(
+        obligations=obligations,
+        documents=documents,
+        words_per_document=words_per_document,
+        seed=seed,
+    )
+
+    started = time.perf_counter()
+    naive = naive_scores(obligation_terms, corpora)
+    naive_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matches = score_obligations(obligation_terms, corpora)
+    sparse_seconds = time.perf_counter() - started
+
+    if naive != [(m.document_index, m.score, m.status) for m in matches]:
+        raise AssertionError("score_obligations diverged from the nested scoring loop")
+
+    return {
+        "obligations": obligations,
+        "documents": documents,
+        "matched": sum(1 for m in matches if m.status == "MATCHED"),
+        "naiveSeconds": round(naive_seconds, 4),
+        "sparseSeconds": round(sparse_seconds, 4),
+        "speedup": round(naive_seconds / sparse_seconds, 2) if sparse_seconds else 0.0,
+    }
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Compare the nested obligation/evidence scoring loop with the sparse scoring engine.")
+    p.add_argument("--obligations", type=int, default=1000, help="Number of obligations (default: 1000)")
+    p.add_argument("--documents", type=int, default=1000, help="Number of evidence documents (default: 1000)")
+    p.add_argument("--words-per-document", type=int, default=400, help="Corpus size per document in words (default: 400)")
+    p.add_argument("--seed", type=int, default=7, help="Random seed (default: 7)")
+    return p
+
+
+def main() -> int:
+    args = _build_arg_parser().parse_args()
+    result = run_benchmark(
+        obligations=args.obligations,
+        documents=args.documents,
+        words_per_document=args.words_per_document,
+        seed=args.seed,
+    )
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
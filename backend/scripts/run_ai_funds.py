@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import uuid
+
+from sqlalchemy.orm import Session, sessionmaker
+
+# Ensure `backend/` is importable when running as a script.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ai_engine.fund_runner import DEFAULT_STAGES, DEFAULT_TIMEOUT_SECONDS, STAGES, active_fund_ids, run_funds  # noqa: E402
+from app.core.db.session import get_engine  # noqa: E402
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Run the per-fund AI engine stages for many funds in parallel worker processes.")
+    p.add_argument("--fund-id", action="append", default=[], help="Fund UUID (repeatable; default: every active fund)")
+    p.add_argument(
+        "--stage",
+        action="append",
+        choices=sorted(STAGES),
+        default=[],
+        help=f"Stage to run (repeatable; default: {' '.join(DEFAULT_STAGES)})",
+    )
+    p.add_argument("--max-workers", type=int, default=None, help="Concurrent funds (default: CPU count)")
+    p.add_argument("--timeout-seconds", type=float, default=DEFAULT_TIMEOUT_SECONDS, help=f"Per-fund timeout (default: {DEFAULT_TIMEOUT_SECONDS:g})")
+    p.add_argument("--actor-id", default="ai-engine-runner", help="Actor recorded on written rows (default: ai-engine-runner)")
+    return p
+
+
+def main() -> int:
+    args = _build_arg_parser().parse_args()
+    if args.fund_id:
+        fund_ids = [uuid.UUID(value) for value in args.fund_id]
+    else:
+        SessionLocal = sessionmaker(bind=get_engine(), autoflush=False, autocommit=False, class_=Session)
+        with SessionLocal() as db:
+            fund_ids = active_fund_ids(db)
+
+    stages = tuple(stage for stage in DEFAULT_STAGES if stage in args.stage) if args.stage else DEFAULT_STAGES
+    report = run_funds(
+        fund_ids,
+        stages=stages,
+        actor_id=args.actor_id,
+        max_workers=args.max_workers,
+        timeout_seconds=args.timeout_seconds,
+    )
+    print(json.dumps(report.to_dict(), indent=2, default=str))
+    return 0 if report.status == "PASS" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import datetime as dt
+import uuid
+
+from fastapi.testclient import TestClient
+
+from ai_engine.fund_runner import FundRunReport, FundRunResult
+from app.modules.ai import routes as ai_routes
+
+
+def test_runner_endpoint_queues_run_and_reports_by_id(client: TestClient, seeded_fund: dict, monkeypatch):
+    calls: list[dict] = []
+
+    def _fake_run_funds(fund_ids, **options):
+        calls.append({"fund_ids": fund_ids, **options})
+        now = dt.datetime.now(dt.timezone.utc)
+        return FundRunReport(
+            started_at=now,
+            finished_at=now,
+            max_workers=1,
+            stages=tuple(options["stages"]),
+            results=tuple(FundRunResult(fund_id=str(fund_id), status="OK", seconds=0.0) for fund_id in fund_ids),
+        )
+
+    monkeypatch.setattr(ai_routes, "run_funds", _fake_run_funds)
+    fund_id = seeded_fund["fund_id"]
+
+    r = client.post(
+        "/admin/ai/runner/run",
+        params={"fund_ids": [fund_id], "stage": ["pipeline"], "as_of": "2026-03-31T00:00:00+00:00"},
+    )
+    assert r.status_code == 202
+    queued = r.json()
+    assert (queued["status"], queued["funds"], queued["stages"]) == ("QUEUED", 1, ["pipeline"])
+
+    # TestClient runs background tasks before returning the response.
+    assert calls[0]["fund_ids"] == [uuid.UUID(fund_id)]
+    assert calls[0]["as_of"] == dt.datetime(2026, 3, 31, tzinfo=dt.timezone.utc)
+    assert calls[0]["start_method"] == "spawn"
+
+    done = client.get(f"/admin/ai/runner/runs/{queued['runId']}").json()
+    assert (done["runId"], done["status"], done["succeeded"]) == (queued["runId"], "PASS", 1)
+
+    assert client.get(f"/admin/ai/runner/runs/{uuid.uuid4()}").status_code == 404
+    assert client.post("/admin/ai/runner/run", params={"stage": ["nope"]}).status_code == 400
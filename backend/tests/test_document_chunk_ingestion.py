@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from app.core.db.models import AuditEvent
 from app.domain.documents.enums import DocumentIngestionStatus
 from app.modules.documents.models import Document, DocumentChunk, DocumentVersion
+from app.services.search_index import IndexingFailure, IndexingResult
 
 
 class _DummySearch:
@@ -17,9 +18,10 @@ class _DummySearch:
 
     def upsert_chunks(self, *, items):
         self.items.extend(items)
+        return IndexingResult(succeeded=len(items))
 
 
-def test_ingestion_worker_generates_chunks_and_indexes(monkeypatch, db_session: Session):
+def _seed_pending_version(db_session: Session) -> tuple[uuid.UUID, uuid.UUID]:
     fund_id = uuid.uuid4()
     doc_id = uuid.uuid4()
     ver_id = uuid.uuid4()
@@ -58,9 +60,10 @@ def test_ingestion_worker_generates_chunks_and_indexes(monkeypatch, db_session:
     db_session.add(doc)
     db_session.add(ver)
     db_session.commit()
+    return fund_id, ver_id
 
-    # Patch external calls in worker
-    from app.domain.documents.services import ingestion_worker as w
+
+def _patch_extraction(monkeypatch, w) -> None:
     from app.services.document_text_extractor import ExtractedPdfText
 
     monkeypatch.setattr(w, "download_bytes", lambda blob_uri: b"%PDF-1.4 dummy")
@@ -70,6 +73,15 @@ def test_ingestion_worker_generates_chunks_and_indexes(monkeypatch, db_session:
         lambda data: ExtractedPdfText(pages=["[PAGE 1]\nRedemption terms...", "[PAGE 2]\nMore text..."]),
     )
 
+
+def test_ingestion_worker_generates_chunks_and_indexes(monkeypatch, db_session: Session):
+    fund_id, ver_id = _seed_pending_version(db_session)
+
+    # Patch external calls in worker
+    from app.domain.documents.services import ingestion_worker as w
+
+    _patch_extraction(monkeypatch, w)
+
     dummy = _DummySearch()
 
     class _DummyClient:
@@ -77,7 +89,7 @@ def test_ingestion_worker_generates_chunks_and_indexes(monkeypatch, db_session:
             pass
 
         def upsert_chunks(self, *, items):
-            dummy.upsert_chunks(items=items)
+            return dummy.upsert_chunks(items=items)
 
     monkeypatch.setattr(w, "AzureSearchChunksClient", _DummyClient)
 
@@ -105,3 +117,35 @@ def test_ingestion_worker_generates_chunks_and_indexes(monkeypatch, db_session:
     assert "DOCUMENT_CHUNKED" in actions
     assert "DOCUMENT_CHUNKS_INDEXED" in actions
 
+
+
+def test_ingestion_worker_does_not_mark_partially_indexed_versions(monkeypatch, db_session: Session):
+    fund_id, ver_id = _seed_pending_version(db_session)
+
+    from app.domain.documents.services import ingestion_worker as w
+
+    _patch_extraction(monkeypatch, w)
+
+    class _RejectingClient:
+        def upsert_chunks(self, *, items):
+            rejected = IndexingFailure(key=items[0]["chunk_id"], status_code=400, error_message="invalid document")
+            return IndexingResult(succeeded=len(items) - 1, failed=(rejected,))
+
+    monkeypatch.setattr(w, "AzureSearchChunksClient", _RejectingClient)
+
+    w.process_version(db_session, fund_id=fund_id, version_id=ver_id, actor_id="worker-test")
+
+    v2 = db_session.query(DocumentVersion).filter(DocumentVersion.id == ver_id).one()
+    first_chunk = (
+        db_session.query(DocumentChunk)
+        .filter(DocumentChunk.version_id == ver_id)
+        .order_by(DocumentChunk.chunk_index.asc())
+        .first()
+    )
+    assert v2.ingestion_status == DocumentIngestionStatus.FAILED
+    assert v2.indexed_at is None
+    assert v2.ingest_error["reason"] == "search_index_rejected"
+    assert v2.ingest_error["failed_keys"] == [str(first_chunk.id)]
+    actions = {e.action for e in db_session.query(AuditEvent).filter(AuditEvent.fund_id == fund_id)}
+    assert "INGESTION_FAILED" in actions
+    assert "DOCUMENT_CHUNKS_INDEXED" not in actions
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import types
+
+import pytest
+from azure.core.exceptions import HttpResponseError
+
+from app.services.search_index import SearchIndexingQueue
+
+
+class _FakeIndex:
+    """In-memory stand-in for a SearchClient's indexing endpoint."""
+
+    def __init__(self, *, throttle_requests: int = 0, busy_keys: dict[str, int] | None = None, rejected: set[str] | None = None):
+        self.documents: dict[str, dict] = {}
+        self.requests: list[list[str]] = []
+        self.throttle_requests = throttle_requests
+        self.busy_keys = dict(busy_keys or {})
+        self.rejected = rejected or set()
+
+    def merge_or_upload_documents(self, *, documents):
+        self.requests.append([d["id"] for d in documents])
+        if self.throttle_requests:
+            self.throttle_requests -= 1
+            error = HttpResponseError(message="Too many requests")
+            error.status_code = 429
+            raise error
+        results = []
+        for doc in documents:
+            key = doc["id"]
+            if self.busy_keys.get(key):
+                self.busy_keys[key] -= 1
+                results.append(types.SimpleNamespace(key=key, succeeded=False, status_code=503, error_message="busy"))
+            elif key in self.rejected:
+                results.append(types.SimpleNamespace(key=key, succeeded=False, status_code=400, error_message="bad field"))
+            else:
+                self.documents[key] = doc
+                results.append(types.SimpleNamespace(key=key, succeeded=True, status_code=201, error_message=None))
+        return results
+
+
+def _docs(count: int, size: int = 10) -> list[dict]:
+    return [{"id": f"d{i}", "content": "x" * size} for i in range(count)]
+
+
+def test_queue_batches_by_count_and_payload_size():
+    index = _FakeIndex()
+    with SearchIndexingQueue(index, max_documents=3, max_bytes=120) as queue:
+        queue.extend(_docs(7))
+        assert [len(r) for r in index.requests] == [3, 3]
+    assert [len(r) for r in index.requests] == [3, 3, 1]
+    assert queue.result().succeeded == 7
+
+    index = _FakeIndex()
+    with SearchIndexingQueue(index, max_documents=100, max_bytes=200) as queue:
+        queue.extend(_docs(5, size=50))
+        queue.add({"id": "huge", "content": "x" * 500})
+    assert [len(r) for r in index.requests] == [2, 2, 1]
+    assert [(f.key, f.status_code) for f in queue.result().failed] == [("huge", 413)]
+
+
+def test_queue_retries_throttling_with_backoff_and_reports_item_failures():
+    delays: list[float] = []
+    index = _FakeIndex(throttle_requests=2, busy_keys={"d1": 1}, rejected={"d2"})
+    with SearchIndexingQueue(index, base_delay=1.0, sleep=delays.append) as queue:
+        queue.extend(_docs(4))
+    result = queue.result()
+
+    assert index.requests == [["d0", "d1", "d2", "d3"]] * 3 + [["d1"]]
+    assert sorted(index.documents) == ["d0", "d1", "d3"]
+    assert result.succeeded == 3
+    assert result.failed_keys == {"d2"}
+    assert 0.5 <= delays[0] <= 1.0 and 1.0 <= delays[1] <= 2.0 and 2.0 <= delays[2] <= 4.0
+
+    index = _FakeIndex(throttle_requests=10)
+    with pytest.raises(HttpResponseError):
+        with SearchIndexingQueue(index, max_retries=2, sleep=lambda _: None) as queue:
+            queue.extend(_docs(2))
+    assert len(index.requests) == 3
+
+
+def test_queue_retries_requests_and_items_on_their_own_status_codes():
+    class _Rejecting(_FakeIndex):
+        def merge_or_upload_documents(self, *, documents):
+            self.requests.append([d["id"] for d in documents])
+            error = HttpResponseError(message="Conflict")
+            error.status_code = 422
+            raise error
+
+    index = _Rejecting()
+    with pytest.raises(HttpResponseError):
+        with SearchIndexingQueue(index, sleep=lambda _: None) as queue:
+            queue.add({"id": "d0"})
+    assert len(index.requests) == 1  # 422 is an item-level retry code only
+
+    class _ItemCodes(_FakeIndex):
+        def merge_or_upload_documents(self, *, documents):
+            self.requests.append([d["id"] for d in documents])
+            first = len(self.requests) == 1
+            codes = {"d0": 207, "d1": 422} if first else {}
+            return [
+                types.SimpleNamespace(key=d["id"], succeeded=d["id"] not in codes, status_code=codes.get(d["id"], 200), error_message=None)
+                for d in documents
+            ]
+
+    index = _ItemCodes()
+    with SearchIndexingQueue(index, sleep=lambda _: None) as queue:
+        queue.extend([{"id": "d0"}, {"id": "d1"}])
+    assert index.requests == [["d0", "d1"], ["d1"]]
+    assert [(f.key, f.status_code) for f in queue.result().failed] == [("d0", 207)]
+    assert queue.result().succeeded == 1